@@ -15,7 +15,7 @@
 import os, sys, datetime as dt
 from pathlib import Path
 import inspect
-import requests
+import functools
 import io
 
 print(f"[{dt.datetime.now().strftime('%Y%m%d_%H%M%S.%f')[:19]}] Starting {__name__}")
@@ -41,9 +41,16 @@ from flask import Flask, redirect
 import lib.fa_dash_utils as fa
 import lib.bod_calcs as bod
 import lib.ga_ahle_calcs as ga
+import lib.data_store as store
+import lib.bod_cube as bod_cube
+import lib.geojson_utils as geo
+import lib.data_registry as datareg
+import lib.frame_index as fidx
+import lib.figure_cache as figcache
 
 #### PARAMETERS
 prod                         = False   # Use when testing/dev mode to remove auth
+warm_data_in_background      = os.environ.get('GBADS_DASH_WARM_DATA' ,'1') != '0'   # Load data sets for all tabs in a background thread once the server is handling requests
 
 #%% 2. INITIALIZE APP
 ###############################################################################################
@@ -74,6 +81,18 @@ if prod:
 
 app.config.suppress_callback_exceptions = True    # Use to remove warnings when assigning callbacks to components that are generated by other callbacks (and therefore not in the initial layout)
 
+# Data sets are read when first used (see lib/data_registry.py)
+# Once the server is handling requests, read the rest in the background so they are ready when users open each tab
+if warm_data_in_background:
+    @app.server.before_request
+    def warm_data():
+        datareg.warm_in_background()
+
+# Hit and miss counts for cached figures in this worker process (see lib/figure_cache.py)
+@app.server.route('/figure-cache-stats')
+def figure_cache_stats():
+    return {'pid':os.getpid() ,'stats':figcache.stats().to_dict('records')}
+
 #%% 3. GLOBAL PROGRAM ELEMENTS
 ###############################################################################################
 # - Global variables and functions that aren't directly involved in the UI interactivity (Callbacks)
@@ -147,6 +166,9 @@ user_guide_tab_selected_style ={
 CWD = os.getcwd()
 DASH_DATA_FOLDER = os.path.join(CWD ,'data')
 
+# Saved figures are only used while the data and dashboard code are unchanged
+figcache.set_version(DASH_DATA_FOLDER ,os.path.abspath(__file__) ,os.path.join(CWD ,'lib'))
+
 # Folder location for ethiopia case study
 GBADsLiverpool=Path(os.getcwd()).parent.parent
 Ethiopia_Workspace = "Ethiopia Workspace"
@@ -161,28 +183,46 @@ else:
     # Output folders:
     ECS_PROGRAM_OUTPUT_FOLDER = os.path.join(GBADsLiverpool, Ethiopia_Workspace, "Program outputs")
     GA_DATA_FOLDER = os.path.join(GBADsLiverpool, Global_Agg_Workspace, "Data")
+# Data sets are registered here with a function to read them. Each is read the
+# first time it is used, with datareg.get('<name>'). See lib/data_registry.py.
+# Data sets are read by callbacks, or in the background once the server starts.
+# Dropdown options that come from the data are built on first use, see get_ga_options().
+
+# These use a Feather copy of the file if the pipeline created one
+def read_pickle_fordash(FILENAME):
+   return lambda: datareg.read_fordash(os.path.join(DASH_DATA_FOLDER ,FILENAME) ,pd.read_pickle)
+
+def read_csv_fordash(FILENAME):
+   return lambda: datareg.read_fordash(os.path.join(DASH_DATA_FOLDER ,FILENAME) ,pd.read_csv)
+
+# Breed standards are also compiled into lookup arrays when read, under the same name. See bod.register_breedstd().
+def read_breedstd_fordash(NAME):
+   return lambda: bod.register_breedstd(NAME ,read_pickle_fordash(f'{NAME}.pkl.gz')())
+
 # -----------------------------------------------------------------------------
 # Poultry
 # -----------------------------------------------------------------------------
 # Main table
-gbads_chickens_merged_fordash = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'gbads_chickens_merged_fordash.pkl.gz'))
+datareg.register('gbads_chickens_merged_fordash' ,read_pickle_fordash('gbads_chickens_merged_fordash.pkl.gz') ,TAB='poultry')
 
 # Breed Standards
-poultrybreedstd_ross308 = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'poultrybreedstd_ross308.pkl.gz'))
-poultrybreedstd_ross708 = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'poultrybreedstd_ross708.pkl.gz'))
-poultrybreedstd_cobb500 = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'poultrybreedstd_cobb500.pkl.gz'))
-poultrybreedstd_vencobb400 = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'poultrybreedstd_vencobb400.pkl.gz'))
-poultrybreedstd_liverpool_model = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'poultrybreedstd_liverpool_model.pkl.gz'))
+datareg.register('poultrybreedstd_ross308' ,read_breedstd_fordash('poultrybreedstd_ross308') ,TAB='poultry')
+datareg.register('poultrybreedstd_ross708' ,read_breedstd_fordash('poultrybreedstd_ross708') ,TAB='poultry')
+datareg.register('poultrybreedstd_cobb500' ,read_breedstd_fordash('poultrybreedstd_cobb500') ,TAB='poultry')
+datareg.register('poultrybreedstd_vencobb400' ,read_breedstd_fordash('poultrybreedstd_vencobb400') ,TAB='poultry')
+# Not used by any callback. Left out of warm-up, so it is only read if requested with datareg.get().
+datareg.register('poultrybreedstd_liverpool_model' ,read_breedstd_fordash('poultrybreedstd_liverpool_model') ,TAB='poultry' ,WARM=False)
 
 # -----------------------------------------------------------------------------
 # Swine
 # -----------------------------------------------------------------------------
 # Main table
-gbads_pigs_merged_fordash = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'gbads_pigs_merged_fordash.pkl.gz'))
+datareg.register('gbads_pigs_merged_fordash' ,read_pickle_fordash('gbads_pigs_merged_fordash.pkl.gz') ,TAB='swine')
 
 # Breed Standards
-swinebreedstd_pic_growthandfeed = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'swinebreedstd_pic_growthandfeed.pkl.gz'))
-swinebreedstd_liverpool_model3 = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'swinebreedstd_liverpool_model3.pkl.gz'))
+datareg.register('swinebreedstd_pic_growthandfeed' ,read_breedstd_fordash('swinebreedstd_pic_growthandfeed') ,TAB='swine')
+# Not used by any callback. Left out of warm-up, so it is only read if requested with datareg.get().
+datareg.register('swinebreedstd_liverpool_model3' ,read_breedstd_fordash('swinebreedstd_liverpool_model3') ,TAB='swine' ,WARM=False)
 
 # -----------------------------------------------------------------------------
 # Ethiopia Case Study
@@ -190,76 +230,85 @@ swinebreedstd_liverpool_model3 = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'
 # AHLE Summary
 # ecs_ahle_summary = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_summary.csv'))
 # Using alternative data which summarizes results from age/sex specific scenarios
-ahle_all_scensmry = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_scensmry.csv'))
+datareg.register('ahle_all_scensmry' ,read_csv_fordash('ahle_all_scensmry.csv') ,TAB='ecs')
+
+# JR 2023-4-19: added regional results. Testing with Nationl level (should be same as before).
+def load_ecs_ahle_summary():
+   ecs_ahle_summary = datareg.get('ahle_all_scensmry').query("region == 'National'").copy()
+
+   # Production system
+   # Rename Overall to more descriptive
+   ecs_ahle_summary['production_system'] = ecs_ahle_summary['production_system'].replace({'Overall': 'All Production Systems'})
+   return ecs_ahle_summary
+datareg.register('ecs_ahle_summary' ,load_ecs_ahle_summary ,TAB='ecs')
+
+# Index for filtering in callbacks
+def load_ecs_scensmry_index():
+   ahle_all_scensmry = datareg.get('ahle_all_scensmry')
+   ahle_all_scensmry = ahle_all_scensmry.assign(
+      production_system=ahle_all_scensmry['production_system'].replace({'Overall': 'All Production Systems'})
+   )
+   return fidx.build_index(ahle_all_scensmry ,['species' ,'production_system' ,'agesex_scenario' ,'region'])
+datareg.register('ecs_scensmry_index' ,load_ecs_scensmry_index ,TAB='ecs')
 
 # AHLE Summary 2 - for stacked bar
-ecs_ahle_summary2 = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_summary2.csv'))
+def load_ecs_ahle_summary2():
+   ecs_ahle_summary2 = datareg.read_fordash(os.path.join(DASH_DATA_FOLDER ,'ahle_all_summary2.csv') ,pd.read_csv)
+   ecs_ahle_summary2 = ecs_ahle_summary2.query("region == 'National'").copy()
+
+   # Rename values to match filters
+   ecs_ahle_summary2['production_system'] = ecs_ahle_summary2['production_system'].replace({'Overall': 'All Production Systems'})
+   return ecs_ahle_summary2
+datareg.register('ecs_ahle_summary2' ,load_ecs_ahle_summary2 ,TAB='ecs')
+
+# Index for filtering in callbacks
+datareg.register('ecs_summary2_index'
+   ,lambda: fidx.build_index(datareg.get('ecs_ahle_summary2') ,['species' ,'production_system'])
+   ,TAB='ecs'
+)
 
 # Attribution Summary
-# ecs_ahle_all_withattr = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_withattr.csv'))
+# datareg.register('ecs_ahle_all_withattr' ,read_csv_fordash('ahle_all_withattr.csv') ,TAB='ecs')
 # Using alternative data with placeholders for disease-specific attribution
-ecs_ahle_all_withattr = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_withattr_disease.csv'))
-
-# JR 2023-4-19: added regional results. Testing with Nationl level (should be same as before).
-ecs_ahle_summary = ahle_all_scensmry.query("region == 'National'").copy()
-ecs_ahle_summary2 = ecs_ahle_summary2.query("region == 'National'")
+datareg.register('ecs_ahle_all_withattr' ,read_csv_fordash('ahle_all_withattr_disease.csv') ,TAB='ecs')
 # ecs_ahle_all_withattr = ecs_ahle_all_withattr.query("region == 'National'")
 
-# Ethiopia geojson files from S3
+# Index for filtering in callbacks
+datareg.register('ecs_withattr_index'
+   ,lambda: fidx.build_index(datareg.get('ecs_ahle_all_withattr') ,['region' ,'production_system' ,'species'])
+   ,TAB='ecs'
+)
+
+# Ethiopia geojson files
 # Regional level
-url = 'https://gbads-data-repo.s3.ca-central-1.amazonaws.com/shape-files/eth_admbnda_adm1_csa_bofedb_2021.geojson'
-r = requests.get(url, allow_redirects=True)
-geojson_ecs = r.json()
+# Local copy of https://gbads-data-repo.s3.ca-central-1.amazonaws.com/shape-files/eth_admbnda_adm1_csa_bofedb_2021.geojson
+# Using simplified geometries to reduce the size of map figures. Only keeping the property used as featureidkey.
+datareg.register('geojson_ecs'
+   ,lambda: geo.load_geojson_simplified(
+      os.path.join(DASH_DATA_FOLDER ,'eth_admbnda_adm1_csa_bofedb_2021.geojson')
+      ,KEEP_PROPERTIES=['ADM1_EN']
+   )
+   ,TAB='ecs'
+)
 
-# Alternative: read from local copy
+# Alternative: read full geometries
 # geojson_ecs = gpd.read_file(os.path.join(DASH_DATA_FOLDER ,'eth_admbnda_adm1_csa_bofedb_2021.geojson'))
 
 # Expert opinion files
-ecs_expertattr_smallrum = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'attribution_experts_smallruminants.csv'))
-ecs_expertattr_cattle = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'attribution_experts_cattle.csv'))
-ecs_expertattr_poultry = pd.read_csv(os.path.join(DASH_DATA_FOLDER ,'attribution_experts_chickens.csv'))
+datareg.register('ecs_expertattr_smallrum' ,read_csv_fordash('attribution_experts_smallruminants.csv') ,TAB='ecs')
+datareg.register('ecs_expertattr_cattle' ,read_csv_fordash('attribution_experts_cattle.csv') ,TAB='ecs')
+datareg.register('ecs_expertattr_poultry' ,read_csv_fordash('attribution_experts_chickens.csv') ,TAB='ecs')
 
 # -----------------------------------------------------------------------------
 # Global Aggregate
 # -----------------------------------------------------------------------------
 # Biomass FAOSTAT
-ga_countries_biomass = pd.read_pickle(os.path.join(DASH_DATA_FOLDER ,'world_ahle_abt_fordash.pkl.gz'))
-
-# Drop unnecessary columns
-ga_countries_biomass = ga_countries_biomass.drop(columns=['producing_animals_eggs_hd',
-                                                          'producing_animals_hides_hd',
-                                                          'producing_animals_meat_hd',
-                                                          'producing_animals_milk_hd',
-                                                          'producing_animals_wool_hd',
-                                                          'output_live_hd',
-                                                          'output_total_hd',
-                                                          # 'output_live_biomass_kg',
-                                                          # 'output_total_biomass_kg',
-                                                          'output_value_live_2010usd',
-                                                          'output_value_total_2010usd',
-                                                          'output_value_meatlive_2010usd',
-                                                          'producer_price_milk_usdpertonne_cnst2010',
-                                                          'producer_price_wool_usdpertonne_cnst2010',
-                                                          'producer_price_meat_live_usdpertonne_cnst2010',
-                                                          'producer_price_eggs_usdpertonne_cnst2010',
-                                                          'producer_price_meat_usdpertonne_cnst2010',
-                                                          'production_eggs_kgperkgbm',
-                                                          'production_hides_kgperkgbm',
-                                                          'production_meat_kgperkgbm',
-                                                          'production_milk_kgperkgbm',
-                                                          'production_wool_kgperkgbm',
-                                                          ])
-
 # Drop species
 drop_species = ['Camels',
                 'Horses',
                 'Buffaloes',
                 'Ducks']
 
-_drop_species = (ga_countries_biomass['species'].isin(drop_species))
-ga_countries_biomass = ga_countries_biomass.loc[~ _drop_species]
-
-
 # Drop countries
 # Thin the regions with many countries
 # ga_countries_biomass['region'].unique()
@@ -419,36 +468,99 @@ drop_countries = [
     ,'Zambia'
     # ,'Zimbabwe'
 ]
-_drop_countries = (ga_countries_biomass['country'].isin(drop_countries))
-ga_countries_biomass = ga_countries_biomass.loc[~ _drop_countries]
-
-# Keep history only to 2015
-# ga_countries_biomass = ga_countries_biomass.loc[ga_countries_biomass['year'] >= 2015]
 
-# Drop missing values from species
-ga_countries_biomass['species'].replace('', np.nan, inplace=True)
-ga_countries_biomass.dropna(subset=['species'], inplace=True)
+def load_ga_countries_biomass():
+    ga_countries_biomass = datareg.read_fordash(os.path.join(DASH_DATA_FOLDER ,'world_ahle_abt_fordash.pkl.gz') ,pd.read_pickle)
+
+    # Drop unnecessary columns
+    ga_countries_biomass = ga_countries_biomass.drop(columns=['producing_animals_eggs_hd',
+                                                              'producing_animals_hides_hd',
+                                                              'producing_animals_meat_hd',
+                                                              'producing_animals_milk_hd',
+                                                              'producing_animals_wool_hd',
+                                                              'output_live_hd',
+                                                              'output_total_hd',
+                                                              # 'output_live_biomass_kg',
+                                                              # 'output_total_biomass_kg',
+                                                              'output_value_live_2010usd',
+                                                              'output_value_total_2010usd',
+                                                              'output_value_meatlive_2010usd',
+                                                              'producer_price_milk_usdpertonne_cnst2010',
+                                                              'producer_price_wool_usdpertonne_cnst2010',
+                                                              'producer_price_meat_live_usdpertonne_cnst2010',
+                                                              'producer_price_eggs_usdpertonne_cnst2010',
+                                                              'producer_price_meat_usdpertonne_cnst2010',
+                                                              'production_eggs_kgperkgbm',
+                                                              'production_hides_kgperkgbm',
+                                                              'production_meat_kgperkgbm',
+                                                              'production_milk_kgperkgbm',
+                                                              'production_wool_kgperkgbm',
+                                                              ])
+
+    # Drop species
+    _drop_species = (ga_countries_biomass['species'].isin(drop_species))
+    ga_countries_biomass = ga_countries_biomass.loc[~ _drop_species]
+
+    # Drop countries
+    _drop_countries = (ga_countries_biomass['country'].isin(drop_countries))
+    ga_countries_biomass = ga_countries_biomass.loc[~ _drop_countries]
+
+    # Keep history only to 2015
+    # ga_countries_biomass = ga_countries_biomass.loc[ga_countries_biomass['year'] >= 2015]
+
+    # Drop missing values from species
+    ga_countries_biomass['species'].replace('', np.nan, inplace=True)
+    ga_countries_biomass.dropna(subset=['species'], inplace=True)
+
+    # Income group
+    # Rename Overall to more descriptive
+    ga_countries_biomass['incomegroup'] = ga_countries_biomass['incomegroup'].replace(
+        {'L': 'Low',
+         'LM':'Lower Middle',
+         'UM':'Upper Middle',
+         'H':'High',
+         'UNK':'Unassigned',
+         'NaN':'Unassigned'
+         })
+
+    # replacing na values in college with No college
+    ga_countries_biomass['incomegroup'].fillna("Unassigned", inplace = True)
+
+    # World Bank regions
+    ga_countries_biomass['region_label'] = ga_countries_biomass['region'].replace({'EAP': 'East Asia & Pacific',
+                                                                             'ECA':'Europe & Central Asia',
+                                                                             'LAC':'Latin America & the Caribbean',
+                                                                             'MENA':'Middle East & North Africa',
+                                                                             'NA':'North America',
+                                                                             'SA':'South Asia',
+                                                                             'SSA':'Sub-Saharan Africa'})
+    return ga_countries_biomass
+datareg.register('ga_countries_biomass' ,load_ga_countries_biomass ,TAB='ga')
 
 # -----------------------------------------------------------------------------
 # Antimicrobial Usage
 # -----------------------------------------------------------------------------
-amu2018_combined_tall = pd.read_csv(os.path.join(DASH_DATA_FOLDER, "amu2018_combined_tall.csv"))
+def load_amu2018_combined_tall():
+    amu2018_combined_tall = datareg.read_fordash(os.path.join(DASH_DATA_FOLDER, "amu2018_combined_tall.csv") ,pd.read_csv)
 
-# Create region labels with number of countries reporting
-# amu2018_combined_tall["region_with_countries_reporting"] = \
-#     amu2018_combined_tall['region'] + " (" + round(amu2018_combined_tall['number_of_countries'] ,0).astype(int).astype(str) + ")"
+    # Create region labels with number of countries reporting
+    # amu2018_combined_tall["region_with_countries_reporting"] = \
+    #     amu2018_combined_tall['region'] + " (" + round(amu2018_combined_tall['number_of_countries'] ,0).astype(int).astype(str) + ")"
 
-# Create region labels with proportion of biomass represented in countries reporting
-amu2018_combined_tall["region_with_countries_reporting"] = \
-    amu2018_combined_tall['region'] \
-        + " (" + round(amu2018_combined_tall['number_of_countries'] ,0).astype(int).astype(str) \
-        + " | " + round(amu2018_combined_tall['biomass_prpn_reporting'] * 100 ,1).astype(str) + "%)"
+    # Create region labels with proportion of biomass represented in countries reporting
+    # Region can be categorical (see datareg.read_fordash()). Use object to add text to it.
+    amu2018_combined_tall["region_with_countries_reporting"] = \
+        amu2018_combined_tall['region'].astype(object) \
+            + " (" + round(amu2018_combined_tall['number_of_countries'] ,0).astype(int).astype(str) \
+            + " | " + round(amu2018_combined_tall['biomass_prpn_reporting'] * 100 ,1).astype(str) + "%)"
+    return amu2018_combined_tall
+datareg.register('amu2018_combined_tall' ,load_amu2018_combined_tall ,TAB='amu')
 
-amu_combined_regional = pd.read_csv(os.path.join(DASH_DATA_FOLDER, "amu_combined_regional.csv"))
-# amu_uncertainty_data = pd.read_csv(os.path.join(DASH_DATA_FOLDER, "amu_uncertainty_data.csv"))
+datareg.register('amu_combined_regional' ,read_csv_fordash("amu_combined_regional.csv") ,TAB='amu')
+# datareg.register('amu_uncertainty_data' ,read_csv_fordash("amu_uncertainty_data.csv") ,TAB='amu')
 
 # Antimicrobial resistance data
-amr_withsmry = pd.read_csv(os.path.join(DASH_DATA_FOLDER, "amr_withsmry.csv"))
+datareg.register('amr_withsmry' ,read_csv_fordash("amr_withsmry.csv") ,TAB='amu')
 
 # =============================================================================
 #### User options and defaults
@@ -579,15 +691,25 @@ metric_options = [
 # -----------------------------------------------------------------------------
 # Poultry
 # -----------------------------------------------------------------------------
-country_options_poultry = []
-for i in np.sort(gbads_chickens_merged_fordash['country'].unique()) :
-   country_shortname = country_shortnames[i]
-   compound_label = f"{i} ({country_shortname})"
-   str(country_options_poultry.append({'label':compound_label,'value':(i)}))
-
-year_options_poultry = []
-for i in np.sort(gbads_chickens_merged_fordash['year'].unique()) :
-   str(year_options_poultry.append({'label':i,'value':(i)}))
+# Options created from the data
+# Built on first use, like get_ga_options(). Dropdowns in the layout start empty.
+# Returns dictionary of option lists: 'country', 'year'
+@functools.lru_cache(maxsize=None)
+def get_poultry_options():
+   gbads_chickens_merged_fordash = datareg.get('gbads_chickens_merged_fordash')
+   options = {}
+
+   options['country'] = []
+   for i in np.sort(gbads_chickens_merged_fordash['country'].unique()) :
+      country_shortname = country_shortnames[i]
+      compound_label = f"{i} ({country_shortname})"
+      str(options['country'].append({'label':compound_label,'value':(i)}))
+
+   options['year'] = []
+   for i in np.sort(gbads_chickens_merged_fordash['year'].unique()) :
+      str(options['year'].append({'label':i,'value':(i)}))
+
+   return options
 
 # Global defaults for sliders
 # Most sliders will default to a value based on data for the selected country and year
@@ -617,26 +739,49 @@ poultry_lookup_breed_from_country = {
 
 # Breed data lookup
 # Keys must match values in poultry_lookup_breed_from_country
-# Values must be data frames imported above
+# Values must be names of data sets registered above. Use datareg.get() to get the data frame.
 poultry_lookup_breed_df = {
-   'Cobb 500':poultrybreedstd_cobb500
-   ,'Ross 308':poultrybreedstd_ross308
-   ,'Ross 708':poultrybreedstd_ross708
-   ,'Venncobb 400':poultrybreedstd_vencobb400
+   'Cobb 500':'poultrybreedstd_cobb500'
+   ,'Ross 308':'poultrybreedstd_ross308'
+   ,'Ross 708':'poultrybreedstd_ross708'
+   ,'Venncobb 400':'poultrybreedstd_vencobb400'
 }
 
+# Precomputed burden of disease results (see lib/bod_cube.py)
+# Keys must match keys in poultry_lookup_breed_df
+# Value is None if the cube is missing or out of date. Results will be calculated live.
+def load_poultry_bod_cubes():
+   input_df = datareg.get('gbads_chickens_merged_fordash')
+   return {
+      'Cobb 500':bod_cube.load_cube('poultry' ,'cobb500' ,input_df ,datareg.get('poultrybreedstd_cobb500'))
+      ,'Ross 308':bod_cube.load_cube('poultry' ,'ross308' ,input_df ,datareg.get('poultrybreedstd_ross308'))
+      ,'Ross 708':bod_cube.load_cube('poultry' ,'ross708' ,input_df ,datareg.get('poultrybreedstd_ross708'))
+      ,'Venncobb 400':bod_cube.load_cube('poultry' ,'vencobb400' ,input_df ,datareg.get('poultrybreedstd_vencobb400'))
+   }
+datareg.register('poultry_lookup_breed_cube' ,load_poultry_bod_cubes ,TAB='poultry')
+
 # -----------------------------------------------------------------------------
 # Swine
 # -----------------------------------------------------------------------------
-country_options_swine = []
-for i in np.sort(gbads_pigs_merged_fordash['country'].unique()) :
-   country_shortname = country_shortnames[i]
-   compound_label = f"{i} ({country_shortname})"
-   str(country_options_swine.append({'label':compound_label,'value':(i)}))
-
-year_options_swine = []
-for i in np.sort(gbads_pigs_merged_fordash['year'].unique()):
-   str(year_options_swine.append({'label':i,'value':(i)}))
+# Options created from the data
+# Built on first use, like get_ga_options(). Dropdowns in the layout start empty.
+# Returns dictionary of option lists: 'country', 'year'
+@functools.lru_cache(maxsize=None)
+def get_swine_options():
+   gbads_pigs_merged_fordash = datareg.get('gbads_pigs_merged_fordash')
+   options = {}
+
+   options['country'] = []
+   for i in np.sort(gbads_pigs_merged_fordash['country'].unique()) :
+      country_shortname = country_shortnames[i]
+      compound_label = f"{i} ({country_shortname})"
+      str(options['country'].append({'label':compound_label,'value':(i)}))
+
+   options['year'] = []
+   for i in np.sort(gbads_pigs_merged_fordash['year'].unique()):
+      str(options['year'].append({'label':i,'value':(i)}))
+
+   return options
 
 # Global defaults for sliders
 # Most sliders will default to a value based on data for the selected country and year
@@ -668,11 +813,17 @@ swine_lookup_breed_from_country = {
 
 # Breed data lookup
 # Keys must match values in swine_lookup_breed_from_country
-# Values must be data frames imported above
+# Values must be names of data sets registered above. Use datareg.get() to get the data frame.
 swine_lookup_breed_df = {
-   'PIC':swinebreedstd_pic_growthandfeed
+   'PIC':'swinebreedstd_pic_growthandfeed'
 }
 
+# Precomputed burden of disease results (see lib/bod_cube.py)
+datareg.register('swine_bod_cube'
+   ,lambda: bod_cube.load_cube('swine' ,'pic_growthandfeed' ,datareg.get('gbads_pigs_merged_fordash') ,datareg.get('swinebreedstd_pic_growthandfeed'))
+   ,TAB='swine'
+)
+
 # =============================================================================
 #### Ethiopia case study options
 # =============================================================================
@@ -691,8 +842,7 @@ ecs_species_options = [{'label': i, 'value': i, 'disabled': False} for i in ["Ca
                                                                              ]]
 
 # Production system
-# Rename Overall to more descriptive
-ecs_ahle_summary['production_system'] = ecs_ahle_summary['production_system'].replace({'Overall': 'All Production Systems'})
+# 'Overall' is renamed when data is loaded, see load_ecs_ahle_summary()
 
 # ecs_prodsys_options are now defined dynamically in a callback based on selected species
 # ecs_prodsys_options = []
@@ -706,10 +856,7 @@ ecs_ahle_summary['production_system'] = ecs_ahle_summary['production_system'].re
 #     str(ecs_year_options.append({'label':i,'value':(i)}))
 
 
-# Sex
-ecs_agesex_options=[]
-for i in np.sort(ecs_ahle_summary['agesex_scenario'].unique()):
-   str(ecs_agesex_options.append({'label':i,'value':(i)}))
+# Sex, attribution, and region options come from the data, see get_ecs_options()
 
 # Filter for juvenile and neonates
 ecs_sex_options_filter = [{'label': "Overall Sex", 'value': "Overall Sex", 'disabled': False}]
@@ -718,12 +865,6 @@ ecs_sex_options_filter = [{'label': "Overall Sex", 'value': "Overall Sex", 'disa
 ecs_currency_options = [{'label': "Birr", 'value': "Birr", 'disabled': False},
                         {'label': "USD", 'value': "USD", 'disabled': False}]
 
-# Attribution
-ecs_attr_options = [{'label': "All Causes", 'value': "All Causes", 'disabled': False}]
-
-for i in np.sort(ecs_ahle_all_withattr['cause'].unique()):
-   str(ecs_attr_options.append({'label':i,'value':(i)}))
-
 # Hierarchy
 ecs_hierarchy_attr_options = [{'label': "Cause", 'value': "cause", 'disabled': False},
                               {'label': "Production System", 'value': "production_system", 'disabled': False},
@@ -738,15 +879,35 @@ ecs_hierarchy_dd_attr_options = [{'label': i, 'value': i, 'disabled': False} for
 
 ecs_hierarchy_dd_attr_options += ecs_hierarchy_attr_options
 
-# Region - removing 'National' from the options
-ecs_region_options = []
-for i in ahle_all_scensmry.query("region != 'National'").region.unique():
-    str(ecs_region_options.append({'label':i,'value':(i)}))
-
 # Display
 ecs_display_options = [{'label': i, 'value': i, 'disabled': False} for i in ["Difference",
                                                                              "Side by Side",
                                                                             ]]
+# Options created from the data
+# Built on first use, like get_ga_options(). Dropdowns in the layout start empty.
+# Returns dictionary of option lists: 'agesex', 'attr', 'region'
+@functools.lru_cache(maxsize=None)
+def get_ecs_options():
+   options = {}
+
+   # Sex
+   options['agesex'] = []
+   for i in np.sort(datareg.get('ecs_ahle_summary')['agesex_scenario'].unique()):
+      str(options['agesex'].append({'label':i,'value':(i)}))
+
+   # Attribution
+   options['attr'] = [{'label': "All Causes", 'value': "All Causes", 'disabled': False}]
+
+   for i in np.sort(datareg.get('ecs_ahle_all_withattr')['cause'].unique()):
+      str(options['attr'].append({'label':i,'value':(i)}))
+
+   # Region - removing 'National' from the options
+   options['region'] = []
+   for i in datareg.get('ahle_all_scensmry').query("region != 'National'").region.unique():
+      str(options['region'].append({'label':i,'value':(i)}))
+
+   return options
+
 # Item
 # Keep only items for the waterfall
 waterfall_plot_values = ('Value of Offtake',
@@ -797,41 +958,9 @@ ecs_map_denominator_options = [{'label': i, 'value': i, 'disabled': False} for i
 # =============================================================================
 #### Global Aggregate options
 # =============================================================================
-# Species
-ga_species_options = []
-for i in ga_countries_biomass['species'].unique():
-    str(ga_species_options.append({'label':i,'value':(i)}))
-
-country_options_ga = [{'label': "All", 'value': "All", 'disabled': False}]
-for i in ga_countries_biomass['country'].unique():
-    str(country_options_ga.append({'label':i,'value':(i)}))
-
-# Income group
-# Rename Overall to more descriptive
-ga_countries_biomass['incomegroup'] = ga_countries_biomass['incomegroup'].replace(
-    {'L': 'Low',
-     'LM':'Lower Middle',
-     'UM':'Upper Middle',
-     'H':'High',
-     'UNK':'Unassigned',
-     'NaN':'Unassigned'
-     })
-
-# replacing na values in college with No college
-ga_countries_biomass['incomegroup'].fillna("Unassigned", inplace = True)
-
-incomegrp_options_ga = [{'label': "All", 'value': "All"}]
-for i in ga_countries_biomass['incomegroup'].unique():
-    str(incomegrp_options_ga.append({'label':i,'value':(i)}))
-
 # Mortality rate
 mortality_rate_options_ga = [{'label': f'{i*100: .0f}%', 'value': i, 'disabled': True} for i in list(np.array(range(1, 11)) / 100)]
 
-# Year
-year_options_ga = []
-for i in np.sort(ga_countries_biomass['year'].unique()):
-   str(year_options_ga.append({'label':i,'value':(i)}))
-
 # AHLE elements
 # Values here must match item names defined in prep_ahle_forwaterfall_ga()
 item_list_ga = [
@@ -857,6 +986,24 @@ map_display_options_ga = [
     ,'AHLE per kg biomass'
     ]
 
+# Rate table
+# Editable table of mortality, morbidity, and vet & med rates, see ga.RATE_TABLE.
+# Rows with a species override the income group's row for that species.
+rate_table_columns_ga = {
+    'incomegroup':'Income group'
+    ,'species':'Species (blank for all)'
+    ,'mortality_rate':'Mortality rate'
+    ,'morbidity_rate':'Morbidity rate'
+    ,'vetspend_biomass_farm_usdperkgbm':'Farm vet & med spend (USD per kg biomass)'
+    ,'vetspend_biomass_public_usdperkgbm':'Public vet & med spend (USD per kg biomass)'
+    ,'vetspend_production_usdperkgprod':'Vet & med spend (USD per kg production)'
+}
+# Species options come from the data, see update_data_options_ga()
+rate_table_dropdowns_ga = {
+    'incomegroup':{'options':[{'label':i ,'value':i} for i in ga.INCOME_GROUPS]}
+    ,'species':{'options':[]}
+}
+
 # Defautls for sliders
 mortality_rate_ga_default = 4
 morbidity_rate_ga_default = 2
@@ -868,6 +1015,12 @@ live_weight_price_ga_default = 1.75
 # !!!: CURRENTLY DIFFERENT FROM POULTRY/SWINE TABS DUE TO DATA AVAILABILITY -eventually want these to be the same
 
 # Region options
+# Uncertainty
+# With interval: show bands from random samples of the rates. See calc_ga_ahle_bands().
+uncertainty_options_ga = [{'label': i, 'value': i, 'disabled': False} for i in ["Point estimate",
+                                                                              "With interval",
+                                                                             ]]
+
 region_structure_options_ga = [{'label': i, 'value': i, 'disabled': False} for i in ["World Bank",]]
 
 region_structure_options_ga += [{'label': i, 'value': i, 'disabled': True} for i in ["WOAH",
@@ -930,64 +1083,63 @@ fao_ena_options_ga = [{'label': i, 'value': i, 'disabled': False} for i in ["TES
 fao_swp_options_ga = [{'label': i, 'value': i, 'disabled': False} for i in ["France",
                                                                             "United States of America"]]
 
-# World Bank regions
-ga_countries_biomass['region_label'] = ga_countries_biomass['region'].replace({'EAP': 'East Asia & Pacific',
-                                                                         'ECA':'Europe & Central Asia',
-                                                                         'LAC':'Latin America & the Caribbean',
-                                                                         'MENA':'Middle East & North Africa',
-                                                                         'NA':'North America',
-                                                                         'SA':'South Asia',
-                                                                         'SSA':'Sub-Saharan Africa'})
-
-wb_region_options_ga = [{'label': "All", 'value': "All"}]
-for i in ga_countries_biomass['region_label'].unique():
-    str(wb_region_options_ga.append({'label':i,'value':(i)}))
-
 # World Bank region-country mapping
 # Pulled from World Bank site (https://datahelpdesk.worldbank.org/knowledgebase/articles/906519-world-bank-country-and-lending-groups)
+wb_region_keys_ga = {
+    'East Asia & Pacific':'wb_eap'
+    ,'Europe & Central Asia':'wb_eca'
+    ,'Latin America & the Caribbean':'wb_lac'
+    ,'Middle East & North Africa':'wb_mena'
+    ,'North America':'wb_na'
+    ,'South Asia':'wb_southasia'
+    ,'Sub-Saharan Africa':'wb_africa'
+}
 
-# East Asia & Pacific options
-options = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == 'East Asia & Pacific')]
-wb_eap_options_ga = [{'label': "All", 'value': "All"}]
-for i in options['country'].unique():
-    str(wb_eap_options_ga.append({'label':i,'value':(i)}))
-
-# Europe & Central Asia options
-options = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == 'Europe & Central Asia')]
-wb_eca_options_ga = [{'label': "All", 'value': "All"}]
-for i in options['country'].unique():
-    str(wb_eca_options_ga.append({'label':i,'value':(i)}))
-
-# Latin America & the Caribbean options
-options = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == 'Latin America & the Caribbean')]
-wb_lac_options_ga = [{'label': "All", 'value': "All"}]
-for i in options['country'].unique():
-    str(wb_lac_options_ga.append({'label':i,'value':(i)}))
-
-# Middle East & North Africa options
-options = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == 'Middle East & North Africa')]
-wb_mena_options_ga = [{'label': "All", 'value': "All"}]
-for i in options['country'].unique():
-    str(wb_mena_options_ga.append({'label':i,'value':(i)}))
-
-# North America options
-options = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == 'North America')]
-wb_na_options_ga = [{'label': "All", 'value': "All"}]
-for i in options['country'].unique():
-    str(wb_na_options_ga.append({'label':i,'value':(i)}))
-
-# South Asia options
-options = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == 'South Asia')]
-wb_southasia_options_ga = [{'label': "All", 'value': "All"}]
-for i in options['country'].unique():
-    str(wb_southasia_options_ga.append({'label':i,'value':(i)}))
-
-# Sub-Saharan Africa options
-options = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == 'Sub-Saharan Africa')]
-wb_africa_options_ga = [{'label': "All", 'value': "All"}]
-for i in options['country'].unique():
-    str(wb_africa_options_ga.append({'label':i,'value':(i)}))
+# Options created from the data
+# These are built on first use rather than when the module is imported, so the
+# data is not read until it is needed. Dropdowns in the layout start empty and
+# get these options from callbacks, see update_data_options_ga().
+# Returns dictionary of option lists: 'species', 'country', 'incomegrp', 'year',
+# 'wb_region', and one for each World Bank region in wb_region_keys_ga
+@functools.lru_cache(maxsize=None)
+def get_ga_options():
+    ga_countries_biomass = datareg.get('ga_countries_biomass')
+    options = {}
+
+    # Species
+    options['species'] = []
+    for i in ga_countries_biomass['species'].unique():
+        str(options['species'].append({'label':i,'value':(i)}))
+
+    options['country'] = [{'label': "All", 'value': "All", 'disabled': False}]
+    for i in ga_countries_biomass['country'].unique():
+        str(options['country'].append({'label':i,'value':(i)}))
+
+    # Income group
+    # Labels are set when data is loaded, see load_ga_countries_biomass()
+    options['incomegrp'] = [{'label': "All", 'value': "All"}]
+    for i in ga_countries_biomass['incomegroup'].unique():
+        str(options['incomegrp'].append({'label':i,'value':(i)}))
+
+    # Year
+    options['year'] = []
+    for i in np.sort(ga_countries_biomass['year'].unique()):
+       str(options['year'].append({'label':i,'value':(i)}))
+
+    # World Bank regions
+    # Labels are set when data is loaded, see load_ga_countries_biomass()
+    options['wb_region'] = [{'label': "All", 'value': "All"}]
+    for i in ga_countries_biomass['region_label'].unique():
+        str(options['wb_region'].append({'label':i,'value':(i)}))
+
+    # Countries in each World Bank region
+    for REGION ,KEY in wb_region_keys_ga.items():
+        region_df = ga_countries_biomass.loc[(ga_countries_biomass['region_label'] == REGION)]
+        options[KEY] = [{'label': "All", 'value': "All"}]
+        for i in region_df['country'].unique():
+            str(options[KEY].append({'label':i,'value':(i)}))
 
+    return options
 
 # =============================================================================
 #### Antimicrobial Usage (AMU) options
@@ -1002,15 +1154,25 @@ amu_map_display_options = [{'label': i, 'value': i, 'disabled': False} for i in
                                                                                   "Antimicrobial expenditure: per kg biomass",]]
 
 
-# Antimicrobial Class
-amu_antimicrobial_class_options = []
-for i in np.sort(amr_withsmry['antimicrobial_class'].unique()):
-    str(amu_antimicrobial_class_options.append({'label':i,'value':(i)}))
+# Options created from the data
+# Built on first use, like get_ga_options(). Dropdowns in the layout start empty.
+# Returns dictionary of option lists: 'antimicrobial_class', 'pathogen'
+@functools.lru_cache(maxsize=None)
+def get_amu_options():
+    amr_withsmry = datareg.get('amr_withsmry')
+    options = {}
+
+    # Antimicrobial Class
+    options['antimicrobial_class'] = []
+    for i in np.sort(amr_withsmry['antimicrobial_class'].unique()):
+        str(options['antimicrobial_class'].append({'label':i,'value':(i)}))
 
-# Pathogen
-amu_pathogen_options = []
-for i in np.sort(amr_withsmry['pathogen'].unique()):
-    str(amu_pathogen_options.append({'label':i,'value':(i)}))
+    # Pathogen
+    options['pathogen'] = []
+    for i in np.sort(amr_withsmry['pathogen'].unique()):
+        str(options['pathogen'].append({'label':i,'value':(i)}))
+
+    return options
 
 # nav_btn_style = {
 #      'align': 'center',
@@ -1026,6 +1188,121 @@ for i in np.sort(amr_withsmry['pathogen'].unique()):
 # =============================================================================
 # These are stored in a separate file, bod_calcs.py, imported above.
 
+# =============================================================================
+#### Global Aggregate AHLE calcs
+# =============================================================================
+# The Global Aggregate AHLE depends only on the world table, the regional
+# antimicrobial data set by the AMU sliders, and the rate table edited on the
+# Global Aggregate Details tab. Calculate it once per distinct state of these
+# and share the result between all Global Aggregate callbacks, keeping the most
+# recently used states.
+# The returned data frames are shared: callers must filter or copy before
+# modifying them.
+ga_ahle_cache_size = 8
+
+# Rate table from its key in the 'ga-rate-table-data' store. None: default rates.
+# A key that is not in the store raises store.MissingKeyError, which leaves the
+# outputs of the calling callback unchanged.
+def get_ga_rate_table(rate_table_key):
+    if rate_table_key is None:
+        return ga.RATE_TABLE
+    return store.get_df(rate_table_key)
+
+@functools.lru_cache(maxsize=ga_ahle_cache_size)
+def calc_ga_ahle(amu_data_key ,rate_table_key=None):
+    ga_countries_biomass = datareg.get('ga_countries_biomass')
+    input_df_amu = store.get_df(amu_data_key)
+
+    # Add antimicrobial expenditure. This returns a copy, so the global table is not modified
+    output_df = ga.add_antimicrobial_expenditure(ga_countries_biomass ,input_df_amu)
+
+    # Add mortality, morbidity, and vetmed rate columns to that copy
+    output_df = ga.add_rates(output_df ,get_ga_rate_table(rate_table_key) ,COPY=False)
+
+    # Apply AHLE calcs
+    output_df = ga.ahle_calcs_adj_outputs(output_df)
+    return output_df
+
+# Waterfall and line plot share the same initial data prep
+@functools.lru_cache(maxsize=ga_ahle_cache_size)
+def calc_ga_ahle_forwaterfall(amu_data_key ,rate_table_key=None):
+    return prep_ahle_forwaterfall_ga(calc_ga_ahle(amu_data_key ,rate_table_key))
+
+# Uncertainty bands for the waterfall and line plot: mean and interval of the
+# AHLE over random samples of the mortality, morbidity, and vet & med rates,
+# centred on the rate table. See ga.ahle_montecarlo() and ga.RATE_UNCERTAINTY.
+ga_ahle_mc_samples = 500
+ga_ahle_mc_interval = 0.95
+
+# Columns from the AHLE calcs giving each item's ideal and current value, for items
+# whose values depend on the rates. Items or values not listed do not.
+# 'diff' gives ideal minus current, needed where both depend on the rates.
+ga_ahle_item_mc_cols = {
+    'Biomass':{'ideal':'ideal_biomass_value_2010usd'}
+    ,'Meat':{'ideal':'ideal_output_value_meat_2010usd'}
+    ,'Eggs':{'ideal':'ideal_output_value_eggs_2010usd'}
+    ,'Milk':{'ideal':'ideal_output_value_milk_2010usd'}
+    ,'Wool':{'ideal':'ideal_output_value_wool_2010usd'}
+    ,'Producers vet & med costs':{'current':'vetspend_farm_usd'}
+    ,'Net value':{
+        'ideal':'ideal_output_plus_biomass_value_2010usd'
+        ,'current':'net_value_2010usd'
+        ,'diff':'ahle_total_2010usd'
+    }
+}
+
+# Rows for the selected region, income group, and country, as filtered by the waterfall and line plot
+def filter_ga_selection(INPUT_DF ,SELECTED_REGION ,SELECTED_INCGRP ,SELECTED_COUNTRY):
+    if SELECTED_COUNTRY != 'All':
+        return INPUT_DF.loc[INPUT_DF['country'] == SELECTED_COUNTRY]
+    _selected = np.ones(len(INPUT_DF) ,dtype=bool)
+    if SELECTED_REGION != 'All':
+        _selected &= (INPUT_DF['region_label'] == SELECTED_REGION)
+    if SELECTED_INCGRP != 'All':
+        _selected &= (INPUT_DF['incomegroup'] == SELECTED_INCGRP)
+    return INPUT_DF.loc[_selected]
+
+# Bands by year for the selection, shared by the waterfall and line plot
+@functools.lru_cache(maxsize=ga_ahle_cache_size)
+def calc_ga_ahle_bands(amu_data_key ,rate_table_key ,selected_region ,selected_incgrp ,selected_country):
+    selected_df = filter_ga_selection(calc_ga_ahle(amu_data_key ,rate_table_key) ,selected_region ,selected_incgrp ,selected_country)
+    mc_cols = sorted({COL for ITEM_COLS in ga_ahle_item_mc_cols.values() for COL in ITEM_COLS.values()})
+    return ga.ahle_montecarlo(selected_df
+        ,N_SAMPLES=ga_ahle_mc_samples
+        ,OUTPUT_COLS=mc_cols
+        ,SUM_BY=['year']
+        ,INTERVAL=ga_ahle_mc_interval
+        ,RATE_TABLE=get_ga_rate_table(rate_table_key)
+    )
+
+# Add low and high values of current, ideal, and difference (ideal minus current) to
+# item sums. Values that do not depend on the rates get low = high = value.
+# INPUT_DF: one row per item and year, with columns 'item', 'year', 'value_usd_current',
+#    'value_usd_ideal', and 'value_usd_ahle_diff'
+# COSTS_NEGATIVE: True if current costs have been made negative, as in the waterfall
+def add_ga_item_bands(INPUT_DF ,BANDS_DF ,COSTS_NEGATIVE=False):
+    OUTPUT_DF = pd.merge(left=INPUT_DF ,right=BANDS_DF ,on='year' ,how='left')
+    for VALUE in ['current' ,'ideal' ,'ahle_diff']:
+        OUTPUT_DF[f'value_usd_{VALUE}_low'] = OUTPUT_DF[f'value_usd_{VALUE}']
+        OUTPUT_DF[f'value_usd_{VALUE}_high'] = OUTPUT_DF[f'value_usd_{VALUE}']
+    for ITEM ,ITEM_COLS in ga_ahle_item_mc_cols.items():
+        _item_rows = (OUTPUT_DF['item'] == ITEM)
+        _negative = COSTS_NEGATIVE and ('COSTS' in ITEM.upper() or 'EXPENDITURE' in ITEM.upper())
+        for VALUE in ['current' ,'ideal']:
+            if VALUE in ITEM_COLS:
+                low ,high = OUTPUT_DF[f'{ITEM_COLS[VALUE]}_low'] ,OUTPUT_DF[f'{ITEM_COLS[VALUE]}_high']
+                if _negative:
+                    low ,high = -high ,-low
+                OUTPUT_DF.loc[_item_rows ,f'value_usd_{VALUE}_low'] = low
+                OUTPUT_DF.loc[_item_rows ,f'value_usd_{VALUE}_high'] = high
+        if 'diff' in ITEM_COLS:
+            OUTPUT_DF.loc[_item_rows ,'value_usd_ahle_diff_low'] = OUTPUT_DF[f"{ITEM_COLS['diff']}_low"]
+            OUTPUT_DF.loc[_item_rows ,'value_usd_ahle_diff_high'] = OUTPUT_DF[f"{ITEM_COLS['diff']}_high"]
+        else:
+            OUTPUT_DF.loc[_item_rows ,'value_usd_ahle_diff_low'] = OUTPUT_DF['value_usd_ideal_low'] - OUTPUT_DF['value_usd_current_high']
+            OUTPUT_DF.loc[_item_rows ,'value_usd_ahle_diff_high'] = OUTPUT_DF['value_usd_ideal_high'] - OUTPUT_DF['value_usd_current_low']
+    return OUTPUT_DF.drop(columns=[COL for COL in BANDS_DF.columns if COL != 'year'])
+
 # =============================================================================
 #### Prep data for plots
 # =============================================================================
@@ -1377,6 +1654,12 @@ def prep_bod_forstackedbar_swine(INPUT_DF):
 def prep_ahle_fortreemap_ecs(INPUT_DF):
    ecs_ahle_attr_treemap = INPUT_DF.copy()
 
+   # Change categorical columns to object. px.treemap() groups by the path
+   # columns, which would add every combination of categories, and fillna(0)
+   # below cannot set a value that is not a category.
+   categorical_cols = list(ecs_ahle_attr_treemap.select_dtypes('category'))
+   ecs_ahle_attr_treemap[categorical_cols] = ecs_ahle_attr_treemap[categorical_cols].astype(object)
+
    # # Trim the data to keep things needed for the treemap
    # ecs_ahle_attr_treemap = working_df[[
    #     'species',
@@ -2052,6 +2335,15 @@ def create_ahle_waterfall_ga(input_df, name, measure, x, y):
 
     return waterfall_fig
 
+# Add a shaded band between LOW and HIGH to a line plot
+def add_band_ga(fig, x, low, high, color, name):
+    fill_color = f'rgba({int(color[1:3], 16)}, {int(color[3:5], 16)}, {int(color[5:7], 16)}, 0.2)'
+    fig.add_trace(go.Scatter(x=x, y=high, mode='lines', line=dict(width=0),
+                             showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=x, y=low, mode='lines', line=dict(width=0),
+                             fill='tonexty', fillcolor=fill_color, name=name, hoverinfo='skip'))
+    return fig
+
 
 def create_map_display_amu(input_df, value):
     # Add graphing country column for map
@@ -2217,10 +2509,14 @@ gbadsDash.layout = html.Div([
         )),
     ], justify='between'),
 
+    # Page address. Callbacks that set options from the data use it to run when the page loads.
+    dcc.Location(id='page-location'),
+
     #### Data to pass between callbacks
     dcc.Store(id='core-data-poultry'),
     dcc.Store(id='core-data-swine'),
     dcc.Store(id='amu-regional-data'),
+    dcc.Store(id='ga-rate-table-data'),
 
     #### TABS
     dcc.Tabs([
@@ -2259,7 +2555,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Region"),
                     dcc.Dropdown(id='select-region-overview-ga',
-                                  options=wb_region_options_ga,
+                                  options=[],
                                   value='All',
                                   clearable = False,
                                   ),
@@ -2271,7 +2567,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Income Group"),
                     dcc.Dropdown(id='select-incomegrp-overview-ga',
-                                  options=incomegrp_options_ga,
+                                  options=[],
                                   value='All',
                                   clearable = False,
                                   ),
@@ -2283,7 +2579,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Country"),
                     dcc.Dropdown(id='select-country-overview-ga',
-                                  options=country_options_ga,
+                                  options=[],
                                   # value='All',
                                   value='Ethiopia', #!!! - for testing
                                   clearable = False,
@@ -2296,7 +2592,7 @@ gbadsDash.layout = html.Div([
                   dbc.Col([
                       html.H6("Species"),
                       dcc.Dropdown(id='select-species-ga',
-                                  options=ga_species_options,
+                                  options=[],
                                   value='Cattle',
                                   clearable = False,
                                   )
@@ -2409,6 +2705,13 @@ gbadsDash.layout = html.Div([
                                   labelStyle={'display': 'block'},
                                   inputStyle={"margin-right": "2px"}, # This pulls the words off of the button
                                   ),
+                    html.H6("Uncertainty", style={"margin-top":"10px"}),
+                    dcc.RadioItems(id='select-uncertainty-ga',
+                                  options=uncertainty_options_ga,
+                                  value='Point estimate',
+                                  labelStyle={'display': 'block'},
+                                  inputStyle={"margin-right": "2px"}, # This pulls the words off of the button
+                                  ),
                     ],
                     style={
                             "margin-top":"10px",
@@ -2435,7 +2738,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Region"),
                     dcc.Dropdown(id='select-region-detail-ga',
-                                  options=wb_region_options_ga,
+                                  options=[],
                                   value='All',
                                   clearable = False,
                                   ),
@@ -2447,7 +2750,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Income Group"),
                     dcc.Dropdown(id='select-incomegrp-detail-ga',
-                                options=incomegrp_options_ga,
+                                options=[],
                                 value='All',
                                 clearable = False,
                                 ),
@@ -2459,7 +2762,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Country"),
                     dcc.Dropdown(id='select-country-detail-ga',
-                                  options=country_options_ga,
+                                  options=[],
                                   value='All',
                                   clearable = False,
                                   ),
@@ -2483,7 +2786,7 @@ gbadsDash.layout = html.Div([
                             dbc.Col([
                                 html.H6("Year"),
                                 dcc.Dropdown(id='select-year-ga',
-                                              options=year_options_ga,
+                                              options=[],
                                               value=2020,
                                               clearable = False,
                                               ),
@@ -2660,6 +2963,42 @@ gbadsDash.layout = html.Div([
                     ],style={"width":5}),
                 ]),
 
+        #### -- RATES
+        dbc.Row([
+            dbc.Col([
+                html.H4("Rates by income group"),
+                html.P("Edit rates to recalculate the AHLE. Add a row with a species to use different rates for that species in an income group."),
+                dash_table.DataTable(
+                    id='ga-rate-table',
+                    columns=[
+                        {"name": j, "id": i, "presentation": "dropdown"} if i in rate_table_dropdowns_ga
+                        else {"name": j, "id": i, "type": "numeric"}
+                        for i, j in rate_table_columns_ga.items()
+                        ],
+                    data=ga.RATE_TABLE.to_dict('records'),
+                    dropdown=rate_table_dropdowns_ga,
+                    editable=True,
+                    row_deletable=True,
+                    style_cell={
+                        'font-family':'sans-serif',
+                        },
+                    style_header={'whiteSpace': 'normal'},
+                    ),
+                ]),
+            ], style={'margin-left':"20px",
+                      "margin-right": "10px"}
+            ),
+        dbc.Row([
+            dbc.Col([
+                html.Button('Add row', id='add-rate-row-ga', n_clicks=0),
+                html.Button('Reset to default', id='reset-rates-ga', n_clicks=0,
+                            style={'margin-left':'10px'}),
+                ]),
+            ], style={'margin-left':"20px",
+                      "margin-top": "10px"}
+            ),
+        html.Br(),
+
         #### -- FOOTNOTES
         dbc.Row([
             dbc.Col([
@@ -2752,7 +3091,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Country"),
                     dcc.Dropdown(id='select-country-poultry',
-                                  options=country_options_poultry,
+                                  options=[],
                                   value='United Kingdom',
                                   clearable = False,
                                   ),
@@ -2765,7 +3104,7 @@ gbadsDash.layout = html.Div([
                   dbc.Col([
                       html.H6("Year"),
                       dcc.Dropdown(id='select-year-poultry',
-                                  options=year_options_poultry,
+                                  options=[],
                                   value=2020,
                                   clearable = False,
                                   )
@@ -3052,7 +3391,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Country"),
                     dcc.Dropdown(id='select-country-swine',
-                                  options=country_options_swine,
+                                  options=[],
                                   value='United Kingdom',
                                   clearable = False,
                                   ),
@@ -3065,7 +3404,7 @@ gbadsDash.layout = html.Div([
                   dbc.Col([
                       html.H6("Year"),
                       dcc.Dropdown(id='select-year-swine',
-                                  options=year_options_swine,
+                                  options=[],
                                   value=2020,
                                   clearable = False,
                                   )
@@ -3406,7 +3745,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H5("Subnational state", id='select-region-ecs-title'),
                     dcc.Dropdown(id='select-region-ecs',
-                                 options=ecs_region_options,
+                                 options=[],
                                  placeholder='Select Subnational...',
                                  clearable = False,
                                  ),
@@ -3456,7 +3795,7 @@ gbadsDash.layout = html.Div([
                                 dbc.Col([
                                     html.H6("Scenario applies to group...", id='select-agesex-ecs-title'),
                                     dcc.Dropdown(id='select-agesex-ecs',
-                                                  options=ecs_agesex_options,
+                                                  options=[],
                                                   value='Overall',
                                                   clearable = False,
                                                   ),
@@ -4117,7 +4456,7 @@ gbadsDash.layout = html.Div([
                 dbc.Col([
                     html.H6("Pathogen", id='select-pathogens-amu-title'),
                     dcc.Dropdown(id='select-pathogens-amu',
-                          options=amu_pathogen_options,
+                          options=[],
                           value='All',
                           clearable=False,
                           ),
@@ -4614,6 +4953,15 @@ gbadsDash.layout = html.Div([
 # ------------------------------------------------------------------------------
 #### -- Controls
 # ------------------------------------------------------------------------------
+# Set year options from the data when the page loads. See get_poultry_options().
+# Country options are set by update_country_options_poultry().
+@gbadsDash.callback(
+    Output('select-year-poultry', 'options'),
+    Input('page-location', 'pathname'),
+    )
+def update_data_options_poultry(pathname):
+    return get_poultry_options()['year']
+
 #Update regions based on region contry aligment selection:
 @gbadsDash.callback(
     Output(component_id='select-region-poultry', component_property='options'),
@@ -4637,7 +4985,7 @@ def update_region_options_poultry(region_country):
 def update_country_options_poultry(region_country, region):
     if region_country == "WOAH":
         if region == "All":
-            options = country_options_poultry
+            options = get_poultry_options()['country']
         elif region == "Africa":
             options = WOAH_africa_options
         elif region == "Americas":
@@ -4648,7 +4996,7 @@ def update_country_options_poultry(region_country, region):
             options = WOAH_europe_options
     elif region_country =="FAO":
         if region == "All":
-            options = country_options_poultry
+            options = get_poultry_options()['country']
         elif region == "Africa":
             options = fao_africa_options
         elif region == "Asia":
@@ -4661,7 +5009,7 @@ def update_country_options_poultry(region_country, region):
             options = fao_swp_options
     elif region_country == "World Bank":
         if region == "All":
-            options = country_options_poultry
+            options = get_poultry_options()['country']
         elif region == "Sub-Saharan Africa":
             options = wb_africa_options
         elif region == "Europe & Central Asia":
@@ -4673,7 +5021,7 @@ def update_country_options_poultry(region_country, region):
         else:
             options = wb_southasia_options
     else:
-        options = country_options_poultry
+        options = get_poultry_options()['country']
 
     return options
 
@@ -4694,7 +5042,7 @@ def reset_achievablepct_poultry(reset):
     Input(component_id='reset-val-poultry', component_property='n_clicks')   # Reset to defaults button
     )
 def show_ref_daysonfeed_poultry(country, year, reset):
-    input_df = gbads_chickens_merged_fordash
+    input_df = datareg.get('gbads_chickens_merged_fordash')
     _rowselect = (input_df['country'] == country) & (input_df['year'] == year)
     datavalue = input_df.loc[_rowselect ,'acc_avgdaysonfeed'].values[0]
     country_shortname = country_shortnames[country]
@@ -4714,7 +5062,7 @@ def show_ref_daysonfeed_poultry(country, year, reset):
     Input(component_id='reset-val-poultry', component_property='n_clicks')   # Reset to defaults button
     )
 def show_ref_producerprice_poultry(country, year, reset):
-    input_df = gbads_chickens_merged_fordash
+    input_df = datareg.get('gbads_chickens_merged_fordash')
     _rowselect = (input_df['country'] == country) & (input_df['year'] == year)
     datavalue = input_df.loc[_rowselect ,'acc_producerprice_usdperkgcarc'].values[0]
     country_shortname = country_shortnames[country]
@@ -4734,7 +5082,7 @@ def show_ref_producerprice_poultry(country, year, reset):
     Input(component_id='reset-val-poultry', component_property='n_clicks')   # Reset to defaults button
     )
 def show_ref_feedprice_poultry(country, year, reset):
-    input_df = gbads_chickens_merged_fordash
+    input_df = datareg.get('gbads_chickens_merged_fordash')
     _rowselect = (input_df['country'] == country) & (input_df['year'] == year)
     datavalue = input_df.loc[_rowselect ,'acc_feedprice_usdpertonne'].values[0]
     country_shortname = country_shortnames[country]
@@ -4756,7 +5104,7 @@ def show_ref_feedprice_poultry(country, year, reset):
     )
 def show_ref_fcr_poultry(country, dof, reset):
     breed_label_touse = poultry_lookup_breed_from_country[country]
-    breed_df_touse = poultry_lookup_breed_df[breed_label_touse]
+    breed_df_touse = datareg.get(poultry_lookup_breed_df[breed_label_touse])
     _rowselect = (breed_df_touse['dayonfeed'] == dof)
     datavalue = breed_df_touse.loc[_rowselect ,'fcr'].values[0]
     if pd.isnull(datavalue):
@@ -4771,8 +5119,9 @@ def show_ref_fcr_poultry(country, dof, reset):
 #### -- Data
 # ------------------------------------------------------------------------------
 # MUST HAPPEN FIRST: Calculate burden of disease components on core data
-# Updates when user changes achievable proportion slider
-# Does not care about simple filtering (country and year)
+# Updates when user changes achievable proportion slider or country
+# Only calculates rows for the selected country (all years, for the background
+# data table). Visuals that compare countries should call with COUNTRY=None.
 @gbadsDash.callback(
     Output('core-data-poultry','data'),
     Input('achievable-pct-slider-poultry','value'),
@@ -4782,10 +5131,15 @@ def show_ref_fcr_poultry(country, dof, reset):
     Input('fcr-slider-poultry','value')
     )
 def update_core_data_poultry(achievable_pct, avg_dof, country, feedprice, fcr):
+    gbads_chickens_merged_fordash = datareg.get('gbads_chickens_merged_fordash')
     breed_label_touse = poultry_lookup_breed_from_country[country]
-    breed_df_touse = poultry_lookup_breed_df[breed_label_touse]
-    poultry_data_withbod = bod.calc_bod_master_poultry(
-      gbads_chickens_merged_fordash
+    breed_df_touse = datareg.get(poultry_lookup_breed_df[breed_label_touse])
+    # Uses precomputed results if available, otherwise calls bod.calc_bod_master_poultry()
+    poultry_data_withbod = bod_cube.calc_bod_master_fromcube(
+      'poultry'
+      ,datareg.get('poultry_lookup_breed_cube')[breed_label_touse]
+      ,gbads_chickens_merged_fordash
+      ,COUNTRY=country                           # Scope: only rows for this country
       ,ACHIEVABLE_PCT_MASTER=achievable_pct      # Integer [0, 120]: proportion of ideal production that is achievable without disease, i.e. efficiency of feed, medications, and practices
       ,AVG_DOF_MASTER=avg_dof                      # Integer (0, 63]: Average days on feed. Will lookup breed standard weight for this day on feed.
       ,BREED_DF_MASTER=breed_df_touse     # Data frame with breed reference information. Must contain columns 'dayonfeed' and 'bodyweight_g'.
@@ -4793,8 +5147,8 @@ def update_core_data_poultry(achievable_pct, avg_dof, country, feedprice, fcr):
       ,IDEAL_FCR_LIVE_MASTER=fcr                        # Float: ideal FCR per kg live weight
       # ,AVG_CARC_YIELD_MASTER=0.695                 # Float [0, 1]: average carcass yield as proportion of live weight. If blank, will use 'bod_breedstdyield_prpn'.
     )
-    poultry_data_withbod['year'] = poultry_data_withbod['year'].astype(str)   # Change Year type to text
-    return poultry_data_withbod.to_json(date_format='iso', orient='split')
+    # Save data on the server and pass only its key to the dcc.Store
+    return store.put_df(poultry_data_withbod)
 
 # Can happen in any order after update_core_data
 # These update when user changes filtering (country and year)
@@ -4806,10 +5160,10 @@ def update_core_data_poultry(achievable_pct, avg_dof, country, feedprice, fcr):
     Input('producer-price-slider-poultry','value'),
     Input('ration-price-slider-poultry','value'),
     )
-def update_background_data_poultry(input_json, country ,producerprice ,rationprice):
-    # Dash callback input data is a string that names a json file
-    # First read it into a dataframe
-    input_df = pd.read_json(input_json, orient='split')
+def update_background_data_poultry(input_key, country ,producerprice ,rationprice):
+    # Dash callback input data is a key to data stored on the server
+    # First get the dataframe
+    input_df = store.get_df(input_key)
     background_data = input_df.loc[(input_df['country'] == country)]
 
     # Add slider values as columns to display
@@ -4997,7 +5351,7 @@ def update_background_data_poultry(input_json, country ,producerprice ,rationpri
     )
 def update_breed_data_poultry(country):
     breed_label_touse = poultry_lookup_breed_from_country[country]
-    breed_df_touse = poultry_lookup_breed_df[breed_label_touse]
+    breed_df_touse = datareg.get(poultry_lookup_breed_df[breed_label_touse])
 
     columns_to_display_with_labels = {
       'dayonfeed':'Day on Feed'
@@ -5042,10 +5396,10 @@ def update_breed_data_poultry(country):
     Input('select-year-poultry','value'),
     Input('producer-price-slider-poultry','value')
     )
-def update_waterfall_poultry(input_json, metric, country, year, producerprice):
-    # Dash callback input data is a string that names a json file
-    # First read it into a dataframe
-    input_df = pd.read_json(input_json, orient='split')
+def update_waterfall_poultry(input_key, metric, country, year, producerprice):
+    # Dash callback input data is a key to data stored on the server
+    # First get the dataframe
+    input_df = store.get_df(input_key)
 
     # Structure for plot
     waterfall_df = prep_bod_forwaterfall(input_df ,USDPERKG=producerprice)
@@ -5264,9 +5618,9 @@ def update_waterfall_footnote_poultry(country):
     Input('select-country-poultry','value'),
     Input('select-year-poultry','value'),
     )
-def update_stacked_bar_poultry(input_json, country, year):
+def update_stacked_bar_poultry(input_key, country, year):
 
-    input_df = pd.read_json(input_json, orient='split')
+    input_df = store.get_df(input_key)
 
     # -----------------------------------------------------------------------------
     # Base plot
@@ -5323,6 +5677,15 @@ def update_stacked_bar_poultry(input_json, country, year):
 # ------------------------------------------------------------------------------
 #### -- Controls
 # ------------------------------------------------------------------------------
+# Set year options from the data when the page loads. See get_swine_options().
+# Country options are set by update_country_options_swine().
+@gbadsDash.callback(
+    Output('select-year-swine', 'options'),
+    Input('page-location', 'pathname'),
+    )
+def update_data_options_swine(pathname):
+    return get_swine_options()['year']
+
 # Update regions based on region contry aligment selection:
 @gbadsDash.callback(
     Output(component_id='select-region-swine', component_property='options'),
@@ -5346,7 +5709,7 @@ def update_region_options_swine(region_country):
 def update_country_options_swine(region_country, region):
     if region_country == "WOAH":
         if region == "All":
-            options = country_options_swine
+            options = get_swine_options()['country']
         elif region == "Africa":
             options = WOAH_africa_options
         elif region == "Americas":
@@ -5357,7 +5720,7 @@ def update_country_options_swine(region_country, region):
             options = WOAH_europe_options
     elif region_country =="FAO":
         if region == "All":
-            options = country_options_swine
+            options = get_swine_options()['country']
         elif region == "Africa":
             options = fao_africa_options
         elif region == "Asia":
@@ -5370,7 +5733,7 @@ def update_country_options_swine(region_country, region):
             options = fao_swp_options
     elif region_country == "World Bank":
         if region == "All":
-            options = country_options_swine
+            options = get_swine_options()['country']
         elif region == "Sub-Saharan Africa":
             options = wb_africa_options
         elif region == "Europe & Central Asia":
@@ -5441,7 +5804,7 @@ def reset_daysonfeed_swine(reset):
     Input(component_id='reset-val-swine', component_property='n_clicks')   # Reset to defaults button
     )
 def show_ref_liveweight_swine(country, year, reset):
-    input_df = gbads_pigs_merged_fordash
+    input_df = datareg.get('gbads_pigs_merged_fordash')
     _rowselect = (input_df['country'] == country) & (input_df['year'] == year)
     datavalue = input_df.loc[_rowselect ,'acc_avgliveweight_kg'].values[0]
     country_shortname = country_shortnames[country]
@@ -5461,7 +5824,7 @@ def show_ref_liveweight_swine(country, year, reset):
     Input(component_id='reset-val-swine', component_property='n_clicks')   # Reset to defaults button
     )
 def show_ref_producerprice_swine(country, year, reset):
-    input_df = gbads_pigs_merged_fordash
+    input_df = datareg.get('gbads_pigs_merged_fordash')
     _rowselect = (input_df['country'] == country) & (input_df['year'] == year)
     datavalue = input_df.loc[_rowselect ,'acc_producerprice_usdperkgcarc'].values[0]
     country_shortname = country_shortnames[country]
@@ -5481,7 +5844,7 @@ def show_ref_producerprice_swine(country, year, reset):
     Input(component_id='reset-val-swine', component_property='n_clicks')   # Reset to defaults button
     )
 def show_ref_feedprice_swine(country, year, reset):
-    input_df = gbads_pigs_merged_fordash
+    input_df = datareg.get('gbads_pigs_merged_fordash')
     _rowselect = (input_df['country'] == country) & (input_df['year'] == year)
     datavalue = input_df.loc[_rowselect ,'acc_feedprice_usdpertonne'].values[0]
     country_shortname = country_shortnames[country]
@@ -5503,7 +5866,7 @@ def show_ref_feedprice_swine(country, year, reset):
     )
 def show_ref_fcr_swine(country, dof, reset):
     breed_label_touse = swine_lookup_breed_from_country[country]
-    breed_df_touse = swine_lookup_breed_df[breed_label_touse]
+    breed_df_touse = datareg.get(swine_lookup_breed_df[breed_label_touse])
     _rowselect = (breed_df_touse['dayonfeed'] == dof)
     datavalue = breed_df_touse.loc[_rowselect ,'cml_fcr'].values[0]
     if pd.isnull(datavalue):
@@ -5539,16 +5902,25 @@ def show_ref_fcr_swine(country, dof, reset):
 
 # Alternative call using ACHIEVABLE WEIGHT instead of ACHIEVABLE PERCENT
 #!!! Make sure appropriate sliders are activated in LAYOUT!
+# Only calculates rows for the selected country (all years, for the background
+# data table). Visuals that compare countries should call with COUNTRY=None.
 @gbadsDash.callback(
     Output('core-data-swine','data'),
     Input('achievable-weight-slider-swine','value'),
     Input('dof-slider-swine','value'),
+    Input('select-country-swine','value'),
     Input('ration-price-slider-swine','value'),
     Input('fcr-slider-swine','value')
     )
-def update_core_data_swine(achievable_wt ,avg_dof ,feedprice ,fcr):
-    swine_data_withbod = bod.calc_bod_master_swine(
-        gbads_pigs_merged_fordash
+def update_core_data_swine(achievable_wt ,avg_dof ,country ,feedprice ,fcr):
+    gbads_pigs_merged_fordash = datareg.get('gbads_pigs_merged_fordash')
+    swinebreedstd_pic_growthandfeed = datareg.get('swinebreedstd_pic_growthandfeed')
+    # Uses precomputed results if available, otherwise calls bod.calc_bod_master_swine()
+    swine_data_withbod = bod_cube.calc_bod_master_fromcube(
+        'swine'
+        ,datareg.get('swine_bod_cube')
+        ,gbads_pigs_merged_fordash
+        ,COUNTRY=country                                   # Scope: only rows for this country
         ,ACHIEVABLE_WT_KG_MASTER=achievable_wt             # Float: achievable weight without disease
         ,AVG_DOF_MASTER=avg_dof                            # Integer [1, 176]: Average days on feed. Will lookup breed standard weight for this day on feed.
         ,BREED_DF_MASTER=swinebreedstd_pic_growthandfeed   # Data frame with breed reference information. Must contain columns 'dayonfeed' and 'bodyweight_g'.
@@ -5556,8 +5928,8 @@ def update_core_data_swine(achievable_wt ,avg_dof ,feedprice ,fcr):
         ,FEEDPRICE_USDPERTONNE_MASTER=feedprice           # Float
         ,IDEAL_FCR_LIVE_MASTER=fcr                        # Float: ideal FCR per kg live weight
     )
-    swine_data_withbod['year'] = swine_data_withbod['year'].astype(str)   # Change Year type to text
-    return swine_data_withbod.to_json(date_format='iso', orient='split')
+    # Save data on the server and pass only its key to the dcc.Store
+    return store.put_df(swine_data_withbod)
 
 # Alternative call using Feed Intake instead of Days on Feed to determine standard
 #!!! Make sure appropriate sliders are activated in LAYOUT!
@@ -5587,10 +5959,10 @@ def update_core_data_swine(achievable_wt ,avg_dof ,feedprice ,fcr):
     Input('producer-price-slider-swine','value'),
     Input('ration-price-slider-swine','value'),
     )
-def update_background_data_swine(input_json, country ,producerprice ,rationprice):
-    # Dash callback input data is a string that names a json file
-    # First read it into a dataframe
-    input_df = pd.read_json(input_json, orient='split')
+def update_background_data_swine(input_key, country ,producerprice ,rationprice):
+    # Dash callback input data is a key to data stored on the server
+    # First get the dataframe
+    input_df = store.get_df(input_key)
     background_data = input_df.loc[(input_df['country'] == country)]
 
     # Add slider values as columns to display
@@ -5779,6 +6151,7 @@ def update_background_data_swine(input_json, country ,producerprice ,rationprice
     Input('core-data-swine','data')   # Currently only one breed used, so no inputs needed. But Dash wants an input here.
     )
 def update_breed_data_swine(breed):
+    swinebreedstd_pic_growthandfeed = datareg.get('swinebreedstd_pic_growthandfeed')
     columns_to_display_with_labels = {
       'dayonfeed':'Day on Feed'
       ,'bodyweight_kg':'Live Weight (kg)'
@@ -5820,10 +6193,10 @@ def update_breed_data_swine(breed):
     Input('select-year-swine','value'),
     Input('producer-price-slider-swine','value')
     )
-def update_waterfall_swine(input_json, metric, country, year, producerprice):
-    # Dash callback input data is a string that names a json file
-    # First read it into a dataframe
-    input_df = pd.read_json(input_json, orient='split')
+def update_waterfall_swine(input_key, metric, country, year, producerprice):
+    # Dash callback input data is a key to data stored on the server
+    # First get the dataframe
+    input_df = store.get_df(input_key)
 
     # Structure for plot
     waterfall_df = prep_bod_forwaterfall(input_df ,USDPERKG=producerprice)
@@ -6025,9 +6398,9 @@ def update_waterfall_swine(input_json, metric, country, year, producerprice):
     Input('select-country-swine','value'),
     Input('select-year-swine','value'),
     )
-def update_stacked_bar_swine(input_json, country, year):
+def update_stacked_bar_swine(input_key, country, year):
 
-    input_df = pd.read_json(input_json, orient='split')
+    input_df = store.get_df(input_key)
 
     # -----------------------------------------------------------------------------
     # Base plot
@@ -6085,6 +6458,21 @@ def update_stacked_bar_swine(input_json, country, year):
 # ------------------------------------------------------------------------------
 #### -- Controls
 # ------------------------------------------------------------------------------
+# Set options that come from the data when the page loads. See get_ga_options().
+# Region, country, and species options are set by the callbacks below.
+@gbadsDash.callback(
+    Output('select-incomegrp-overview-ga', 'options'),
+    Output('select-incomegrp-detail-ga', 'options'),
+    Output('select-year-ga', 'options'),
+    Output('ga-rate-table', 'dropdown'),
+    Input('page-location', 'pathname'),
+    )
+def update_data_options_ga(pathname):
+    ga_options = get_ga_options()
+    rate_table_dropdowns = dict(rate_table_dropdowns_ga)
+    rate_table_dropdowns['species'] = {'options':sorted(ga_options['species'] ,key=lambda option: option['label'])}
+    return ga_options['incomegrp'], ga_options['incomegrp'], ga_options['year'], rate_table_dropdowns
+
 # Update regions based on region contry aligment selection:
 @gbadsDash.callback(
     Output('select-region-overview-ga', 'options'),
@@ -6096,7 +6484,7 @@ def update_region_overview_options_ga(region_country):
     elif region_country =="FAO":
         options = fao_region_options_ga
     else:   # Fallback: World Bank
-        options = wb_region_options_ga
+        options = get_ga_options()['wb_region']
     return options
 
 @gbadsDash.callback(
@@ -6109,7 +6497,7 @@ def update_region_detail_options_ga(region_country):
     elif region_country =="FAO":
         options = fao_region_options_ga
     else:   # Fallback: World Bank
-        options = wb_region_options_ga
+        options = get_ga_options()['wb_region']
     return options
 
 # Update country options based on region and income group selection
@@ -6120,9 +6508,10 @@ def update_region_detail_options_ga(region_country):
     Input('select-incomegrp-overview-ga','value'),
     )
 def update_country_overview_options_ga(region_country, region, income):
+    ga_countries_biomass = datareg.get('ga_countries_biomass')
     if region_country == "WOAH":
         if region == "All":
-            options = country_options_ga
+            options = get_ga_options()['country']
         elif region == "Africa":
             options = WOAH_africa_options_ga
         elif region == "Americas":
@@ -6135,7 +6524,7 @@ def update_country_overview_options_ga(region_country, region, income):
             options = WOAH_me_options_ga
     elif region_country =="FAO":
         if region == "All":
-            options = country_options_ga
+            options = get_ga_options()['country']
         elif region == "Africa":
             options = fao_africa_options_ga
         elif region == "Asia":
@@ -6151,7 +6540,7 @@ def update_country_overview_options_ga(region_country, region, income):
     elif region_country == "World Bank":
         if region == "All":
             if income == "All":
-                options = country_options_ga
+                options = get_ga_options()['country']
             else:
                 options_df = ga_countries_biomass.loc[(ga_countries_biomass['incomegroup'] == income)]
                 options = [{'label': "All", 'value': "All"}]
@@ -6169,7 +6558,7 @@ def update_country_overview_options_ga(region_country, region, income):
                 for i in options_df['country'].unique():
                     str(options.append({'label':i,'value':(i)}))
     else:
-        options = country_options_ga
+        options = get_ga_options()['country']
 
     return options
 
@@ -6181,9 +6570,10 @@ def update_country_overview_options_ga(region_country, region, income):
     Input('select-incomegrp-detail-ga','value'),
     )
 def update_country_detail_options_ga(region_country, region, income):
+    ga_countries_biomass = datareg.get('ga_countries_biomass')
     if region_country == "WOAH":
         if region == "All":
-            options = country_options_ga
+            options = get_ga_options()['country']
         elif region == "Africa":
             options = WOAH_africa_options_ga
         elif region == "Americas":
@@ -6196,7 +6586,7 @@ def update_country_detail_options_ga(region_country, region, income):
             options = WOAH_me_options_ga
     elif region_country =="FAO":
         if region == "All":
-            options = country_options_ga
+            options = get_ga_options()['country']
         elif region == "Africa":
             options = fao_africa_options_ga
         elif region == "Asia":
@@ -6212,7 +6602,7 @@ def update_country_detail_options_ga(region_country, region, income):
     elif region_country == "World Bank":
         if region == "All":
             if income == "All":
-                options = country_options_ga
+                options = get_ga_options()['country']
             else:
                 options_df = ga_countries_biomass.loc[(ga_countries_biomass['incomegroup'] == income)]
                 options = [{'label': "All", 'value': "All"}]
@@ -6230,7 +6620,7 @@ def update_country_detail_options_ga(region_country, region, income):
                 for i in options_df['country'].unique():
                     str(options.append({'label':i,'value':(i)}))
     else:
-        options = country_options_ga
+        options = get_ga_options()['country']
 
     return options
 
@@ -6241,6 +6631,7 @@ def update_country_detail_options_ga(region_country, region, income):
     Input('select-region-overview-ga', 'value'),
     )
 def update_species_options_ga(country, region):
+    ga_countries_biomass = datareg.get('ga_countries_biomass')
     if region == 'All':
         if country == "All":
             options = []
@@ -6253,7 +6644,7 @@ def update_species_options_ga(country, region):
                 str(options.append({'label':i,'value':(i)}))
     elif region == "Sub-Saharan Africa":
         if country == 'All':
-            country = [[v for k,v in d.items()] for d in wb_africa_options_ga]
+            country = [[v for k,v in d.items()] for d in get_ga_options()['wb_africa']]
             country = [a[1] for a in country]
             input_df = ga_countries_biomass[ga_countries_biomass['country'].isin(country)]
         else:
@@ -6264,7 +6655,7 @@ def update_species_options_ga(country, region):
             str(options.append({'label':i,'value':(i)}))
     elif region == "East Asia & Pacific":
         if country == 'All':
-            country = [[v for k,v in d.items()] for d in wb_eap_options_ga]
+            country = [[v for k,v in d.items()] for d in get_ga_options()['wb_eap']]
             country = [a[1] for a in country]
             input_df = ga_countries_biomass[ga_countries_biomass['country'].isin(country)]
         else:
@@ -6275,7 +6666,7 @@ def update_species_options_ga(country, region):
             str(options.append({'label':i,'value':(i)}))
     elif region == "Europe & Central Asia":
         if country == 'All':
-            country = [[v for k,v in d.items()] for d in wb_eca_options_ga]
+            country = [[v for k,v in d.items()] for d in get_ga_options()['wb_eca']]
             country = [a[1] for a in country]
             input_df = ga_countries_biomass[ga_countries_biomass['country'].isin(country)]
         else:
@@ -6286,7 +6677,7 @@ def update_species_options_ga(country, region):
             str(options.append({'label':i,'value':(i)}))
     elif region == "Latin America & the Caribbean":
         if country == 'All':
-            country = [[v for k,v in d.items()] for d in wb_lac_options_ga]
+            country = [[v for k,v in d.items()] for d in get_ga_options()['wb_lac']]
             country = [a[1] for a in country]
             input_df = ga_countries_biomass[ga_countries_biomass['country'].isin(country)]
         else:
@@ -6297,7 +6688,7 @@ def update_species_options_ga(country, region):
             str(options.append({'label':i,'value':(i)}))
     elif region == "Middle East & North Africa":
         if country == 'All':
-            country = [[v for k,v in d.items()] for d in wb_mena_options_ga]
+            country = [[v for k,v in d.items()] for d in get_ga_options()['wb_mena']]
             country = [a[1] for a in country]
             input_df = ga_countries_biomass[ga_countries_biomass['country'].isin(country)]
         else:
@@ -6308,7 +6699,7 @@ def update_species_options_ga(country, region):
             str(options.append({'label':i,'value':(i)}))
     elif region == "North America":
         if country == 'All':
-            country = [[v for k,v in d.items()] for d in wb_na_options_ga]
+            country = [[v for k,v in d.items()] for d in get_ga_options()['wb_na']]
             country = [a[1] for a in country]
             input_df = ga_countries_biomass[ga_countries_biomass['country'].isin(country)]
         else:
@@ -6319,7 +6710,7 @@ def update_species_options_ga(country, region):
             str(options.append({'label':i,'value':(i)}))
     else:
         if country == 'All':
-            country = [[v for k,v in d.items()] for d in wb_southasia_options_ga]
+            country = [[v for k,v in d.items()] for d in get_ga_options()['wb_southasia']]
             country = [a[1] for a in country]
             input_df = ga_countries_biomass[ga_countries_biomass['country'].isin(country)]
         else:
@@ -6350,6 +6741,37 @@ def update_species_options_ga(country, region):
 # ------------------------------------------------------------------------------
 #### -- Data
 # ------------------------------------------------------------------------------
+# Rate table: add a row, reset to the default rates, or apply edits
+# Edits are checked with ga.clean_rate_table() and the table shows the rates used:
+# rates outside the valid range revert to the default for the income group, and
+# a deleted row for all species of an income group comes back. Added rows are
+# kept until an income group is chosen.
+# The rates used are saved on the server and only their key is passed to the
+# dcc.Store. Calculations read the rates from there, so edits apply without
+# reloading the data.
+@gbadsDash.callback(
+    Output('ga-rate-table', 'data'),
+    Output('ga-rate-table-data', 'data'),
+    Input('add-rate-row-ga', 'n_clicks'),
+    Input('reset-rates-ga', 'n_clicks'),
+    Input('ga-rate-table', 'data'),
+    )
+def update_rate_table_ga(add_row, reset, rate_table):
+    if ctx.triggered_id in (None, 'reset-rates-ga'):
+        rate_table = ga.RATE_TABLE.to_dict('records')
+    edited_df = pd.DataFrame(rate_table, columns=list(ga.RATE_TABLE))
+    clean_df = ga.clean_rate_table(edited_df)
+
+    # Rows without an income group are not used yet but stay in the table
+    new_df = edited_df.loc[edited_df['incomegroup'].isnull()]
+    if ctx.triggered_id == 'add-rate-row-ga':
+        new_df = pd.concat([new_df, pd.DataFrame([{i: None for i in rate_table_columns_ga}])])
+
+    # Blank cells are None in the table data
+    display_df = pd.concat([clean_df, new_df]).astype(object)
+    display_df = display_df.where(display_df.notnull(), None)
+    return display_df.to_dict('records'), store.put_df(clean_df)
+
 # Attribution datatable below graphic
 @gbadsDash.callback(
     Output('ga-world-abt-datatable', 'children'),
@@ -6359,26 +6781,18 @@ def update_species_options_ga(country, region):
     Input('select-country-overview-ga','value'),
     # Input('select-currency-ecs','value'),
     Input('amu-regional-data', 'data'),
+    Input('ga-rate-table-data', 'data'),
     )
 def update_overview_table_ga(
         species
         ,income
         ,region
         ,country
-        ,amu_data_json
+        ,amu_data_key
+        ,rate_table_key
     ):
     # Read in data
-    input_df = ga_countries_biomass.copy()
-    input_df_amu = pd.read_json(amu_data_json, orient='split')
-
-    # Add mortality, morbidity, and vetmed rate columns
-    input_df = ga.add_mortality_rate(input_df)
-    input_df = ga.add_morbidity_rate(input_df)
-    input_df = ga.add_vetmed_rates(input_df)
-    input_df = ga.add_antimicrobial_expenditure(input_df ,input_df_amu)
-
-    # Apply AHLE calcs
-    input_df = ga.ahle_calcs_adj_outputs(input_df)
+    input_df = calc_ga_ahle(amu_data_key ,rate_table_key)
 
     # Filter Species
     input_df = input_df.loc[(input_df['species'] == species)]
@@ -6392,56 +6806,56 @@ def update_overview_table_ga(
     # Filter Region & country
     if region == "All":
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in country_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['country']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
              input_df=input_df.loc[(input_df['country'] == country)]
     elif region == "Sub-Saharan Africa":
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in wb_africa_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_africa']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
              input_df=input_df.loc[(input_df['country'] == country)]
     elif region == "East Asia & Pacific":
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in wb_eap_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_eap']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
              input_df=input_df.loc[(input_df['country'] == country)]
     elif region == "Europe & Central Asia":
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in wb_eca_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_eca']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
              input_df=input_df.loc[(input_df['country'] == country)]
     elif region == "Latin America & the Caribbean":
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in wb_lac_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_lac']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
              input_df=input_df.loc[(input_df['country'] == country)]
     elif region == "Middle East & North Africa":
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in wb_mena_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_mena']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
              input_df=input_df.loc[(input_df['country'] == country)]
     elif region == "North America":
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in wb_na_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_na']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
              input_df=input_df.loc[(input_df['country'] == country)]
     else:
          if country == 'All':
-             selected = [[v for k,v in d.items()] for d in wb_southasia_options_ga]
+             selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_southasia']]
              selected = [a[1] for a in selected]
              input_df = input_df[input_df['country'].isin(selected)]
          else:
@@ -6514,25 +6928,17 @@ def update_overview_table_ga(
     Input('select-incomegrp-detail-ga','value'),
     Input('select-country-detail-ga','value'),
     Input('amu-regional-data', 'data'),
+    Input('ga-rate-table-data', 'data'),
     )
 def update_detail_table_ga(
         selected_region
         ,selected_incgrp
         ,selected_country
-        ,amu_data_json
+        ,amu_data_key
+        ,rate_table_key
     ):
     # Read data
-    input_df = ga_countries_biomass.copy()
-    input_df_amu = pd.read_json(amu_data_json, orient='split')
-
-    # Add mortality, morbidity, and vetmed rate columns
-    input_df = ga.add_mortality_rate(input_df)
-    input_df = ga.add_morbidity_rate(input_df)
-    input_df = ga.add_vetmed_rates(input_df)
-    input_df = ga.add_antimicrobial_expenditure(input_df ,input_df_amu)
-
-    # Apply AHLE calcs
-    input_df = ga.ahle_calcs_adj_outputs(input_df)
+    input_df = calc_ga_ahle(amu_data_key ,rate_table_key)
 
     # Apply filters
     input_df_filtered = input_df
@@ -6572,6 +6978,9 @@ def update_detail_table_ga(
             print_selected_country = f'{selected_country}'
             print_selected_incgrp = ''
 
+    # Copy the selected rows because formatting below modifies the data in place
+    input_df_filtered = input_df_filtered.copy()
+
     columns_to_display_with_labels = {
         'region':'Region'
         ,'incomegroup':'Income group'
@@ -6778,7 +7187,9 @@ def update_detail_table_ga(
     Input('select-incomegrp-overview-ga','value'),
     # Input('select-currency-ecs','value'),
     Input('amu-regional-data', 'data'),
+    Input('ga-rate-table-data', 'data'),
    )
+@figcache.cached_figure()
 def update_bio_ahle_visual_ga(
         viz_selection
         ,species
@@ -6786,74 +7197,65 @@ def update_bio_ahle_visual_ga(
         ,region
         ,display
         ,income
-        ,amu_data_json
+        ,amu_data_key
+        ,rate_table_key
     ):
    # Data
-   input_df = ga_countries_biomass.copy()
-   input_df_amu = pd.read_json(amu_data_json, orient='split')
-
-   # Add mortality, morbidity, and vetmed rate columns
-   input_df = ga.add_mortality_rate(input_df)
-   input_df = ga.add_morbidity_rate(input_df)
-   input_df = ga.add_vetmed_rates(input_df)
-   input_df = ga.add_antimicrobial_expenditure(input_df ,input_df_amu)
-
-   # Apply AHLE calcs
-   input_df = ga.ahle_calcs_adj_outputs(input_df)
+   input_df = calc_ga_ahle(amu_data_key ,rate_table_key)
 
    # Filter Region & country
    if region == "All":
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in country_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['country']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
             input_df=input_df.loc[(input_df['country'] == country)]
    elif region == "Sub-Saharan Africa":
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in wb_africa_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_africa']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
             input_df=input_df.loc[(input_df['country'] == country)]
    elif region == "East Asia & Pacific":
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in wb_eap_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_eap']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
             input_df=input_df.loc[(input_df['country'] == country)]
    elif region == "Europe & Central Asia":
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in wb_eca_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_eca']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
             input_df=input_df.loc[(input_df['country'] == country)]
    elif region == "Latin America & the Caribbean":
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in wb_lac_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_lac']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
             input_df=input_df.loc[(input_df['country'] == country)]
    elif region == "Middle East & North Africa":
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in wb_mena_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_mena']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
             input_df=input_df.loc[(input_df['country'] == country)]
    elif region == "North America":
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in wb_na_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_na']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
             input_df=input_df.loc[(input_df['country'] == country)]
    else:
         if country == 'All':
-            selected = [[v for k,v in d.items()] for d in wb_southasia_options_ga]
+            selected = [[v for k,v in d.items()] for d in get_ga_options()['wb_southasia']]
             selected = [a[1] for a in selected]
             input_df = input_df[input_df['country'].isin(selected)]
         else:
@@ -6947,45 +7349,36 @@ def update_bio_ahle_visual_ga(
 @gbadsDash.callback(
     Output('ga-ahle-waterfall','figure'),
     Input('amu-regional-data', 'data'),
+    Input('ga-rate-table-data', 'data'),
     Input('select-region-detail-ga','value'),
     Input('select-incomegrp-detail-ga','value'),
     Input('select-country-detail-ga','value'),
     Input('select-year-ga','value'),
     Input('select-display-ga','value'),
+    Input('select-uncertainty-ga','value'),
     )
 def update_ahle_waterfall_ga(
-        amu_data_json
+        amu_data_key
+        ,rate_table_key
         ,selected_region
         ,selected_incgrp
         ,selected_country
         ,selected_year
         ,display
+        ,uncertainty
     ):
     # Read data
-    input_df = ga_countries_biomass.copy()
-    input_df_amu = pd.read_json(amu_data_json, orient='split')
-
-    # Add mortality, morbidity, and vetmed rate columns
-    input_df = ga.add_mortality_rate(input_df)
-    input_df = ga.add_morbidity_rate(input_df)
-    input_df = ga.add_vetmed_rates(input_df)
-    input_df = ga.add_antimicrobial_expenditure(input_df ,input_df_amu)
-
-    # Apply AHLE calcs
-    input_df = ga.ahle_calcs_adj_outputs(input_df)
-
-    # Prep the data
-    prep_df = prep_ahle_forwaterfall_ga(input_df)
-
-    # Make costs negative
-    _vetmed_rows = (prep_df['item'].str.contains('COSTS' ,case=False ,na=False)\
-                    | prep_df['item'].str.contains('EXPENDITURE' ,case=False ,na=False))
-    prep_df.loc[_vetmed_rows ,'value_usd_current'] = -1 * prep_df.loc[_vetmed_rows ,'value_usd_current']
+    prep_df = calc_ga_ahle_forwaterfall(amu_data_key ,rate_table_key)
 
     # Apply user filters
     # There will always be a year filter
     prep_df_filtered = prep_df.query(f"year == {selected_year}")
 
+    # Make costs negative
+    _vetmed_rows = (prep_df_filtered['item'].str.contains('COSTS' ,case=False ,na=False)\
+                    | prep_df_filtered['item'].str.contains('EXPENDITURE' ,case=False ,na=False))
+    prep_df_filtered.loc[_vetmed_rows ,'value_usd_current'] = -1 * prep_df_filtered.loc[_vetmed_rows ,'value_usd_current']
+
     # Region, Country and Income group might not be filtered
     if selected_region == 'All':
         if selected_country == 'All':
@@ -7030,6 +7423,15 @@ def update_ahle_waterfall_ga(
     # Get total AHLE for printing
     total_ahle = prep_df_sums.query("item.str.upper() == 'NET VALUE'")['value_usd_ahle_diff'].values[0]
 
+    # Add uncertainty bands
+    show_interval = (uncertainty == 'With interval')
+    print_total_interval = ''
+    if show_interval:
+        bands_df = calc_ga_ahle_bands(amu_data_key ,rate_table_key ,selected_region ,selected_incgrp ,selected_country)
+        prep_df_sums = add_ga_item_bands(prep_df_sums.assign(year=int(selected_year)) ,bands_df ,COSTS_NEGATIVE=True)
+        total_ahle_bands = prep_df_sums.query("item.str.upper() == 'NET VALUE'")
+        print_total_interval = f" ({ga_ahle_mc_interval :.0%} interval ${total_ahle_bands['value_usd_ahle_diff_low'].values[0] :,.0f} to ${total_ahle_bands['value_usd_ahle_diff_high'].values[0] :,.0f})"
+
     if display =='Side by Side':
         # Create graph with current values
         name = 'Current'
@@ -7053,7 +7455,7 @@ def update_ahle_waterfall_ga(
             waterfallgroupgap = 0.5,    # Gap between bars
             )
 
-        ga_waterfall_fig.update_layout(title_text=f'Compare Current values and costs | {print_selected_country}{print_selected_incgrp}{selected_year}<br><sup>Total animal health loss envelope: ${total_ahle :,.0f} in constant 2010 US dollars</sup><br>',
+        ga_waterfall_fig.update_layout(title_text=f'Compare Current values and costs | {print_selected_country}{print_selected_incgrp}{selected_year}<br><sup>Total animal health loss envelope: ${total_ahle :,.0f}{print_total_interval} in constant 2010 US dollars</sup><br>',
                                         yaxis_title='US Dollars (2010 constant)',
                                         font_size=15)
     else:
@@ -7064,7 +7466,23 @@ def update_ahle_waterfall_ga(
         y = prep_df_sums['value_usd_ahle_diff']
         ga_waterfall_fig = create_ahle_waterfall_ga(prep_df_sums, name, measure, x, y)
 
-        ga_waterfall_fig.update_layout(title_text=f'Ideal minus current values and costs | {print_selected_country}{print_selected_incgrp}{selected_year}<br><sup>Total animal health loss envelope: ${total_ahle :,.0f} in constant 2010 US dollars</sup><br>',
+        if show_interval:
+            # Error bars at the end of each bar. Totals end at the running total.
+            bar_ends = np.cumsum(np.where(np.array(measure) == 'relative', y, 0))
+            ga_waterfall_fig.add_trace(go.Scatter(
+                x=x,
+                y=bar_ends,
+                mode='markers',
+                marker={'opacity':0},
+                error_y={'type':'data',
+                         'array':(prep_df_sums['value_usd_ahle_diff_high'] - y).clip(lower=0),
+                         'arrayminus':(y - prep_df_sums['value_usd_ahle_diff_low']).clip(lower=0),
+                         'color':'black'},
+                name=f'{ga_ahle_mc_interval :.0%} interval',
+                hoverinfo='skip',
+                ))
+
+        ga_waterfall_fig.update_layout(title_text=f'Ideal minus current values and costs | {print_selected_country}{print_selected_incgrp}{selected_year}<br><sup>Total animal health loss envelope: ${total_ahle :,.0f}{print_total_interval} in constant 2010 US dollars</sup><br>',
                                         yaxis_title='US Dollars (2010 constant)',
                                         font_size=15)
 
@@ -7079,6 +7497,8 @@ def update_ahle_waterfall_ga(
     Input('select-item-ga','value'),
     Input('select-display-ga','value'),
     Input('amu-regional-data', 'data'),
+    Input('ga-rate-table-data', 'data'),
+    Input('select-uncertainty-ga','value'),
     )
 def update_ahle_lineplot_ga(
         selected_region
@@ -7086,24 +7506,13 @@ def update_ahle_lineplot_ga(
         ,selected_country
         ,selected_item
         ,display
-        ,amu_data_json
+        ,amu_data_key
+        ,rate_table_key
+        ,uncertainty
     ):
     # Read data
-    input_df = ga_countries_biomass.copy()
-    input_df_amu = pd.read_json(amu_data_json, orient='split')
-
-    # Add mortality, morbidity, and vetmed rate columns
-    input_df = ga.add_mortality_rate(input_df)
-    input_df = ga.add_morbidity_rate(input_df)
-    input_df = ga.add_vetmed_rates(input_df)
-    input_df = ga.add_antimicrobial_expenditure(input_df ,input_df_amu)
-
-    # Apply AHLE calcs
-    input_df = ga.ahle_calcs_adj_outputs(input_df)
-
-    # Prep the data
     # Initial data prep is same as waterfall!
-    prep_df = prep_ahle_forwaterfall_ga(input_df)
+    prep_df = calc_ga_ahle_forwaterfall(amu_data_key ,rate_table_key)
 
     # Apply user filters
     # There will always be an item filter
@@ -7154,6 +7563,12 @@ def update_ahle_lineplot_ga(
     prep_df_sums = prep_df_filtered.groupby('year')[['value_usd_current' ,'value_usd_ideal', 'value_usd_ahle_diff']].sum()
     prep_df_sums = prep_df_sums.reset_index()
 
+    # Add uncertainty bands
+    show_interval = (uncertainty == 'With interval')
+    if show_interval:
+        bands_df = calc_ga_ahle_bands(amu_data_key ,rate_table_key ,selected_region ,selected_incgrp ,selected_country)
+        prep_df_sums = add_ga_item_bands(prep_df_sums.assign(item=selected_item) ,bands_df)
+
 
     if display == "Side by Side":
         # Plot current value
@@ -7174,6 +7589,14 @@ def update_ahle_lineplot_ga(
         ga_lineplot_fig = make_subplots()
         ga_lineplot_fig.add_trace(plot_ideal_value)
         ga_lineplot_fig.add_trace(plot_current_value)
+
+        # Bands only for values that depend on the rates
+        if show_interval:
+            for value, plot_value in [('ideal', plot_ideal_value), ('current', plot_current_value)]:
+                if (prep_df_sums[f'value_usd_{value}_low'] != prep_df_sums[f'value_usd_{value}_high']).any():
+                    add_band_ga(ga_lineplot_fig, prep_df_sums['year'],
+                                prep_df_sums[f'value_usd_{value}_low'], prep_df_sums[f'value_usd_{value}_high'],
+                                plot_value.line.color, f'{plot_value.name} {ga_ahle_mc_interval :.0%} interval')
         ga_lineplot_fig.update_layout(title_text=f'Current & ideal {print_selected_item} | {print_selected_country}{print_selected_incgrp}<br><sup></sup><br>',
                                       yaxis_title='US Dollars (2010 constant)',
                                       font_size=15,
@@ -7209,6 +7632,11 @@ def update_ahle_lineplot_ga(
 
         ga_lineplot_fig = make_subplots()
         ga_lineplot_fig.add_trace(plot_ahle_value)
+
+        if show_interval and (prep_df_sums['value_usd_ahle_diff_low'] != prep_df_sums['value_usd_ahle_diff_high']).any():
+            add_band_ga(ga_lineplot_fig, prep_df_sums['year'],
+                        prep_df_sums['value_usd_ahle_diff_low'], prep_df_sums['value_usd_ahle_diff_high'],
+                        plot_ahle_value.line.color, f'{ga_ahle_mc_interval :.0%} interval')
         ga_lineplot_fig.update_layout(title_text=f'Ideal minus current {print_selected_item} | {print_selected_country}{print_selected_incgrp}<br><sup></sup><br>',
                                       yaxis_title='US Dollars (2010 constant)',
                                       font_size=15,
@@ -7231,6 +7659,7 @@ def update_ahle_lineplot_ga(
     Input('select-species-ecs', 'value'),
     )
 def update_prodsys_options_ecs(species):
+    ecs_ahle_summary = datareg.get('ecs_ahle_summary')
     # Get unique production systems for selected species
     unique_prodsys = np.sort(ecs_ahle_summary.loc[ecs_ahle_summary['species'] == species ,'production_system'].unique())
     options = [{'label': i, 'value': i} for i in unique_prodsys]
@@ -7262,6 +7691,7 @@ def update_longitudinal_options_ecs(species):
     Input('select-species-ecs','value'),
     )
 def update_year_select_ecs(graph, species):
+    ecs_ahle_summary = datareg.get('ecs_ahle_summary')
     value=2021
     ecs_year_options=[]     # By default, list is blank
     placeholder = '2021'
@@ -7310,9 +7740,9 @@ def update_geo_view_options_ecs(graph, species, year):
     )
 def update_age_options_ecs(species):
     if species == "Cattle":
-        options = ecs_agesex_options
+        options = get_ecs_options()['agesex']
     else:
-        options = ecs_agesex_options.copy()
+        options = get_ecs_options()['agesex'].copy()
         for d in options:
             if d['value'] == 'Oxen':
                 options.remove(d)
@@ -7484,7 +7914,7 @@ def update_dd4_options_ecs(graph, top_lvl_hierarchy, dd1_hierarchy, dd2_hierarch
     Input('select-geo-view-ecs','value'),
     )
 def update_ahle_graph_controls(graph, geo_view):
-    options2 = ecs_region_options.copy()
+    options2 = get_ecs_options()['region'].copy()
 
     for d in options2:
         if graph == 'Over Time':
@@ -7679,16 +8109,14 @@ def update_footnote(graph):
     Input('select-agesex-ecs', 'value'),
 )
 def update_ecs_ahle_data(currency, species, prodsys, agesex):
-    # Read in data and apply filters
-    input_df = ecs_ahle_summary
-    # Species filter
-    input_df = input_df.loc[(input_df['species'] == species)]
-    # Production System filter
-    # Rename values to match filters
-    input_df['production_system'] = input_df['production_system'].replace({'Overall': 'All Production Systems'})
-    input_df=input_df.loc[(input_df['production_system'] == prodsys)]
-    # Age/sex filter
-    input_df=input_df.loc[(input_df['agesex_scenario'] == agesex)]
+    # Read in data and apply species, production system, and age/sex filters
+    input_df = fidx.select(
+        datareg.get('ecs_scensmry_index')
+        ,species=species
+        ,production_system=prodsys
+        ,agesex_scenario=agesex
+        ,region='National'
+    ).copy()
 
     # If currency is USD, use USD columns
     display_currency = 'Birr'
@@ -7779,26 +8207,26 @@ def update_ecs_ahle_data(currency, species, prodsys, agesex):
     Input('select-species-ecs','value'),
     )
 def update_ecs_attr_data(currency, prodsys, species):
-    # Read in data
-    input_df = ecs_ahle_all_withattr
+    attr_filters = {}
 
     # Production System filter
     # If All production systems, don't filter. Attribution data is not aggregated to that level.
-    if prodsys == 'All Production Systems':
-        input_df=input_df
-    else:
-        input_df=input_df.loc[(input_df['production_system'] == prodsys)]
+    if prodsys != 'All Production Systems':
+        attr_filters['production_system'] = prodsys
 
     # Species filter
     # Goat and Sheep do not appear separately. These get all small ruminants results.
     if species == 'Goat' or species == "Sheep":
-        input_df=input_df.loc[(input_df['species'] == 'All Small Ruminants')]
+        attr_filters['species'] = 'All Small Ruminants'
 
     # Poultry subspecies do not appear separately. These get all poultry results.
     elif species == 'Poultry hybrid' or species == "Poultry indigenous":
-        input_df=input_df.loc[(input_df['species'] == 'All Poultry')]
+        attr_filters['species'] = 'All Poultry'
     else:
-        input_df=input_df.loc[(input_df['species'] == species)]
+        attr_filters['species'] = species
+
+    # Read in data and apply filters
+    input_df = fidx.select(datareg.get('ecs_withattr_index') ,**attr_filters).copy()
 
     # If currency is USD, use USD columns
     display_currency = 'Birr'
@@ -7863,13 +8291,13 @@ def update_ecs_attr_data(currency, prodsys, species):
 def update_ecs_attr_expert_data(species):
     # Read in data depending on species selected
     if species in ["All Small Ruminants", "Goat", "Sheep"]:
-        input_df = ecs_expertattr_smallrum
+        input_df = datareg.get('ecs_expertattr_smallrum').copy()
         spec_label = "Small Ruminants"
     elif species == "Cattle":
-        input_df = ecs_expertattr_cattle
+        input_df = datareg.get('ecs_expertattr_cattle').copy()
         spec_label = "Cattle"
     elif species in ["All Poultry", "Poultry hybrid", "Poultry indigenous"]:
-        input_df = ecs_expertattr_poultry
+        input_df = datareg.get('ecs_expertattr_poultry').copy()
         spec_label = "Poultry"
 
     # Format numbers
@@ -7947,24 +8375,21 @@ def update_ahle_value_and_cost_viz_ecs(
         geo_view,
         region,
     ):
-    # Read in data and apply filters
-    input_df = ahle_all_scensmry
-    # Species filter
-    input_df = input_df.loc[(input_df['species'] == species)]
-    # Production System filter
-    # Rename values to match filters
-    input_df['production_system'] = input_df['production_system'].replace({'Overall': 'All Production Systems'})
-    input_df=input_df.loc[(input_df['production_system'] == prodsys)]
-    # Age/sex filter
-    input_df=input_df.loc[(input_df['agesex_scenario'] == agesex)]
     # Geographic filter
     if geo_view.upper() == "NATIONAL":
-        input_df = input_df.query("region == 'National'")
         reg_title = 'National'
     else:
-        input_df = input_df.query("region == @region")
         reg_title = region
 
+    # Read in data and apply species, production system, age/sex, and geographic filters
+    input_df = fidx.select(
+        datareg.get('ecs_scensmry_index')
+        ,species=species
+        ,production_system=prodsys
+        ,agesex_scenario=agesex
+        ,region=reg_title
+    )
+
     # Prep the data
     prep_df = prep_ahle_forwaterfall_ecs(input_df)
 
@@ -8668,6 +9093,7 @@ def update_ahle_value_and_cost_viz_ecs(
     Input('select-geo-view-ecs','value'),
     Input('select-region-ecs','value'),
 )
+@figcache.cached_figure()
 def update_attr_treemap_ecs(
         prodsys,
         species,
@@ -8683,37 +9109,32 @@ def update_attr_treemap_ecs(
         geo_view,
         region,
     ):
-    # Data
-    input_df = ecs_ahle_all_withattr
-
     # Geographic filter
     if geo_view.upper() == "NATIONAL":
-        input_df = input_df.query("region == 'National'")
         reg_title = 'National'
     else:
-        input_df = input_df.query("region == @region")
         reg_title = region
+    attr_filters = {'region':reg_title}
 
     # Production System filter
     # If All production systems, don't filter. Attribution data is not aggregated to that level.
-    if prodsys == 'All Production Systems':
-        input_df=input_df
-    else:
-        input_df=input_df.loc[(input_df['production_system'] == prodsys)]
+    if prodsys != 'All Production Systems':
+        attr_filters['production_system'] = prodsys
 
     # Species filter
     # Goat and Sheep do not appear separately. These get all small ruminants results.
     if species == 'Goat' or species == "Sheep":
-        input_df=input_df.loc[(input_df['species'] == 'All Small Ruminants')]
         species_label = 'All Small Ruminants'
 
     # Poultry subspecies do not appear separately. These get all poultry results.
     elif species == 'Poultry hybrid' or species == "Poultry indigenous":
-        input_df=input_df.loc[(input_df['species'] == 'All Poultry')]
         species_label = 'All Poultry'
     else:
-        input_df=input_df.loc[(input_df['species'] == species)]
         species_label = species
+    attr_filters['species'] = species_label
+
+    # Data
+    input_df = fidx.select(datareg.get('ecs_withattr_index') ,**attr_filters).copy()
 
     # If currency is USD, use USD columns
     if currency == 'USD':
@@ -8826,10 +9247,8 @@ def update_stacked_bar_ecs(
         selected_item,
     ):
     # AHLE Summary 2 - for stacked bar
-    input_df = ecs_ahle_summary2
-
-    # Rename values to match filters
-    input_df['production_system'] = input_df['production_system'].replace({'Overall': 'All Production Systems'})
+    # Apply production system and species filters
+    input_df = fidx.select(datareg.get('ecs_summary2_index') ,species=species ,production_system=prodsys)
 
     # Set columns for stacked bar based on selections
     # Change y based on selected currency value
@@ -9203,12 +9622,6 @@ def update_stacked_bar_ecs(
     # Structure for plot
     stackedbar_df = prep_ahle_forstackedbar_ecs(input_df, cols_birr_costs, cols_usd_costs, pretty_ahle_cost_names)
 
-    # Apply production system filter
-    stackedbar_df = stackedbar_df.loc[stackedbar_df['production_system'] == prodsys]
-
-    # Apply species filter
-    stackedbar_df = stackedbar_df.loc[stackedbar_df['species'] == species]
-
     x = stackedbar_df['species']
 
     # Change y based on selected currency value
@@ -9257,6 +9670,7 @@ def update_stacked_bar_ecs(
     Input('select-currency-ecs','value'),
     Input('select-map-denominator-ecs','value'),
     )
+@figcache.cached_figure()
 def update_map_display_ecs(species, agesex_scenario, prodsys, item, currency, denominator):
     if species.upper() != 'CATTLE':
         ecs_map_fig = go.Figure()
@@ -9276,8 +9690,8 @@ def update_map_display_ecs(species, agesex_scenario, prodsys, item, currency, de
                ]
            )
     else:
-        # Ethiopia subnational level map data from S3
-        geojson_ecs_df = geojson_ecs.copy()
+        # Ethiopia subnational level map data (simplified geometries)
+        geojson_ecs_df = datareg.get('geojson_ecs')
         # geojson_ecs_df = gpd.read_file('<filename>.geojson')
 
         # Set location based on the granularity level of data - currently Region
@@ -9288,27 +9702,26 @@ def update_map_display_ecs(species, agesex_scenario, prodsys, item, currency, de
         featurekey = (f'properties.{featureid}')
 
         # Read in data and apply filters
-        input_df = ahle_all_scensmry
-
-        # Filter based on species - Currently only have Cattle for 2021
-        input_df = input_df.loc[(input_df['species'] == 'Cattle')]
+        ecs_scensmry_index = datareg.get('ecs_scensmry_index')
 
         # Remove 'National' for regional view
-        input_df = input_df.query("region != 'National'")
-
-        # Production System filter
-        # Rename values to match filters
-        input_df['production_system'] = input_df['production_system'].replace({'Overall': 'All Production Systems'})
-        input_df=input_df.loc[(input_df['production_system'] == prodsys)]
+        subnational_regions = [r for r in fidx.key_values(ecs_scensmry_index ,'region') if r != 'National']
 
-        # Age/sex filter
-        input_df=input_df.loc[(input_df['agesex_scenario'] == agesex_scenario)]
+        # Filter based on species - Currently only have Cattle for 2021
+        # Also production system and age/sex filters
+        input_df = fidx.select(
+            ecs_scensmry_index
+            ,species='Cattle'
+            ,production_system=prodsys
+            ,agesex_scenario=agesex_scenario
+            ,region=subnational_regions
+        )
 
         if item == 'Ideal Gross Margin' or item == 'Animal Health Loss Envelope':
             item_filter = 'Gross Margin'
         else:
             item_filter = item
-        input_df = input_df.query("item == @item_filter")
+        input_df = input_df.loc[input_df['item'] == item_filter].copy()
 
         # Create AHLE columns
         input_df['mean_AHLE'] = input_df['mean_ideal'] - input_df['mean_current']
@@ -9439,7 +9852,7 @@ def update_antimicrobial_importance_class_switch(display_option, viz_switch):
         block = {'display': 'block'}
         # d['disabled']=False
     else:
-        options = amu_antimicrobial_class_options.copy()
+        options = get_amu_options()['antimicrobial_class'].copy()
         for d in options:
             if display_option == 'Antimicrobial Resistance (country level)':
                 block = {'display': 'block'}
@@ -9466,8 +9879,9 @@ def update_antimicrobial_importance_class_switch(display_option, viz_switch):
     Input('select-antimicrobial-importance-class-amu', 'value'),
     )
 def update_map_amr_options(display_option, antimicrobial_class):
-    # options1 = amu_antimicrobial_class_options.copy()
-    options2 = amu_pathogen_options.copy()
+    amr_withsmry = datareg.get('amr_withsmry')
+    # options1 = get_amu_options()['antimicrobial_class'].copy()
+    options2 = get_amu_options()['pathogen'].copy()
     # for d in options1:
     #     if display_option == 'AMR':
     #         block = {'display': 'block'}
@@ -9573,6 +9987,7 @@ def update_map_amr_options(display_option, antimicrobial_class):
     Input('reset-sliders-amu','n_clicks'),
     )
 def update_usage_price_sliders(reset_button):
+    amu_combined_regional = datareg.get('amu_combined_regional')
     regional_usage_price_data = amu_combined_regional.copy()
 
 
@@ -9726,6 +10141,7 @@ def update_regional_table_amu(
         ,usage_europe ,price_europe
         ,usage_mideast ,price_mideast
     ):
+    amu_combined_regional = datareg.get('amu_combined_regional')
     df = amu_combined_regional.copy()
 
     # Add selected usage and price values as columns
@@ -9744,7 +10160,8 @@ def update_regional_table_amu(
     df['am_expenditure_usd_selected'] = df['amu_terrestrial_tonnes_selected'] * df['am_price_usdpertonne_selected']
     df['am_expenditure_usd_perkg_selected'] = df['am_expenditure_usd_selected'] / df['biomass_terr_kg_region']
 
-    return df.to_json(date_format='iso', orient='split')
+    # Save data on the server and pass only its key to the dcc.Store
+    return store.put_df(df)
 
 # Datatable below graphics
 @gbadsDash.callback(
@@ -9752,6 +10169,7 @@ def update_regional_table_amu(
     Input('select-species-ga','value'),
     )
 def update_table_display_amu(dummy_input):
+    amu2018_combined_tall = datareg.get('amu2018_combined_tall')
     display_data = amu2018_combined_tall.copy()
 
     # Filter out AGP
@@ -9844,8 +10262,8 @@ def update_table_display_amu(dummy_input):
     Output('amu-regional-todisplay', 'children'),
     Input('amu-regional-data', 'data'),
     )
-def update_regional_display_amu(input_json):
-    display_data = pd.read_json(input_json, orient='split')
+def update_regional_display_amu(input_key):
+    display_data = store.get_df(input_key)
 
     columns_to_display_with_labels = {
         'region':'Region'
@@ -9979,6 +10397,7 @@ def update_regional_display_amu(input_json):
     Input('amu-regional-data', 'data'),
     )
 def update_amr_display_amu(dummy_input):
+    amr_withsmry = datareg.get('amr_withsmry')
     display_data = amr_withsmry.copy()
 
     columns_to_display_with_labels = {
@@ -10165,10 +10584,13 @@ def update_amr_display_amu(dummy_input):
     Input('select-pathogens-amu','value'),
     Input('amu-regional-data', 'data'),
     )
-def update_map_amu (viz_switch, quantity, antimicrobial_class, pathogens, input_json):
+@figcache.cached_figure()
+def update_map_amu (viz_switch, quantity, antimicrobial_class, pathogens, input_key):
+    amu2018_combined_tall = datareg.get('amu2018_combined_tall')
+    amr_withsmry = datareg.get('amr_withsmry')
     input_df = amu2018_combined_tall.copy()
     input_df_amr = amr_withsmry.copy()
-    input_df_am_expend = pd.read_json(input_json, orient='split')
+    input_df_am_expend = store.get_df(input_key)
 
     # Filter scope to All and remove nulls from importance category
     input_df = input_df.query("scope == 'All'")
@@ -10432,6 +10854,7 @@ def update_map_amu (viz_switch, quantity, antimicrobial_class, pathogens, input_
     )
 
 def update_stacked_bar_amu (classification, quantity, select_amu_graph):
+    amu2018_combined_tall = datareg.get('amu2018_combined_tall')
     stackedbar_df = amu2018_combined_tall.copy()
     stackedbar_df = stackedbar_df.query("scope == 'All'").query("antimicrobial_class != 'total_antimicrobials'")
 
@@ -10445,7 +10868,7 @@ def update_stacked_bar_amu (classification, quantity, select_amu_graph):
     stackedbar_df.antimicrobial_class_group2 = stackedbar_df.antimicrobial_class_group2.str.title()
 
     # Create region labels with proportion of biomass represented in countries reporting and adding a break
-    stackedbar_df["region_with_countries_reporting"] = stackedbar_df['region'] \
+    stackedbar_df["region_with_countries_reporting"] = stackedbar_df['region'].astype(object) \
             + '<br>' \
             + " (" + round(stackedbar_df['number_of_countries'] ,0).astype(int).astype(str) \
             + " | " + round(stackedbar_df['biomass_prpn_reporting'] * 100 ,1).astype(str) + "%)"
@@ -10613,6 +11036,7 @@ def update_stacked_bar_amu (classification, quantity, select_amu_graph):
     Input('select-classification-amu', 'value'),
     )
 def update_donut_chart_amu (quantity, region, classification):
+    amu2018_combined_tall = datareg.get('amu2018_combined_tall')
     input_df = amu2018_combined_tall.copy()
 
     # Workaround to fix names in legend
@@ -10763,8 +11187,8 @@ def update_donut_chart_amu (quantity, region, classification):
     Input('amu-regional-data', 'data'),
     Input('select-usage-units-amu' ,'value'),
     )
-def update_am_usage_comparison(input_json, units):
-    input_df = pd.read_json(input_json, orient='split')
+def update_am_usage_comparison(input_key, units):
+    input_df = store.get_df(input_key)
 
     # Recalculate units if needed
     if units == 'mg per kg biomass':
@@ -10835,8 +11259,8 @@ def update_am_usage_comparison(input_json, units):
     Output('am-price-comparison','figure'),
     Input('amu-regional-data', 'data'),
     )
-def update_am_price_comparison(input_json):
-    input_df = pd.read_json(input_json, orient='split')
+def update_am_price_comparison(input_key):
+    input_df = store.get_df(input_key)
 
     # Set custom colors to sync across all visuals
     colors = {"Asia, Far East and Oceania": 'rgb(102,197,204)',
@@ -10889,8 +11313,8 @@ def update_am_price_comparison(input_json):
     Input('amu-regional-data', 'data'),
     Input('select-expenditure-units-amu', 'value'),
     )
-def update_expenditure_amu(input_json, expenditure_units):
-    input_df = pd.read_json(input_json, orient='split')
+def update_expenditure_amu(input_key, expenditure_units):
+    input_df = store.get_df(input_key)
 
     # Set the units based on the expenditure selected
     if expenditure_units == 'per kg biomass':
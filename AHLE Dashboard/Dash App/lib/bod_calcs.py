@@ -1,7 +1,8 @@
 #%% About
 '''
 This defines functions that respond to user inputs in Dash, adding calculated
-columns to the base table for each species.
+columns to the base table for each species. Each calculation function takes the
+whole table and returns a column, see Master functions.
 '''
 #%% Libraries
 
@@ -9,12 +10,17 @@ import os
 import sys
 import datetime as dt
 import inspect
+import threading
 import numpy as np
-import scipy.interpolate
 import pandas as pd
 
 #%% Master functions
 # These are species-specific and call all other functions.
+# The calculation functions below only use elementwise arithmetic, so the
+# master functions pass them the whole data frame and each one returns a full
+# column. This avoids a Python-level call per row with df.apply(axis=1).
+# Breed standard lookups do not depend on the row, so they are resolved once
+# as scalars from the compiled breed standard (see Breed standards) and broadcast.
 
 def calc_bod_master_poultry(
       INPUT_DF
@@ -31,56 +37,43 @@ def calc_bod_master_poultry(
    # Apply BOD calculations. Each one adds a column to the data frame.
    # Order matters as some rely on variables created by others!!!
    OUTPUT_DF['bod_dof_used'] = AVG_DOF_MASTER   # Save this as a column for display
-   OUTPUT_DF['bod_breedstdwt_kg'] = OUTPUT_DF.apply(calc_bod_breedstdwt_kg_fromdays_poultry ,axis=1
+   OUTPUT_DF['bod_breedstdwt_kg'] = calc_bod_breedstdwt_kg_fromdays_poultry(OUTPUT_DF
       ,BREED_DF=BREED_DF_MASTER
       ,AVG_DOF=AVG_DOF_MASTER
    )
    if AVG_CARC_YIELD_MASTER:
       OUTPUT_DF['bod_breedstdyield_prpn'] = AVG_CARC_YIELD_MASTER
    else:
-      OUTPUT_DF['bod_breedstdyield_prpn'] = OUTPUT_DF.apply(calc_bod_breedstdyield_prpn_poultry ,axis=1
+      OUTPUT_DF['bod_breedstdyield_prpn'] = calc_bod_breedstdyield_prpn_poultry(OUTPUT_DF
          ,BREED_DF=BREED_DF_MASTER
          ,AVG_DOF=AVG_DOF_MASTER
       )
-   OUTPUT_DF['bod_breedstdcarcwt_kg'] = OUTPUT_DF.apply(calc_bod_breedstdcarcwt_kg ,axis=1)
-   OUTPUT_DF['bod_referenceproduction_tonnes'] = OUTPUT_DF.apply(calc_bod_referenceproduction_tonnes ,axis=1)
-   OUTPUT_DF['bod_efficiency_tonnes'] = OUTPUT_DF.apply(calc_bod_efficiency_tonnes_frompct ,axis=1
+   OUTPUT_DF['bod_breedstdcarcwt_kg'] = calc_bod_breedstdcarcwt_kg(OUTPUT_DF)
+   OUTPUT_DF['bod_referenceproduction_tonnes'] = calc_bod_referenceproduction_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_efficiency_tonnes'] = calc_bod_efficiency_tonnes_frompct(OUTPUT_DF
       ,ACHIEVABLE_PCT=ACHIEVABLE_PCT_MASTER
    )
-   OUTPUT_DF['bod_gmax_tonnes'] = OUTPUT_DF.apply(calc_bod_gmax_tonnes ,axis=1)
-   OUTPUT_DF['bod_realizedproduction_tonnes'] = OUTPUT_DF.apply(calc_bod_realizedproduction_tonnes ,axis=1)
-   OUTPUT_DF['bod_deathloss_tonnes'] = OUTPUT_DF.apply(calc_bod_deathloss_tonnes ,axis=1)
-   OUTPUT_DF['bod_totalburden_tonnes'] = OUTPUT_DF.apply(calc_bod_totalburden_tonnes ,axis=1)
-   OUTPUT_DF['bod_morbidity_tonnes'] = OUTPUT_DF.apply(calc_bod_morbidity_tonnes ,axis=1)
+   OUTPUT_DF['bod_gmax_tonnes'] = calc_bod_gmax_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_realizedproduction_tonnes'] = calc_bod_realizedproduction_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_deathloss_tonnes'] = calc_bod_deathloss_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_totalburden_tonnes'] = calc_bod_totalburden_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_morbidity_tonnes'] = calc_bod_morbidity_tonnes(OUTPUT_DF)
 
    # Adjustments & Corrections
-   # If user selected an achievable proportion too low, morbidity will be the wrong sign
-   # For these, set morbidity = 0 and add reduced growth to effect of feed
-   rows_with_wrongsign_morbidity = (OUTPUT_DF['bod_morbidity_tonnes'] > 0)
-   OUTPUT_DF.loc[rows_with_wrongsign_morbidity] = OUTPUT_DF.loc[rows_with_wrongsign_morbidity].eval(
-       '''
-       bod_efficiency_tonnes = bod_efficiency_tonnes + bod_morbidity_tonnes
-       bod_morbidity_tonnes = 0
-       bod_totalburden_tonnes = bod_deathloss_tonnes
-       '''
-   )
+   OUTPUT_DF = correct_wrongsign_morbidity(OUTPUT_DF)
 
    # Ideal Costs
-   OUTPUT_DF['adjusted_feedcost_usdperkglive'] = OUTPUT_DF.apply(calc_adjusted_feedcost_usdperkglive ,axis=1
-         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE_MASTER
-      )
-   OUTPUT_DF['ideal_headplaced'] = OUTPUT_DF.apply(calc_ideal_headplaced ,axis=1)
-   OUTPUT_DF['ideal_fcr'] = IDEAL_FCR_LIVE_MASTER
-   OUTPUT_DF[['ideal_feed_tonnes' ,'ideal_feedcost_usdperkglive']] = \
-      OUTPUT_DF.apply(calc_ideal_feedcost_usdperkglive ,axis=1
-         ,IDEAL_FCR_LIVE=IDEAL_FCR_LIVE_MASTER
-         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE_MASTER
-      )
-   OUTPUT_DF['ideal_chickcost_usdperkglive'] = OUTPUT_DF.apply(calc_ideal_chickcost_usdperkglive ,axis=1)
-   OUTPUT_DF['ideal_landhousingcost_usdperkglive'] = OUTPUT_DF.apply(calc_ideal_landhousingcost_usdperkglive ,axis=1)
-   OUTPUT_DF['ideal_laborcost_usdperkglive'] = OUTPUT_DF.apply(calc_ideal_laborcost_usdperkglive ,axis=1)
-   OUTPUT_DF['ideal_medcost_usdperkglive'] = OUTPUT_DF.apply(calc_ideal_medcost_usdperkglive ,axis=1)
-   OUTPUT_DF['ideal_othercost_usdperkglive'] = OUTPUT_DF.apply(calc_ideal_othercost_usdperkglive ,axis=1)
+   OUTPUT_DF = calc_bod_feedcosts_poultry(OUTPUT_DF
+      ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE_MASTER
+      ,IDEAL_FCR_LIVE=IDEAL_FCR_LIVE_MASTER
+   )
+   # Keep ideal_headplaced right after the adjusted feed cost, where tables and exports expect it
+   OUTPUT_DF.insert(OUTPUT_DF.columns.get_loc('adjusted_feedcost_usdperkglive') + 1 ,'ideal_headplaced' ,calc_ideal_headplaced(OUTPUT_DF))
+   OUTPUT_DF['ideal_chickcost_usdperkglive'] = calc_ideal_chickcost_usdperkglive(OUTPUT_DF)
+   OUTPUT_DF['ideal_landhousingcost_usdperkglive'] = calc_ideal_landhousingcost_usdperkglive(OUTPUT_DF)
+   OUTPUT_DF['ideal_laborcost_usdperkglive'] = calc_ideal_laborcost_usdperkglive(OUTPUT_DF)
+   OUTPUT_DF['ideal_medcost_usdperkglive'] = calc_ideal_medcost_usdperkglive(OUTPUT_DF)
+   OUTPUT_DF['ideal_othercost_usdperkglive'] = calc_ideal_othercost_usdperkglive(OUTPUT_DF)
 
    return OUTPUT_DF
 
@@ -108,13 +101,13 @@ def calc_bod_master_swine(
    # Apply BOD calculations. Each one adds a column to the data frame.
    # Order matters as some rely on variables created by others!!!
    if AVG_DOF_MASTER:
-      OUTPUT_DF['bod_breedstdwt_kg'] = OUTPUT_DF.apply(calc_bod_breedstdwt_kg_fromdays_swine ,axis=1
+      OUTPUT_DF['bod_breedstdwt_kg'] = calc_bod_breedstdwt_kg_fromdays_swine(OUTPUT_DF
           ,BREED_DF=BREED_DF_MASTER
           ,AVG_DOF=AVG_DOF_MASTER
       )
       OUTPUT_DF['bod_dof_used'] = AVG_DOF_MASTER   # Add column for display
    elif AVG_FEEDINT_KG_MASTER:
-      OUTPUT_DF['bod_breedstdwt_kg'] = OUTPUT_DF.apply(calc_bod_breedstdwt_kg_fromfeed_swine ,axis=1
+      OUTPUT_DF['bod_breedstdwt_kg'] = calc_bod_breedstdwt_kg_fromfeed_swine(OUTPUT_DF
          ,BREED_DF=BREED_DF_MASTER
          ,AVG_FEEDINT_KG=AVG_FEEDINT_KG_MASTER
       )
@@ -127,154 +120,335 @@ def calc_bod_master_swine(
    else:   # For swine, there is no breed standard lookup for yield
       print(f"<{funcname}> Error: missing required argument: AVG_CARC_YIELD_MASTER.")
 
-   OUTPUT_DF['bod_breedstdcarcwt_kg'] = OUTPUT_DF.apply(calc_bod_breedstdcarcwt_kg ,axis=1)
-   OUTPUT_DF['bod_referenceproduction_tonnes'] = OUTPUT_DF.apply(calc_bod_referenceproduction_tonnes ,axis=1)
+   OUTPUT_DF['bod_breedstdcarcwt_kg'] = calc_bod_breedstdcarcwt_kg(OUTPUT_DF)
+   OUTPUT_DF['bod_referenceproduction_tonnes'] = calc_bod_referenceproduction_tonnes(OUTPUT_DF)
 
    if ACHIEVABLE_PCT_MASTER:
-      OUTPUT_DF['bod_efficiency_tonnes'] = OUTPUT_DF.apply(calc_bod_efficiency_tonnes_frompct ,axis=1
+      OUTPUT_DF['bod_efficiency_tonnes'] = calc_bod_efficiency_tonnes_frompct(OUTPUT_DF
           ,ACHIEVABLE_PCT=ACHIEVABLE_PCT_MASTER
       )
    elif ACHIEVABLE_WT_KG_MASTER:
-      OUTPUT_DF['bod_efficiency_tonnes'] = OUTPUT_DF.apply(calc_bod_efficiency_tonnes_fromwt ,axis=1
+      OUTPUT_DF['bod_efficiency_tonnes'] = calc_bod_efficiency_tonnes_fromwt(OUTPUT_DF
           ,ACHIEVABLE_WT_KG=ACHIEVABLE_WT_KG_MASTER
       )
    else:
       print(f"<{funcname}> Error: missing required argument for calculating suboptimal growth.")
 
-   OUTPUT_DF['bod_gmax_tonnes'] = OUTPUT_DF.apply(calc_bod_gmax_tonnes ,axis=1)
-   OUTPUT_DF['bod_realizedproduction_tonnes'] = OUTPUT_DF.apply(calc_bod_realizedproduction_tonnes ,axis=1)
-   OUTPUT_DF['bod_deathloss_tonnes'] = OUTPUT_DF.apply(calc_bod_deathloss_tonnes ,axis=1)
-   OUTPUT_DF['bod_totalburden_tonnes'] = OUTPUT_DF.apply(calc_bod_totalburden_tonnes ,axis=1)
-   OUTPUT_DF['bod_morbidity_tonnes'] = OUTPUT_DF.apply(calc_bod_morbidity_tonnes ,axis=1)
+   OUTPUT_DF['bod_gmax_tonnes'] = calc_bod_gmax_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_realizedproduction_tonnes'] = calc_bod_realizedproduction_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_deathloss_tonnes'] = calc_bod_deathloss_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_totalburden_tonnes'] = calc_bod_totalburden_tonnes(OUTPUT_DF)
+   OUTPUT_DF['bod_morbidity_tonnes'] = calc_bod_morbidity_tonnes(OUTPUT_DF)
 
    # Adjustments & Corrections
-   # If user selected an achievable proportion too low, morbidity will be the wrong sign
-   # For these, set morbidity = 0 and add reduced growth to effect of feed
-   rows_with_wrongsign_morbidity = (OUTPUT_DF['bod_morbidity_tonnes'] > 0)
-   OUTPUT_DF.loc[rows_with_wrongsign_morbidity] = OUTPUT_DF.loc[rows_with_wrongsign_morbidity].eval(
-       '''
-       bod_efficiency_tonnes = bod_efficiency_tonnes + bod_morbidity_tonnes
-       bod_morbidity_tonnes = 0
-       bod_totalburden_tonnes = bod_deathloss_tonnes
-       '''
-   )
+   OUTPUT_DF = correct_wrongsign_morbidity(OUTPUT_DF)
 
    # Ideal Costs
-   OUTPUT_DF['adjusted_feedcost_usdperkgcarc'] = OUTPUT_DF.apply(calc_adjusted_feedcost_usdperkgcarc ,axis=1
-         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE_MASTER
+   OUTPUT_DF = calc_bod_feedcosts_swine(OUTPUT_DF
+      ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE_MASTER
+      ,IDEAL_FCR_LIVE=IDEAL_FCR_LIVE_MASTER
+   )
+   # Keep ideal_headplaced right after the adjusted feed cost, where tables and exports expect it
+   OUTPUT_DF.insert(OUTPUT_DF.columns.get_loc('adjusted_feedcost_usdperkgcarc') + 1 ,'ideal_headplaced' ,calc_ideal_headplaced(OUTPUT_DF))
+   OUTPUT_DF['ideal_nonfeedvariablecost_usdperkgcarc'] = calc_ideal_nonfeedvariablecost_usdperkgcarc(OUTPUT_DF)
+   OUTPUT_DF['ideal_landhousingcost_usdperkgcarc'] = calc_ideal_landhousingcost_usdperkgcarc(OUTPUT_DF)
+   OUTPUT_DF['ideal_laborcost_usdperkgcarc'] = calc_ideal_laborcost_usdperkgcarc(OUTPUT_DF)
+
+   return OUTPUT_DF
+
+# Feed price and ideal FCR only affect these columns. They are kept together so
+# they can be recalculated on their own, e.g. by the scenario cube in bod_cube.py.
+def calc_bod_feedcosts_poultry(
+      INPUT_DF
+      ,FEEDPRICE_USDPERTONNE
+      ,IDEAL_FCR_LIVE   # Float: ideal FCR (kg feed per kg live weight)
+      ):
+   OUTPUT_DF = INPUT_DF
+   OUTPUT_DF['adjusted_feedcost_usdperkglive'] = calc_adjusted_feedcost_usdperkglive(OUTPUT_DF
+         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE
       )
-   OUTPUT_DF['ideal_headplaced'] = OUTPUT_DF.apply(calc_ideal_headplaced ,axis=1)
-   OUTPUT_DF['ideal_fcr'] = IDEAL_FCR_LIVE_MASTER
-   OUTPUT_DF[['ideal_feed_tonnes' ,'ideal_feedcost_usdperkgcarc']] = \
-      OUTPUT_DF.apply(
-         calc_ideal_feedcost_usdperkgcarc ,axis=1
-         ,IDEAL_FCR_LIVE=IDEAL_FCR_LIVE_MASTER
-         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE_MASTER
+   OUTPUT_DF['ideal_fcr'] = IDEAL_FCR_LIVE
+   OUTPUT_DF['ideal_feed_tonnes'] ,OUTPUT_DF['ideal_feedcost_usdperkglive'] = \
+      calc_ideal_feedcost_usdperkglive(OUTPUT_DF
+         ,IDEAL_FCR_LIVE=IDEAL_FCR_LIVE
+         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE
       )
-   OUTPUT_DF['ideal_nonfeedvariablecost_usdperkgcarc'] = OUTPUT_DF.apply(calc_ideal_nonfeedvariablecost_usdperkgcarc ,axis=1)
-   OUTPUT_DF['ideal_landhousingcost_usdperkgcarc'] = OUTPUT_DF.apply(calc_ideal_landhousingcost_usdperkgcarc ,axis=1)
-   OUTPUT_DF['ideal_laborcost_usdperkgcarc'] = OUTPUT_DF.apply(calc_ideal_laborcost_usdperkgcarc ,axis=1)
+   return OUTPUT_DF
 
+def calc_bod_feedcosts_swine(
+      INPUT_DF
+      ,FEEDPRICE_USDPERTONNE
+      ,IDEAL_FCR_LIVE   # Float: ideal FCR (kg feed per kg live weight)
+      ):
+   OUTPUT_DF = INPUT_DF
+   OUTPUT_DF['adjusted_feedcost_usdperkgcarc'] = calc_adjusted_feedcost_usdperkgcarc(OUTPUT_DF
+         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE
+      )
+   OUTPUT_DF['ideal_fcr'] = IDEAL_FCR_LIVE
+   OUTPUT_DF['ideal_feed_tonnes'] ,OUTPUT_DF['ideal_feedcost_usdperkgcarc'] = \
+      calc_ideal_feedcost_usdperkgcarc(OUTPUT_DF
+         ,IDEAL_FCR_LIVE=IDEAL_FCR_LIVE
+         ,FEEDPRICE_USDPERTONNE=FEEDPRICE_USDPERTONNE
+      )
    return OUTPUT_DF
 
+# If user selected an achievable proportion too low, morbidity will be the wrong sign
+# For these, set morbidity = 0 and add reduced growth to effect of feed
+def correct_wrongsign_morbidity(INPUT_DF):
+   OUTPUT_DF = INPUT_DF
+   rows_with_wrongsign_morbidity = (OUTPUT_DF['bod_morbidity_tonnes'] > 0)
+   OUTPUT_DF['bod_efficiency_tonnes'] = OUTPUT_DF['bod_efficiency_tonnes'].mask(
+      rows_with_wrongsign_morbidity
+      ,OUTPUT_DF['bod_efficiency_tonnes'] + OUTPUT_DF['bod_morbidity_tonnes']
+   )
+   OUTPUT_DF['bod_morbidity_tonnes'] = OUTPUT_DF['bod_morbidity_tonnes'].mask(rows_with_wrongsign_morbidity ,0)
+   OUTPUT_DF['bod_totalburden_tonnes'] = OUTPUT_DF['bod_totalburden_tonnes'].mask(
+      rows_with_wrongsign_morbidity
+      ,OUTPUT_DF['bod_deathloss_tonnes']
+   )
+   return OUTPUT_DF
+
+#%% Breed standards
+# Each breed standard is compiled once into arrays so lookups do not search or
+# rebuild an interpolator from the data frame on every call:
+#    Weight and yield by day on feed: one value per whole day from the first to
+#    the last day in the standard, NaN for days not in the standard.
+#    Weight by cumulative feed intake: feed and weight sorted by feed, for
+#    linear interpolation.
+# Lookup functions take a breed standard data frame or the name it was registered
+# under, and a number or array. They return the same shape, with NaN for values
+# outside the breed standard.
+
+# Compiled breed standards by name. Filled by register_breedstd().
+BREEDSTD_REGISTRY = {}
+
+# Compiled breed standards by data frame, {id(BREED_DF): (BREED_DF, compiled)}
+# The data frame is kept so its id cannot be reused by another object.
+_breedstd_registered = {}
+_breedstd_unregistered = {}    # Data frames compiled on first use, e.g. copies made by callbacks
+_breedstd_lock = threading.Lock()
+
+# Maximum number of unregistered data frames to keep compiled
+_BREEDSTD_MAX_UNREGISTERED = 16
+
+# Column in a breed standard data frame converted to the given unit, or None if there is no such column
+# COLUMNS: dictionary {column name: multiplier to convert to the unit}, in order of preference
+def _breedstd_column(BREED_DF ,COLUMNS):
+   for COL ,MULTIPLIER in COLUMNS.items():
+      if COL in BREED_DF.columns:
+         return pd.to_numeric(BREED_DF[COL] ,errors='coerce').to_numpy(dtype=float) * MULTIPLIER
+   return None
+
+# Compile a breed standard data frame into lookup arrays
+# Poultry standards have 'bodyweight_g', 'pct_yield', and 'cmlfeedintake_g'.
+# Swine standards have 'bodyweight_kg' and 'cml_feedintake_kg'.
+def compile_breedstd(
+      BREED_DF     # Data frame with breed reference information. Must contain column 'dayonfeed'.
+      ):
+   days = pd.to_numeric(BREED_DF['dayonfeed'] ,errors='coerce').to_numpy(dtype=float)
+   weight_kg = _breedstd_column(BREED_DF ,{'bodyweight_g':1/1000 ,'bodyweight_kg':1})
+   yield_prpn = _breedstd_column(BREED_DF ,{'pct_yield':1/100})
+   feed_kg = _breedstd_column(BREED_DF ,{'cml_feedintake_kg':1 ,'cmlfeedintake_g':1/1000})
+
+   # Dense arrays by day. Only whole days can be looked up. If a day appears more than once, use the first.
+   _whole_days = np.isfinite(days) & (days == np.round(days))
+   whole_days = days[_whole_days].astype(int)
+   first_day = whole_days.min() if len(whole_days) > 0 else 0
+   n_days = whole_days.max() - first_day + 1 if len(whole_days) > 0 else 0
+   day_index = whole_days - first_day
+   def _by_day(VALUES):
+      if VALUES is None:
+         return None
+      dense = np.full(n_days ,np.nan)
+      dense[day_index[::-1]] = VALUES[_whole_days][::-1]
+      return dense
+
+   # Weight by feed, sorted by feed
+   feed_sorted ,weight_byfeed = None ,None
+   if feed_kg is not None and weight_kg is not None:
+      _valid = np.isfinite(feed_kg) & np.isfinite(weight_kg)
+      _order = np.argsort(feed_kg[_valid] ,kind='stable')
+      feed_sorted = feed_kg[_valid][_order]
+      weight_byfeed = weight_kg[_valid][_order]
+
+   return {
+      'first_day':first_day
+      ,'weight_kg_byday':_by_day(weight_kg)
+      ,'yield_prpn_byday':_by_day(yield_prpn)
+      ,'feed_kg':feed_sorted
+      ,'weight_kg_byfeed':weight_byfeed
+   }
+
+# Compile a breed standard and save it under NAME
+# Returns BREED_DF, so it can wrap a data loader
+# Raises ValueError if weight_at_day() would not return a weight for any day of the standard
+def register_breedstd(NAME ,BREED_DF):
+   compiled = compile_breedstd(BREED_DF)
+   if compiled['weight_kg_byday'] is None or not np.isfinite(compiled['weight_kg_byday']).any():
+      raise ValueError(f"Breed standard {NAME} has no body weight by day. It needs column 'bodyweight_g' or 'bodyweight_kg'.")
+   with _breedstd_lock:
+      BREEDSTD_REGISTRY[NAME] = compiled
+      _breedstd_registered[id(BREED_DF)] = (BREED_DF ,compiled)
+   return BREED_DF
+
+# Compiled breed standard for a registered name or a data frame
+# Data frames not registered are compiled on first use and kept for later calls
+def get_breedstd(BREED):
+   if isinstance(BREED ,str):
+      return BREEDSTD_REGISTRY[BREED]
+   with _breedstd_lock:
+      saved = _breedstd_registered.get(id(BREED)) or _breedstd_unregistered.get(id(BREED))
+   if saved is not None and saved[0] is BREED:
+      return saved[1]
+   compiled = compile_breedstd(BREED)
+   with _breedstd_lock:
+      while len(_breedstd_unregistered) >= _BREEDSTD_MAX_UNREGISTERED:
+         del _breedstd_unregistered[next(iter(_breedstd_unregistered))]    # Oldest first
+      _breedstd_unregistered[id(BREED)] = (BREED ,compiled)
+   return compiled
+
+# Return a number for a number input, otherwise an array
+def _as_input_shape(VALUES ,INPUT):
+   if np.ndim(INPUT) == 0:
+      return float(VALUES)
+   return VALUES
+
+def _lookup_byday(BREED ,DAYS ,KEY):
+   compiled = get_breedstd(BREED)
+   dense = compiled[KEY]
+   days = np.asarray(DAYS ,dtype=float)
+   OUTPUT = np.full(days.shape ,np.nan)
+   if dense is not None:
+      day_index = days - compiled['first_day']
+      _found = np.isfinite(days) & (days == np.round(days)) & (day_index >= 0) & (day_index < len(dense))
+      OUTPUT[_found] = dense[day_index[_found].astype(int)]
+   return _as_input_shape(OUTPUT ,DAYS)
+
+# Breed standard live weight (kg) at days on feed
+def weight_at_day(
+      BREED     # Breed standard data frame, or name given to register_breedstd()
+      ,DAYS     # Number or array: days on feed
+      ):
+   return _lookup_byday(BREED ,DAYS ,'weight_kg_byday')
+
+# Breed standard carcass yield (proportion of live weight) at days on feed
+def yield_at_day(
+      BREED     # Breed standard data frame, or name given to register_breedstd()
+      ,DAYS     # Number or array: days on feed
+      ):
+   return _lookup_byday(BREED ,DAYS ,'yield_prpn_byday')
+
+# Breed standard live weight (kg) at cumulative feed intake, interpolated linearly
+def weight_at_feed(
+      BREED        # Breed standard data frame, or name given to register_breedstd()
+      ,FEED_KG     # Number or array: cumulative feed intake in kg per head
+      ):
+   compiled = get_breedstd(BREED)
+   feed_kg = np.asarray(FEED_KG ,dtype=float)
+   OUTPUT = np.full(feed_kg.shape ,np.nan)
+   if compiled['feed_kg'] is not None and len(compiled['feed_kg']) > 0:
+      OUTPUT = np.interp(feed_kg ,compiled['feed_kg'] ,compiled['weight_kg_byfeed'] ,left=np.nan ,right=np.nan)
+   return _as_input_shape(OUTPUT ,FEED_KG)
+
 #%% Production
+# Calculation functions take the whole data frame as INPUT_DF and return a
+# column (Series or array) with one value per row of INPUT_DF. Breed standard
+# lookups return a scalar, which the master functions broadcast to all rows.
 
 # =============================================================================
 #### Common
 # =============================================================================
 def calc_bod_referenceproduction_tonnes(
-      INPUT_ROW
+      INPUT_DF
       ):
    # (Animals placed) x (Breed Std. Live Weight @ Avg. Days on Feed) x (Carcass Yield)
-   OUTPUT = INPUT_ROW['acc_headplaced'] * INPUT_ROW['bod_breedstdwt_kg'] * INPUT_ROW['bod_breedstdyield_prpn'] / 1000
+   OUTPUT = INPUT_DF['acc_headplaced'] * INPUT_DF['bod_breedstdwt_kg'] * INPUT_DF['bod_breedstdyield_prpn'] / 1000
    return OUTPUT
 
 def calc_bod_efficiency_tonnes_frompct(
-      INPUT_ROW
+      INPUT_DF
       ,ACHIEVABLE_PCT   # Integer [0+]: proportion of ideal production that is achievable without disease, i.e. efficiency of feed, medications, and practices. Can be > 100.
       ):
-   OUTPUT = (INPUT_ROW['bod_referenceproduction_tonnes'] * (1 - (ACHIEVABLE_PCT/100))) * (-1)  # If ACHIEVABLE_PCT < 100, want result to be negative.
+   OUTPUT = (INPUT_DF['bod_referenceproduction_tonnes'] * (1 - (ACHIEVABLE_PCT/100))) * (-1)  # If ACHIEVABLE_PCT < 100, want result to be negative.
    return OUTPUT
 
 def calc_bod_efficiency_tonnes_fromwt(
-      INPUT_ROW
+      INPUT_DF
       ,ACHIEVABLE_WT_KG   # Float: achievable weight without disease
       ):
-   OUTPUT = (INPUT_ROW['bod_referenceproduction_tonnes'] - (INPUT_ROW['acc_headplaced'] * ACHIEVABLE_WT_KG * INPUT_ROW['bod_breedstdyield_prpn'] / 1000)) * (-1)  # If ACHIEVABLE_WT_KG < reference production, want result to be negative.
+   OUTPUT = (INPUT_DF['bod_referenceproduction_tonnes'] - (INPUT_DF['acc_headplaced'] * ACHIEVABLE_WT_KG * INPUT_DF['bod_breedstdyield_prpn'] / 1000)) * (-1)  # If ACHIEVABLE_WT_KG < reference production, want result to be negative.
    return OUTPUT
 
-def calc_bod_gmax_tonnes(INPUT_ROW):
-    OUTPUT = INPUT_ROW['bod_referenceproduction_tonnes'] + INPUT_ROW['bod_efficiency_tonnes']
+def calc_bod_gmax_tonnes(INPUT_DF):
+    OUTPUT = INPUT_DF['bod_referenceproduction_tonnes'] + INPUT_DF['bod_efficiency_tonnes']
     return OUTPUT
 
-def calc_bod_realizedproduction_tonnes(INPUT_ROW):
-   OUTPUT = INPUT_ROW['acc_totalcarcweight_tonnes']
+def calc_bod_realizedproduction_tonnes(INPUT_DF):
+   OUTPUT = INPUT_DF['acc_totalcarcweight_tonnes']
    return OUTPUT
 
-def calc_bod_deathloss_tonnes(INPUT_ROW):
+def calc_bod_deathloss_tonnes(INPUT_DF):
    # Total shortfall in head count. All-cause mortality.
    # Convert to weight by multiplying by avg. carcass weight of those that lived
-   OUTPUT = (INPUT_ROW['acc_headplaced'] - INPUT_ROW['acc_headslaughtered']) \
-       * INPUT_ROW['acc_avgcarcweight_kg'] / 1000 * (-1)  # Want result to be negative
+   OUTPUT = (INPUT_DF['acc_headplaced'] - INPUT_DF['acc_headslaughtered']) \
+       * INPUT_DF['acc_avgcarcweight_kg'] / 1000 * (-1)  # Want result to be negative
    # Alternative: multiply by breed standard weight
    # I don't think we want to do this, because it muddles the losses due to morbidity vs. mortality
-   # OUTPUT = (INPUT_ROW['acc_headplaced'] - INPUT_ROW['acc_headslaughtered']) \
-   #     * INPUT_ROW['bod_breedstdwt_kg'] / 1000 * (-1)  # Want result to be negative
+   # OUTPUT = (INPUT_DF['acc_headplaced'] - INPUT_DF['acc_headslaughtered']) \
+   #     * INPUT_DF['bod_breedstdwt_kg'] / 1000 * (-1)  # Want result to be negative
    return OUTPUT
 
 # Alternative 2: multiply by breed standard weight and adjust for achievable percent
 # Like the alternative using breed standard weight, this muddles morbidity and mortality. Not using.
 # def calc_bod_deathloss_tonnes_frompct(
-#       INPUT_ROW
+#       INPUT_DF
 #       ,ACHIEVABLE_PCT   # Integer [0+]: proportion of ideal production that is achievable without disease, i.e. efficiency of feed, medications, and practices. Can be > 100.
 #       ):
-#    OUTPUT = (INPUT_ROW['acc_headplaced'] - INPUT_ROW['acc_headslaughtered']) \
-#       * (INPUT_ROW['bod_breedstdwt_kg'] * (ACHIEVABLE_PCT/100)) / 1000 * (-1)  # Want result to be negative
+#    OUTPUT = (INPUT_DF['acc_headplaced'] - INPUT_DF['acc_headslaughtered']) \
+#       * (INPUT_DF['bod_breedstdwt_kg'] * (ACHIEVABLE_PCT/100)) / 1000 * (-1)  # Want result to be negative
 #    return OUTPUT
 
 # def calc_bod_deathloss_tonnes_fromwt(
-#       INPUT_ROW
+#       INPUT_DF
 #       ,ACHIEVABLE_WT_KG   # Float: achievable weight without disease
 #       ):
-#    OUTPUT = (INPUT_ROW['acc_headplaced'] - INPUT_ROW['acc_headslaughtered']) \
-#       * (ACHIEVABLE_WT_KG * INPUT_ROW['bod_breedstdyield_prpn']) / 1000 * (-1)  # Want result to be negative
+#    OUTPUT = (INPUT_DF['acc_headplaced'] - INPUT_DF['acc_headslaughtered']) \
+#       * (ACHIEVABLE_WT_KG * INPUT_DF['bod_breedstdyield_prpn']) / 1000 * (-1)  # Want result to be negative
 #    return OUTPUT
 
-def calc_bod_totalburden_tonnes(INPUT_ROW):
-   OUTPUT = (INPUT_ROW['bod_gmax_tonnes'] - INPUT_ROW['bod_realizedproduction_tonnes']) * (-1)  # Want result to be negative
+def calc_bod_totalburden_tonnes(INPUT_DF):
+   OUTPUT = (INPUT_DF['bod_gmax_tonnes'] - INPUT_DF['bod_realizedproduction_tonnes']) * (-1)  # Want result to be negative
    return OUTPUT
 
-def calc_bod_morbidity_tonnes(INPUT_ROW):
-   OUTPUT = (INPUT_ROW['bod_totalburden_tonnes'] - INPUT_ROW['bod_deathloss_tonnes'])
+def calc_bod_morbidity_tonnes(INPUT_DF):
+   OUTPUT = (INPUT_DF['bod_totalburden_tonnes'] - INPUT_DF['bod_deathloss_tonnes'])
    return OUTPUT
 
-def calc_bod_breedstdcarcwt_kg(INPUT_ROW):
-   OUTPUT = INPUT_ROW['bod_breedstdwt_kg'] * INPUT_ROW['bod_breedstdyield_prpn']
+def calc_bod_breedstdcarcwt_kg(INPUT_DF):
+   OUTPUT = INPUT_DF['bod_breedstdwt_kg'] * INPUT_DF['bod_breedstdyield_prpn']
    return OUTPUT
 
 # =============================================================================
 #### Poultry
 # =============================================================================
 def calc_bod_breedstdwt_kg_fromdays_poultry(
-      INPUT_ROW
+      INPUT_DF
       ,BREED_DF       # Data frame with breed reference information. Must contain columns 'dayonfeed' and 'bodyweight_g'.
       ,AVG_DOF        # Integer (0, 60]: Average days on feed. Will lookup breed standard weight for this day on feed.
       ):
    # Could limit breed choice based on country
       # India: Vencobb400
       # Others: Cobb500, Ross308, or Ross708
-   _select_dof = (BREED_DF['dayonfeed'] == AVG_DOF)
-   breedstdwt_kg = BREED_DF.loc[_select_dof ,'bodyweight_g'] / 1000
+   breedstdwt_kg = weight_at_day(BREED_DF ,AVG_DOF)
    OUTPUT = breedstdwt_kg
    return OUTPUT
 
 def calc_bod_breedstdyield_prpn_poultry(
-      INPUT_ROW
+      INPUT_DF
       ,BREED_DF       # Data frame with breed reference information. Must contain columns 'dayonfeed' and 'pct_yield'.
       ,AVG_DOF        # Integer (0, 60]: Average days on feed. Will lookup breed standard yield for this day on feed.
       ):
-   _select_dof = (BREED_DF['dayonfeed'] == AVG_DOF)
-   breedstdyield_prpn = BREED_DF.loc[_select_dof ,'pct_yield'] / 100
+   breedstdyield_prpn = yield_at_day(BREED_DF ,AVG_DOF)
    OUTPUT = breedstdyield_prpn
    return OUTPUT
 
@@ -282,27 +456,21 @@ def calc_bod_breedstdyield_prpn_poultry(
 #### Swine
 # =============================================================================
 def calc_bod_breedstdwt_kg_fromdays_swine(
-      INPUT_ROW
+      INPUT_DF
       ,BREED_DF       # Data frame with breed reference information. Must contain columns 'dayonfeed' and 'bodyweight_kg'.
       ,AVG_DOF        # Integer [1, 176]: Average days on feed. Will lookup breed standard weight for this day on feed.
       ):
-   _select_dof = (BREED_DF['dayonfeed'] == AVG_DOF)
-   breedstdwt_kg = BREED_DF.loc[_select_dof ,'bodyweight_kg']
+   breedstdwt_kg = weight_at_day(BREED_DF ,AVG_DOF)
    OUTPUT = breedstdwt_kg
    return OUTPUT
 
 def calc_bod_breedstdwt_kg_fromfeed_swine(
-      INPUT_ROW
+      INPUT_DF
       ,BREED_DF         # Data frame with breed reference information. Must contain columns 'bodyweight_kg' and 'cml_feedintake_kg'.
       ,AVG_FEEDINT_KG   # Float: average feed intake in kg per head
       ):
-   # Create interpolator from breed standard
-   interp_weight_from_feed = scipy.interpolate.interp1d(
-      BREED_DF['cml_feedintake_kg']
-      ,BREED_DF['bodyweight_kg']
-   )
-   # Apply interpolator
-   OUTPUT = interp_weight_from_feed(AVG_FEEDINT_KG) * 1   # Multiply by one: trick to convert array to number
+   breedstdwt_kg = weight_at_feed(BREED_DF ,AVG_FEEDINT_KG)
+   OUTPUT = breedstdwt_kg
    return OUTPUT
 
 #%% Costs
@@ -318,12 +486,12 @@ def calc_bod_breedstdwt_kg_fromfeed_swine(
 # TRICK: Gmax already includes logic for breed standard weight and effect of
 # feed and practices to tell us what could be achieved by head placed. So find
 # head placed that makes gmax = realized production.
-def calc_ideal_headplaced(INPUT_ROW):
+def calc_ideal_headplaced(INPUT_DF):
    # Calculate actual production as proporion of gmax
-   realized_prpn_gmax = INPUT_ROW['bod_realizedproduction_tonnes'] / INPUT_ROW['bod_gmax_tonnes']
+   realized_prpn_gmax = INPUT_DF['bod_realizedproduction_tonnes'] / INPUT_DF['bod_gmax_tonnes']
 
    # Reduce head placed by this proportion
-   ideal_headplaced = round(INPUT_ROW['acc_headplaced'] * realized_prpn_gmax ,0)
+   ideal_headplaced = round(INPUT_DF['acc_headplaced'] * realized_prpn_gmax ,0)
    OUTPUT = ideal_headplaced
    return OUTPUT
 
@@ -335,73 +503,75 @@ def calc_ideal_headplaced(INPUT_ROW):
 # allow the user to specify a feed price with a slider.
 # Calculate an adjusted actual feed cost based on the slider.
 def calc_adjusted_feedcost_usdperkglive(
-      INPUT_ROW
+      INPUT_DF
       ,FEEDPRICE_USDPERTONNE
       ):
    # Get feed price slider as proportion of actual
-   if pd.notnull(INPUT_ROW['acc_feedprice_usdpertonne']):   # If actual feed price is not missing
-      feedprice_slider_prpn = FEEDPRICE_USDPERTONNE / INPUT_ROW['acc_feedprice_usdpertonne']
-   else:
-      feedprice_slider_prpn = 1
+   # If actual feed price is missing, use 1
+   feedprice_slider_prpn = np.where(
+      pd.notnull(INPUT_DF['acc_feedprice_usdpertonne'])
+      ,FEEDPRICE_USDPERTONNE / INPUT_DF['acc_feedprice_usdpertonne']
+      ,1
+   )
 
    # Adjust feed cost in same proportion
-   adjusted_feedcost_usdperkglive = INPUT_ROW['acc_feedcost_usdperkglive'] * feedprice_slider_prpn
+   adjusted_feedcost_usdperkglive = INPUT_DF['acc_feedcost_usdperkglive'] * feedprice_slider_prpn
    OUTPUT = adjusted_feedcost_usdperkglive
    return OUTPUT
 
 # Calculate feed required to reach same production under ideal FCR
 def calc_ideal_feedcost_usdperkglive(
-      INPUT_ROW
+      INPUT_DF
       ,IDEAL_FCR_LIVE   # Float: ideal FCR (kg feed per kg live weight)
       ,FEEDPRICE_USDPERTONNE
       ):
    # Back-calculate realized live weight from production and carcass yield
-   required_live_weight_tonnes = INPUT_ROW['bod_realizedproduction_tonnes'] / INPUT_ROW['bod_breedstdyield_prpn']
+   required_live_weight_tonnes = INPUT_DF['bod_realizedproduction_tonnes'] / INPUT_DF['bod_breedstdyield_prpn']
 
    # Calculate ideal feed required
    ideal_feed_tonnes = required_live_weight_tonnes * IDEAL_FCR_LIVE
 
    # Calculate feed cost
    # Using feed price from data
-   ideal_feedcost_usdperkglive = (ideal_feed_tonnes * INPUT_ROW['acc_feedprice_usdpertonne']) / (required_live_weight_tonnes * 1000)
+   ideal_feedcost_usdperkglive = (ideal_feed_tonnes * INPUT_DF['acc_feedprice_usdpertonne']) / (required_live_weight_tonnes * 1000)
    # Using feed price input parameter
    ideal_feedcost_whatif_usdperkglive = (ideal_feed_tonnes * FEEDPRICE_USDPERTONNE) / (required_live_weight_tonnes * 1000)
 
-   OUTPUT = pd.Series([ideal_feed_tonnes ,ideal_feedcost_whatif_usdperkglive])
+   OUTPUT = (ideal_feed_tonnes ,ideal_feedcost_whatif_usdperkglive)
    return OUTPUT
 
-def calc_ideal_chickcost_usdperkglive(INPUT_ROW):
+def calc_ideal_chickcost_usdperkglive(INPUT_DF):
    # Reduce in proportion to head placed
-   ideal_headplaced_prpn = INPUT_ROW['ideal_headplaced'] / INPUT_ROW['acc_headplaced']
-   ideal_chickcost_usdperkglive = INPUT_ROW['acc_chickcost_usdperkglive'] * ideal_headplaced_prpn
+   ideal_headplaced_prpn = INPUT_DF['ideal_headplaced'] / INPUT_DF['acc_headplaced']
+   ideal_chickcost_usdperkglive = INPUT_DF['acc_chickcost_usdperkglive'] * ideal_headplaced_prpn
    OUTPUT = ideal_chickcost_usdperkglive
    return OUTPUT
 
-def calc_ideal_landhousingcost_usdperkglive(INPUT_ROW):
+def calc_ideal_landhousingcost_usdperkglive(INPUT_DF):
    # Reduce in proportion to head placed
-   ideal_headplaced_prpn = INPUT_ROW['ideal_headplaced'] / INPUT_ROW['acc_headplaced']
-   ideal_landhousingcost_usdperkglive = INPUT_ROW['acc_landhousingcost_usdperkglive'] * ideal_headplaced_prpn
+   ideal_headplaced_prpn = INPUT_DF['ideal_headplaced'] / INPUT_DF['acc_headplaced']
+   ideal_landhousingcost_usdperkglive = INPUT_DF['acc_landhousingcost_usdperkglive'] * ideal_headplaced_prpn
    OUTPUT = ideal_landhousingcost_usdperkglive
    return OUTPUT
 
-def calc_ideal_laborcost_usdperkglive(INPUT_ROW):
+def calc_ideal_laborcost_usdperkglive(INPUT_DF):
    # Reduce in proportion to land & facilities costs
-   ideal_financecost_prpn = INPUT_ROW['ideal_landhousingcost_usdperkglive'] / INPUT_ROW['acc_landhousingcost_usdperkglive']
-   ideal_laborcost_usdperkglive = INPUT_ROW['acc_laborcost_usdperkglive'] * ideal_financecost_prpn
+   ideal_financecost_prpn = INPUT_DF['ideal_landhousingcost_usdperkglive'] / INPUT_DF['acc_landhousingcost_usdperkglive']
+   ideal_laborcost_usdperkglive = INPUT_DF['acc_laborcost_usdperkglive'] * ideal_financecost_prpn
    OUTPUT = ideal_laborcost_usdperkglive
    return OUTPUT
 
-def calc_ideal_medcost_usdperkglive(INPUT_ROW):
+def calc_ideal_medcost_usdperkglive(INPUT_DF):
    # Reduce in proportion to head placed
-   ideal_headplaced_prpn = INPUT_ROW['ideal_headplaced'] / INPUT_ROW['acc_headplaced']
-   ideal_medcost_usdperkglive = INPUT_ROW['acc_medcost_usdperkglive'] * ideal_headplaced_prpn
+   ideal_headplaced_prpn = INPUT_DF['ideal_headplaced'] / INPUT_DF['acc_headplaced']
+   ideal_medcost_usdperkglive = INPUT_DF['acc_medcost_usdperkglive'] * ideal_headplaced_prpn
    OUTPUT = ideal_medcost_usdperkglive
    return OUTPUT
 
-def calc_ideal_othercost_usdperkglive(INPUT_ROW):
+def calc_ideal_othercost_usdperkglive(INPUT_DF):
    # Reduce in proportion to head placed
-   ideal_headplaced_prpn = INPUT_ROW['ideal_headplaced'] / INPUT_ROW['acc_headplaced']
-   ideal_othercost_usdperkglive = INPUT_ROW['acc_othercost_usdperkglive'] * ideal_headplaced_prpn
+   ideal_headplaced_prpn = INPUT_DF['ideal_headplaced'] / INPUT_DF['acc_headplaced']
+   ideal_othercost_usdperkglive = INPUT_DF['acc_othercost_usdperkglive'] * ideal_headplaced_prpn
    OUTPUT = ideal_othercost_usdperkglive
    return OUTPUT
 
@@ -413,55 +583,55 @@ def calc_ideal_othercost_usdperkglive(INPUT_ROW):
 # allow the user to specify a feed price with a slider.
 # Calculate an adjusted actual feed cost based on the slider.
 def calc_adjusted_feedcost_usdperkgcarc(
-      INPUT_ROW
+      INPUT_DF
       ,FEEDPRICE_USDPERTONNE
       ):
    # Get feed price slider as proportion of actual price
-   feedprice_slider_prpn = FEEDPRICE_USDPERTONNE / INPUT_ROW['acc_feedprice_usdpertonne']
+   feedprice_slider_prpn = FEEDPRICE_USDPERTONNE / INPUT_DF['acc_feedprice_usdpertonne']
 
    # Adjust feed cost in same proportion
-   adjusted_feedcost_usdperkgcarc = INPUT_ROW['acc_feedcost_usdperkgcarc'] * feedprice_slider_prpn
+   adjusted_feedcost_usdperkgcarc = INPUT_DF['acc_feedcost_usdperkgcarc'] * feedprice_slider_prpn
    OUTPUT = adjusted_feedcost_usdperkgcarc
    return OUTPUT
 
 # Calculate feed required to reach same production under ideal FCR
 def calc_ideal_feedcost_usdperkgcarc(
-      INPUT_ROW
+      INPUT_DF
       ,FEEDPRICE_USDPERTONNE
       ,IDEAL_FCR_LIVE   # Float: ideal FCR (kg feed per kg live weight)
       ):
    # Back-calculate realized live weight from production and carcass yield
-   required_live_weight_tonnes = INPUT_ROW['bod_realizedproduction_tonnes'] / INPUT_ROW['bod_breedstdyield_prpn']
+   required_live_weight_tonnes = INPUT_DF['bod_realizedproduction_tonnes'] / INPUT_DF['bod_breedstdyield_prpn']
 
    # Calculate ideal feed required
    ideal_feed_tonnes = required_live_weight_tonnes * IDEAL_FCR_LIVE
 
    # Calculate feed cost
    # Using feed price from data
-   ideal_feedcost_usdperkgcarc = (ideal_feed_tonnes * INPUT_ROW['acc_feedprice_usdpertonne']) / (INPUT_ROW['bod_realizedproduction_tonnes'] * 1000)
+   ideal_feedcost_usdperkgcarc = (ideal_feed_tonnes * INPUT_DF['acc_feedprice_usdpertonne']) / (INPUT_DF['bod_realizedproduction_tonnes'] * 1000)
    # Using feed price from input parameter
-   ideal_feedcost_whatif_usdperkgcarc = (ideal_feed_tonnes * FEEDPRICE_USDPERTONNE) / (INPUT_ROW['bod_realizedproduction_tonnes'] * 1000)
+   ideal_feedcost_whatif_usdperkgcarc = (ideal_feed_tonnes * FEEDPRICE_USDPERTONNE) / (INPUT_DF['bod_realizedproduction_tonnes'] * 1000)
 
-   OUTPUT = pd.Series([ideal_feed_tonnes ,ideal_feedcost_usdperkgcarc])
+   OUTPUT = (ideal_feed_tonnes ,ideal_feedcost_usdperkgcarc)
    return OUTPUT
 
-def calc_ideal_nonfeedvariablecost_usdperkgcarc(INPUT_ROW):
+def calc_ideal_nonfeedvariablecost_usdperkgcarc(INPUT_DF):
    # Reduce in proportion to head placed
-   ideal_headplaced_prpn = INPUT_ROW['ideal_headplaced'] / INPUT_ROW['acc_headplaced']
-   ideal_nonfeedvariablecost_usdperkgcarc = INPUT_ROW['acc_nonfeedvariablecost_usdperkgcarc'] * ideal_headplaced_prpn
+   ideal_headplaced_prpn = INPUT_DF['ideal_headplaced'] / INPUT_DF['acc_headplaced']
+   ideal_nonfeedvariablecost_usdperkgcarc = INPUT_DF['acc_nonfeedvariablecost_usdperkgcarc'] * ideal_headplaced_prpn
    OUTPUT = ideal_nonfeedvariablecost_usdperkgcarc
    return OUTPUT
 
-def calc_ideal_landhousingcost_usdperkgcarc(INPUT_ROW):
+def calc_ideal_landhousingcost_usdperkgcarc(INPUT_DF):
    # Reduce in proportion to head placed
-   ideal_headplaced_prpn = INPUT_ROW['ideal_headplaced'] / INPUT_ROW['acc_headplaced']
-   ideal_landhousingcost_usdperkgcarc = INPUT_ROW['acc_landhousingcost_usdperkgcarc'] * ideal_headplaced_prpn
+   ideal_headplaced_prpn = INPUT_DF['ideal_headplaced'] / INPUT_DF['acc_headplaced']
+   ideal_landhousingcost_usdperkgcarc = INPUT_DF['acc_landhousingcost_usdperkgcarc'] * ideal_headplaced_prpn
    OUTPUT = ideal_landhousingcost_usdperkgcarc
    return OUTPUT
 
-def calc_ideal_laborcost_usdperkgcarc(INPUT_ROW):
+def calc_ideal_laborcost_usdperkgcarc(INPUT_DF):
    # Reduce in proportion to land & facilities costs
-   ideal_financecost_prpn = INPUT_ROW['ideal_landhousingcost_usdperkgcarc'] / INPUT_ROW['acc_landhousingcost_usdperkgcarc']
-   ideal_laborcost_usdperkgcarc = INPUT_ROW['acc_laborcost_usdperkgcarc'] * ideal_financecost_prpn
+   ideal_financecost_prpn = INPUT_DF['ideal_landhousingcost_usdperkgcarc'] / INPUT_DF['acc_landhousingcost_usdperkgcarc']
+   ideal_laborcost_usdperkgcarc = INPUT_DF['acc_laborcost_usdperkgcarc'] * ideal_financecost_prpn
    OUTPUT = ideal_laborcost_usdperkgcarc
    return OUTPUT
@@ -0,0 +1,266 @@
+#%% About
+'''
+This defines a precomputed scenario cube for the poultry and swine burden of
+disease calcs in bod_calcs.py.
+
+The production calcs for each species depend on two sliders:
+    Poultry: achievable percent of breed standard and days on feed
+    Swine: achievable weight and days on feed
+The build step runs calc_bod_master_<species> for every combination of the
+values these sliders can take and saves the results as one array per breed,
+with dimensions (slider 1, slider 2, row, column), in .npy format. The dashboard
+memory-maps the array and reads a single slice when the sliders change.
+
+Feed price and ideal FCR only affect the feed cost columns, so these are not
+part of the grid. They are recalculated on lookup with the same functions used
+by the master functions (calc_bod_feedcosts_<species>). Adding them to the grid
+would make the poultry cube several gigabytes.
+
+If slider values are not on the grid, other inputs differ from those used to
+build the cube, or the cube was built from different data, results are
+calculated live instead.
+
+All calcs are row by row, so results can be limited to a country and year scope.
+Only the rows in scope are read from the cube or calculated live. With no scope
+(cross-country mode) results are returned for all rows, for views that compare
+countries.
+
+To build the cubes, run from the Dash App folder:
+    python -m lib.bod_cube
+'''
+#%% Libraries
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+import lib.bod_calcs as bod
+import lib.data_store as store
+
+#%% Settings
+
+# Slider values to precompute. Must match slider settings in the dashboard layout.
+# Fixed arguments are passed to the master function for every scenario. Lookups
+# with different values for these are calculated live.
+CUBE_SPECS = {
+    'poultry':{
+        'master_func':bod.calc_bod_master_poultry
+        ,'feedcost_func':bod.calc_bod_feedcosts_poultry
+        ,'feedcost_cols':[
+            'adjusted_feedcost_usdperkglive'
+            ,'ideal_fcr'
+            ,'ideal_feed_tonnes'
+            ,'ideal_feedcost_usdperkglive'
+        ]
+        ,'grid':{
+            'ACHIEVABLE_PCT_MASTER':np.arange(90 ,111 ,1)
+            ,'AVG_DOF_MASTER':np.arange(20 ,61 ,1)
+        }
+        ,'fixed_args':{}
+    }
+    ,'swine':{
+        'master_func':bod.calc_bod_master_swine
+        ,'feedcost_func':bod.calc_bod_feedcosts_swine
+        ,'feedcost_cols':[
+            'adjusted_feedcost_usdperkgcarc'
+            ,'ideal_fcr'
+            ,'ideal_feed_tonnes'
+            ,'ideal_feedcost_usdperkgcarc'
+        ]
+        ,'grid':{
+            'ACHIEVABLE_WT_KG_MASTER':np.arange(70 ,181 ,5)
+            ,'AVG_DOF_MASTER':np.arange(112 ,197 ,7)
+        }
+        ,'fixed_args':{
+            'AVG_CARC_YIELD_MASTER':0.75
+        }
+    }
+}
+
+# Arguments that are never part of the cube
+NONGRID_ARGS = ['BREED_DF_MASTER' ,'FEEDPRICE_USDPERTONNE_MASTER' ,'IDEAL_FCR_LIVE_MASTER']
+
+CUBE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))) ,'data')
+
+#%% Functions
+
+def _cube_filepaths(SPECIES ,BREED_NAME ,FOLDER):
+    basename = os.path.join(FOLDER ,f'bod_cube_{SPECIES}_{BREED_NAME}')
+    return f'{basename}.npy' ,f'{basename}.json'
+
+# Build the cube for one species and breed
+# INPUT_DF and BREED_DF must be the same data the dashboard will use
+def build_cube(SPECIES ,BREED_NAME ,INPUT_DF ,BREED_DF ,FOLDER=CUBE_FOLDER):
+    spec = CUBE_SPECS[SPECIES]
+    grid_names = list(spec['grid'])
+    axis_1 ,axis_2 = spec['grid'].values()
+
+    # Feed cost columns are recalculated on lookup. Any value will do here.
+    def _run_master(VALUE_1 ,VALUE_2):
+        return spec['master_func'](
+            INPUT_DF
+            ,BREED_DF_MASTER=BREED_DF
+            ,FEEDPRICE_USDPERTONNE_MASTER=0
+            ,IDEAL_FCR_LIVE_MASTER=0
+            ,**spec['fixed_args']
+            ,**{grid_names[0]:VALUE_1 ,grid_names[1]:VALUE_2}
+        )
+
+    # Run the first scenario to get the output columns
+    first_output = _run_master(axis_1[0] ,axis_2[0])
+    cube_cols = [c for c in first_output.columns if c not in INPUT_DF.columns and c not in spec['feedcost_cols']]
+
+    npy_filepath ,json_filepath = _cube_filepaths(SPECIES ,BREED_NAME ,FOLDER)
+    os.makedirs(FOLDER ,exist_ok=True)
+    # Remove old metadata first so a partly written cube is never used
+    if os.path.exists(json_filepath):
+        os.remove(json_filepath)
+    cube = np.lib.format.open_memmap(
+        npy_filepath
+        ,mode='w+'
+        ,dtype='float64'
+        ,shape=(len(axis_1) ,len(axis_2) ,len(INPUT_DF) ,len(cube_cols))
+    )
+    for i ,value_1 in enumerate(axis_1):
+        for j ,value_2 in enumerate(axis_2):
+            output_df = _run_master(value_1 ,value_2)
+            cube[i ,j] = output_df[cube_cols].to_numpy(dtype='float64')
+    cube.flush()
+    del cube
+
+    cube_meta = {
+        'species':SPECIES
+        ,'breed':BREED_NAME
+        ,'axes':{name:[float(v) for v in values] for name ,values in spec['grid'].items()}
+        ,'fixed_args':spec['fixed_args']
+        ,'columns':cube_cols
+        ,'dtypes':{c:str(first_output[c].dtype) for c in cube_cols}
+        ,'column_order':list(first_output.columns)
+        ,'data_key':store.make_key(INPUT_DF)
+        ,'breed_key':store.make_key(BREED_DF)
+    }
+    with open(json_filepath ,'w') as f:
+        json.dump(cube_meta ,f ,indent=1)
+    return npy_filepath
+
+# Load the cube for one species and breed
+# Returns None if the cube does not exist or was built from different data
+def load_cube(SPECIES ,BREED_NAME ,INPUT_DF ,BREED_DF ,FOLDER=CUBE_FOLDER):
+    npy_filepath ,json_filepath = _cube_filepaths(SPECIES ,BREED_NAME ,FOLDER)
+    try:
+        with open(json_filepath) as f:
+            cube_meta = json.load(f)
+        cube_values = np.load(npy_filepath ,mmap_mode='r')
+    except (OSError ,ValueError):
+        print(f'> BOD cube for {SPECIES} {BREED_NAME} not found. Will calculate live.')
+        return None
+    if cube_meta['data_key'] != store.make_key(INPUT_DF) \
+        or cube_meta['breed_key'] != store.make_key(BREED_DF):
+        print(f'> BOD cube for {SPECIES} {BREED_NAME} does not match current data. Will calculate live.')
+        return None
+    return {'meta':cube_meta ,'values':cube_values}
+
+def _lookup_index(AXIS ,VALUE):
+    matches = np.flatnonzero(np.isclose(AXIS ,VALUE))
+    if len(matches) == 1:
+        return matches[0]
+    return None
+
+# Row positions of INPUT_DF in a country and year scope
+# COUNTRY, YEAR: single value or list of values. None: all.
+# Returns None if there is no scope (all rows)
+def scope_rows(INPUT_DF ,COUNTRY=None ,YEAR=None):
+    if COUNTRY is None and YEAR is None:
+        return None
+    in_scope = np.ones(len(INPUT_DF) ,dtype=bool)
+    for col ,value in (('country' ,COUNTRY) ,('year' ,YEAR)):
+        if value is not None:
+            values = list(value) if isinstance(value ,(list ,tuple ,set)) else [value]
+            in_scope &= INPUT_DF[col].isin(values).to_numpy()
+    return np.flatnonzero(in_scope)
+
+# Get results for one scenario from the cube
+# ROWS: row positions of INPUT_DF to return, from scope_rows(). None: all rows.
+# Returns None if the scenario is not in the cube
+def lookup_cube(CUBE ,INPUT_DF ,ROWS=None ,**MASTER_ARGS):
+    if CUBE is None:
+        return None
+    cube_meta = CUBE['meta']
+    spec = CUBE_SPECS[cube_meta['species']]
+
+    # Arguments other than the grid must match those used to build the cube
+    other_args = {k:v for k ,v in MASTER_ARGS.items() \
+        if v is not None and k not in NONGRID_ARGS and k not in cube_meta['axes']}
+    if other_args != cube_meta['fixed_args']:
+        return None
+
+    idx = []
+    for name ,axis in cube_meta['axes'].items():
+        value = MASTER_ARGS.get(name)
+        if value is None:
+            return None
+        i = _lookup_index(axis ,value)
+        if i is None:
+            return None
+        idx.append(i)
+
+    # Only the rows in scope are read from the memory-mapped file
+    if ROWS is None:
+        scoped_df = INPUT_DF
+        cube_values = np.array(CUBE['values'][idx[0] ,idx[1]])
+    else:
+        scoped_df = INPUT_DF.iloc[ROWS]
+        cube_values = np.array(CUBE['values'][idx[0] ,idx[1] ,ROWS])
+    cube_df = pd.DataFrame(
+        cube_values
+        ,index=scoped_df.index
+        ,columns=cube_meta['columns']
+    )
+    # Cube is stored as float. Restore other types.
+    nonfloat_dtypes = {c:t for c ,t in cube_meta['dtypes'].items() if t != 'float64'}
+    if nonfloat_dtypes:
+        cube_df = cube_df.astype(nonfloat_dtypes)
+    OUTPUT_DF = pd.concat([scoped_df ,cube_df] ,axis=1)
+    OUTPUT_DF = spec['feedcost_func'](OUTPUT_DF
+        ,FEEDPRICE_USDPERTONNE=MASTER_ARGS['FEEDPRICE_USDPERTONNE_MASTER']
+        ,IDEAL_FCR_LIVE=MASTER_ARGS['IDEAL_FCR_LIVE_MASTER']
+    )
+    return OUTPUT_DF[cube_meta['column_order']]
+
+# Use in place of calc_bod_master_<species>
+# Looks up results in the cube if possible, otherwise calculates them live
+# COUNTRY, YEAR: scope of rows to return, see scope_rows(). Leave both as None
+#   for all countries and years (cross-country mode).
+# MASTER_ARGS: keyword arguments for calc_bod_master_<species>
+def calc_bod_master_fromcube(SPECIES ,CUBE ,INPUT_DF ,COUNTRY=None ,YEAR=None ,**MASTER_ARGS):
+    rows = scope_rows(INPUT_DF ,COUNTRY=COUNTRY ,YEAR=YEAR)
+    OUTPUT_DF = lookup_cube(CUBE ,INPUT_DF ,ROWS=rows ,**MASTER_ARGS)
+    if OUTPUT_DF is None:
+        scoped_df = INPUT_DF if rows is None else INPUT_DF.iloc[rows]
+        OUTPUT_DF = CUBE_SPECS[SPECIES]['master_func'](scoped_df ,**MASTER_ARGS)
+    return OUTPUT_DF
+
+#%% Build cubes for all breeds
+
+if __name__ == '__main__':
+    data_files = {
+        'poultry':'gbads_chickens_merged_fordash.pkl.gz'
+        ,'swine':'gbads_pigs_merged_fordash.pkl.gz'
+    }
+    breed_prefixes = {
+        'poultry':'poultrybreedstd_'
+        ,'swine':'swinebreedstd_'
+    }
+    for species ,data_file in data_files.items():
+        input_df = pd.read_pickle(os.path.join(CUBE_FOLDER ,data_file))
+        breed_files = sorted(f for f in os.listdir(CUBE_FOLDER) \
+            if f.startswith(breed_prefixes[species]) and f.endswith('.pkl.gz'))
+        for breed_file in breed_files:
+            breed_name = breed_file[len(breed_prefixes[species]):-len('.pkl.gz')]
+            breed_df = pd.read_pickle(os.path.join(CUBE_FOLDER ,breed_file))
+            try:
+                npy_filepath = build_cube(species ,breed_name ,input_df ,breed_df)
+                print(f'> Saved BOD cube {npy_filepath}')
+            except (KeyError ,ValueError) as e:     # Breed data without required columns
+                print(f'> Could not build BOD cube for {species} {breed_name}: {e!r}')
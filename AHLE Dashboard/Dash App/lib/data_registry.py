@@ -0,0 +1,167 @@
+#%% About
+'''
+This defines a registry of the data sets used by the dashboard, so that each
+one is read the first time it is needed rather than all at startup.
+
+Each data set is registered with a name, the dashboard tab that uses it, and a
+function that reads and prepares it. get() calls that function on first access
+and keeps the result for later calls. warm_in_background() loads data sets
+that have not been used yet in a separate thread, so they are ready before
+users open the tab. Data sets registered with WARM=False are left out of this
+and only read by get().
+
+Load time and memory use are recorded for each data set. Use report() to see
+them.
+
+read_fordash() reads a data file, using a Feather copy of it if there is an
+up-to-date one. The pipelines that export data for the dashboard save these
+copies with to_feather_fordash(). Columns such as species, region and item are
+stored as categorical in these copies and stay categorical when read, which
+uses less memory. Code that sets new values in these columns must change them
+to object or add the categories first, and groupby() on them should use
+observed=True.
+'''
+#%% Libraries
+
+import os
+import sys
+import threading
+from time import perf_counter
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+import lib.fa_dash_utils as fa
+
+#%% Settings
+
+_registry = OrderedDict()
+_registry_lock = threading.Lock()
+_warm_thread = None
+
+# Extensions of data files that can have a Feather copy
+FEATHER_SOURCE_EXTENSIONS = ['.pkl.gz' ,'.pkl' ,'.csv']
+
+#%% Functions
+
+# Register a data set
+# LOADER: function with no arguments that returns the data set
+# TAB: name of the dashboard tab that uses the data set. Used by warm() to load tabs together.
+# WARM: False to leave the data set out of warm(), so it is only read by get()
+def register(NAME ,LOADER ,TAB=None ,WARM=True):
+    with _registry_lock:
+        _registry[NAME] = {
+            'loader':LOADER
+            ,'tab':TAB
+            ,'warm':WARM
+            ,'lock':threading.Lock()
+            ,'data':None
+            ,'loaded':False
+            ,'load_seconds':None
+            ,'memory_mb':None
+        }
+
+def _memory_bytes(DATA):
+    if isinstance(DATA ,(pd.DataFrame ,pd.Series)):
+        return DATA.memory_usage(deep=True).sum()
+    elif isinstance(DATA ,np.ndarray):
+        return DATA.nbytes
+    elif isinstance(DATA ,dict):
+        return sys.getsizeof(DATA) + sum(_memory_bytes(v) for v in DATA.values())
+    elif isinstance(DATA ,(list ,tuple)):
+        return sys.getsizeof(DATA) + sum(_memory_bytes(v) for v in DATA)
+    else:
+        return sys.getsizeof(DATA)
+
+# Get a data set, loading it if needed
+# Returns the stored object, not a copy: callers must filter or copy before modifying it
+def get(NAME):
+    item = _registry[NAME]
+    if item['loaded']:
+        return item['data']
+    # Only one thread loads a data set. Others wait for it.
+    with item['lock']:
+        if not item['loaded']:
+            timerstart = perf_counter()
+            item['data'] = item['loader']()
+            item['load_seconds'] = perf_counter() - timerstart
+            try:
+                item['memory_mb'] = _memory_bytes(item['data']) / 1e6
+            except Exception:    # Memory is for reporting only
+                item['memory_mb'] = np.nan
+            item['loaded'] = True
+            fa.logit(f"Loaded {NAME} in {item['load_seconds']:.3f} seconds, {item['memory_mb']:.1f} MB")
+    return item['data']
+
+def is_loaded(NAME):
+    return _registry[NAME]['loaded']
+
+# Load all data sets for the given tabs, or all data sets if TABS is None
+# Skips data sets registered with WARM=False
+def warm(TABS=None):
+    for name ,item in list(_registry.items()):
+        if item['warm'] and (TABS is None or item['tab'] in TABS):
+            try:
+                get(name)
+            except Exception as e:     # Leave it for get() to raise when a callback needs it
+                fa.logit(f"Could not load {name}: {e!r}")
+
+# Call warm() in a background thread
+# Only starts one thread per process
+def warm_in_background(TABS=None ,DELAY_SECONDS=0):
+    global _warm_thread
+    if _warm_thread is not None:    # Called on every request. Skip the lock once started.
+        return _warm_thread
+    with _registry_lock:
+        if _warm_thread is not None:
+            return _warm_thread
+        def _warm():
+            if DELAY_SECONDS > 0:
+                threading.Event().wait(DELAY_SECONDS)
+            warm(TABS)
+            fa.logit(f"Data warm-up complete:\n{report().to_string()}")
+        _warm_thread = threading.Thread(target=_warm ,name='data_registry_warm' ,daemon=True)
+        _warm_thread.start()
+    return _warm_thread
+
+# Read a data file for the dashboard
+# If there is a Feather file with the same name that is at least as new as FILEPATH, reads that
+# instead. Otherwise, or if package pyarrow is not installed, reads FILEPATH with READER.
+# READER: function that takes a file path and returns a data frame, e.g. pd.read_csv
+def read_fordash(FILEPATH ,READER):
+    feather_filepath = None
+    for ext in FEATHER_SOURCE_EXTENSIONS:
+        if FILEPATH.endswith(ext):
+            feather_filepath = FILEPATH[:-len(ext)] + '.feather'
+            break
+    try:
+        use_feather = feather_filepath is not None \
+            and os.path.getmtime(feather_filepath) >= os.path.getmtime(FILEPATH)
+    except OSError:     # No Feather file
+        use_feather = False
+    if use_feather:
+        try:
+            import pyarrow.feather as feather
+        except ImportError:
+            use_feather = False
+    if not use_feather:
+        return READER(FILEPATH)
+
+    # Memory-map the file rather than reading it into a buffer first
+    # Columns that to_feather_fordash() stored as categorical stay categorical
+    table = feather.read_table(feather_filepath ,memory_map=True)
+    return table.to_pandas()
+
+# Data frame of load time and memory for each registered data set
+def report():
+    rows = [
+        {
+            'name':name
+            ,'tab':item['tab']
+            ,'loaded':item['loaded']
+            ,'load_seconds':item['load_seconds']
+            ,'memory_mb':item['memory_mb']
+        }
+        for name ,item in list(_registry.items())
+    ]
+    return pd.DataFrame(rows ,columns=['name' ,'tab' ,'loaded' ,'load_seconds' ,'memory_mb'])
@@ -0,0 +1,145 @@
+#%% About
+'''
+This defines a server-side store for data frames that are passed between Dash
+callbacks.
+
+Instead of serializing a data frame to JSON and sending it to the browser in a
+dcc.Store, a callback saves it here and puts only a short key in the dcc.Store.
+Downstream callbacks use the key to get the data frame back.
+
+Data frames are kept in memory and also written to a local folder in binary
+(pickle) format, so that all worker processes on the same machine can read them.
+The key is a hash of the data frame contents, so identical data always gets the
+same key and is only stored once.
+
+Keys come back from the browser, so get_df() only accepts keys in the form
+make_key() creates, and the folder must be private to the user running the app.
+If a key is not in the store, e.g. after a restart or on another server, get_df()
+raises MissingKeyError. Dash treats this as PreventUpdate: the callback's outputs
+keep their current values until the stored data is created again.
+'''
+#%% Libraries
+
+import os
+import re
+import stat
+import hashlib
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+import pandas as pd
+from dash.exceptions import PreventUpdate
+
+#%% Settings
+
+# Folder for stored data frames. Shared by all worker processes on this machine.
+# Must be private to the user running the app (see _check_folder()). The default
+# includes the user ID so that users sharing a temporary folder each get their own
+# (on Windows the temporary folder is already per user).
+STORE_FOLDER = os.environ.get(
+    'GBADS_DASH_STORE_FOLDER'
+    ,os.path.join(tempfile.gettempdir() ,f"gbads_dash_store{f'_{os.getuid()}' if hasattr(os ,'getuid') else ''}")
+)
+
+# Maximum number of data frames to keep. When exceeded, the least recently used are dropped.
+MAX_ITEMS_MEMORY = 32
+MAX_ITEMS_DISK = 256
+
+# Keys made by make_key(). Any other key is rejected.
+_KEY_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+_memory_store = OrderedDict()
+_memory_lock = threading.Lock()
+_folder_checked = False
+
+#%% Functions
+
+# Raised by get_df() when a key is not in the store. A KeyError, and a PreventUpdate
+# so that Dash leaves the outputs of the callback unchanged.
+class MissingKeyError(PreventUpdate ,KeyError):
+    pass
+
+def make_key(INPUT_DF):
+    hasher = hashlib.sha1()
+    hasher.update(pd.util.hash_pandas_object(INPUT_DF ,index=True).values.tobytes())
+    hasher.update(str(list(INPUT_DF.columns)).encode())
+    return hasher.hexdigest()[:16]
+
+def _check_key(KEY):
+    if not (isinstance(KEY ,str) and _KEY_PATTERN.match(KEY)):
+        raise MissingKeyError(f'Invalid store key: {KEY!r}.')
+
+def _key_filepath(KEY):
+    _check_key(KEY)
+    return os.path.join(STORE_FOLDER ,f'{KEY}.pkl')
+
+# Create STORE_FOLDER if needed and check that only this user can use it, so no
+# one else can place files in it for get_df() to unpickle
+def _check_folder():
+    global _folder_checked
+    if _folder_checked:
+        return
+    os.makedirs(STORE_FOLDER ,mode=0o700 ,exist_ok=True)
+    folder_stat = os.lstat(STORE_FOLDER)
+    if not stat.S_ISDIR(folder_stat.st_mode):
+        raise RuntimeError(f'Store folder {STORE_FOLDER} is not a directory. Links are not accepted.')
+    if hasattr(os ,'getuid'):   # Permissions are not checked on Windows
+        if folder_stat.st_uid != os.getuid():
+            raise RuntimeError(f'Store folder {STORE_FOLDER} is owned by another user. Set GBADS_DASH_STORE_FOLDER to a private folder.')
+        if folder_stat.st_mode & 0o077:
+            os.chmod(STORE_FOLDER ,0o700)
+    _folder_checked = True
+
+def _add_to_memory(KEY ,INPUT_DF):
+    with _memory_lock:
+        _memory_store[KEY] = INPUT_DF
+        _memory_store.move_to_end(KEY)
+        while len(_memory_store) > MAX_ITEMS_MEMORY:
+            _memory_store.popitem(last=False)
+
+def _prune_disk():
+    try:
+        filepaths = [os.path.join(STORE_FOLDER ,f) for f in os.listdir(STORE_FOLDER) if f.endswith('.pkl')]
+        if len(filepaths) > MAX_ITEMS_DISK:
+            filepaths.sort(key=os.path.getmtime)
+            for filepath in filepaths[:len(filepaths) - MAX_ITEMS_DISK]:
+                os.remove(filepath)
+    except OSError:     # Another process may have removed a file first
+        pass
+
+# Save a data frame and return its key
+# Usage: return put_df(df) at the end of a callback whose Output is a dcc.Store
+def put_df(INPUT_DF):
+    key = make_key(INPUT_DF)
+    _add_to_memory(key ,INPUT_DF)
+
+    _check_folder()
+    filepath = _key_filepath(key)
+    if os.path.exists(filepath):
+        os.utime(filepath)      # Mark as recently used
+    else:
+        # Write to a temporary file and rename so other processes never read a partial file
+        tmp_filepath = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+        INPUT_DF.to_pickle(tmp_filepath ,compression=None ,protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filepath ,filepath)
+        _prune_disk()
+    return key
+
+# Get a data frame back from its key
+# Returns a copy, so callbacks can modify it without affecting other callbacks
+# Raises MissingKeyError if KEY is not a valid key or is not in the store
+def get_df(KEY):
+    _check_key(KEY)
+    with _memory_lock:
+        stored_df = _memory_store.get(KEY)
+        if stored_df is not None:
+            _memory_store.move_to_end(KEY)
+    if stored_df is None:
+        _check_folder()
+        try:
+            stored_df = pd.read_pickle(_key_filepath(KEY) ,compression=None)
+        except FileNotFoundError:
+            raise MissingKeyError(f'No stored data for key {KEY}. It may have been dropped from the store.') from None
+        _add_to_memory(KEY ,stored_df)
+    return stored_df.copy()
@@ -0,0 +1,223 @@
+#%% About
+'''
+This defines a server-side cache for figures returned by Dash callbacks.
+
+Many users look at the same few views, and each time the callback rebuilds the
+same figure from the same inputs. Decorating a callback with cached_figure()
+saves the figure as JSON, keyed by the callback name and its input values, and
+returns the saved JSON the next time the callback is called with the same
+inputs.
+
+Figures are kept in memory and also written to a local folder, so that all
+worker processes on the same machine share them. The folder is in shared
+memory (/dev/shm) where available. Both are limited in size: when exceeded, the
+least recently used figures are dropped. The folder's limit also depends on the
+free space on its file system, as /dev/shm can be small (64 MB by default in
+Docker).
+
+The key also includes a version set with set_version(), based on the data files
+and the dashboard code, so saved figures are not used after either changes.
+
+Only use for callbacks whose output depends on nothing but their inputs and the
+data files. Use stats() to see hit and miss counts for each callback.
+'''
+#%% Libraries
+
+import os
+import time
+import json
+import hashlib
+import shutil
+import tempfile
+import threading
+import functools
+from collections import OrderedDict
+import pandas as pd
+import plotly.io as pio
+
+#%% Settings
+
+# Folder for saved figures. Shared by all worker processes on this machine.
+if os.path.isdir('/dev/shm'):
+    _default_folder = os.path.join('/dev/shm' ,'gbads_dash_figures')
+else:
+    _default_folder = os.path.join(tempfile.gettempdir() ,'gbads_dash_figures')
+CACHE_FOLDER = os.environ.get('GBADS_DASH_FIGURE_CACHE_FOLDER' ,_default_folder)
+
+# Set environment variable GBADS_DASH_FIGURE_CACHE=0 to always rebuild figures
+ENABLED = os.environ.get('GBADS_DASH_FIGURE_CACHE' ,'1') != '0'
+
+# Maximum total size of saved figures. When exceeded, the least recently used are dropped.
+MAX_MB_MEMORY = 64
+MAX_MB_DISK = 256
+
+# Proportion of the space on the folder's file system that saved figures can use,
+# counting the space they already use. The disk limit is the smaller of this and MAX_MB_DISK.
+MAX_DISK_SHARE = 0.5
+
+# Temporary files older than this are left from failed writes and are removed
+_TMP_MAX_AGE_SECONDS = 600
+
+_memory_cache = OrderedDict()
+_memory_bytes = 0
+_memory_lock = threading.Lock()
+
+_version = ''
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+#%% Functions
+
+# Set the version included in every key
+# PATHS: files or folders whose names, sizes and modification times make up the version
+def set_version(*PATHS):
+    global _version
+    hasher = hashlib.sha1()
+    for path in PATHS:
+        if os.path.isdir(path):
+            filepaths = sorted(os.path.join(path ,f) for f in os.listdir(path))
+        else:
+            filepaths = [path]
+        for filepath in filepaths:
+            try:
+                file_stat = os.stat(filepath)
+            except OSError:
+                continue
+            hasher.update(f'{filepath}|{file_stat.st_size}|{file_stat.st_mtime_ns}'.encode())
+    _version = hasher.hexdigest()[:12]
+    return _version
+
+def make_key(NAME ,ARGS ,KWARGS):
+    # Inputs are dropdown values, lists, or dcc.Store keys. default=str covers numpy numbers.
+    inputs_json = json.dumps([NAME ,_version ,ARGS ,KWARGS] ,sort_keys=True ,default=str)
+    return f'{NAME}_{hashlib.sha1(inputs_json.encode()).hexdigest()[:16]}'
+
+def _key_filepath(KEY):
+    return os.path.join(CACHE_FOLDER ,f'{KEY}.json')
+
+def _count(NAME ,RESULT):
+    with _stats_lock:
+        counts = _stats.setdefault(NAME ,{'memory_hits':0 ,'disk_hits':0 ,'misses':0})
+        counts[RESULT] += 1
+
+def _add_to_memory(KEY ,FIGURE_JSON):
+    global _memory_bytes
+    with _memory_lock:
+        if KEY in _memory_cache:
+            _memory_cache.move_to_end(KEY)
+            return
+        _memory_cache[KEY] = FIGURE_JSON
+        _memory_bytes += len(FIGURE_JSON)
+        while _memory_bytes > MAX_MB_MEMORY * 1e6 and len(_memory_cache) > 1:
+            _ ,dropped_json = _memory_cache.popitem(last=False)
+            _memory_bytes -= len(dropped_json)
+
+def _remove(FILEPATH):
+    try:
+        os.remove(FILEPATH)
+    except OSError:     # Another process may have removed it first
+        pass
+
+# Space saved figures can use, given the space they use now
+def _disk_budget_bytes(CACHE_BYTES):
+    free_bytes = shutil.disk_usage(CACHE_FOLDER).free
+    return min(MAX_MB_DISK * 1e6 ,MAX_DISK_SHARE * (CACHE_BYTES + free_bytes))
+
+# Drop the least recently used figures until NEW_BYTES more fit in the disk limit
+# Returns True if they fit
+def _prune_disk(NEW_BYTES=0):
+    file_stats = []
+    now = time.time()
+    for f in os.listdir(CACHE_FOLDER):
+        filepath = os.path.join(CACHE_FOLDER ,f)
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:     # Another process may have removed it first
+            continue
+        if f.endswith('.json'):
+            file_stats.append((file_stat.st_mtime ,file_stat.st_size ,filepath))
+        elif f.endswith('.tmp') and now - file_stat.st_mtime > _TMP_MAX_AGE_SECONDS:
+            _remove(filepath)
+    total_bytes = sum(size for _ ,size ,_ in file_stats)
+    budget_bytes = _disk_budget_bytes(total_bytes)
+    if NEW_BYTES > budget_bytes:
+        return False
+    file_stats.sort()
+    for _ ,size ,filepath in file_stats:
+        if total_bytes + NEW_BYTES <= budget_bytes:
+            break
+        _remove(filepath)
+        total_bytes -= size
+    return True
+
+def get_figure_json(KEY):
+    with _memory_lock:
+        figure_json = _memory_cache.get(KEY)
+        if figure_json is not None:
+            _memory_cache.move_to_end(KEY)
+            return figure_json ,'memory_hits'
+    filepath = _key_filepath(KEY)
+    try:
+        with open(filepath ,encoding='utf-8') as f:
+            figure_json = f.read()
+        os.utime(filepath)      # Mark as recently used
+    except OSError:
+        return None ,'misses'
+    _add_to_memory(KEY ,figure_json)
+    return figure_json ,'disk_hits'
+
+def put_figure_json(KEY ,FIGURE_JSON):
+    _add_to_memory(KEY ,FIGURE_JSON)
+    figure_bytes = FIGURE_JSON.encode('utf-8')
+    filepath = _key_filepath(KEY)
+    tmp_filepath = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(CACHE_FOLDER ,mode=0o700 ,exist_ok=True)
+        # Make room first, so a full folder still shrinks
+        if not _prune_disk(len(figure_bytes)):
+            return
+        # Write to a temporary file and rename so other processes never read a partial file
+        with open(tmp_filepath ,'wb') as f:
+            f.write(figure_bytes)
+        os.replace(tmp_filepath ,filepath)
+    except OSError:     # Folder may be full or read-only. Memory cache still works.
+        _remove(tmp_filepath)
+
+# Decorator for callbacks that return a figure
+# Place below @gbadsDash.callback:
+#   @gbadsDash.callback(Output('my-graph','figure') ,Input(...))
+#   @figcache.cached_figure()
+#   def update_my_graph(...):
+# NAME: name to use in keys and stats. Defaults to the function name.
+def cached_figure(NAME=None):
+    def decorator(FUNC):
+        name = NAME or FUNC.__name__
+        @functools.wraps(FUNC)
+        def wrapper(*args ,**kwargs):
+            if not ENABLED:
+                return FUNC(*args ,**kwargs)
+            key = make_key(name ,args ,kwargs)
+            figure_json ,result = get_figure_json(key)
+            _count(name ,result)
+            if figure_json is not None:
+                return json.loads(figure_json)
+
+            figure = FUNC(*args ,**kwargs)
+            try:
+                figure_json = pio.to_json(figure ,validate=False)
+            except (TypeError ,ValueError):     # Not a figure, e.g. dash.no_update. Return without saving.
+                return figure
+            put_figure_json(key ,figure_json)
+            return figure
+        return wrapper
+    return decorator
+
+# Data frame of hit and miss counts for each callback in this process
+def stats():
+    with _stats_lock:
+        rows = [{'name':name ,**counts} for name ,counts in _stats.items()]
+    stats_df = pd.DataFrame(rows ,columns=['name' ,'memory_hits' ,'disk_hits' ,'misses'])
+    stats_df['hit_rate'] = (stats_df['memory_hits'] + stats_df['disk_hits']) \
+        / (stats_df['memory_hits'] + stats_df['disk_hits'] + stats_df['misses'])
+    return stats_df
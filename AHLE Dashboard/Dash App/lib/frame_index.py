@@ -0,0 +1,109 @@
+#%% About
+'''
+This defines an index for filtering a data frame on a fixed set of key columns.
+
+Dashboard callbacks filter the same data frames on the same few columns
+(e.g. species, production system, group and region) every time an input
+changes. Each filter scans every row.
+
+build_index() splits a data frame once into one part for each combination of
+key values. select() returns the part for a combination with a dictionary
+lookup. If some key columns are not filtered, or a list of values is given for
+a column, the matching parts are combined in the original row order. The
+result is kept for later calls with the same filters.
+
+Parts are copies of the original rows, so changes to them never affect the
+original data frame. They are shared by all callbacks, so callers must not
+modify what select() returns: use .copy() before adding or changing columns.
+'''
+#%% Libraries
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+#%% Settings
+
+# Maximum number of combined results to keep for each index. When exceeded, the least recently used are dropped.
+MAX_SELECTIONS = 64
+
+#%% Functions
+
+# Build an index on KEY_COLS
+# Returns a dictionary to pass to select()
+def build_index(INPUT_DF ,KEY_COLS):
+    key_cols = list(KEY_COLS)
+    partitions = {}
+    positions = {}
+    for key ,group_positions in INPUT_DF.groupby(key_cols ,sort=False ,dropna=False ,observed=True).indices.items():
+        if not isinstance(key ,tuple):     # Single key column
+            key = (key ,)
+        positions[key] = group_positions
+        partitions[key] = INPUT_DF.iloc[group_positions].copy()
+    return {
+        'key_cols':key_cols
+        ,'partitions':partitions
+        ,'positions':positions
+        ,'empty':INPUT_DF.iloc[0:0].copy()
+        ,'selections':OrderedDict()
+        ,'lock':threading.Lock()
+    }
+
+# Unique values of a key column, in order of appearance
+def key_values(INDEX ,KEY_COL):
+    i = INDEX['key_cols'].index(KEY_COL)
+    return list(dict.fromkeys(key[i] for key in INDEX['partitions']))
+
+# Get the rows matching FILTERS
+# FILTERS: keyword arguments {key column: value}. Value can be a single value or a list of values.
+#   Key columns that are not given are not filtered.
+# Returns a shared data frame. Do not modify it.
+def select(INDEX ,**FILTERS):
+    unknown_cols = [col for col in FILTERS if col not in INDEX['key_cols']]
+    if unknown_cols:
+        raise KeyError(f'Not key columns of this index: {unknown_cols}')
+
+    # All key columns filtered on a single value: one part
+    if len(FILTERS) == len(INDEX['key_cols']) \
+        and not any(isinstance(value ,(list ,tuple ,set)) for value in FILTERS.values()):
+        key = tuple(FILTERS[col] for col in INDEX['key_cols'])
+        return INDEX['partitions'].get(key ,INDEX['empty'])
+
+    # Otherwise combine matching parts
+    # None in filter_values means the column is not filtered
+    filter_values = []
+    for col in INDEX['key_cols']:
+        if col not in FILTERS:
+            filter_values.append(None)
+        elif isinstance(FILTERS[col] ,(list ,tuple ,set)):
+            filter_values.append(tuple(FILTERS[col]))
+        else:
+            filter_values.append((FILTERS[col] ,))
+    selection_key = tuple(filter_values)
+
+    with INDEX['lock']:
+        OUTPUT_DF = INDEX['selections'].get(selection_key)
+        if OUTPUT_DF is not None:
+            INDEX['selections'].move_to_end(selection_key)
+            return OUTPUT_DF
+
+    matching_keys = [
+        key for key in INDEX['partitions']
+        if all(values is None or key_value in values for key_value ,values in zip(key ,filter_values))
+    ]
+    if not matching_keys:
+        OUTPUT_DF = INDEX['empty']
+    elif len(matching_keys) == 1:
+        OUTPUT_DF = INDEX['partitions'][matching_keys[0]]
+    else:
+        # Restore the original row order
+        row_positions = np.concatenate([INDEX['positions'][key] for key in matching_keys])
+        OUTPUT_DF = pd.concat([INDEX['partitions'][key] for key in matching_keys])
+        OUTPUT_DF = OUTPUT_DF.iloc[np.argsort(row_positions ,kind='stable')]
+
+    with INDEX['lock']:
+        INDEX['selections'][selection_key] = OUTPUT_DF
+        while len(INDEX['selections']) > MAX_SELECTIONS:
+            INDEX['selections'].popitem(last=False)
+    return OUTPUT_DF
@@ -21,62 +21,126 @@ def lookup_from_dictionary(KEY ,DICT):
         return None
 
 # =============================================================================
-# Add mortality, morbidity, and vet & med rates by income group
-# These are currently trivial functions, but they could be made to recalculate
-# rates with various user input.
+# Add mortality, morbidity, and vet & med rates
+# Rates are held in one table with a row for each income group, and optionally
+# a row for a species within an income group. Rows with species None apply to
+# all species without a row of their own. The dashboard can pass an edited copy
+# of the table to recalculate with other rates. See ahle_sweep() to calculate
+# AHLE for many sets of rates at once.
 # =============================================================================
-def add_mortality_rate(INPUT_DF):
-    mortality_byincome = {
-        "Low":0.15
-        ,"Lower Middle":0.1
-        ,"Upper Middle":0.06
-        ,"High":0.04
-    }
-    OUTPUT_DF = INPUT_DF.copy()
-    OUTPUT_DF['mortality_rate'] = OUTPUT_DF['incomegroup'].apply(lookup_from_dictionary ,DICT=mortality_byincome)
-    return OUTPUT_DF
-
-def add_morbidity_rate(INPUT_DF):
-    OUTPUT_DF = INPUT_DF.copy()
-    morbidity_byincome = {
-        "Low":0.15
-        ,"Lower Middle":0.15
-        ,"Upper Middle":0.15
-        ,"High":0.15
-    }
-    OUTPUT_DF['morbidity_rate'] = OUTPUT_DF['incomegroup'].apply(lookup_from_dictionary ,DICT=morbidity_byincome)
-    return OUTPUT_DF
-
-def add_vetmed_rates(INPUT_DF):
-    OUTPUT_DF = INPUT_DF.copy()
-
-    # Spend per kg biomass, farm level
-    farmspend_perkg_biomass_byincome = {
-        "Low":0.01
-        ,"Lower Middle":0.02
-        ,"Upper Middle":0.03
-        ,"High":0.05
-    }
-    # Spend per kg biomass, public level
-    pubspend_perkg_biomass_byincome = {
-        "Low":0.005
-        ,"Lower Middle":0.01
-        ,"Upper Middle":0.02
-        ,"High":0.03
-    }
-    # Spend per kg production
-    vetspend_perkg_prod_byincome = {
-        "Low":0.0025
-        ,"Lower Middle":0.005
-        ,"Upper Middle":0.01
-        ,"High":0.01
-    }
-    OUTPUT_DF['vetspend_biomass_farm_usdperkgbm'] = \
-        OUTPUT_DF['incomegroup'].apply(lookup_from_dictionary ,DICT=farmspend_perkg_biomass_byincome)
-    OUTPUT_DF['vetspend_biomass_public_usdperkgbm'] = \
-        OUTPUT_DF['incomegroup'].apply(lookup_from_dictionary ,DICT=pubspend_perkg_biomass_byincome)
-    OUTPUT_DF['vetspend_production_usdperkgprod'] = \
-        OUTPUT_DF['incomegroup'].apply(lookup_from_dictionary ,DICT=vetspend_perkg_prod_byincome)
+INCOME_GROUPS = ["Low" ,"Lower Middle" ,"Upper Middle" ,"High"]
+
+# Rate columns in RATE_TABLE. These are the columns add_rates() adds to the data.
+RATE_COLS = [
+    'mortality_rate'
+    ,'morbidity_rate'
+    ,'vetspend_biomass_farm_usdperkgbm'      # Spend per kg biomass, farm level
+    ,'vetspend_biomass_public_usdperkgbm'    # Spend per kg biomass, public level
+    ,'vetspend_production_usdperkgprod'      # Spend per kg production
+]
+
+RATE_TABLE = pd.DataFrame({
+    'incomegroup':INCOME_GROUPS
+    ,'species':None
+    ,'mortality_rate':[0.15 ,0.1 ,0.06 ,0.04]
+    ,'morbidity_rate':[0.15 ,0.15 ,0.15 ,0.15]
+    ,'vetspend_biomass_farm_usdperkgbm':[0.01 ,0.02 ,0.03 ,0.05]
+    ,'vetspend_biomass_public_usdperkgbm':[0.005 ,0.01 ,0.02 ,0.03]
+    ,'vetspend_production_usdperkgprod':[0.0025 ,0.005 ,0.01 ,0.01]
+})
+
+# Rates that are proportions. These must be in [0, 1), as ideal values divide by (1 - rate).
+# Other rates must be 0 or more.
+PROPORTION_RATES = ['mortality_rate' ,'morbidity_rate']
+
+# Highest value of PROPORTION_RATES when varied from the base rate by tornado_params()
+# and sample_rates(), unless the base rate is higher
+MAX_VARIED_PROPORTION = 0.95
+
+# Cap rates varied from BASE so PROPORTION_RATES stay below 1
+def _cap_varied(RATE ,VALUES ,BASE):
+    if RATE in PROPORTION_RATES:
+        return np.minimum(VALUES ,np.maximum(BASE ,MAX_VARIED_PROPORTION))
+    return VALUES
+
+# True for each value that is valid for RATE. NaN is not valid.
+def valid_rates(RATE ,VALUES):
+    values = np.asarray(VALUES ,dtype=float)
+    with np.errstate(invalid='ignore'):
+        valid = (values >= 0)
+        if RATE in PROPORTION_RATES:
+            valid &= (values < 1)
+    return valid
+
+def _check_rates(RATE ,VALUES ,SOURCE):
+    if not np.all(valid_rates(RATE ,VALUES)):
+        limits = '[0, 1)' if RATE in PROPORTION_RATES else '0 or more'
+        raise ValueError(f"{RATE} in {SOURCE} must be {limits}. Got {np.unique(np.asarray(VALUES ,dtype=float)).tolist()}.")
+
+# Make a rate table edited by a user valid, e.g. from the dashboard
+# - Rows without a known income group are dropped
+# - If an income group and species appear more than once, the last row is used
+# - Rates that are missing, not numbers, or outside the valid range (see valid_rates())
+#   use the rate from DEFAULT_TABLE for the income group
+# - Income groups without a row for all species get the row from DEFAULT_TABLE
+# Returns a new data frame with rows in the order of INCOME_GROUPS
+def clean_rate_table(INPUT_DF ,DEFAULT_TABLE=RATE_TABLE):
+    default_rows = DEFAULT_TABLE.loc[DEFAULT_TABLE['species'].isnull()]
+    default_rates = default_rows.set_index('incomegroup')
+    OUTPUT_DF = INPUT_DF.reindex(columns=list(DEFAULT_TABLE))
+    OUTPUT_DF['species'] = OUTPUT_DF['species'].mask(OUTPUT_DF['species'] == '')
+    OUTPUT_DF = OUTPUT_DF.loc[OUTPUT_DF['incomegroup'].isin(default_rates.index)]
+    OUTPUT_DF = OUTPUT_DF.drop_duplicates(subset=['incomegroup' ,'species'] ,keep='last')
+
+    for COL in RATE_COLS:
+        rate = pd.to_numeric(OUTPUT_DF[COL] ,errors='coerce')
+        rate = rate.where(valid_rates(COL ,rate))
+        OUTPUT_DF[COL] = rate.fillna(OUTPUT_DF['incomegroup'].map(default_rates[COL])).astype(float)
+
+    # Put back rows for all species that were deleted
+    has_default = OUTPUT_DF.loc[OUTPUT_DF['species'].isnull() ,'incomegroup']
+    OUTPUT_DF = pd.concat([OUTPUT_DF ,default_rows.loc[~ default_rows['incomegroup'].isin(has_default)]])
+
+    # Each income group's row for all species first, then its species rows
+    group_order = pd.Categorical(OUTPUT_DF['incomegroup'] ,categories=INCOME_GROUPS).codes
+    OUTPUT_DF = OUTPUT_DF.iloc[np.lexsort([OUTPUT_DF['species'].notnull() ,group_order])]
+    OUTPUT_DF['species'] = OUTPUT_DF['species'].astype(object).where(OUTPUT_DF['species'].notnull() ,None)
+    return OUTPUT_DF.reset_index(drop=True)
+
+# Position of each key of DATA_KEYS in TABLE_KEYS, -1 where not found
+# Both are data frames with the same key columns
+def _key_positions(TABLE_KEYS ,DATA_KEYS):
+    if TABLE_KEYS.duplicated().any():
+        raise ValueError(f"Rate table has more than one row for: {TABLE_KEYS.loc[TABLE_KEYS.duplicated()].to_dict('records')}")
+    table_index = pd.MultiIndex.from_frame(TABLE_KEYS.astype(str))
+    return table_index.get_indexer(pd.MultiIndex.from_frame(DATA_KEYS.astype(str)))
+
+# Row of RATE_TABLE to use for each row of INPUT_DF: the row for its income group and
+# species if there is one, otherwise the row for its income group with species None
+# Returns integer array, -1 where RATE_TABLE has no row
+def rate_table_rows(INPUT_DF ,RATE_TABLE=RATE_TABLE):
+    _all_species = RATE_TABLE['species'].isnull().to_numpy()
+    table_rows = np.flatnonzero(_all_species)
+    positions = _key_positions(RATE_TABLE.loc[_all_species ,['incomegroup']] ,INPUT_DF[['incomegroup']])
+    OUTPUT = np.where(positions >= 0 ,table_rows[positions] ,-1)
+    if not _all_species.all():
+        table_rows = np.flatnonzero(~_all_species)
+        positions = _key_positions(RATE_TABLE.loc[~_all_species ,['incomegroup' ,'species']] ,INPUT_DF[['incomegroup' ,'species']])
+        OUTPUT = np.where(positions >= 0 ,table_rows[positions] ,OUTPUT)
+    return OUTPUT
+
+# Add all rate columns. Rows with no rates in RATE_TABLE, e.g. income group
+# 'Unassigned', get NaN.
+# Raises ValueError if RATE_TABLE has a rate outside the valid range. See clean_rate_table().
+# COPY: False to add the columns to INPUT_DF itself, e.g. when it is already a new data frame
+def add_rates(INPUT_DF ,RATE_TABLE=RATE_TABLE ,COPY=True):
+    for COL in RATE_COLS:
+        _check_rates(COL ,RATE_TABLE[COL] ,'RATE_TABLE')
+    table_rows = rate_table_rows(INPUT_DF ,RATE_TABLE)
+    OUTPUT_DF = INPUT_DF.copy() if COPY else INPUT_DF
+    for COL in RATE_COLS:
+        rate_withnan = np.append(RATE_TABLE[COL].to_numpy(dtype=float) ,np.nan)     # Row -1 selects NaN
+        OUTPUT_DF[COL] = rate_withnan[table_rows]
     return OUTPUT_DF
 
 # =============================================================================
@@ -199,6 +263,257 @@ def ahle_calcs_adj_outputs(INPUT_DF):
     )
     return OUTPUT_DF
 
+# =============================================================================
+# Sensitivity sweeps: ahle_calcs_adj_outputs() for many sets of rates at once
+# Each set of rates is a scenario. Rates are arrays of shape (scenarios, rows),
+# so every formula is evaluated for all countries, species, years, and
+# scenarios in one NumPy operation instead of once per scenario.
+# The formulas must match ahle_calcs_adj_outputs().
+# =============================================================================
+# Rates for each scenario and row of RATE_TABLE
+# PARAMS: list of dictionaries, one per scenario, or a data frame with one row per scenario.
+#    Keys are rate names from RATE_COLS. Each value is one of:
+#    - a number for all rows of RATE_TABLE
+#    - a dictionary by income group, for the rows of RATE_TABLE with that income group
+#    - a list or array with a value for each row of RATE_TABLE
+#    Rates not given use RATE_TABLE.
+# Returns dictionary {rate name: array (scenarios, rows of RATE_TABLE)}
+def _params_to_rates(PARAMS ,RATE_TABLE=RATE_TABLE):
+    if isinstance(PARAMS ,pd.DataFrame):
+        PARAMS = PARAMS.to_dict('records')
+    unknown_rates = {RATE for SCENARIO in PARAMS for RATE in SCENARIO} - set(RATE_COLS)
+    if unknown_rates:
+        raise ValueError(f"Unknown rates in PARAMS: {sorted(unknown_rates)}. Must be in RATE_COLS.")
+
+    table_groups = RATE_TABLE['incomegroup'].to_numpy()
+    rates = {}
+    for RATE in RATE_COLS:
+        base = RATE_TABLE[RATE].to_numpy(dtype=float)
+        rate_byrow = np.tile(base ,(len(PARAMS) ,1))
+        for i ,SCENARIO in enumerate(PARAMS):
+            value = SCENARIO.get(RATE)
+            if isinstance(value ,dict):
+                for GROUP ,GROUP_VALUE in value.items():
+                    rate_byrow[i ,table_groups == GROUP] = GROUP_VALUE
+            elif np.ndim(value) == 1:
+                if len(value) != len(base):
+                    raise ValueError(f"{RATE} in PARAMS has {len(value)} values. Must have one for each of the {len(base)} rows of RATE_TABLE.")
+                rate_byrow[i] = value
+            elif value is not None and not pd.isnull(value):     # Missing values in a PARAMS data frame are NaN
+                rate_byrow[i] = value
+        _check_rates(RATE ,rate_byrow ,'PARAMS or RATE_TABLE')
+        rates[RATE] = rate_byrow
+    return rates
+
+# ahle_calcs_adj_outputs() for each scenario
+# INPUT_DF: data frame as passed to ahle_calcs_adj_outputs(). Rate columns are not needed.
+# PARAMS: see _params_to_rates()
+# Returns dictionary {column name: array (scenarios, rows)} with the columns
+# ahle_calcs_adj_outputs() adds. Row order is the same as INPUT_DF.
+def ahle_sweep_arrays(INPUT_DF ,PARAMS ,RATE_TABLE=RATE_TABLE):
+    return _ahle_arrays(INPUT_DF ,_params_to_rates(PARAMS ,RATE_TABLE) ,RATE_TABLE)
+
+# RATES_BYROW: dictionary {rate name: array (scenarios, rows of RATE_TABLE)}, see _params_to_rates()
+def _ahle_arrays(INPUT_DF ,RATES_BYROW ,RATE_TABLE=RATE_TABLE):
+    # Rate for each scenario and row. Rows with no rates in RATE_TABLE (-1) select
+    # an added last column of NaN, as with add_rates().
+    table_rows = rate_table_rows(INPUT_DF ,RATE_TABLE)
+    rates = {}
+    for RATE ,RATE_BYROW in RATES_BYROW.items():
+        rate_byrow_withnan = np.concatenate([RATE_BYROW ,np.full((RATE_BYROW.shape[0] ,1) ,np.nan)] ,axis=1)
+        rates[RATE] = rate_byrow_withnan[: ,table_rows]
+    col = {COL:INPUT_DF[COL].to_numpy(dtype=float) for COL in [
+        'biomass' ,'biomass_value_2010usd' ,'output_plus_biomass_value_2010usd' ,'antimicrobial_expenditure_usd'
+        ,'output_value_eggs_2010usd' ,'output_value_meat_2010usd' ,'output_value_milk_2010usd' ,'output_value_wool_2010usd'
+        ,'production_eggs_tonnes' ,'production_meat_tonnes' ,'production_milk_tonnes' ,'production_wool_tonnes'
+    ]}
+    def _fill_zero(ARRAY):
+        return np.where(np.isnan(ARRAY) ,0 ,ARRAY)
+    OUTPUT = {}
+
+    # Ideals
+    OUTPUT['ideal_biomass_value_2010usd'] = _fill_zero(col['biomass_value_2010usd'] * (1 / (1 - rates['mortality_rate'])))
+    for PRODUCT in ['eggs' ,'meat' ,'milk' ,'wool']:
+        OUTPUT[f'ideal_output_value_{PRODUCT}_2010usd'] = \
+            _fill_zero(col[f'output_value_{PRODUCT}_2010usd'] * (1 / (1 - rates['morbidity_rate'])))
+
+    # Vet & Med spending
+    OUTPUT['vetspend_biomass_farm_usd'] = _fill_zero(rates['vetspend_biomass_farm_usdperkgbm'] * (col['biomass'] / 1000) * 1000)
+    OUTPUT['vetspend_biomass_public_usd'] = _fill_zero(rates['vetspend_biomass_public_usdperkgbm'] * (col['biomass'] / 1000) * 1000)
+    for PRODUCT in ['meat' ,'eggs' ,'milk' ,'wool']:
+        OUTPUT[f'vetspend_production_{PRODUCT}_usd'] = \
+            _fill_zero(rates['vetspend_production_usdperkgprod'] * col[f'production_{PRODUCT}_tonnes'] * 1000)
+    OUTPUT['vetspend_farm_usd'] = OUTPUT['vetspend_biomass_farm_usd'] + OUTPUT['vetspend_production_meat_usd'] \
+        + OUTPUT['vetspend_production_eggs_usd'] + OUTPUT['vetspend_production_milk_usd'] + OUTPUT['vetspend_production_wool_usd']
+    OUTPUT['vetspend_public_usd'] = np.zeros_like(OUTPUT['vetspend_farm_usd'])     # See ahle_calcs_adj_outputs()
+    OUTPUT['net_value_2010usd'] = col['output_plus_biomass_value_2010usd'] \
+        - OUTPUT['vetspend_farm_usd'] - OUTPUT['vetspend_public_usd'] - col['antimicrobial_expenditure_usd']
+    OUTPUT['ideal_output_plus_biomass_value_2010usd'] = OUTPUT['ideal_biomass_value_2010usd'] + OUTPUT['ideal_output_value_meat_2010usd'] \
+        + OUTPUT['ideal_output_value_eggs_2010usd'] + OUTPUT['ideal_output_value_milk_2010usd'] + OUTPUT['ideal_output_value_wool_2010usd']
+
+    # AHLE
+    OUTPUT['ahle_dueto_reducedoutput_2010usd'] = OUTPUT['ideal_output_plus_biomass_value_2010usd'] - col['output_plus_biomass_value_2010usd']
+    OUTPUT['ahle_dueto_vetandmedcost_2010usd'] = col['output_plus_biomass_value_2010usd'] - OUTPUT['net_value_2010usd']
+    OUTPUT['ahle_total_2010usd'] = OUTPUT['ahle_dueto_reducedoutput_2010usd'] + OUTPUT['ahle_dueto_vetandmedcost_2010usd']
+    with np.errstate(divide='ignore' ,invalid='ignore'):     # Zero biomass or output gives inf or NaN, as with eval()
+        OUTPUT['ahle_2010usd_perkgbm'] = OUTPUT['ahle_total_2010usd'] / col['biomass']
+        for AHLE in ['dueto_reducedoutput' ,'dueto_vetandmedcost' ,'total']:
+            OUTPUT[f'ahle_{AHLE}_pctofoutput'] = (OUTPUT[f'ahle_{AHLE}_2010usd'] / col['output_plus_biomass_value_2010usd']) * 100
+    return OUTPUT
+
+# ahle_calcs_adj_outputs() for each scenario, as a long data frame
+# Returns one row per scenario and row of INPUT_DF (or group, if SUM_BY is given),
+# with column 'scenario' giving the position of the scenario in PARAMS.
+def ahle_sweep(
+        INPUT_DF
+        ,PARAMS             # List of dictionaries or data frame. See _params_to_rates().
+        ,OUTPUT_COLS=['ahle_dueto_reducedoutput_2010usd' ,'ahle_dueto_vetandmedcost_2010usd' ,'ahle_total_2010usd']
+        ,ID_COLS=['country' ,'species' ,'year']    # Columns of INPUT_DF to include
+        ,SUM_BY=None        # List of columns of INPUT_DF. If given, sum OUTPUT_COLS within these groups for each scenario, e.g. ['year'] for world totals. Only use with USD columns.
+        ,RATE_TABLE=RATE_TABLE      # Base rates for rates not given in PARAMS
+    ):
+    arrays = ahle_sweep_arrays(INPUT_DF ,PARAMS ,RATE_TABLE)
+    n_scenarios = next(iter(arrays.values())).shape[0]
+    if SUM_BY:
+        group_codes ,groups_df = _group_codes(INPUT_DF ,SUM_BY)
+        OUTPUT_DF = pd.concat([groups_df] * n_scenarios ,ignore_index=True)
+        for COL in OUTPUT_COLS:
+            OUTPUT_DF[COL] = _sum_by_group(arrays[COL] ,group_codes ,len(groups_df)).ravel()
+        n_rows = len(groups_df)
+    else:
+        OUTPUT_DF = pd.concat([INPUT_DF[ID_COLS].reset_index(drop=True)] * n_scenarios ,ignore_index=True)
+        for COL in OUTPUT_COLS:
+            OUTPUT_DF[COL] = arrays[COL].ravel()
+        n_rows = len(INPUT_DF)
+    OUTPUT_DF.insert(0 ,'scenario' ,np.repeat(np.arange(n_scenarios) ,n_rows))
+    return OUTPUT_DF
+
+# Sum an array (scenarios, rows) within groups of rows, ignoring NaN
+# Returns array (scenarios, groups)
+def _sum_by_group(ARRAY ,GROUP_CODES ,N_GROUPS):
+    n_scenarios = ARRAY.shape[0]
+    flat_codes = (np.arange(n_scenarios)[: ,None] * N_GROUPS + GROUP_CODES[None ,:]).ravel()
+    sums = np.bincount(flat_codes ,weights=np.nan_to_num(ARRAY).ravel() ,minlength=n_scenarios * N_GROUPS)
+    return sums.reshape(n_scenarios ,N_GROUPS)
+
+# Group number for each row of INPUT_DF and a data frame of the groups in that order
+def _group_codes(INPUT_DF ,BY):
+    group_codes = INPUT_DF.groupby(BY ,observed=True ,dropna=False ,sort=True).ngroup().to_numpy()
+    groups_df = INPUT_DF[BY].assign(_group=group_codes).drop_duplicates('_group').sort_values('_group')
+    return group_codes ,groups_df.drop(columns='_group').reset_index(drop=True)
+
+# Scenarios for a tornado chart: each rate in turn multiplied by each of SCALES
+# for all rows of RATE_TABLE, with the other rates at their base values.
+# PROPORTION_RATES are capped at MAX_VARIED_PROPORTION.
+# Returns list of dictionaries for PARAMS, and a data frame describing each scenario
+# (columns 'scenario', 'rate', 'scale'). The first scenario is the base (rate None, scale 1).
+def tornado_params(SCALES=[0.5 ,1.5] ,RATES=None ,RATE_TABLE=RATE_TABLE):
+    if RATES is None:
+        RATES = list(RATE_COLS)
+    params = [{}]
+    scenarios = [{'rate':None ,'scale':1}]
+    for RATE in RATES:
+        for SCALE in SCALES:
+            base = RATE_TABLE[RATE].to_numpy(dtype=float)
+            params.append({RATE:_cap_varied(RATE ,base * SCALE ,base)})
+            scenarios.append({'rate':RATE ,'scale':SCALE})
+    scenarios_df = pd.DataFrame(scenarios)
+    scenarios_df.insert(0 ,'scenario' ,range(len(scenarios_df)))
+    return params ,scenarios_df
+
+# =============================================================================
+# Uncertainty: ahle_calcs_adj_outputs() for random samples of the rates
+# Each sample draws every rate for each row of RATE_TABLE from its distribution in
+# RATE_UNCERTAINTY. Samples are evaluated in chunks with the sweep functions
+# above, and each chunk is summed to groups (e.g. years) before the next, so
+# memory depends on the chunk size rather than the number of samples.
+# =============================================================================
+# Distribution of each rate. The base rate in RATE_TABLE is the most likely value.
+#    'distribution': 'pert' or 'uniform'
+#    'low', 'high': limits as a proportion of the base rate. A number for all income
+#        groups or a dictionary by income group. For PROPORTION_RATES, high is capped
+#        at MAX_VARIED_PROPORTION.
+#    'lambda': PERT shape. Higher values put more weight on the base rate. Default 4.
+RATE_UNCERTAINTY = {
+    'mortality_rate':{'distribution':'pert' ,'low':0.5 ,'high':1.5}
+    ,'morbidity_rate':{'distribution':'pert' ,'low':0.5 ,'high':1.5}
+    ,'vetspend_biomass_farm_usdperkgbm':{'distribution':'pert' ,'low':0.5 ,'high':1.5}
+    ,'vetspend_biomass_public_usdperkgbm':{'distribution':'pert' ,'low':0.5 ,'high':1.5}
+    ,'vetspend_production_usdperkgprod':{'distribution':'pert' ,'low':0.5 ,'high':1.5}
+}
+
+# Memory for the arrays of one chunk of samples. A chunk holds about
+# _ARRAYS_PER_SAMPLE arrays of one value per row for each sample.
+MC_CHUNK_BYTES = 256 * 2**20
+_ARRAYS_PER_SAMPLE = 40
+
+# Random samples of each rate
+# Returns dictionary {rate name: array (samples, rows of RATE_TABLE)}, see _params_to_rates()
+def sample_rates(N_SAMPLES ,UNCERTAINTY=RATE_UNCERTAINTY ,SEED=None ,RATE_TABLE=RATE_TABLE):
+    rng = np.random.default_rng(SEED)
+    table_groups = RATE_TABLE['incomegroup']
+    def _bygroup(VALUE):
+        if isinstance(VALUE ,dict):
+            return table_groups.map(VALUE).fillna(1).to_numpy(dtype=float)
+        return np.full(len(table_groups) ,VALUE ,dtype=float)
+    rates = {}
+    for RATE in RATE_COLS:
+        base = RATE_TABLE[RATE].to_numpy(dtype=float)
+        _check_rates(RATE ,base ,'RATE_TABLE')
+        spec = UNCERTAINTY.get(RATE)
+        if spec is None:    # No uncertainty: base rate for every sample
+            rates[RATE] = np.broadcast_to(base ,(N_SAMPLES ,len(base)))
+            continue
+        low = base * _bygroup(spec['low'])
+        high = _cap_varied(RATE ,base * _bygroup(spec['high']) ,base)
+        if spec['distribution'].upper() == 'PERT':
+            # PERT is a Beta distribution scaled to (low, high)
+            pert_lambda = spec.get('lambda' ,4)
+            width = np.where(high > low ,high - low ,1)
+            alpha = 1 + pert_lambda * (base - low) / width
+            beta = 1 + pert_lambda * (high - base) / width
+            unit_samples = rng.beta(alpha ,beta ,size=(N_SAMPLES ,len(base)))
+        elif spec['distribution'].upper() == 'UNIFORM':
+            unit_samples = rng.random(size=(N_SAMPLES ,len(base)))
+        else:
+            raise ValueError(f"Unknown distribution for {RATE}: {spec['distribution']}. Must be 'pert' or 'uniform'.")
+        rates[RATE] = low + unit_samples * (high - low)
+    return rates
+
+# Mean and interval of ahle_calcs_adj_outputs() columns over random samples of the rates,
+# summed within groups
+# Returns data frame with one row per group, and columns {column}_mean, {column}_low, {column}_high
+# for each of OUTPUT_COLS
+def ahle_montecarlo(
+        INPUT_DF            # Data frame as passed to ahle_calcs_adj_outputs(). Rate columns are not needed.
+        ,N_SAMPLES=1000
+        ,OUTPUT_COLS=['ahle_dueto_reducedoutput_2010usd' ,'ahle_dueto_vetandmedcost_2010usd' ,'ahle_total_2010usd']
+        ,SUM_BY=['year']    # List of columns of INPUT_DF. Sums are calculated for each sample before taking percentiles. Only use with USD columns.
+        ,INTERVAL=0.95      # Float (0, 1): proportion of samples between low and high
+        ,UNCERTAINTY=RATE_UNCERTAINTY
+        ,SEED=0             # Integer: fixed by default so repeated calls give the same result. None: different every call.
+        ,CHUNK_BYTES=MC_CHUNK_BYTES
+        ,RATE_TABLE=RATE_TABLE      # Base rates
+    ):
+    rates = sample_rates(N_SAMPLES ,UNCERTAINTY ,SEED ,RATE_TABLE)
+    group_codes ,groups_df = _group_codes(INPUT_DF ,SUM_BY)
+    sums = {COL:np.empty((N_SAMPLES ,len(groups_df))) for COL in OUTPUT_COLS}
+
+    chunk_size = max(1 ,int(CHUNK_BYTES // (max(1 ,len(INPUT_DF)) * 8 * _ARRAYS_PER_SAMPLE)))
+    for START in range(0 ,N_SAMPLES ,chunk_size):
+        _chunk = slice(START ,min(START + chunk_size ,N_SAMPLES))
+        arrays = _ahle_arrays(INPUT_DF ,{RATE:RATE_SAMPLES[_chunk] for RATE ,RATE_SAMPLES in rates.items()} ,RATE_TABLE)
+        for COL in OUTPUT_COLS:
+            sums[COL][_chunk] = _sum_by_group(arrays[COL] ,group_codes ,len(groups_df))
+        del arrays
+
+    OUTPUT_DF = groups_df.copy()
+    for COL in OUTPUT_COLS:
+        OUTPUT_DF[f'{COL}_mean'] = sums[COL].mean(axis=0)
+        OUTPUT_DF[f'{COL}_low'] ,OUTPUT_DF[f'{COL}_high'] = \
+            np.percentile(sums[COL] ,[50 * (1 - INTERVAL) ,50 * (1 + INTERVAL)] ,axis=0)
+    return OUTPUT_DF
+
 # =============================================================================
 # These center on adjusting INPUTS under ideal conditions.
 # See Animal stock and flow.docx from William.
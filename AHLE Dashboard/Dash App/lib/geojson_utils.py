@@ -0,0 +1,130 @@
+#%% About
+'''
+This defines functions to load geojson files for dashboard maps.
+
+Map geometries are much more detailed than needed at the zoom levels used in the
+dashboard, and the full geometry is sent to the browser every time a map is
+drawn. load_geojson_simplified() reads a local geojson file and returns a
+lightweight version:
+    - Polygon rings are simplified with the Douglas-Peucker algorithm
+    - Coordinates are rounded to a fixed number of decimals
+    - Only the requested properties are kept
+
+The result is cached in a file next to the original. The cache file name
+includes a hash of the original file contents and the settings, so it is
+rebuilt automatically when either changes.
+
+Rings are simplified independently, so borders shared by two regions may not
+match exactly. With the default tolerance the differences are not visible at
+country-level zoom.
+'''
+#%% Libraries
+
+import os
+import json
+import hashlib
+import numpy as np
+
+#%% Functions
+
+# Douglas-Peucker simplification of a line
+# Returns a boolean array marking the points to keep. First and last points are always kept.
+def _douglas_peucker_keep(POINTS ,TOLERANCE):
+    keep = np.zeros(len(POINTS) ,dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0 ,len(POINTS) - 1)]
+    while stack:
+        start ,end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = POINTS[end] - POINTS[start]
+        offsets = POINTS[start + 1:end] - POINTS[start]
+        segment_length = np.hypot(segment[0] ,segment[1])
+        if segment_length == 0:
+            distances = np.hypot(offsets[:, 0] ,offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / segment_length
+        i_max = np.argmax(distances)
+        if distances[i_max] > TOLERANCE:
+            i_split = start + 1 + i_max
+            keep[i_split] = True
+            stack.append((start ,i_split))
+            stack.append((i_split ,end))
+    return keep
+
+# Simplify and round a closed polygon ring
+# Returns None if the ring collapses to fewer than 4 points (the minimum for a closed ring)
+def simplify_ring(RING ,TOLERANCE ,DECIMALS):
+    points = np.asarray(RING ,dtype='float64')[:, :2]
+    if len(points) > 4:
+        points = points[_douglas_peucker_keep(points ,TOLERANCE)]
+    points = np.round(points ,DECIMALS)
+
+    # Rounding can create repeated points. Drop them.
+    repeated = np.r_[False ,np.all(points[1:] == points[:-1] ,axis=1)]
+    points = points[~repeated]
+    if len(points) < 4:
+        return None
+    return points.tolist()
+
+def simplify_geometry(GEOMETRY ,TOLERANCE ,DECIMALS):
+    def _simplify_polygon(POLYGON):
+        rings = [simplify_ring(ring ,TOLERANCE ,DECIMALS) for ring in POLYGON]
+        if rings[0] is None:
+            return None
+        return [ring for ring in rings if ring is not None]   # Drop holes that collapsed
+
+    if GEOMETRY['type'] == 'Polygon':
+        polygon = _simplify_polygon(GEOMETRY['coordinates'])
+        if polygon is None:      # Keep small polygons rather than drop the feature
+            return simplify_geometry(GEOMETRY ,0 ,DECIMALS) if TOLERANCE > 0 else GEOMETRY
+        return {'type':'Polygon' ,'coordinates':polygon}
+    elif GEOMETRY['type'] == 'MultiPolygon':
+        polygons = [_simplify_polygon(polygon) for polygon in GEOMETRY['coordinates']]
+        polygons = [polygon for polygon in polygons if polygon is not None]   # Drop islands that collapsed
+        if not polygons:
+            return simplify_geometry(GEOMETRY ,0 ,DECIMALS) if TOLERANCE > 0 else GEOMETRY
+        return {'type':'MultiPolygon' ,'coordinates':polygons}
+    else:
+        return GEOMETRY
+
+def simplify_geojson(GEOJSON ,TOLERANCE ,DECIMALS ,KEEP_PROPERTIES=None):
+    features = []
+    for feature in GEOJSON['features']:
+        properties = feature['properties']
+        if KEEP_PROPERTIES is not None:
+            properties = {k:properties.get(k) for k in KEEP_PROPERTIES}
+        features.append({
+            'type':'Feature'
+            ,'properties':properties
+            ,'geometry':simplify_geometry(feature['geometry'] ,TOLERANCE ,DECIMALS)
+        })
+    return {'type':'FeatureCollection' ,'features':features}
+
+# Read a local geojson file and return a simplified version
+# TOLERANCE: maximum distance a simplified ring can move from the original, in coordinate units (degrees for lat/lon)
+# DECIMALS: number of decimals to keep in coordinates. 3 decimals is about 100m.
+# KEEP_PROPERTIES: list of feature properties to keep, e.g. the one used as featureidkey. If None, keeps all.
+def load_geojson_simplified(FILEPATH ,TOLERANCE=0.002 ,DECIMALS=3 ,KEEP_PROPERTIES=None):
+    with open(FILEPATH ,'rb') as f:
+        file_bytes = f.read()
+
+    hasher = hashlib.sha1(file_bytes)
+    hasher.update(json.dumps([TOLERANCE ,DECIMALS ,KEEP_PROPERTIES]).encode())
+    cache_filepath = f'{os.path.splitext(FILEPATH)[0]}.simplified_{hasher.hexdigest()[:12]}.geojson'
+    try:
+        with open(cache_filepath) as f:
+            return json.load(f)
+    except (OSError ,ValueError):
+        pass
+
+    geojson_simplified = simplify_geojson(json.loads(file_bytes) ,TOLERANCE ,DECIMALS ,KEEP_PROPERTIES)
+    try:
+        # Write to a temporary file and rename so other processes never read a partial file
+        tmp_filepath = f'{cache_filepath}.{os.getpid()}.tmp'
+        with open(tmp_filepath ,'w') as f:
+            json.dump(geojson_simplified ,f ,separators=(',' ,':'))
+        os.replace(tmp_filepath ,cache_filepath)
+    except OSError:     # Data folder may be read-only. Use the result without caching.
+        pass
+    return geojson_simplified
@@ -0,0 +1,99 @@
+#%% About
+'''
+This runs the numbered scripts in this folder as a pipeline using _pipeline.py.
+
+Only the scripts whose code or input files have changed since their last
+successful run are run, along with any scripts that use their outputs. Scripts
+that do not depend on each other are run in parallel. Output from each script
+is written to a log file in pipeline_logs, next to the state file.
+
+Input and output files of each script are found by scanning the script. Add any
+that are built another way to its stage with INPUTS or OUTPUTS. See
+_pipeline.py for details.
+
+IMPORTANT: before running this, set Python's working directory to the folder
+where this code is stored.
+'''
+#%% Setup
+
+exec(open('0_runme.py').read())
+import _pipeline
+imp.reload(_pipeline)
+
+# Folder variables used in the scripts, for finding their input and output files
+pipeline_folders = {
+   'RAWDATA_FOLDER':RAWDATA_FOLDER
+   ,'PRODATA_FOLDER':PRODATA_FOLDER
+   ,'EXPDATA_FOLDER':EXPDATA_FOLDER
+   ,'REPORTS_FOLDER':REPORTS_FOLDER
+   ,'CHARACTERIZE_FOLDER':CHARACTERIZE_FOLDER
+   ,'DASH_DATA_FOLDER':DASH_DATA_FOLDER
+}
+
+# File recording the hashes and status of each stage
+PIPELINE_STATE_FILE = os.path.join(PRODATA_FOLDER ,'pipeline_state.json')
+
+# Maximum number of scripts to run at once
+PIPELINE_MAX_WORKERS = max(1 ,os.cpu_count() - 1)
+
+# True: run all scripts even if they are up to date
+PIPELINE_FORCE = False
+
+#%% Stages
+'''
+In the order the scripts would be run by hand. A script only waits for earlier
+scripts that write its input files.
+'''
+pipeline_stages = [
+   # Extracts. These do not depend on each other and run in parallel.
+   # Those that read Excel or PDF files use _readcache.py, so a change to it re-runs them.
+   _pipeline.stage('1a_extract_faostat.py' ,pipeline_folders)
+   ,_pipeline.stage('1b_extract_eurostat.py' ,pipeline_folders)
+   ,_pipeline.stage('1c_extract_ukgov_poultry.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1d_extract_usda_quickstats.py' ,pipeline_folders)
+   ,_pipeline.stage('1e_extract_wahis_disease.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1f_extract_uk_feedprice.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1g_extract_uk_feedproduction.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1h_extract_ukfsa_condemns.py' ,pipeline_folders)
+   ,_pipeline.stage('1i_extract_brazil_poultry.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1j_extract_china_poultry.py' ,pipeline_folders)
+   ,_pipeline.stage('1k_extract_india_poultry.py' ,pipeline_folders)
+   ,_pipeline.stage('1l_extract_uk_misc.py' ,pipeline_folders)
+   ,_pipeline.stage('1m_extract_worldbank.py' ,pipeline_folders)
+   ,_pipeline.stage('1n_extract_pig333.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1o_extract_oecd_ag.py' ,pipeline_folders)
+   ,_pipeline.stage('1p_extract_interpig.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1q_extract_williams_poultry_costs.py' ,pipeline_folders)
+   ,_pipeline.stage('1r_extract_agreste.py' ,pipeline_folders)
+   ,_pipeline.stage('1s_extract_poultry_breedstd_or_models.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1t_extract_swine_breedstd_or_models.py' ,pipeline_folders ,INPUTS=['_readcache.py'])
+   ,_pipeline.stage('1u_extract_usda_feedintakeandprice.py' ,pipeline_folders)
+   ,_pipeline.stage('1v_extract_eu_importexport.py' ,pipeline_folders)
+   ,_pipeline.stage('1w_extract_uncomtrade.py' ,pipeline_folders)
+   ,_pipeline.stage('1x_extract_usda_fas_psd.py' ,pipeline_folders)
+   ,_pipeline.stage('1y_extract_usda_gats.py' ,pipeline_folders)
+   ,_pipeline.stage('1z_extract_othervars.py' ,pipeline_folders)
+
+   # Assemble. Both import _coalesce.py, so a change to it re-runs them.
+   ,_pipeline.stage('2a_assemble_poultry.py' ,pipeline_folders ,INPUTS=['_coalesce.py'])
+   ,_pipeline.stage('2b_assemble_swine.py' ,pipeline_folders ,INPUTS=['_coalesce.py'])
+
+   # Burden of disease
+   ,_pipeline.stage('3a_burdenofdisease_poultry.py' ,pipeline_folders)
+   ,_pipeline.stage('3b_burdenofdisease_swine.py' ,pipeline_folders)
+]
+
+#%% Run
+
+# To see which scripts would run without running them:
+# _pipeline.run_pipeline(pipeline_stages ,PIPELINE_STATE_FILE ,DRY_RUN=True)
+
+pipeline_status = _pipeline.run_pipeline(
+   pipeline_stages
+   ,PIPELINE_STATE_FILE
+   ,MAX_WORKERS=PIPELINE_MAX_WORKERS
+   ,FORCE=PIPELINE_FORCE
+)
+pipeline_failed = [SCRIPT for SCRIPT ,STATUS in pipeline_status.items() if STATUS in ('failed' ,'upstream failed')]
+if pipeline_failed:
+   print(f"Scripts not completed: {pipeline_failed}")
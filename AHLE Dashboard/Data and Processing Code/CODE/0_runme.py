@@ -17,3 +17,8 @@ CHARACTERIZE_FOLDER = os.path.join(CURRENT_FOLDER, 'CHARACTERIZE')
 
 # Folder for Dash data
 DASH_DATA_FOLDER = os.path.join(PARENT_FOLDER, 'Dashboard' ,'Dev' ,'data')
+
+# Reader for Excel and PDF tables that caches the parsed results. See _readcache.py.
+import _readcache as readcache
+imp.reload(readcache)
+readcache.CACHE_FOLDER = os.path.join(PRODATA_FOLDER ,'readcache')
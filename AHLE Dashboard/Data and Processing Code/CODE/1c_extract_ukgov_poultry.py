@@ -6,10 +6,10 @@
 # ----------------------------------------------------------------------------
 # Import
 # ----------------------------------------------------------------------------
-uk_chicksplaced = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-placings-20jan22.ods')
-                                ,sheet_name='UK_Placings_Annual'
-                                ,skiprows=list(range(7)) + list(range(37,43))   # Exclude descriptive rows and footnotes
-                                )
+uk_chicksplaced = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-placings-20jan22.ods')
+                                       ,sheet_name='UK_Placings_Annual'
+                                       ,skiprows=list(range(7)) + list(range(37,43))   # Exclude descriptive rows and footnotes
+                                       )
 cleancolnames(uk_chicksplaced)
 
 # ----------------------------------------------------------------------------
@@ -42,10 +42,10 @@ datainfo(uk_chicksplaced)
 # ----------------------------------------------------------------------------
 # Import and basics
 # ----------------------------------------------------------------------------
-uk_slaughter_birds = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-slaughter-20jan22.ods')
-                                ,sheet_name='Slaughterings_Annual_'
-                                ,skiprows=list(range(8))   # Exclude descriptive rows
-                                )
+uk_slaughter_birds = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-slaughter-20jan22.ods')
+                                       ,sheet_name='Slaughterings_Annual_'
+                                       ,skiprows=list(range(8))   # Exclude descriptive rows
+                                       )
 cleancolnames(uk_slaughter_birds)
 
 # Drop footnotes and blank rows
@@ -84,10 +84,10 @@ datainfo(uk_slaughter_birds)
 # ----------------------------------------------------------------------------
 # Import and basics
 # ----------------------------------------------------------------------------
-uk_slaughter_liveweight = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-slaughter-20jan22.ods')
-                                ,sheet_name='Liveweights_Annual'
-                                ,skiprows=list(range(7))   # Exclude descriptive rows
-                                )
+uk_slaughter_liveweight = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-slaughter-20jan22.ods')
+                                       ,sheet_name='Liveweights_Annual'
+                                       ,skiprows=list(range(7))   # Exclude descriptive rows
+                                       )
 cleancolnames(uk_slaughter_liveweight)
 
 # Drop footnotes and blank rows
@@ -133,10 +133,10 @@ datainfo(uk_slaughter_liveweight)
 # ----------------------------------------------------------------------------
 # Import and basics
 # ----------------------------------------------------------------------------
-uk_slaughter_carcassweight = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-slaughter-20jan22.ods')
-                                ,sheet_name='Production_Annual'
-                                ,skiprows=list(range(7))   # Exclude descriptive rows
-                                )
+uk_slaughter_carcassweight = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-poultry-slaughter-20jan22.ods')
+                                       ,sheet_name='Production_Annual'
+                                       ,skiprows=list(range(7))   # Exclude descriptive rows
+                                       )
 cleancolnames(uk_slaughter_carcassweight)
 uk_slaughter_carcassweight.rename(columns={'total_for_year':'year'} ,inplace=True)
 
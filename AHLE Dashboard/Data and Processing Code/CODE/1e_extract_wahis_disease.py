@@ -5,7 +5,7 @@
 # ----------------------------------------------------------------------------
 # Import
 # ----------------------------------------------------------------------------
-wahis_birds_imp = pd.read_excel(os.path.join(RAWDATA_FOLDER, 'wahis_birds_2011_2021.xlsx') ,sheet_name='Sheet1')
+wahis_birds_imp = readcache.read_excel(os.path.join(RAWDATA_FOLDER, 'wahis_birds_2011_2021.xlsx') ,sheet_name='Sheet1')
 cleancolnames(wahis_birds_imp)
 datainfo(wahis_birds_imp)
 
@@ -175,7 +175,7 @@ wahis_birds_agg2_p.to_pickle(os.path.join(PRODATA_FOLDER ,'wahis_birds_agg2_p.pk
 # ----------------------------------------------------------------------------
 # Import
 # ----------------------------------------------------------------------------
-wahis_swine_imp = pd.read_excel(os.path.join(RAWDATA_FOLDER, 'wahis_swine_2011_2021.xlsx') ,sheet_name='Sheet1')
+wahis_swine_imp = readcache.read_excel(os.path.join(RAWDATA_FOLDER, 'wahis_swine_2011_2021.xlsx') ,sheet_name='Sheet1')
 cleancolnames(wahis_swine_imp)
 datainfo(wahis_swine_imp)
 
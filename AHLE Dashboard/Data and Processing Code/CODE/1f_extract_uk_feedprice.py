@@ -6,10 +6,10 @@
 # ----------------------------------------------------------------------------
 # Import
 # ----------------------------------------------------------------------------
-uk_feedprice_imp = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-commodityprices-compounds-03feb22.ods')
-                                 ,sheet_name='Compound_Feed_Prices'
-                                 ,skiprows=list(range(8))   # Exclude descriptive rows and footnotes
-                                 )
+uk_feedprice_imp = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-commodityprices-compounds-03feb22.ods')
+                                        ,sheet_name='Compound_Feed_Prices'
+                                        ,skiprows=list(range(8))   # Exclude descriptive rows and footnotes
+                                        )
 cleancolnames(uk_feedprice_imp)
 datainfo(uk_feedprice_imp)
 
@@ -96,14 +96,16 @@ monthlist = [
    ,'dec'
 ]
 
+# Import all tabs (years) in one call, so they are parsed in parallel
+uk_feedcmdtyprice_sheets = readcache.read_excel_ranges(os.path.join(RAWDATA_FOLDER ,'uk-commodityprices-straights-20jan22.ods')
+   ,{YEAR:{'sheet_name':str(YEAR) ,'skiprows':list(range(8))} for YEAR in range(2011 ,2022)}   # Exclude descriptive rows at top
+)
+
 # Loop over all tabs in spreadsheet
 uk_feedcmdtyprice_imp = pd.DataFrame()   # Initialize data to hold all years
 for YEAR in range(2011 ,2022):
-   # Import single sheet (year)
-   uk_feedcmdtyprice_sheet_imp = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'uk-commodityprices-straights-20jan22.ods')
-                                               ,sheet_name=str(YEAR)
-                                               ,skiprows=list(range(8))   # Exclude descriptive rows at top
-                                               )
+   # Single sheet (year)
+   uk_feedcmdtyprice_sheet_imp = uk_feedcmdtyprice_sheets[YEAR]
 
    # Assign column names
    #!!! Note this assumes the same column ordering for all tabs
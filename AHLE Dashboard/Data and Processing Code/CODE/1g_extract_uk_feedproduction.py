@@ -12,11 +12,11 @@ def import_feedproduction_rowset(
       ,ITEM_SUFFIX=''   # String: Optional suffix to add to all Item lables. Use to distinguish sources if needed.
       ):
    # Import
-   OUTPUT_DF = pd.read_excel(FILENAME
-                             ,sheet_name=SHEETNAME
-                             ,skiprows=STARTROW - 1
-                             ,nrows=NROWS
-                             )
+   OUTPUT_DF = readcache.read_excel(FILENAME
+                                    ,sheet_name=SHEETNAME
+                                    ,skiprows=STARTROW - 1
+                                    ,nrows=NROWS
+                                    )
 
    # Get feed item as its own column
    feed_item = list(OUTPUT_DF)[0]   # First column is name of item
@@ -6,7 +6,7 @@
 #%% Brazil
 
 # Import
-brazil_chicksplaced = pd.read_excel(
+brazil_chicksplaced = readcache.read_excel(
    os.path.join(RAWDATA_FOLDER ,'Brazil_AviSite_ChicksPlaced.xlsx')
    ,sheet_name='Sheet1'
    ,skiprows=3                 # List: row numbers to skip. Integer: count of rows to skip at start of file
@@ -9,12 +9,12 @@ So I am only bringing in Pig333 data for the non-European countries in scope (Br
 '''
 #%% Production data
 
-pig333_production = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'pig333_production_brazil_china_russia_2010_2021.xlsx') ,sheet_name='Data')
+pig333_production = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'pig333_production_brazil_china_russia_2010_2021.xlsx') ,sheet_name='Data')
 datainfo(pig333_production)
 
 #%% Producer Prices
 
-pig333_producerprice = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'pig333_producerprice_brazil_china_russia_2010_2021.xlsx') ,sheet_name='Data')
+pig333_producerprice = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'pig333_producerprice_brazil_china_russia_2010_2021.xlsx') ,sheet_name='Data')
 datainfo(pig333_producerprice)
 
 #%% Merge and export
@@ -49,11 +49,11 @@ def read_interpig_singleyear(
       ):
    funcname = inspect.currentframe().f_code.co_name
 
-   df_list = tabula.read_pdf(PDF_FILE
-                             ,pages=PDF_PAGE
-                             ,pandas_options={'header':None}
-                             ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
-                             )
+   df_list = readcache.read_pdf(PDF_FILE
+                                ,pages=PDF_PAGE
+                                ,pandas_options={'header':None}
+                                ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
+                                )
    df = df_list[PDF_TABLENUM]
 
    # Get rows for first table
@@ -119,11 +119,11 @@ def read_interpig_multiyear(
       ):
    funcname = inspect.currentframe().f_code.co_name
 
-   df_list = tabula.read_pdf(PDF_FILE
-                             ,pages=PDF_PAGE
-                             ,pandas_options={'header':None}
-                             ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
-                             )
+   df_list = readcache.read_pdf(PDF_FILE
+                                ,pages=PDF_PAGE
+                                ,pandas_options={'header':None}
+                                ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
+                                )
    df = df_list[PDF_TABLENUM]
 
    # Get rows for first table
@@ -216,11 +216,11 @@ def read_interpig_multiyear(
 # =============================================================================
 #### DEV Read 2020
 # =============================================================================
-interpig_fps_2020_list = tabula.read_pdf(interpig_pdf_2020
-                                          ,pages=9
-                                          ,pandas_options={'header':None}
-                                          ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
-                                          )
+interpig_fps_2020_list = readcache.read_pdf(interpig_pdf_2020
+                                             ,pages=9
+                                             ,pandas_options={'header':None}
+                                             ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
+                                             )
 interpig_fps_2020 = interpig_fps_2020_list[0]
 
 # Split table and merge
@@ -328,11 +328,11 @@ interpig_fps_2015 = read_interpig_singleyear(
 #### Read 3-year table from 2015
 # =============================================================================
 # From 2015 file, read alternate table that includes data back to 2013
-interpig_fps_2013to2015_list = tabula.read_pdf(interpig_pdf_2015
-                                                ,pages=13
-                                                ,pandas_options={'header':None}
-                                                ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
-                                                )
+interpig_fps_2013to2015_list = readcache.read_pdf(interpig_pdf_2015
+                                                   ,pages=13
+                                                   ,pandas_options={'header':None}
+                                                   ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
+                                                   )
 
 # =============================================================================
 #### Stack
@@ -413,11 +413,11 @@ datainfo(interpig_financial_2015to2020)
 # =============================================================================
 #### DEV Read single file
 # =============================================================================
-interpig_feedprice_2016_list = tabula.read_pdf(interpig_pdf_2016
-                                               ,pages=8
-                                               ,pandas_options={'header':None}
-                                               ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
-                                               )
+interpig_feedprice_2016_list = readcache.read_pdf(interpig_pdf_2016
+                                                  ,pages=8
+                                                  ,pandas_options={'header':None}
+                                                  ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
+                                                  )
 
 # =============================================================================
 #### Read 2016-2020 tables in GBP
@@ -642,11 +642,11 @@ datainfo(interpig_feedprice_2016to2020)
 # =============================================================================
 #### DEV Read single file
 # =============================================================================
-interpig_physical_2015to2017_list = tabula.read_pdf(interpig_pdf_2017
-                                                    ,pages=13
-                                                    ,pandas_options={'header':None}
-                                                    ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
-                                                    )
+interpig_physical_2015to2017_list = readcache.read_pdf(interpig_pdf_2017
+                                                       ,pages=13
+                                                       ,pandas_options={'header':None}
+                                                       ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
+                                                       )
 
 # =============================================================================
 #### Read 2017 and 2020 files with function
@@ -794,11 +794,11 @@ datainfo(interpig_physical_2015to2020)
 # =============================================================================
 #### DEV Read single file
 # =============================================================================
-interpig_industrytrends_2020_list = tabula.read_pdf(interpig_pdf_2020
-                                                    ,pages=22
-                                                    ,pandas_options={'header':None}
-                                                    ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
-                                                    )
+interpig_industrytrends_2020_list = readcache.read_pdf(interpig_pdf_2020
+                                                       ,pages=22
+                                                       ,pandas_options={'header':None}
+                                                       ,lattice=True 	    # True: use lattice mode (if there are ruling lines separating cells)
+                                                       )
 
 # =============================================================================
 #### Read 2015-2020
@@ -16,16 +16,16 @@ breedstd_pdf_ross708 = os.path.join(RAWDATA_FOLDER ,'Poultry Standards' ,'Ross-7
 # Weight by Day
 # ----------------------------------------------------------------------------
 # Read PDFs
-ross308_list = tabula.read_pdf(breedstd_pdf_ross308
-                               ,pages=4    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
-                               )
+ross308_list = readcache.read_pdf(breedstd_pdf_ross308
+                                  ,pages=4    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
+                                  )
 ross308 = ross308_list[0]
 cleancolnames(ross308)
 datainfo(ross308)
 
-ross708_list = tabula.read_pdf(breedstd_pdf_ross708
-                               ,pages=4    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
-                               )
+ross708_list = readcache.read_pdf(breedstd_pdf_ross708
+                                  ,pages=4    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
+                                  )
 ross708 = ross708_list[0]
 cleancolnames(ross708)
 datainfo(ross708)
@@ -71,15 +71,15 @@ ross708 = ross708.astype('float64')
 # ----------------------------------------------------------------------------
 # Read Excel
 # These tables are not machine-readable in the PDFs, so I have manually copied them into Excel files
-ross308_yield = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'Poultry Standards' ,'Ross 308 Yield table.xlsx')
-                              ,sheet_name='Sheet1'
-                              )
+ross308_yield = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'Poultry Standards' ,'Ross 308 Yield table.xlsx')
+                                     ,sheet_name='Sheet1'
+                                     )
 cleancolnames(ross308_yield)
 datainfo(ross308_yield)
 
-ross708_yield = pd.read_excel(os.path.join(RAWDATA_FOLDER ,'Poultry Standards' ,'Ross 708 Yield table.xlsx')
-                              ,sheet_name='Sheet1'
-                              )
+ross708_yield = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'Poultry Standards' ,'Ross 708 Yield table.xlsx')
+                                     ,sheet_name='Sheet1'
+                                     )
 cleancolnames(ross708_yield)
 datainfo(ross708_yield)
 
@@ -174,9 +174,9 @@ breedstd_pdf_cobb500 = os.path.join(RAWDATA_FOLDER ,'Poultry Standards' ,'Cobb 5
 # Weight by Day
 # ----------------------------------------------------------------------------
 # Read PDF
-cobb_list = tabula.read_pdf(breedstd_pdf_cobb500
-                            ,pages=3    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
-                            )
+cobb_list = readcache.read_pdf(breedstd_pdf_cobb500
+                               ,pages=3    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
+                               )
 cobb = cobb_list[0]
 cleancolnames(cobb)
 datainfo(cobb)
@@ -208,9 +208,9 @@ datainfo(cobb)
 # Carcass Yield by Weight
 # ----------------------------------------------------------------------------
 # Read table
-cobb_yield_list = tabula.read_pdf(breedstd_pdf_cobb500
-                                  ,pages=13    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
-                                  )
+cobb_yield_list = readcache.read_pdf(breedstd_pdf_cobb500
+                                     ,pages=13    # From a specific page. Note result is a list even if there is only 1 table. If there are multiple tables, each will be stored as an element.
+                                     )
 cobb_yield = cobb_yield_list[0]   # Use AS HATCHED table
 cleancolnames(cobb_yield)
 datainfo(cobb_yield)
@@ -288,7 +288,7 @@ plt.title('Poultry reference growth\n Based on Cobb 500 breed standard' ,fontsiz
 # ----------------------------------------------------------------------------
 # Read table
 # ----------------------------------------------------------------------------
-vencobb_imp = pd.read_excel(
+vencobb_imp = readcache.read_excel(
    os.path.join(RAWDATA_FOLDER ,'Poultry Standards' ,'Vencobb400 Broiler manual - Performance Goals.xlsx')
    ,sheet_name='Vencobb 400'
 )
@@ -9,14 +9,14 @@ Reading tables from breed standard PDFs.
 #### Read tables into pandas dataframes
 # =============================================================================
 # Table 1.1: ADG, FCR, etc.
-pic_adg_list = tabula.read_pdf(
+pic_adg_list = readcache.read_pdf(
    os.path.join(RAWDATA_FOLDER ,'Swine standards' ,'PIC-Wean-To-Finish-Manual.pdf')
    ,pages=5    # Integer or List: page number(s) to read from. 'all': read whole PDF.
 )
 pic_adg = pic_adg_list[0]
 
 # Tables A-1, A-2, and A-3: Weight by Days on Feed for different flooring types
-pic_dof_list = tabula.read_pdf(
+pic_dof_list = readcache.read_pdf(
    os.path.join(RAWDATA_FOLDER ,'Swine standards' ,'PIC-Wean-To-Finish-Manual.pdf')
    ,pages=[45 ,46 ,47]    # Integer or List: page number(s) to read from. 'all': read whole PDF.
 )
@@ -37,7 +37,7 @@ datainfo(pic_dof_3)
 
 # Table J: Growth and Feed Intake by Day on Feed
 # Supercedes tables A-1 thru A-3 as it covers more days on feed and has expected feed intake
-pic_growthandfeed_list = tabula.read_pdf(
+pic_growthandfeed_list = readcache.read_pdf(
    os.path.join(RAWDATA_FOLDER ,'Swine standards' ,'PIC-Wean-To-Finish-Manual.pdf')
    ,pages=56    # Integer or List: page number(s) to read from. 'all': read whole PDF.
 )
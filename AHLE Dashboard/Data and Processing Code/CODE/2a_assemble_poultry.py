@@ -84,6 +84,10 @@ fao_chickens_tomerge = fao_chickens_tomerge.add_prefix('fao_')
 
 datainfo(fao_chickens_tomerge)
 
+# Tables to join onto this one. Each section below adds one, and all are joined
+# in one step in Join all sources.
+chickens_sources = {}
+
 #%% Merge Eurostat
 
 # ----------------------------------------------------------------------------
@@ -137,24 +141,10 @@ euro_chickencombo_tomerge = euro_chickencombo_tomerge.add_prefix('euro_')
 datainfo(euro_chickencombo_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = 1   # Initialize
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=fao_chickens_tomerge
-   ,right=euro_chickencombo_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['euro_country_upcase' ,'euro_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['euro'] = {'data':euro_chickencombo_tomerge ,'country':'euro_country_upcase' ,'year':'euro_year'}
 
 #%% Merge UK Gov
 # UK chicks placed and slaughter, including liveweight
@@ -186,24 +176,10 @@ uk_broilercombo_tomerge = uk_broilercombo_tomerge.add_prefix('ukgov_')
 datainfo(uk_broilercombo_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=uk_broilercombo_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['ukgov_country_upcase' ,'ukgov_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['ukgov'] = {'data':uk_broilercombo_tomerge ,'country':'ukgov_country_upcase' ,'year':'ukgov_year'}
 
 #%% Merge USDA
 
@@ -233,24 +209,10 @@ usda_broilers_tomerge = usda_broilers_tomerge.add_prefix('usda_')
 datainfo(usda_broilers_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=usda_broilers_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['usda_country_upcase' ,'usda_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['usda'] = {'data':usda_broilers_tomerge ,'country':'usda_country_upcase' ,'year':'usda_year'}
 
 #%% Merge Eurostat Imports/Exports
 
@@ -337,24 +299,10 @@ euro_impexp_tomerge = euro_impexp_tomerge.add_prefix('euimp_')
 datainfo(euro_impexp_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=euro_impexp_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['euimp_country_upcase' ,'euimp_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['euimp'] = {'data':euro_impexp_tomerge ,'country':'euimp_country_upcase' ,'year':'euimp_year'}
 
 #%% Merge UN Comtrade Imports/Exports
 
@@ -407,24 +355,10 @@ uncomtrade_tomerge = uncomtrade_tomerge.add_prefix('uncom_')
 datainfo(uncomtrade_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=uncomtrade_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['uncom_country_upcase' ,'uncom_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['uncom'] = {'data':uncomtrade_tomerge ,'country':'uncom_country_upcase' ,'year':'uncom_year'}
 
 #%% Merge USDA PSD Imports/Exports
 
@@ -581,24 +515,10 @@ uk_feedprice_withprod_agg_tomerge = uk_feedprice_withprod_agg_tomerge.add_prefix
 datainfo(uk_feedprice_withprod_agg_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-    left=chickens_merged
-    ,right=uk_feedprice_withprod_agg_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['ukfeed_country_upcase' ,'ukfeed_year']
-    ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['ukfeed'] = {'data':uk_feedprice_withprod_agg_tomerge ,'country':'ukfeed_country_upcase' ,'year':'ukfeed_year'}
 
 #%% Merge World Bank
 # Inflation, Exchange rate, and GDP
@@ -653,24 +573,10 @@ wb_infl_exchg_tomerge = wb_infl_exchg_tomerge.add_prefix('wb_')
 datainfo(wb_infl_exchg_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-    left=chickens_merged
-    ,right=wb_infl_exchg_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['wb_country_upcase' ,'wb_year']
-    ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['wb'] = {'data':wb_infl_exchg_tomerge ,'country':'wb_country_upcase' ,'year':'wb_year'}
 
 #%% Merge WAHIS Diseases
 
@@ -720,24 +626,10 @@ wahis_birds_tomerge = wahis_birds_tomerge.add_prefix('wahis_')
 datainfo(wahis_birds_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-    left=chickens_merged
-    ,right=wahis_birds_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['wahis_country_upcase' ,'wahis_year']
-    ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['wahis'] = {'data':wahis_birds_tomerge ,'country':'wahis_country_upcase' ,'year':'wahis_year'}
 
 #%% Merge Brazil specifics
 
@@ -766,22 +658,11 @@ brazil_chicksplaced_tomerge = brazil_chicksplaced_tomerge.add_prefix('brzl_')
 
 datainfo(brazil_chicksplaced_tomerge)
 
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=brazil_chicksplaced_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['brzl_country_upcase' ,'brzl_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# ----------------------------------------------------------------------------
+# Add to sources to join
+# ----------------------------------------------------------------------------
+# Join on country and year
+chickens_sources['brzl'] = {'data':brazil_chicksplaced_tomerge ,'country':'brzl_country_upcase' ,'year':'brzl_year'}
 
 #%% Merge UK Condemns (FSA)
 
@@ -818,24 +699,10 @@ ukfsa_poultry_condemns_tomerge = ukfsa_poultry_condemns_tomerge.add_prefix('ukcd
 datainfo(ukfsa_poultry_condemns_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=ukfsa_poultry_condemns_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['ukcdm_country_upcase' ,'ukcdm_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['ukcdm'] = {'data':ukfsa_poultry_condemns_tomerge ,'country':'ukcdm_country_upcase' ,'year':'ukcdm_year'}
 
 #%% Merge UK Misc
 '''
@@ -869,25 +736,11 @@ ukmisc_poultry_tomerge = ukmisc_poultry_tomerge.add_prefix('ukmisc_')
 datainfo(ukmisc_poultry_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
+# Join on country only
 #!!! For now, assuming estimates apply to all years.
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=ukmisc_poultry_tomerge
-   ,left_on=['fao_country_upcase']
-   ,right_on=['ukmisc_country_upcase']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+chickens_sources['ukmisc'] = {'data':ukmisc_poultry_tomerge ,'country':'ukmisc_country_upcase'}
 
 #%% Merge India specifics
 
@@ -917,24 +770,10 @@ india_poultry_tomerge = india_poultry_tomerge.add_prefix('india_')
 datainfo(india_poultry_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=india_poultry_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['india_country_upcase' ,'india_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# Join on country and year
+chickens_sources['india'] = {'data':india_poultry_tomerge ,'country':'india_country_upcase' ,'year':'india_year'}
 
 #%% Merge China specifics
 
@@ -983,9 +822,9 @@ oecd_ag_poultry_tomerge = oecd_ag_poultry_tomerge.add_prefix('oecd_')
 datainfo(oecd_ag_poultry_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-# mergenum = mergenum + 1
+# chickens_sources['oecd'] = {'data':oecd_ag_poultry_tomerge ,'country':'oecd_country_upcase' ,'year':'oecd_year'}
 
 #%% Merge Breed Standards
 
@@ -1052,33 +891,34 @@ poultry_costs_fromwill_tomerge = poultry_costs_fromwill_tomerge.add_prefix('glb_
 datainfo(poultry_costs_fromwill_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
+# Join on country and year
+# Also join sources by country only so they are filled for every year. Suffixes
+# _x and _y tell apart the columns that are in both.
+chickens_sources['glb'] = {
+   'data':poultry_costs_fromwill_tomerge.rename(columns={'glb_country_upcase':'glb_country_upcase_x' ,'glb_source':'glb_source_x'})
+   ,'country':'glb_country_upcase_x'
+   ,'year':'glb_year'
+}
+chickens_sources['glb_allyears'] = {
+   'data':poultry_costs_fromwill_tomerge[['glb_country_upcase' ,'glb_source']].rename(columns={'glb_country_upcase':'glb_country_upcase_y' ,'glb_source':'glb_source_y'})
+   ,'country':'glb_country_upcase_y'
+}
 
-# Merge on country and year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=poultry_costs_fromwill_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['glb_country_upcase' ,'glb_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-chickens_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Merge sources by country only so they are filled for every year
-chickens_merged = pd.merge(
-   left=chickens_merged
-   ,right=poultry_costs_fromwill_tomerge[['glb_country_upcase' ,'glb_source']]
-   ,left_on=['fao_country_upcase']
-   ,right_on=['glb_country_upcase']
-   ,how='left'
-)
+#%% Join all sources
 
-# Save this merged version as separate dataframe
-exec(f"chickens_merged_{mergenum} = chickens_merged.copy()")
-exec(f"datainfo(chickens_merged_{mergenum})")
+# ----------------------------------------------------------------------------
+# Join
+# ----------------------------------------------------------------------------
+# Left join of every source onto FAO table on country and year
+chickens_merged ,chickens_sources_coverage = join_on_country_year(
+   fao_chickens_tomerge
+   ,'fao_country_upcase'
+   ,'fao_year'
+   ,chickens_sources
+)
+datainfo(chickens_merged)
 
 # =============================================================================
 #### Fill in costs
@@ -1194,6 +1034,8 @@ datainfo(gbads_chickens_merged)
 # ============================================================================
 #### Utility functions
 # ============================================================================
+import _coalesce as coalesce      # Fills acc_ columns from a list of candidate sources
+
 # This function is used inside apply() to fill in a new column with the first
 # non-missing value from a set of candidate columns
 # Example usage:
@@ -1237,48 +1079,23 @@ datainfo(gbads_chickens_merged)
 # Note Avg Days On Feed is a parameter in Dash, allowing user to select the value used for calcs
 # Data entered here is only displayed as a reference in Dash
 # Assembling this column from miscellaneous sources. URL's from Liverpool data organizer.
-def create_acc_avgdaysonfeed(INPUT_ROW):
-   if INPUT_ROW['country'].upper() == 'BRAZIL':
-      OUTPUT = 43
-      OUTPUT_SOURCE = 'https://www.embrapa.br/suinos-e-aves/cias/custos/calcule/planilha'
-   elif INPUT_ROW['country'].upper() == 'CHINA':
-      OUTPUT = 44
-      OUTPUT_SOURCE = 'https://www.ncbi.nlm.nih.gov/pmc/articles/PMC7142404/'
-   elif INPUT_ROW['country'].upper() == 'FRANCE':
-      OUTPUT = 37
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   elif INPUT_ROW['country'].upper() == 'GERMANY':
-      OUTPUT = 34
-      OUTPUT_SOURCE = 'https://www.dlg.org/de/landwirtschaft/themen/tierhaltung/gefluegel/dlg-merkblatt-406'
-   elif INPUT_ROW['country'].upper() == 'INDIA':
-      OUTPUT = 42
-      OUTPUT_SOURCE = 'https://www.theglobalstatistics.com/chicks-rate-today/ '
-   # elif INPUT_ROW['country'].upper() == 'ITALY':
-   #     OUTPUT =
-   #     OUTPUT_SOURCE = None
-   elif INPUT_ROW['country'].upper() == 'NETHERLANDS':
-      OUTPUT = 41
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   # elif INPUT_ROW['country'].upper() == 'POLAND':
-   #     OUTPUT =
-   #     OUTPUT_SOURCE = None
-   # elif INPUT_ROW['country'].upper() == 'SPAIN':
-   #     OUTPUT =
-   #     OUTPUT_SOURCE = None
-   elif INPUT_ROW['country'].upper() == 'UNITED KINGDOM':
-      OUTPUT = 35
-      OUTPUT_SOURCE = 'https://www.nfuonline.com/archive?treeid=139718'
-   elif INPUT_ROW['country'].upper() == 'UNITED STATES OF AMERICA':
-      # OUTPUT = 47
-      # OUTPUT_SOURCE = 'https://www.nationalchickencouncil.org/statistic/us-broiler-performance/'
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   'acc_avgdaysonfeed':[
+      {'when':"country.str.upper() == 'BRAZIL'" ,'value':43 ,'source':'https://www.embrapa.br/suinos-e-aves/cias/custos/calcule/planilha'}
+      ,{'when':"country.str.upper() == 'CHINA'" ,'value':44 ,'source':'https://www.ncbi.nlm.nih.gov/pmc/articles/PMC7142404/'}
+      ,{'when':"country.str.upper() == 'FRANCE'" ,'value':37 ,'source_col':'glb_source_y'}
+      ,{'when':"country.str.upper() == 'GERMANY'" ,'value':34 ,'source':'https://www.dlg.org/de/landwirtschaft/themen/tierhaltung/gefluegel/dlg-merkblatt-406'}
+      ,{'when':"country.str.upper() == 'INDIA'" ,'value':42 ,'source':'https://www.theglobalstatistics.com/chicks-rate-today/ '}
+      # ,{'when':"country.str.upper() == 'ITALY'" ,'value': ,'source':None}
+      ,{'when':"country.str.upper() == 'NETHERLANDS'" ,'value':41 ,'source_col':'glb_source_y'}
+      # ,{'when':"country.str.upper() == 'POLAND'" ,'value': ,'source':None}
+      # ,{'when':"country.str.upper() == 'SPAIN'" ,'value': ,'source':None}
+      ,{'when':"country.str.upper() == 'UNITED KINGDOM'" ,'value':35 ,'source':'https://www.nfuonline.com/archive?treeid=139718'}
+      # United States: 47 days from 'https://www.nationalchickencouncil.org/statistic/us-broiler-performance/'
       # 47 days produces breed standard potential incompatible with data. Probably due to bimodality of US broilers. Picking a higer number for now.
-      OUTPUT = 52
-      OUTPUT_SOURCE = None
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_avgdaysonfeed' ,'acc_avgdaysonfeed_src']] = gbads_chickens_merged.apply(create_acc_avgdaysonfeed ,axis=1)
+      ,{'when':"country.str.upper() == 'UNITED STATES OF AMERICA'" ,'value':52 ,'source':None}
+   ]
+})
 gbads_chickens_merged['acc_avgdaysonfeed'] = round(gbads_chickens_merged['acc_avgdaysonfeed'])
 
 # ============================================================================
@@ -1294,35 +1111,23 @@ gbads_chickens_merged['acc_avgdaysonfeed'] = round(gbads_chickens_merged['acc_av
 # Currently applies to both chicks and adults
 acc_prpn_netimports_forslaughter = 0.8
 
-def create_acc_netimport_chicks(INPUT_ROW):
-   # Eurostat
-   if pd.notnull(INPUT_ROW['euimp_net_import_live_gallusdom_lte185g_head']):
-      OUTPUT = INPUT_ROW['euimp_net_import_live_gallusdom_lte185g_head'] * acc_prpn_netimports_forslaughter
-      OUTPUT_SOURCE = 'Eurostat'
-   # UN Comtrade
-   elif pd.notnull(INPUT_ROW['uncom_net_import_live_gallusdom_lte185g_head']):
-      OUTPUT = INPUT_ROW['uncom_net_import_live_gallusdom_lte185g_head'] * acc_prpn_netimports_forslaughter
-      OUTPUT_SOURCE = 'UN Comtrade'
-   # USDA
-   else:   #!!! Net imports are generally small compared to head slaughtered. For now, assuming zero for years with no data.
-      OUTPUT = 0
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_netimport_chicks' ,'acc_netimport_chicks_src']] = gbads_chickens_merged.apply(create_acc_netimport_chicks ,axis=1)
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   'acc_netimport_chicks':[
+      {'when':'euimp_net_import_live_gallusdom_lte185g_head' ,'value':f'euimp_net_import_live_gallusdom_lte185g_head * {acc_prpn_netimports_forslaughter}' ,'source':'Eurostat'}
+      ,{'when':'uncom_net_import_live_gallusdom_lte185g_head' ,'value':f'uncom_net_import_live_gallusdom_lte185g_head * {acc_prpn_netimports_forslaughter}' ,'source':'UN Comtrade'}
+      # USDA
+      #!!! Net imports are generally small compared to head slaughtered. For now, assuming zero for years with no data.
+      ,{'value':0 ,'source':None}
+   ]
+   ,'acc_netimport_adults':[
+      {'when':'euimp_net_import_live_gallusdom_gt185g_head' ,'value':f'euimp_net_import_live_gallusdom_gt185g_head * {acc_prpn_netimports_forslaughter}' ,'source':'Eurostat'}
+      # UN Comtrade does not have data on mature birds
+      # USDA does not have data on mature birds
+      #!!! Net imports are generally small compared to head slaughtered. For now, assuming zero for years with no data.
+      ,{'value':0 ,'source':None}
+   ]
+})
 gbads_chickens_merged['acc_netimport_chicks'] = round(gbads_chickens_merged['acc_netimport_chicks'])
-
-def create_acc_netimport_adults(INPUT_ROW):
-   # Eurostat
-   if pd.notnull(INPUT_ROW['euimp_net_import_live_gallusdom_gt185g_head']):
-      OUTPUT = INPUT_ROW['euimp_net_import_live_gallusdom_gt185g_head'] * acc_prpn_netimports_forslaughter
-      OUTPUT_SOURCE = 'Eurostat'
-   # UN Comtrade does not have data on mature birds
-   # USDA does not have data on mature birds
-   else:   #!!! Net imports are generally small compared to head slaughtered. For now, assuming zero for years with no data.
-      OUTPUT = 0
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_netimport_adults' ,'acc_netimport_adults_src']] = gbads_chickens_merged.apply(create_acc_netimport_adults ,axis=1)
 gbads_chickens_merged['acc_netimport_adults'] = round(gbads_chickens_merged['acc_netimport_adults'])
 
 # ============================================================================
@@ -1343,170 +1148,90 @@ gbads_chickens_merged['acc_netimport_adults'] = round(gbads_chickens_merged['acc
 # instead have mortality rates. We will back-calculate chicks placed from head
 # slaughtered and mortality.
 
-def create_acc_headplaced(INPUT_ROW):
-   # if INPUT_ROW['country'].upper() == 'UNITED KINGDOM':
-   #     OUTPUT = INPUT_ROW['ukgov_chicksplaced_broilers_thsdhd'] * 1000
-
-   # Idea: rather than checking country names, check variables for missingness.
-   # Check country-specific variables first (e.g. ukgov) then broader databases (e.g. Eurostat).
-   # Advantage: if any years are missing from country-specific data they can be filled in with broader databases.
-
-   # UK
-   if pd.notnull(INPUT_ROW['ukgov_chicksplaced_broilers_thsdhd']):
-      OUTPUT = INPUT_ROW['ukgov_chicksplaced_broilers_thsdhd'] * 1000 \
-         + INPUT_ROW['acc_netimport_adults']
-      OUTPUT_SOURCE = 'UK Gov'
-
-   # US
-   elif pd.notnull(INPUT_ROW['usda_chicksplaced_broilers_thsdhd']):
-      OUTPUT = INPUT_ROW['usda_chicksplaced_broilers_thsdhd'] * 1000 \
-         + INPUT_ROW['acc_netimport_adults']
-      OUTPUT_SOURCE = 'USDA'
-
-   # EU
-   elif pd.notnull(INPUT_ROW['euro_chickshatched_broilers_thsdhd']):
-      OUTPUT = INPUT_ROW['euro_chickshatched_broilers_thsdhd'] * 1000 \
-         + INPUT_ROW['acc_netimport_chicks'] \
-            + INPUT_ROW['acc_netimport_adults']
-      OUTPUT_SOURCE = 'Eurostat'
-
-   # Brazil
-   elif pd.notnull(INPUT_ROW['brzl_chicksplaced_thsdhd']):   #!!! Assuming broilers
-      OUTPUT = INPUT_ROW['brzl_chicksplaced_thsdhd'] * 1000 \
-         + INPUT_ROW['acc_netimport_adults']
-      OUTPUT_SOURCE = 'AviSite'
-
-   # India
-   elif pd.notnull(INPUT_ROW['india_chicksplaced_broilers_thsdhd']):
-      OUTPUT = INPUT_ROW['india_chicksplaced_broilers_thsdhd'] * 1000 \
-         + INPUT_ROW['acc_netimport_adults']
-      OUTPUT_SOURCE = 'InfoMetrics'
-
-   # China - special case. Back calculating from head slaughtered and average mortality.
-   # From reference R39
-   # https://www.ncbi.nlm.nih.gov/pmc/articles/PMC7142404/
-   # Mortality percentages: 6.92, 3.79, 3.26 giving average of 4.66
-   elif INPUT_ROW['country'].upper() == 'CHINA':
-      OUTPUT = INPUT_ROW['fao_slaughtered_chickens_thsdhd'] * 1000 * 1.0466  #!!! Assuming FAO is primarily broilers
-      OUTPUT_SOURCE = ''
-
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_headplaced' ,'acc_headplaced_src']] = gbads_chickens_merged.apply(create_acc_headplaced ,axis=1)
+# Idea: rather than checking country names, check variables for missingness.
+# Check country-specific variables first (e.g. ukgov) then broader databases (e.g. Eurostat).
+# Advantage: if any years are missing from country-specific data they can be filled in with broader databases.
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   'acc_headplaced':[
+      # UK
+      {'when':'ukgov_chicksplaced_broilers_thsdhd' ,'value':'ukgov_chicksplaced_broilers_thsdhd * 1000 + acc_netimport_adults' ,'source':'UK Gov'}
+      # US
+      ,{'when':'usda_chicksplaced_broilers_thsdhd' ,'value':'usda_chicksplaced_broilers_thsdhd * 1000 + acc_netimport_adults' ,'source':'USDA'}
+      # EU
+      ,{'when':'euro_chickshatched_broilers_thsdhd' ,'value':'euro_chickshatched_broilers_thsdhd * 1000 + acc_netimport_chicks + acc_netimport_adults' ,'source':'Eurostat'}
+      # Brazil
+      ,{'when':'brzl_chicksplaced_thsdhd' ,'value':'brzl_chicksplaced_thsdhd * 1000 + acc_netimport_adults' ,'source':'AviSite'}   #!!! Assuming broilers
+      # India
+      ,{'when':'india_chicksplaced_broilers_thsdhd' ,'value':'india_chicksplaced_broilers_thsdhd * 1000 + acc_netimport_adults' ,'source':'InfoMetrics'}
+      # China - special case. Back calculating from head slaughtered and average mortality.
+      # From reference R39
+      # https://www.ncbi.nlm.nih.gov/pmc/articles/PMC7142404/
+      # Mortality percentages: 6.92, 3.79, 3.26 giving average of 4.66
+      ,{'when':"country.str.upper() == 'CHINA'" ,'value':'fao_slaughtered_chickens_thsdhd * 1000 * 1.0466' ,'source':''}   #!!! Assuming FAO is primarily broilers
+   ]
+})
 gbads_chickens_merged['acc_headplaced'] = round(gbads_chickens_merged['acc_headplaced'])
 
 # ============================================================================
 #### Head Slaughtered, Carcass & Live Weight
 # ============================================================================
-def create_acc_headslaughtered(INPUT_ROW):
-   # if INPUT_ROW['country'].upper() == 'UNITED KINGDOM':
-   #    OUTPUT = INPUT_ROW['ukgov_slaughter_broilers_thsdhd'] * 1000
-   # UK
-   if pd.notnull(INPUT_ROW['ukgov_slaughter_broilers_thsdhd']):
-      OUTPUT = INPUT_ROW['ukgov_slaughter_broilers_thsdhd'] * 1000
-      OUTPUT_SOURCE = 'UK Gov'
-   # US
-   elif pd.notnull(INPUT_ROW['usda_production_broilers_thsdhd']):
-      OUTPUT = INPUT_ROW['usda_production_broilers_thsdhd'] * 1000
-      OUTPUT_SOURCE = 'USDA'
-   # Euro
-   elif pd.notnull(INPUT_ROW['euro_sl_est_broilers_thsdhd']):
-      OUTPUT = INPUT_ROW['euro_sl_est_broilers_thsdhd'] * 1000
-      OUTPUT_SOURCE = 'Eurostat'
-   # FAO
-   elif pd.notnull(INPUT_ROW['fao_slaughtered_chickens_thsdhd']):   #!!! Assuming FAO is primarily broilers
-      OUTPUT = INPUT_ROW['fao_slaughtered_chickens_thsdhd'] * 1000
-      OUTPUT_SOURCE = 'FAO'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_headslaughtered' ,'acc_headslaughtered_src']] = gbads_chickens_merged.apply(create_acc_headslaughtered ,axis=1)
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   'acc_headslaughtered':[
+      # UK
+      {'when':'ukgov_slaughter_broilers_thsdhd' ,'value':'ukgov_slaughter_broilers_thsdhd * 1000' ,'source':'UK Gov'}
+      # US
+      ,{'when':'usda_production_broilers_thsdhd' ,'value':'usda_production_broilers_thsdhd * 1000' ,'source':'USDA'}
+      # Euro
+      ,{'when':'euro_sl_est_broilers_thsdhd' ,'value':'euro_sl_est_broilers_thsdhd * 1000' ,'source':'Eurostat'}
+      # FAO
+      ,{'when':'fao_slaughtered_chickens_thsdhd' ,'value':'fao_slaughtered_chickens_thsdhd * 1000' ,'source':'FAO'}   #!!! Assuming FAO is primarily broilers
+   ]
+   ,'acc_totalcarcweight_tonnes':[
+      {'when':'ukgov_slaughter_broilers_carcwt_thsdtonnes' ,'value':'ukgov_slaughter_broilers_carcwt_thsdtonnes * 1000' ,'source':'UK Gov'}
+      ,{'when':'usda_production_broilers_thsdtonnes' ,'value':'usda_production_broilers_thsdtonnes * 1000' ,'source':'USDA'}
+      ,{'when':'euro_sl_est_broilers_thsdtonne' ,'value':'euro_sl_est_broilers_thsdtonne * 1000' ,'source':'Eurostat'}
+      ,{'when':'fao_production_chickens_tonnes' ,'source':'FAO'}   #!!! Assuming broilers
+   ]
+})
 gbads_chickens_merged['acc_headslaughtered'] = round(gbads_chickens_merged['acc_headslaughtered'])
 
-def create_acc_totalcarcweight_tonnes(INPUT_ROW):
-   # if INPUT_ROW['country'].upper() == 'UNITED KINGDOM':
-   #    OUTPUT = INPUT_ROW['ukgov_slaughter_broilers_carcwt_thsdtonnes'] * 1000
-   if pd.notnull(INPUT_ROW['ukgov_slaughter_broilers_carcwt_thsdtonnes']):
-      OUTPUT = INPUT_ROW['ukgov_slaughter_broilers_carcwt_thsdtonnes'] * 1000
-      OUTPUT_SOURCE = 'UK Gov'
-   elif pd.notnull(INPUT_ROW['usda_production_broilers_thsdtonnes']):
-      OUTPUT = INPUT_ROW['usda_production_broilers_thsdtonnes'] * 1000
-      OUTPUT_SOURCE = 'USDA'
-   elif pd.notnull(INPUT_ROW['euro_sl_est_broilers_thsdtonne']):
-      OUTPUT = INPUT_ROW['euro_sl_est_broilers_thsdtonne'] * 1000
-      OUTPUT_SOURCE = 'Eurostat'
-   elif pd.notnull(INPUT_ROW['fao_production_chickens_tonnes']):   #!!! Assuming broilers
-      OUTPUT = INPUT_ROW['fao_production_chickens_tonnes']
-      OUTPUT_SOURCE = 'FAO'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_totalcarcweight_tonnes' ,'acc_totalcarcweight_tonnes_src']] = gbads_chickens_merged.apply(create_acc_totalcarcweight_tonnes ,axis=1)
-
-def create_acc_avgcarcweight_kg(INPUT_ROW):
-   OUTPUT = INPUT_ROW['acc_totalcarcweight_tonnes'] * 1000 / INPUT_ROW['acc_headslaughtered']
-   return OUTPUT
-gbads_chickens_merged['acc_avgcarcweight_kg'] = gbads_chickens_merged.apply(create_acc_avgcarcweight_kg ,axis=1)
+gbads_chickens_merged['acc_avgcarcweight_kg'] = gbads_chickens_merged['acc_totalcarcweight_tonnes'] * 1000 / gbads_chickens_merged['acc_headslaughtered']
 
 # Have data on live weight for some countries
-# For others, calculate from carcass weight assuming an average yield
-def create_acc_avgliveweight_kg(
-      INPUT_ROW
-      ,AVG_CARC_YIELD=0.695   # Number [0,1]: average carcass yield in kg meat per kg live weight
-      ):
-   # UK
-   if pd.notnull(INPUT_ROW['ukgov_slaughter_broilers_avglivewt_kg']):
-      OUTPUT = INPUT_ROW['ukgov_slaughter_broilers_avglivewt_kg']
-      OUTPUT_SOURCE = 'UK Gov'
-   else:
-      # Don't want to assume a carcass yield at this point
-      # OUTPUT = INPUT_ROW['acc_avgcarcweight_kg'] / AVG_CARC_YIELD
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_avgliveweight_kg' ,'acc_avgliveweight_kg_src']] = gbads_chickens_merged.apply(create_acc_avgliveweight_kg ,axis=1)
+# For others, could calculate from carcass weight assuming an average yield (0.695 kg meat per kg live weight)
+# Don't want to assume a carcass yield at this point
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   'acc_avgliveweight_kg':[
+      # UK
+      {'when':'ukgov_slaughter_broilers_avglivewt_kg' ,'source':'UK Gov'}
+   ]
+})
 
 # ============================================================================
 #### Feed Consumption
 # ============================================================================
-def create_acc_feedconsumption_tonnes(INPUT_ROW):
-   # UK
-   if pd.notnull(INPUT_ROW['ukfeed_production_broiler_chicken_compounds_tonnes']):
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   'acc_feedconsumption_tonnes':[
+      # UK
       #!!! Assuming feed produced in UK is consumed in UK
-      OUTPUT = INPUT_ROW['ukfeed_production_broiler_chicken_compounds_tonnes']
-      OUTPUT_SOURCE = 'AHDB'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_feedconsumption_tonnes' ,'acc_feedconsumption_tonnes_src']] = gbads_chickens_merged.apply(create_acc_feedconsumption_tonnes ,axis=1)
+      {'when':'ukfeed_production_broiler_chicken_compounds_tonnes' ,'source':'AHDB'}
+   ]
+})
 
 # The team is uncomfortable assuming feed production is the same as feed consumption
 # Instead, back-calculate feed consumption from feed price and total expenditure
-def create_acc_feedconsumption_tonnes_2(INPUT_ROW):
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
+# gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{'acc_feedconsumption_tonnes':[]})
 
-def create_acc_fcr_live(INPUT_ROW):
-   OUTPUT = np.nan
-   OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-# gbads_chickens_merged[['acc_fcr_live' ,'acc_fcr_live_src']] = gbads_chickens_merged.apply(create_acc_fcr_live ,axis=1)
+# gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{'acc_fcr_live':[]})
 
 # Average feed intake per head
 # How much was eaten by the animals that died? Related to phase of life that the mortality occurred.
 # Head slaughtered is too small a denominator because some was eaten by animals that didn't make it to slaughter
 # Head placed is too large a denominator because not all those animals were eating the whole time
-def create_acc_avgfeedintake_adj_kgperhd(INPUT_ROW):
-   # Create adjusted feed consumption by removing some proportion of feed consumed by head that died
-   feedcnsm_headthatdied_prpn = 0.1  # [0,1]: proportion of total feed consumed by head that died
-   adj_feedconsumption_tonnes = INPUT_ROW['acc_feedconsumption_tonnes'] * (1 - feedcnsm_headthatdied_prpn)
-   OUTPUT = adj_feedconsumption_tonnes / INPUT_ROW['acc_headslaughtered'] * 1000
-   return OUTPUT
-# gbads_chickens_merged['acc_avgfeedintake_adj_kgperhd'] = gbads_chickens_merged.apply(create_acc_avgfeedintake_adj_kgperhd ,axis=1)
+# Create adjusted feed consumption by removing some proportion of feed consumed by head that died
+# feedcnsm_headthatdied_prpn = 0.1  # [0,1]: proportion of total feed consumed by head that died
+# gbads_chickens_merged['acc_avgfeedintake_adj_kgperhd'] = gbads_chickens_merged['acc_feedconsumption_tonnes'] * (1 - feedcnsm_headthatdied_prpn) \
+#    / gbads_chickens_merged['acc_headslaughtered'] * 1000
 
 # ============================================================================
 #### Producer Price and Feed Price
@@ -1518,57 +1243,31 @@ def addcol_constant_currency(INPUT_DF ,CURRENCY_COLUMN ,CPI_COLUMN):
     constant_currency = INPUT_DF[CURRENCY_COLUMN] * (100 / INPUT_DF[CPI_COLUMN])  # Will return constant currency for same year that CPI is indexed to
     return constant_currency
 
-def create_acc_feedprice_usdpertonne(INPUT_ROW):
-   # Eurostat
-   if pd.notnull(INPUT_ROW['euro_feed_bulk_broilers_priceper100kg_localcrncy']):
-      OUTPUT = INPUT_ROW['euro_feed_bulk_broilers_priceper100kg_localcrncy'] * 10 / INPUT_ROW['wb_exchangerate_lcuperusd']
-      OUTPUT_SOURCE = 'Eurostat'
-   # UK
-   elif pd.notnull(INPUT_ROW['ukfeed_feedprice_poultry_gbppertonne_wtavg']):
-      OUTPUT = INPUT_ROW['ukfeed_feedprice_poultry_gbppertonne_wtavg'] / INPUT_ROW['wb_exchangerate_lcuperusd']
-      OUTPUT_SOURCE = 'AHDB'
-   # USA
-   # elif INPUT_ROW['country'].upper() == 'UNITED STATES OF AMERICA':
-   #    OUTPUT = 350
-   #    OUTPUT_SOURCE = 'Expert opinion'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_feedprice_usdpertonne' ,'acc_feedprice_usdpertonne_src']] = gbads_chickens_merged.apply(create_acc_feedprice_usdpertonne ,axis=1)
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   'acc_feedprice_usdpertonne':[
+      # Eurostat
+      {'when':'euro_feed_bulk_broilers_priceper100kg_localcrncy' ,'value':'euro_feed_bulk_broilers_priceper100kg_localcrncy * 10 / wb_exchangerate_lcuperusd' ,'source':'Eurostat'}
+      # UK
+      ,{'when':'ukfeed_feedprice_poultry_gbppertonne_wtavg' ,'value':'ukfeed_feedprice_poultry_gbppertonne_wtavg / wb_exchangerate_lcuperusd' ,'source':'AHDB'}
+      # USA
+      # ,{'when':"country.str.upper() == 'UNITED STATES OF AMERICA'" ,'value':350 ,'source':'Expert opinion'}
+   ]
+   ,'acc_producerprice_usdperkgcarc':[
+      # FAO
+      {'when':'fao_producerprice_chickens_carcass_usdpertonne' ,'value':'fao_producerprice_chickens_carcass_usdpertonne / 1000' ,'source':'FAO'}
+      # Eurostat
+      # Want carcass price not live price!!
+      # ,{'when':'euro_chickens_live1stchoice_priceper100kg_euros' ,'value':'(euro_chickens_live1stchoice_priceper100kg_euros / 100) / wb_exchangerate_europerusd' ,'source':'Eurostat'}
+      # US
+      ,{'when':'usda_pricereceived_broilers_dollarsperkg' ,'source':'USDA'}
+   ]
+   ,'acc_chickprice_usdperhd':[
+      # William's cost spreadsheet
+      {'when':'glb_chickprice_perhd_usd' ,'source_col':'glb_source_y'}
+   ]
+})
 gbads_chickens_merged['acc_feedprice_usdpertonne_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_feedprice_usdpertonne' ,'wb_cpi_idx2010')
-
-def create_acc_producerprice_usdperkgcarc(INPUT_ROW):
-   # FAO
-   if pd.notnull(INPUT_ROW['fao_producerprice_chickens_carcass_usdpertonne']):
-      OUTPUT = INPUT_ROW['fao_producerprice_chickens_carcass_usdpertonne'] / 1000
-      OUTPUT_SOURCE = 'FAO'
-   # Eurostat
-   # Want carcass price not live price!!
-   # elif pd.notnull(INPUT_ROW['euro_chickens_live1stchoice_priceper100kg_euros']):
-   #     OUTPUT = (INPUT_ROW['euro_chickens_live1stchoice_priceper100kg_euros'] / 100) / INPUT_ROW['wb_exchangerate_europerusd']
-   #     OUTPUT_SOURCE = 'Eurostat'
-   # US
-   elif pd.notnull(INPUT_ROW['usda_pricereceived_broilers_dollarsperkg']):
-      OUTPUT = INPUT_ROW['usda_pricereceived_broilers_dollarsperkg']
-      OUTPUT_SOURCE = 'USDA'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_producerprice_usdperkgcarc' ,'acc_producerprice_usdperkgcarc_src']] = gbads_chickens_merged.apply(create_acc_producerprice_usdperkgcarc ,axis=1)
 gbads_chickens_merged['acc_producerprice_usdperkgcarc_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_producerprice_usdperkgcarc' ,'wb_cpi_idx2010')
-
-def create_acc_chickprice_usdperhd(INPUT_ROW):
-   # William's cost spreadsheet
-   if pd.notnull(INPUT_ROW['glb_chickprice_perhd_usd']):
-      OUTPUT = INPUT_ROW['glb_chickprice_perhd_usd']
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_chickprice_usdperhd' ,'acc_chickprice_usdperhd_src']] = gbads_chickens_merged.apply(create_acc_chickprice_usdperhd ,axis=1)
 gbads_chickens_merged['acc_chickprice_usdperhd_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_chickprice_usdperhd' ,'wb_cpi_idx2010')
 
 # ============================================================================
@@ -1576,77 +1275,20 @@ gbads_chickens_merged['acc_chickprice_usdperhd_cnst2010'] = addcol_constant_curr
 # ============================================================================
 #!!! Note these are per kg live weight rather than carcass weight because that
 # is how William calculated them.
-def create_acc_feedcost_usdperkglive(INPUT_ROW):
-   # William's cost spreadsheet
-   if pd.notnull(INPUT_ROW['glb_feedcost_perkglive_usd']):
-      OUTPUT = INPUT_ROW['glb_feedcost_perkglive_usd']
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_feedcost_usdperkglive' ,'acc_feedcost_usdperkglive_src']] = gbads_chickens_merged.apply(create_acc_feedcost_usdperkglive ,axis=1)
-gbads_chickens_merged['acc_feedcost_usdperkglive_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_feedcost_usdperkglive' ,'wb_cpi_idx2010')
-
-def create_acc_chickcost_usdperkglive(INPUT_ROW):
-   # William's cost spreadsheet
-   if pd.notnull(INPUT_ROW['glb_chickcost_perkglive_usd']):
-      OUTPUT = INPUT_ROW['glb_chickcost_perkglive_usd']
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_chickcost_usdperkglive' ,'acc_chickcost_usdperkglive_src']] = gbads_chickens_merged.apply(create_acc_chickcost_usdperkglive ,axis=1)
-gbads_chickens_merged['acc_chickcost_usdperkglive_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_chickcost_usdperkglive' ,'wb_cpi_idx2010')
-
-def create_acc_laborcost_usdperkglive(INPUT_ROW):
-   # William's cost spreadsheet
-   if pd.notnull(INPUT_ROW['glb_laborcost_perkglive_usd']):
-      OUTPUT = INPUT_ROW['glb_laborcost_perkglive_usd']
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_laborcost_usdperkglive' ,'acc_laborcost_usdperkglive_src']] = gbads_chickens_merged.apply(create_acc_laborcost_usdperkglive ,axis=1)
-gbads_chickens_merged['acc_laborcost_usdperkglive_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_laborcost_usdperkglive' ,'wb_cpi_idx2010')
-
-def create_acc_landhousingcost_usdperkglive(INPUT_ROW):
-   # William's cost spreadsheet
-   if pd.notnull(INPUT_ROW['glb_landhousingcost_perkglive_usd']):
-      OUTPUT = INPUT_ROW['glb_landhousingcost_perkglive_usd']
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_landhousingcost_usdperkglive' ,'acc_landhousingcost_usdperkglive_src']] = gbads_chickens_merged.apply(create_acc_landhousingcost_usdperkglive ,axis=1)
-gbads_chickens_merged['acc_landhousingcost_usdperkglive_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_landhousingcost_usdperkglive' ,'wb_cpi_idx2010')
-
-def create_acc_medcost_usdperkglive(INPUT_ROW):
-   # William's cost spreadsheet
-   if pd.notnull(INPUT_ROW['glb_medicinecost_perkglive_usd']):
-      OUTPUT = INPUT_ROW['glb_medicinecost_perkglive_usd']
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_medcost_usdperkglive' ,'acc_medcost_usdperkglive_src']] = gbads_chickens_merged.apply(create_acc_medcost_usdperkglive ,axis=1)
-gbads_chickens_merged['acc_medcost_usdperkglive_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_medcost_usdperkglive' ,'wb_cpi_idx2010')
-
-def create_acc_othercost_usdperkglive(INPUT_ROW):
-   # William's cost spreadsheet
-   if pd.notnull(INPUT_ROW['glb_othercost_perkglive_usd']):
-      OUTPUT = INPUT_ROW['glb_othercost_perkglive_usd']
-      OUTPUT_SOURCE = INPUT_ROW['glb_source_y']
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_chickens_merged[['acc_othercost_usdperkglive' ,'acc_othercost_usdperkglive_src']] = gbads_chickens_merged.apply(create_acc_othercost_usdperkglive ,axis=1)
-gbads_chickens_merged['acc_othercost_usdperkglive_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,'acc_othercost_usdperkglive' ,'wb_cpi_idx2010')
+# All from William's cost spreadsheet
+acc_cost_cols_glb = {
+   'acc_feedcost_usdperkglive':'glb_feedcost_perkglive_usd'
+   ,'acc_chickcost_usdperkglive':'glb_chickcost_perkglive_usd'
+   ,'acc_laborcost_usdperkglive':'glb_laborcost_perkglive_usd'
+   ,'acc_landhousingcost_usdperkglive':'glb_landhousingcost_perkglive_usd'
+   ,'acc_medcost_usdperkglive':'glb_medicinecost_perkglive_usd'
+   ,'acc_othercost_usdperkglive':'glb_othercost_perkglive_usd'
+}
+gbads_chickens_merged = coalesce.add_columns(gbads_chickens_merged ,{
+   ACC_COL:[{'when':GLB_COL ,'source_col':'glb_source_y'}] for ACC_COL ,GLB_COL in acc_cost_cols_glb.items()
+})
+for ACC_COL in acc_cost_cols_glb:
+   gbads_chickens_merged[f'{ACC_COL}_cnst2010'] = addcol_constant_currency(gbads_chickens_merged ,ACC_COL ,'wb_cpi_idx2010')
 
 # ============================================================================
 #### Datainfo
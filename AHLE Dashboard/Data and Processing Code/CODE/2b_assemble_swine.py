@@ -84,6 +84,10 @@ fao_pigs_tomerge = fao_pigs_tomerge.add_prefix('fao_')
 
 datainfo(fao_pigs_tomerge)
 
+# Tables to join onto this one. Each section below adds one, and all are joined
+# in one step in Join all sources.
+pigs_sources = {}
+
 #%% Merge Eurostat
 
 # ----------------------------------------------------------------------------
@@ -134,24 +138,10 @@ euro_pigcombo_tomerge = euro_pigcombo_tomerge.add_prefix('euro_')
 datainfo(euro_pigcombo_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = 1   # Initialize
-
-# Merge on country and year
-pigs_merged = pd.merge(
-   left=fao_pigs_tomerge
-   ,right=euro_pigcombo_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['euro_country_upcase' ,'euro_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['euro'] = {'data':euro_pigcombo_tomerge ,'country':'euro_country_upcase' ,'year':'euro_year'}
 
 #%% Merge USDA PSD
 # Pig meat and animal numbers
@@ -197,24 +187,10 @@ usda_psd_swinemeat_p_tomerge = usda_psd_swinemeat_p_tomerge.add_prefix('psd_')
 datainfo(usda_psd_swinemeat_p_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-pigs_merged = pd.merge(
-   left=pigs_merged
-   ,right=usda_psd_swinemeat_p_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['psd_country_upcase' ,'psd_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['psd'] = {'data':usda_psd_swinemeat_p_tomerge ,'country':'psd_country_upcase' ,'year':'psd_year'}
 
 #%% Merge USDA Swine
 
@@ -299,24 +275,10 @@ usda_swine_tomerge = usda_swine_tomerge.add_prefix('usda_')
 datainfo(usda_swine_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-pigs_merged = pd.merge(
-    left=pigs_merged
-    ,right=usda_swine_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['usda_country_upcase' ,'usda_year']
-    ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['usda'] = {'data':usda_swine_tomerge ,'country':'usda_country_upcase' ,'year':'usda_year'}
 
 #%% Merge Pig333 Production and Price
 # According to the site, data for European countries comes from Eurostat, which we are already using.
@@ -348,24 +310,10 @@ pig333_production_price_tomerge = pig333_production_price_tomerge.add_prefix('pi
 datainfo(pig333_production_price_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-pigs_merged = pd.merge(
-    left=pigs_merged
-    ,right=pig333_production_price_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['pig333_country_upcase' ,'pig333_year']
-    ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['pig333'] = {'data':pig333_production_price_tomerge ,'country':'pig333_country_upcase' ,'year':'pig333_year'}
 
 #%% Merge Eurostat Imports/Exports
 
@@ -477,24 +425,10 @@ euro_impexp_swine_tomerge = euro_impexp_swine_tomerge.add_prefix('euimp_')
 datainfo(euro_impexp_swine_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-pigs_merged = pd.merge(
-    left=pigs_merged
-    ,right=euro_impexp_swine_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['euimp_country_upcase' ,'euimp_year']
-    ,how='left'                        # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'     # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['euimp'] = {'data':euro_impexp_swine_tomerge ,'country':'euimp_country_upcase' ,'year':'euimp_year'}
 
 #%% Merge UN Comtrade Imports/Exports
 
@@ -538,24 +472,10 @@ uncomtrade_tomerge = uncomtrade_tomerge.add_prefix('uncom_')
 datainfo(uncomtrade_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-pigs_merged = pd.merge(
-   left=pigs_merged
-   ,right=uncomtrade_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['uncom_country_upcase' ,'uncom_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['uncom'] = {'data':uncomtrade_tomerge ,'country':'uncom_country_upcase' ,'year':'uncom_year'}
 
 #%% Merge UK Feed Price and Production
 
@@ -696,24 +616,10 @@ uk_feedprice_withprod_agg_tomerge = uk_feedprice_withprod_agg_tomerge.add_prefix
 datainfo(uk_feedprice_withprod_agg_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-pigs_merged = pd.merge(
-    left=pigs_merged
-    ,right=uk_feedprice_withprod_agg_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['ukfeed_country_upcase' ,'ukfeed_year']
-    ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['ukfeed'] = {'data':uk_feedprice_withprod_agg_tomerge ,'country':'ukfeed_country_upcase' ,'year':'ukfeed_year'}
 
 #%% Merge World Bank
 # Inflation, Exchange rate, and GDP
@@ -781,24 +687,10 @@ wb_infl_exchg_tomerge = wb_infl_exchg_tomerge.add_prefix('wb_')
 datainfo(wb_infl_exchg_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
-
-# Merge on country and year
-pigs_merged = pd.merge(
-    left=pigs_merged
-    ,right=wb_infl_exchg_tomerge
-    ,left_on=['fao_country_upcase' ,'fao_year']
-    ,right_on=['wb_country_upcase' ,'wb_year']
-    ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
-
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# Join on country and year
+pigs_sources['wb'] = {'data':wb_infl_exchg_tomerge ,'country':'wb_country_upcase' ,'year':'wb_year'}
 
 #%% Merge interPIG
 
@@ -918,24 +810,24 @@ interpig_combo_tomerge = interpig_combo_tomerge.add_prefix('ip_')
 datainfo(interpig_combo_tomerge)
 
 # ----------------------------------------------------------------------------
-# Merge
+# Add to sources to join
 # ----------------------------------------------------------------------------
-mergenum = mergenum + 1
+# Join on country and year
+pigs_sources['ip'] = {'data':interpig_combo_tomerge ,'country':'ip_country_upcase' ,'year':'ip_year'}
 
-# Merge on country and year
-pigs_merged = pd.merge(
-   left=pigs_merged
-   ,right=interpig_combo_tomerge
-   ,left_on=['fao_country_upcase' ,'fao_year']
-   ,right_on=['ip_country_upcase' ,'ip_year']
-   ,how='left'                              # String: 'inner', 'outer', 'left', 'right', or 'cross'. Note: 'left' and 'right' are equivalent to SQL 'left outer' and 'right outer' joins.
-   ,indicator=f'_merge_{mergenum}'          # True: Add column '_merge' indicating which table each row came from. String: e.g. '_merge1' to give this column a custom name.
-)
-pigs_merged[f'_merge_{mergenum}'].value_counts()          # Check number of rows from each table (requires indicator=True)
+#%% Join all sources
 
-# Save this merged version as separate dataframe
-exec(f"pigs_merged_{mergenum} = pigs_merged.copy()")
-exec(f"datainfo(pigs_merged_{mergenum})")
+# ----------------------------------------------------------------------------
+# Join
+# ----------------------------------------------------------------------------
+# Left join of every source onto FAO table on country and year
+pigs_merged ,pigs_sources_coverage = join_on_country_year(
+   fao_pigs_tomerge
+   ,'fao_country_upcase'
+   ,'fao_year'
+   ,pigs_sources
+)
+datainfo(pigs_merged)
 
 #%% Calcs and Reconciliation
 '''
@@ -961,6 +853,8 @@ except NameError:
   print('> Data frame loaded.')
 datainfo(gbads_pigs_merged)
 
+import _coalesce as coalesce      # Fills acc_ columns from a list of candidate sources
+
 # ============================================================================
 #### Key columns and basic cleanup
 # ============================================================================
@@ -984,41 +878,26 @@ datainfo(gbads_pigs_merged)
 # ============================================================================
 #### Imports/Exports
 # ============================================================================
-def create_acc_netimport_lt50kg(INPUT_ROW):
-   # Eurostat
-   if pd.notnull(INPUT_ROW['euimp_net_import_live_swine_nonbreeding_lt50kg_head']):
-      OUTPUT = INPUT_ROW['euimp_net_import_live_swine_nonbreeding_lt50kg_head']
-      OUTPUT_SOURCE = 'Eurostat'
-   # UN Comtrade
-   elif pd.notnull(INPUT_ROW['uncom_net_import_live_swine_lt50kg_head']):
-      OUTPUT = INPUT_ROW['uncom_net_import_live_swine_lt50kg_head']
-      OUTPUT_SOURCE = 'UN Comtrade'
-   # USDA FAS
-   #!!! Note FAS does not distinguish weight categories
-   elif pd.notnull(INPUT_ROW['psd_net_imports__1000_head_']):
-      OUTPUT = INPUT_ROW['psd_net_imports__1000_head_']
-      OUTPUT_SOURCE = 'USDA FAS'
-   else:
-      OUTPUT = 0   #!!! If no data, assume negligible
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_netimport_lt50kg' ,'acc_netimport_lt50kg_src']] = gbads_pigs_merged.apply(create_acc_netimport_lt50kg ,axis=1)
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_netimport_lt50kg':[
+      # Eurostat
+      {'when':'euimp_net_import_live_swine_nonbreeding_lt50kg_head' ,'source':'Eurostat'}
+      # UN Comtrade
+      ,{'when':'uncom_net_import_live_swine_lt50kg_head' ,'source':'UN Comtrade'}
+      # USDA FAS
+      #!!! Note FAS does not distinguish weight categories
+      ,{'when':'psd_net_imports__1000_head_' ,'source':'USDA FAS'}
+      ,{'value':0 ,'source':None}   #!!! If no data, assume negligible
+   ]
+   ,'acc_netimport_gte50kg':[
+      # Eurostat
+      {'when':'euimp_net_import_live_swine_nonbreeding_gte50kg_head' ,'source':'Eurostat'}
+      # UN Comtrade
+      ,{'when':'uncom_net_import_live_swine_gte50kg_head' ,'source':'UN Comtrade'}
+      ,{'value':0 ,'source':None}   #!!! If no data, assume negligible
+   ]
+})
 gbads_pigs_merged['acc_netimport_lt50kg'] = round(gbads_pigs_merged['acc_netimport_lt50kg'])
-
-def create_acc_netimport_gte50kg(INPUT_ROW):
-   # Eurostat
-   if pd.notnull(INPUT_ROW['euimp_net_import_live_swine_nonbreeding_gte50kg_head']):
-      OUTPUT = INPUT_ROW['euimp_net_import_live_swine_nonbreeding_gte50kg_head']
-      OUTPUT_SOURCE = 'Eurostat'
-   # UN Comtrade
-   elif pd.notnull(INPUT_ROW['uncom_net_import_live_swine_gte50kg_head']):
-      OUTPUT = INPUT_ROW['uncom_net_import_live_swine_gte50kg_head']
-      OUTPUT_SOURCE = 'UN Comtrade'
-   else:
-      OUTPUT = 0   #!!! If no data, assume negligible
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_netimport_gte50kg' ,'acc_netimport_gte50kg_src']] = gbads_pigs_merged.apply(create_acc_netimport_gte50kg ,axis=1)
 gbads_pigs_merged['acc_netimport_gte50kg'] = round(gbads_pigs_merged['acc_netimport_gte50kg'])
 
 # ============================================================================
@@ -1030,240 +909,136 @@ est_litters_persow_peryear = 2.3
 est_avg_litter_size = 12
 est_prewean_mortality = 0.14     # [0,1] Proportion of piglets that die before weaning
 
-def create_acc_breedingsows(INPUT_ROW):
-   # US
-   if pd.notnull(INPUT_ROW['usda_hogs_breeding_inventory_first_of_jun']):
-      OUTPUT = INPUT_ROW['usda_hogs_breeding_inventory_first_of_jun']
-      OUTPUT_SOURCE = 'USDA'
-   # EU
-   elif pd.notnull(INPUT_ROW['euro_breedingsows_gte50kg_jun_thsdhd']):
-      OUTPUT = INPUT_ROW['euro_breedingsows_gte50kg_jun_thsdhd'] * 1000
-      OUTPUT_SOURCE = 'Eurostat'
-   # USDA FAS
-   elif pd.notnull(INPUT_ROW['psd_sow_beginning_stocks__1000_head_']):
-      OUTPUT = INPUT_ROW['psd_sow_beginning_stocks__1000_head_'] * 1000
-      OUTPUT_SOURCE = 'USDA FAS'
-   # InterPIG
-   elif pd.notnull(INPUT_ROW['ip_breedingsownumbers000head_']):
-      OUTPUT = INPUT_ROW['ip_breedingsownumbers000head_'] * 1000
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_breedingsows' ,'acc_breedingsows_src']] = gbads_pigs_merged.apply(create_acc_breedingsows ,axis=1)
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_breedingsows':[
+      # US
+      {'when':'usda_hogs_breeding_inventory_first_of_jun' ,'source':'USDA'}
+      # EU
+      ,{'when':'euro_breedingsows_gte50kg_jun_thsdhd' ,'value':'euro_breedingsows_gte50kg_jun_thsdhd * 1000' ,'source':'Eurostat'}
+      # USDA FAS
+      ,{'when':'psd_sow_beginning_stocks__1000_head_' ,'value':'psd_sow_beginning_stocks__1000_head_ * 1000' ,'source':'USDA FAS'}
+      # InterPIG
+      ,{'when':'ip_breedingsownumbers000head_' ,'value':'ip_breedingsownumbers000head_ * 1000' ,'source':'interPIG'}
+   ]
+})
 gbads_pigs_merged['acc_breedingsows'] = round(gbads_pigs_merged['acc_breedingsows'])
 
-def create_acc_litters_persow_peryear(INPUT_ROW):
-   if pd.notnull(INPUT_ROW['ip_litterssowyear']):
-      OUTPUT = INPUT_ROW['ip_litterssowyear']   # If present in data
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = est_litters_persow_peryear
-      OUTPUT_SOURCE = 'Average'
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_litters_persow_peryear' ,'acc_litters_persow_peryear_src']] = gbads_pigs_merged.apply(create_acc_litters_persow_peryear ,axis=1)
-
-def create_acc_pigsperlitter(INPUT_ROW):
-   # US
-   if pd.notnull(INPUT_ROW['usda_hogs_pigsperlitter']):
-      OUTPUT = INPUT_ROW['usda_hogs_pigsperlitter']
-      OUTPUT_SOURCE = 'USDA'
-   else:
-      OUTPUT = est_avg_litter_size
-      OUTPUT_SOURCE = 'Average'
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_pigsperlitter' ,'acc_pigsperlitter_src']] = gbads_pigs_merged.apply(create_acc_pigsperlitter ,axis=1)
-
-def create_acc_headfarrowed(INPUT_ROW):
-    # US
-    if pd.notnull(INPUT_ROW['usda_hogs_pigsperlitter']):
-      OUTPUT = INPUT_ROW['acc_breedingsows'] \
-          * INPUT_ROW['usda_hogs_pigsperlitter'] \
-            * INPUT_ROW['acc_litters_persow_peryear']
-      OUTPUT_SOURCE = 'USDA'
-    # EU
-    elif pd.notnull(INPUT_ROW['euro_breedingsows_gte50kg_jun_thsdhd']):
-      OUTPUT = INPUT_ROW['euro_breedingsows_gte50kg_jun_thsdhd'] * 1000 \
-          * est_avg_litter_size \
-            * INPUT_ROW['acc_litters_persow_peryear']
-      OUTPUT_SOURCE = 'Eurostat'
-    # USDA FAS
-    elif pd.notnull(INPUT_ROW['psd_sow_beginning_stocks__1000_head_']):
-      OUTPUT = INPUT_ROW['psd_sow_beginning_stocks__1000_head_'] * 1000 \
-          * est_avg_litter_size \
-            * INPUT_ROW['acc_litters_persow_peryear']
-      OUTPUT_SOURCE = 'USDA FAS'
-    else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-    return pd.Series([OUTPUT ,OUTPUT_SOURCE])
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_litters_persow_peryear':[
+      {'when':'ip_litterssowyear' ,'source':'interPIG'}   # If present in data
+      ,{'value':est_litters_persow_peryear ,'source':'Average'}
+   ]
+   ,'acc_pigsperlitter':[
+      # US
+      {'when':'usda_hogs_pigsperlitter' ,'source':'USDA'}
+      ,{'value':est_avg_litter_size ,'source':'Average'}
+   ]
+})
+
 # No longer using head farrowed
-# gbads_pigs_merged[['acc_headfarrowed' ,'acc_headfarrowed_src']] = gbads_pigs_merged.apply(create_acc_headfarrowed ,axis=1)
+# gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+#    'acc_headfarrowed':[
+#       # US
+#       {'when':'usda_hogs_pigsperlitter' ,'value':'acc_breedingsows * usda_hogs_pigsperlitter * acc_litters_persow_peryear' ,'source':'USDA'}
+#       # EU
+#       ,{'when':'euro_breedingsows_gte50kg_jun_thsdhd' ,'value':f'euro_breedingsows_gte50kg_jun_thsdhd * 1000 * {est_avg_litter_size} * acc_litters_persow_peryear' ,'source':'Eurostat'}
+#       # USDA FAS
+#       ,{'when':'psd_sow_beginning_stocks__1000_head_' ,'value':f'psd_sow_beginning_stocks__1000_head_ * 1000 * {est_avg_litter_size} * acc_litters_persow_peryear' ,'source':'USDA FAS'}
+#    ]
+# })
 # gbads_pigs_merged['acc_headfarrowed'] = round(gbads_pigs_merged['acc_headfarrowed'])
 
-def create_acc_headweaned(INPUT_ROW):
-   if pd.notnull(INPUT_ROW['ip_pigsweanedsowyear']):
-      OUTPUT = INPUT_ROW['acc_breedingsows'] * INPUT_ROW['ip_pigsweanedsowyear']
-   else:
-      OUTPUT = INPUT_ROW['acc_breedingsows'] * INPUT_ROW['acc_litters_persow_peryear'] \
-         * INPUT_ROW['acc_pigsperlitter'] * (1 - est_prewean_mortality)
-   return OUTPUT
-gbads_pigs_merged['acc_headweaned'] = gbads_pigs_merged.apply(create_acc_headweaned ,axis=1)
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_headweaned':[
+      {'when':'ip_pigsweanedsowyear' ,'value':'acc_breedingsows * ip_pigsweanedsowyear'}
+      ,{'value':f'acc_breedingsows * acc_litters_persow_peryear * acc_pigsperlitter * (1 - {est_prewean_mortality})'}
+   ]
+} ,SOURCE_COLS=False)
 gbads_pigs_merged['acc_headweaned'] = round(gbads_pigs_merged['acc_headweaned'])
 
 # Idea: all adjustments to head count are built into head placed:
 # - Imports/exports of piglets
 # - Imports/exports of mature pigs
 # - Changes in stocks
-def create_acc_headplaced(INPUT_ROW):
-   OUTPUT = INPUT_ROW['acc_headweaned'] + INPUT_ROW['acc_netimport_lt50kg'] + INPUT_ROW['acc_netimport_gte50kg']
-   return OUTPUT
-gbads_pigs_merged['acc_headplaced'] = gbads_pigs_merged.apply(create_acc_headplaced ,axis=1)
+gbads_pigs_merged['acc_headplaced'] = gbads_pigs_merged['acc_headweaned'] + gbads_pigs_merged['acc_netimport_lt50kg'] + gbads_pigs_merged['acc_netimport_gte50kg']
 gbads_pigs_merged['acc_headplaced'] = round(gbads_pigs_merged['acc_headplaced'])
 
 # ============================================================================
 #### Head Slaughtered, Carcass & Live Weight
 # ============================================================================
-def create_acc_headslaughtered(INPUT_ROW):
-   # FAO
-   if pd.notnull(INPUT_ROW['fao_slaughtered_pigs_hd']):
-      OUTPUT = INPUT_ROW['fao_slaughtered_pigs_hd']
-      OUTPUT_SOURCE = 'FAO'
-   # Eurostat
-   elif pd.notnull(INPUT_ROW['euro_sl_pigmeat_thsdhd']):
-      OUTPUT = INPUT_ROW['euro_sl_pigmeat_thsdhd'] * 1000
-      OUTPUT_SOURCE = 'Eurostat'
-   # interPIG
-   elif pd.notnull(INPUT_ROW['ip_annualpigslaughterings000head_']):
-      OUTPUT = INPUT_ROW['ip_annualpigslaughterings000head_'] * 1000
-      OUTPUT_SOURCE = 'interPIG'
-   # US
-   elif pd.notnull(INPUT_ROW['usda_hogs_slaughter_hd']):
-      OUTPUT = INPUT_ROW['usda_hogs_slaughter_hd']
-      OUTPUT_SOURCE = 'USDA'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_headslaughtered' ,'acc_headslaughtered_src']] = gbads_pigs_merged.apply(create_acc_headslaughtered ,axis=1)
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_headslaughtered':[
+      # FAO
+      {'when':'fao_slaughtered_pigs_hd' ,'source':'FAO'}
+      # Eurostat
+      ,{'when':'euro_sl_pigmeat_thsdhd' ,'value':'euro_sl_pigmeat_thsdhd * 1000' ,'source':'Eurostat'}
+      # interPIG
+      ,{'when':'ip_annualpigslaughterings000head_' ,'value':'ip_annualpigslaughterings000head_ * 1000' ,'source':'interPIG'}
+      # US
+      ,{'when':'usda_hogs_slaughter_hd' ,'source':'USDA'}
+   ]
+   ,'acc_totalcarcweight_tonnes':[
+      # FAO
+      {'when':'fao_production_pigs_tonnes' ,'source':'FAO'}
+      # Eurostat
+      ,{'when':'euro_sl_pigmeat_thsdtonne' ,'value':'euro_sl_pigmeat_thsdtonne * 1000' ,'source':'Eurostat'}
+      # interPIG
+      ,{'when':'ip_pigmeatproduction000tonnes_' ,'value':'ip_pigmeatproduction000tonnes_ * 1000' ,'source':'interPIG'}
+      # US
+      ,{'when':'usda_hogs_production_kg' ,'value':'usda_hogs_production_kg / 1000' ,'source':'USDA'}
+   ]
+})
 gbads_pigs_merged['acc_headslaughtered'] = round(gbads_pigs_merged['acc_headslaughtered'])
 
-def create_acc_totalcarcweight_tonnes(INPUT_ROW):
-   # FAO
-   if pd.notnull(INPUT_ROW['fao_production_pigs_tonnes']):
-      OUTPUT = INPUT_ROW['fao_production_pigs_tonnes']
-      OUTPUT_SOURCE = 'FAO'
-   # Eurostat
-   elif pd.notnull(INPUT_ROW['euro_sl_pigmeat_thsdtonne']):
-      OUTPUT = INPUT_ROW['euro_sl_pigmeat_thsdtonne'] * 1000
-      OUTPUT_SOURCE = 'Eurostat'
-   # interPIG
-   elif pd.notnull(INPUT_ROW['ip_pigmeatproduction000tonnes_']):
-      OUTPUT = INPUT_ROW['ip_pigmeatproduction000tonnes_'] * 1000
-      OUTPUT_SOURCE = 'interPIG'
-   # US
-   elif pd.notnull(INPUT_ROW['usda_hogs_production_kg']):
-      OUTPUT = INPUT_ROW['usda_hogs_production_kg'] / 1000
-      OUTPUT_SOURCE = 'USDA'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_totalcarcweight_tonnes' ,'acc_totalcarcweight_tonnes_src']] = gbads_pigs_merged.apply(create_acc_totalcarcweight_tonnes ,axis=1)
-
-def create_acc_avgcarcweight_kg(INPUT_ROW):
-   OUTPUT = INPUT_ROW['acc_totalcarcweight_tonnes'] * 1000 / INPUT_ROW['acc_headslaughtered']
-   return OUTPUT
-gbads_pigs_merged['acc_avgcarcweight_kg'] = gbads_pigs_merged.apply(create_acc_avgcarcweight_kg ,axis=1)
-
-def create_acc_avgliveweight_kg(
-      INPUT_ROW
-      # ,AVG_CARC_YIELD=0.75   # Float [0,1]: average carcass yield in kg meat per kg live weight
-      ):
-   # interPIG
-   if pd.notnull(INPUT_ROW['ip_averageliveweightatslaughterkg']):
-      OUTPUT = INPUT_ROW['ip_averageliveweightatslaughterkg']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_avgliveweight_kg' ,'acc_avgliveweight_kg_src']] = gbads_pigs_merged.apply(create_acc_avgliveweight_kg ,axis=1)
+gbads_pigs_merged['acc_avgcarcweight_kg'] = gbads_pigs_merged['acc_totalcarcweight_tonnes'] * 1000 / gbads_pigs_merged['acc_headslaughtered']
+
+# Not calculating from carcass weight with an average carcass yield (0.75 kg meat per kg live weight)
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_avgliveweight_kg':[
+      # interPIG
+      {'when':'ip_averageliveweightatslaughterkg' ,'source':'interPIG'}
+   ]
+})
 
 # ============================================================================
 #### Feed Consumption
 # ============================================================================
-def create_acc_feedconsumption_tonnes(INPUT_ROW):
-   # UK
-   if pd.notnull(INPUT_ROW['ukfeed_production_total_pig_feed_exclbreeding_thsdtonnes']):
-      #!!! Assuming feed produced in UK is consumed in UK
-      OUTPUT = INPUT_ROW['ukfeed_production_total_pig_feed_exclbreeding_thsdtonnes'] * 1000
-      OUTPUT_SOURCE = 'AHDB'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-# gbads_pigs_merged[['acc_feedconsumption_tonnes' ,'acc_feedconsumption_tonnes_src']] = gbads_pigs_merged.apply(create_acc_feedconsumption_tonnes ,axis=1)
+# UK
+#!!! Assuming feed produced in UK is consumed in UK
+# gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+#    'acc_feedconsumption_tonnes':[
+#       {'when':'ukfeed_production_total_pig_feed_exclbreeding_thsdtonnes' ,'value':'ukfeed_production_total_pig_feed_exclbreeding_thsdtonnes * 1000' ,'source':'AHDB'}
+#    ]
+# })
 
 # The team is uncomfortable assuming feed production is the same as feed consumption
 # Instead, back-calculate feed consumption from feed price and total expenditure
-def create_acc_feedconsumption_tonnes_2(INPUT_ROW):
-   # InterPIG
-   if pd.notnull(INPUT_ROW['ip_totalfeed_tonnes']):
-      OUTPUT = INPUT_ROW['ip_totalfeed_tonnes']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_feedconsumption_tonnes' ,'acc_feedconsumption_tonnes_src']] = gbads_pigs_merged.apply(create_acc_feedconsumption_tonnes_2 ,axis=1)
-
-def create_acc_fcr_carc(INPUT_ROW):
-   # InterPIG
-   if pd.notnull(INPUT_ROW['ip_fcr_carc']):
-      OUTPUT = INPUT_ROW['ip_fcr_carc']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_fcr_carc' ,'acc_fcr_carc_src']] = gbads_pigs_merged.apply(create_acc_fcr_carc ,axis=1)
-
-def create_acc_fcr_live(INPUT_ROW):
-   # InterPIG
-   if pd.notnull(INPUT_ROW['ip_fcr_live']):
-      OUTPUT = INPUT_ROW['ip_fcr_live']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_fcr_live' ,'acc_fcr_live_src']] = gbads_pigs_merged.apply(create_acc_fcr_live ,axis=1)
-
-def create_acc_avgfeedintake_kgperhd(INPUT_ROW):
-   # InterPIG
-   if pd.notnull(INPUT_ROW['ip_feedperhead_kg']):
-      OUTPUT = INPUT_ROW['ip_feedperhead_kg']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_avgfeedintake_kgperhd' ,'acc_avgfeedintake_kgperhd_src']] = gbads_pigs_merged.apply(create_acc_avgfeedintake_kgperhd ,axis=1)
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_feedconsumption_tonnes':[
+      # InterPIG
+      {'when':'ip_totalfeed_tonnes' ,'source':'interPIG'}
+   ]
+   ,'acc_fcr_carc':[
+      # InterPIG
+      {'when':'ip_fcr_carc' ,'source':'interPIG'}
+   ]
+   ,'acc_fcr_live':[
+      # InterPIG
+      {'when':'ip_fcr_live' ,'source':'interPIG'}
+   ]
+   ,'acc_avgfeedintake_kgperhd':[
+      # InterPIG
+      {'when':'ip_feedperhead_kg' ,'source':'interPIG'}
+   ]
+})
 
 # Average feed intake per head
 # How much was eaten by the animals that died? Related to phase of life that the mortality occurred.
 # Head slaughtered is too small a denominator because some was eaten by animals that didn't make it to slaughter
 # Head placed is too large a denominator because not all those animals were eating the whole time
-def create_acc_avgfeedintake_adj_kgperhd(
-      INPUT_ROW
-      ,PRPN_FEEDCNSM_DEAD=0.1  # [0,1]: proportion of total feed consumed by head that died
-      ):
-   adj_feedconsumption_tonnes = INPUT_ROW['acc_feedconsumption_tonnes'] * (1 - PRPN_FEEDCNSM_DEAD)
-   OUTPUT = adj_feedconsumption_tonnes / INPUT_ROW['acc_headslaughtered'] * 1000
-   return OUTPUT
-# gbads_pigs_merged['acc_avgfeedintake_adj_kgperhd'] = gbads_pigs_merged.apply(create_acc_avgfeedintake_adj_kgperhd ,axis=1)
+# prpn_feedcnsm_dead = 0.1  # [0,1]: proportion of total feed consumed by head that died
+# gbads_pigs_merged['acc_avgfeedintake_adj_kgperhd'] = gbads_pigs_merged['acc_feedconsumption_tonnes'] * (1 - prpn_feedcnsm_dead) \
+#    / gbads_pigs_merged['acc_headslaughtered'] * 1000
 
 # Alternative average feed intake, estimating the feed consumed by animals that died,
 # according to mortality rates and average weights in each phase of growout using the PIC standard.
@@ -1291,126 +1066,58 @@ def addcol_constant_currency(INPUT_DF ,CURRENCY_COLUMN ,CPI_COLUMN):
     constant_currency = INPUT_DF[CURRENCY_COLUMN] * (100 / INPUT_DF[CPI_COLUMN])  # Will return constant currency for same year that CPI is indexed to
     return constant_currency
 
-def create_acc_feedprice_usdpertonne(INPUT_ROW):
-   # Eurostat
-   if pd.notnull(INPUT_ROW['euro_feed_bulk_fatteningpigs_priceper100kg_localcrncy']):
-      OUTPUT = INPUT_ROW['euro_feed_bulk_fatteningpigs_priceper100kg_localcrncy'] * 10 / INPUT_ROW['wb_exchangerate_lcuperusd']
-      OUTPUT_SOURCE = 'Eurostat'
-   # UK
-   elif pd.notnull(INPUT_ROW['ukfeed_feedprice_pig_gbppertonne_wtavg']):
-      OUTPUT = INPUT_ROW['ukfeed_feedprice_pig_gbppertonne_wtavg'] / INPUT_ROW['wb_exchangerate_gbpperusd']
-      OUTPUT_SOURCE = 'AHDB'
-   # interPIG
-   elif pd.notnull(INPUT_ROW['ip_averagefarmfeedprice_europertonne']):
-      OUTPUT = INPUT_ROW['ip_averagefarmfeedprice_europertonne'] / INPUT_ROW['wb_exchangerate_europerusd']
-      OUTPUT_SOURCE = 'interPIG'
-   # interPIG alternative: back-calculate from feed cost per kg carcass weight
-   # This ensures feed price is consistent with feed cost per kg carcass weight
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_feedprice_usdpertonne' ,'acc_feedprice_usdpertonne_src']] = gbads_pigs_merged.apply(create_acc_feedprice_usdpertonne ,axis=1)
-gbads_pigs_merged['acc_feedprice_usdpertonne_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_feedprice_usdpertonne' ,'wb_cpi_idx2010')
-
-def create_acc_producerprice_usdperkgcarc(INPUT_ROW):
-   # FAO
-   if pd.notnull(INPUT_ROW['fao_producerprice_pigs_carcass_usdpertonne']):
-      OUTPUT = INPUT_ROW['fao_producerprice_pigs_carcass_usdpertonne'] / 1000
-      OUTPUT_SOURCE = 'FAO'
-   # Eurostat
-   elif pd.notnull(INPUT_ROW['euro_pigs_grade1_carcass_priceper100kg_euros']):
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   'acc_feedprice_usdpertonne':[
+      # Eurostat
+      {'when':'euro_feed_bulk_fatteningpigs_priceper100kg_localcrncy' ,'value':'euro_feed_bulk_fatteningpigs_priceper100kg_localcrncy * 10 / wb_exchangerate_lcuperusd' ,'source':'Eurostat'}
+      # UK
+      ,{'when':'ukfeed_feedprice_pig_gbppertonne_wtavg' ,'value':'ukfeed_feedprice_pig_gbppertonne_wtavg / wb_exchangerate_gbpperusd' ,'source':'AHDB'}
+      # interPIG
+      ,{'when':'ip_averagefarmfeedprice_europertonne' ,'value':'ip_averagefarmfeedprice_europertonne / wb_exchangerate_europerusd' ,'source':'interPIG'}
+      # interPIG alternative: back-calculate from feed cost per kg carcass weight
+      # This ensures feed price is consistent with feed cost per kg carcass weight
+   ]
+   ,'acc_producerprice_usdperkgcarc':[
+      # FAO
+      {'when':'fao_producerprice_pigs_carcass_usdpertonne' ,'value':'fao_producerprice_pigs_carcass_usdpertonne / 1000' ,'source':'FAO'}
+      # Eurostat
       # Second price not used: 'euro_pigs_grade2_carcass_priceper100kg_euros'
-      OUTPUT = (INPUT_ROW['euro_pigs_grade1_carcass_priceper100kg_euros'] / 100) / INPUT_ROW['wb_exchangerate_europerusd']
-      OUTPUT_SOURCE = 'Eurostat'
-   # US
-   elif pd.notnull(INPUT_ROW['usda_hogs_pricerecvd_dolpercwt']):
-      OUTPUT = (INPUT_ROW['usda_hogs_pricerecvd_dolpercwt'] / 100) * uc.lbs_per_kg
-      OUTPUT_SOURCE = 'USDA'
-   # Pig333
-   elif pd.notnull(INPUT_ROW['pig333_pigprice_mean_lcuperkg']):
-      OUTPUT = INPUT_ROW['pig333_pigprice_mean_lcuperkg'] / INPUT_ROW['wb_exchangerate_lcuperusd']
-      OUTPUT_SOURCE = 'Pig333'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_producerprice_usdperkgcarc' ,'acc_producerprice_usdperkgcarc_src']] = gbads_pigs_merged.apply(create_acc_producerprice_usdperkgcarc ,axis=1)
+      ,{'when':'euro_pigs_grade1_carcass_priceper100kg_euros' ,'value':'(euro_pigs_grade1_carcass_priceper100kg_euros / 100) / wb_exchangerate_europerusd' ,'source':'Eurostat'}
+      # US
+      ,{'when':'usda_hogs_pricerecvd_dolpercwt' ,'value':f'(usda_hogs_pricerecvd_dolpercwt / 100) * {uc.lbs_per_kg}' ,'source':'USDA'}
+      # Pig333
+      ,{'when':'pig333_pigprice_mean_lcuperkg' ,'value':'pig333_pigprice_mean_lcuperkg / wb_exchangerate_lcuperusd' ,'source':'Pig333'}
+   ]
+   ,'acc_pigletprice_usdperkg':[
+      # Eurostat
+      {'when':'euro_piglets_live_priceper100kg_euros' ,'value':'(euro_piglets_live_priceper100kg_euros / 100) / wb_exchangerate_europerusd' ,'source':'Eurostat'}
+   ]
+})
+gbads_pigs_merged['acc_feedprice_usdpertonne_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_feedprice_usdpertonne' ,'wb_cpi_idx2010')
 gbads_pigs_merged['acc_producerprice_usdperkgcarc_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_producerprice_usdperkgcarc' ,'wb_cpi_idx2010')
-
-def create_acc_pigletprice_usdperkg(INPUT_ROW):
-   # Eurostat
-   if pd.notnull(INPUT_ROW['euro_piglets_live_priceper100kg_euros']):
-      OUTPUT = (INPUT_ROW['euro_piglets_live_priceper100kg_euros'] / 100) / INPUT_ROW['wb_exchangerate_europerusd']
-      OUTPUT_SOURCE = 'Eurostat'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_pigletprice_usdperkg' ,'acc_pigletprice_usdperkg_src']] = gbads_pigs_merged.apply(create_acc_pigletprice_usdperkg ,axis=1)
 gbads_pigs_merged['acc_pigletprice_usdperkg_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_pigletprice_usdperkg' ,'wb_cpi_idx2010')
 
 # ============================================================================
 #### Costs
 # ============================================================================
-def create_acc_feedcost_usdperkgcarc(INPUT_ROW):
-   # interPIG
-   if pd.notnull(INPUT_ROW['ip_feed_gbpperkgcarc']):
-      OUTPUT = INPUT_ROW['ip_feed_gbpperkgcarc'] / INPUT_ROW['wb_exchangerate_gbpperusd']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_feedcost_usdperkgcarc' ,'acc_feedcost_usdperkgcarc_src']] = gbads_pigs_merged.apply(create_acc_feedcost_usdperkgcarc ,axis=1)
-gbads_pigs_merged['acc_feedcost_usdperkgcarc_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_feedcost_usdperkgcarc' ,'wb_cpi_idx2010')
-
-def create_acc_nonfeedvariablecost_usdperkgcarc(INPUT_ROW):
-   # interPIG
-   if pd.notnull(INPUT_ROW['ip_othervariablecosts_gbpperkgcarc']):
-      OUTPUT = INPUT_ROW['ip_othervariablecosts_gbpperkgcarc'] / INPUT_ROW['wb_exchangerate_gbpperusd']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_nonfeedvariablecost_usdperkgcarc' ,'acc_nonfeedvariablecost_usdperkgcarc_src']] = gbads_pigs_merged.apply(create_acc_nonfeedvariablecost_usdperkgcarc ,axis=1)
-gbads_pigs_merged['acc_nonfeedvariablecost_usdperkgcarc_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_nonfeedvariablecost_usdperkgcarc' ,'wb_cpi_idx2010')
-
-def create_acc_pigletcost_usdperkgcarc(
-      INPUT_ROW
-      ,AVG_PIGLETWEIGHT_KG=7
-      ):
-   OUTPUT = INPUT_ROW['acc_headplaced'] * INPUT_ROW['acc_pigletprice_usdperkg'] * AVG_PIGLETWEIGHT_KG \
-      / (INPUT_ROW['acc_totalcarcweight_tonnes'] * 1000)
-   return OUTPUT
-gbads_pigs_merged['acc_pigletcost_usdperkgcarc'] = gbads_pigs_merged.apply(create_acc_pigletcost_usdperkgcarc ,axis=1)
+# From interPIG, converted from GBP
+acc_cost_cols_ip = {
+   'acc_feedcost_usdperkgcarc':'ip_feed_gbpperkgcarc'
+   ,'acc_nonfeedvariablecost_usdperkgcarc':'ip_othervariablecosts_gbpperkgcarc'
+   ,'acc_laborcost_usdperkgcarc':'ip_labour_gbpperkgcarc'
+   ,'acc_landhousingcost_usdperkgcarc':'ip_depreciationandfinance_gbpperkgcarc'
+}
+gbads_pigs_merged = coalesce.add_columns(gbads_pigs_merged ,{
+   ACC_COL:[{'when':IP_COL ,'value':f'{IP_COL} / wb_exchangerate_gbpperusd' ,'source':'interPIG'}] for ACC_COL ,IP_COL in acc_cost_cols_ip.items()
+})
+for ACC_COL in acc_cost_cols_ip:
+   gbads_pigs_merged[f'{ACC_COL}_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,ACC_COL ,'wb_cpi_idx2010')
+
+avg_pigletweight_kg = 7
+gbads_pigs_merged['acc_pigletcost_usdperkgcarc'] = gbads_pigs_merged['acc_headplaced'] * gbads_pigs_merged['acc_pigletprice_usdperkg'] * avg_pigletweight_kg \
+   / (gbads_pigs_merged['acc_totalcarcweight_tonnes'] * 1000)
 gbads_pigs_merged['acc_pigletcost_usdperkgcarc_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_pigletcost_usdperkgcarc' ,'wb_cpi_idx2010')
 
-def create_acc_laborcost_usdperkgcarc(INPUT_ROW):
-   # interPIG
-   if pd.notnull(INPUT_ROW['ip_labour_gbpperkgcarc']):
-      OUTPUT = INPUT_ROW['ip_labour_gbpperkgcarc'] / INPUT_ROW['wb_exchangerate_gbpperusd']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_laborcost_usdperkgcarc' ,'acc_laborcost_usdperkgcarc_src']] = gbads_pigs_merged.apply(create_acc_laborcost_usdperkgcarc ,axis=1)
-gbads_pigs_merged['acc_laborcost_usdperkgcarc_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_laborcost_usdperkgcarc' ,'wb_cpi_idx2010')
-
-def create_acc_landhousingcost_usdperkgcarc(INPUT_ROW):
-   # interPIG
-   if pd.notnull(INPUT_ROW['ip_depreciationandfinance_gbpperkgcarc']):
-      OUTPUT = INPUT_ROW['ip_depreciationandfinance_gbpperkgcarc'] / INPUT_ROW['wb_exchangerate_gbpperusd']
-      OUTPUT_SOURCE = 'interPIG'
-   else:
-      OUTPUT = np.nan
-      OUTPUT_SOURCE = None
-   return pd.Series([OUTPUT ,OUTPUT_SOURCE])
-gbads_pigs_merged[['acc_landhousingcost_usdperkgcarc' ,'acc_landhousingcost_usdperkgcarc_src']] = gbads_pigs_merged.apply(create_acc_landhousingcost_usdperkgcarc ,axis=1)
-gbads_pigs_merged['acc_landhousingcost_usdperkgcarc_cnst2010'] = addcol_constant_currency(gbads_pigs_merged ,'acc_landhousingcost_usdperkgcarc' ,'wb_cpi_idx2010')
-
 # ============================================================================
 #### Datainfo
 # ============================================================================
@@ -0,0 +1,87 @@
+#%% About
+'''
+This builds the accepted (acc_) columns of the assemble scripts from a list of
+candidate sources, taking the first candidate that applies to each row.
+
+Each candidate is a dictionary:
+   'when':   condition for the candidate to apply. Either a column name, which
+             applies where the column is non-missing, or an expression for
+             DataFrame.eval() that returns True or False, e.g.
+             "country.str.upper() == 'CHINA'". Omit to apply to all rows
+             (use as the last candidate for a default).
+   'value':  value to use. A column name, an expression for DataFrame.eval()
+             e.g. "euro_sl_est_broilers_thsdhd * 1000", or a number.
+             Defaults to the 'when' column.
+   'source': label saved in the source column, e.g. 'Eurostat'. Default None.
+   'source_col': column to take the label from instead, e.g. 'glb_source_y'.
+
+Candidates are evaluated on whole columns, so the time taken does not grow with
+the number of countries and years the way DataFrame.apply(axis=1) does.
+
+Usage:
+   import _coalesce as coalesce
+   df = coalesce.add_columns(df ,{
+      'acc_headslaughtered':[
+         {'when':'ukgov_slaughter_broilers_thsdhd' ,'value':'ukgov_slaughter_broilers_thsdhd * 1000' ,'source':'UK Gov'}
+         ,{'when':'fao_slaughtered_chickens_thsdhd' ,'value':'fao_slaughtered_chickens_thsdhd * 1000' ,'source':'FAO'}
+      ]
+   })
+'''
+#%% Libraries
+
+import numpy as np
+import pandas as pd
+
+#%% Functions
+
+# Evaluate a column name, expression, or number on the whole data frame
+# Returns a numpy array with one value per row
+def _evaluate(INPUT_DF ,EXPRESSION):
+   if isinstance(EXPRESSION ,str):
+      if EXPRESSION in INPUT_DF.columns:
+         result = INPUT_DF[EXPRESSION]
+      else:
+         result = INPUT_DF.eval(EXPRESSION ,engine='python')
+   else:
+      result = EXPRESSION
+   return np.broadcast_to(np.asarray(result) ,(len(INPUT_DF) ,))
+
+# Rows where a candidate applies
+def _condition(INPUT_DF ,WHEN):
+   if WHEN is None:
+      return np.ones(len(INPUT_DF) ,dtype=bool)
+   if WHEN in INPUT_DF.columns:
+      return INPUT_DF[WHEN].notnull().to_numpy()
+   return _evaluate(INPUT_DF ,WHEN).astype(bool)
+
+# Value and source for each row from the first candidate that applies
+# CANDIDATES: list of dictionaries, see About
+# Returns two series with the same index as INPUT_DF: values (float) and sources (object, None where no candidate applies)
+def coalesce_column(INPUT_DF ,CANDIDATES):
+   values = np.full(len(INPUT_DF) ,np.nan)
+   sources = np.full(len(INPUT_DF) ,None ,dtype=object)
+   unassigned = np.ones(len(INPUT_DF) ,dtype=bool)
+   for CANDIDATE in CANDIDATES:
+      _rows = unassigned & _condition(INPUT_DF ,CANDIDATE.get('when'))
+      if not _rows.any():
+         continue
+      values[_rows] = _evaluate(INPUT_DF ,CANDIDATE.get('value' ,CANDIDATE.get('when')))[_rows]
+      if 'source_col' in CANDIDATE:
+         sources[_rows] = INPUT_DF[CANDIDATE['source_col']].to_numpy()[_rows]
+      else:
+         sources[_rows] = CANDIDATE.get('source')
+      unassigned &= ~_rows
+   return pd.Series(values ,index=INPUT_DF.index) ,pd.Series(sources ,index=INPUT_DF.index)
+
+# Add a value column and a source column ({name}_src) for each target
+# TARGETS: dictionary of new column names and their list of candidates. Targets are added in
+# order, so candidates can use targets added before them.
+# SOURCE_COLS: False to add only the value columns
+def add_columns(INPUT_DF ,TARGETS ,SOURCE_COLS=True):
+   OUTPUT_DF = INPUT_DF.copy()
+   for NAME ,CANDIDATES in TARGETS.items():
+      values ,sources = coalesce_column(OUTPUT_DF ,CANDIDATES)
+      OUTPUT_DF[NAME] = values
+      if SOURCE_COLS:
+         OUTPUT_DF[f'{NAME}_src'] = sources
+   return OUTPUT_DF
@@ -305,3 +305,76 @@ def run_cmd(
    print(f'<{funcname}> Ended with returncode = {cmd_status.returncode}')
 
    return None    # If you want to use something that is returned, add it here. Assign it when you call the function e.g. returned_object = run_cmd().
+
+# To join several source tables onto a base table by country and year in one step
+# Each table is matched on a normalized key: country in uppercase without surrounding spaces, and year as a number.
+# Rows of each source are lined up with the rows of the base table and all sources are added at once,
+# as with a series of left merges but without copying the growing table for each one.
+# SOURCES: dictionary of source names and dictionaries with:
+#    'data': data frame to join. Columns should already have a prefix for the source.
+#    'country': name of country column in data
+#    'year' (opt): name of year column in data. If omitted, each row applies to all years of its country.
+# Every source must have at most one row per key, and column names must not repeat across tables.
+# Both are checked before joining and raise an error.
+# Returns the joined data frame and a coverage report with one row per source:
+#    source_rows: rows in source
+#    base_rows_matched: rows of base table that got a match
+#    source_rows_unmatched: rows in source whose key is not in the base table (e.g. countries out of scope)
+# Usage:
+#   sources = {'euro':{'data':euro_df ,'country':'euro_country_upcase' ,'year':'euro_year'}}
+#   merged_df ,coverage = join_on_country_year(base_df ,'fao_country_upcase' ,'fao_year' ,sources)
+def join_on_country_year(
+      BASE_DF
+      ,BASE_COUNTRY     # String: name of country column in base table
+      ,BASE_YEAR        # String: name of year column in base table
+      ,SOURCES
+   ):
+   funcname = inspect.currentframe().f_code.co_name
+
+   def _normalized_key(DF ,COUNTRY ,YEAR=None):
+      country_key = DF[COUNTRY].astype('object').str.upper().str.strip()
+      if YEAR is None:
+         return pd.Index(country_key)
+      year_key = pd.to_numeric(DF[YEAR] ,errors='coerce').astype('float64')
+      return pd.MultiIndex.from_arrays([country_key ,year_key])
+
+   # Check keys and column names before joining anything
+   source_keys = {}
+   problems = []
+   all_cols = list(BASE_DF)
+   for NAME ,SOURCE in SOURCES.items():
+      source_key = _normalized_key(SOURCE['data'] ,SOURCE['country'] ,SOURCE.get('year'))
+      _dup_keys = source_key.duplicated(keep=False)
+      if _dup_keys.any():
+         problems.append(f"{NAME}: {_dup_keys.sum()} rows with duplicate keys, e.g. {list(source_key[_dup_keys].unique()[:3])}")
+      source_keys[NAME] = source_key
+      all_cols = all_cols + list(SOURCE['data'])
+   repeated_cols = pd.Index(all_cols)[pd.Index(all_cols).duplicated()].unique()
+   if len(repeated_cols) > 0:
+      problems.append(f"Columns in more than one table: {list(repeated_cols)}")
+   if problems:
+      raise ValueError(f"<{funcname}> Cannot join:\n   " + "\n   ".join(problems))
+
+   # Line up each source with the rows of the base table
+   base_key = _normalized_key(BASE_DF ,BASE_COUNTRY ,BASE_YEAR)
+   aligned_list = [BASE_DF.reset_index(drop=True)]
+   coverage_list = []
+   for NAME ,SOURCE in SOURCES.items():
+      if SOURCE.get('year') is None:
+         source_rows_forbase = source_keys[NAME].get_indexer(base_key.get_level_values(0))
+      else:
+         source_rows_forbase = source_keys[NAME].get_indexer(base_key)
+      # Position -1 (no match) is not in the index, so reindex gives a row of missing values
+      aligned = SOURCE['data'].reset_index(drop=True).reindex(source_rows_forbase)
+      aligned_list.append(aligned.reset_index(drop=True))
+      coverage_list.append({
+         'source':NAME
+         ,'source_rows':len(SOURCE['data'])
+         ,'base_rows_matched':(source_rows_forbase >= 0).sum()
+         ,'source_rows_unmatched':len(SOURCE['data']) - len(np.unique(source_rows_forbase[source_rows_forbase >= 0]))
+      })
+   OUTPUT_DF = pd.concat(aligned_list ,axis=1)
+
+   coverage = pd.DataFrame(coverage_list)
+   print(f"<{funcname}> {len(BASE_DF) :,} base rows. Coverage by source:\n{coverage.to_string(index=False)}")
+   return OUTPUT_DF ,coverage
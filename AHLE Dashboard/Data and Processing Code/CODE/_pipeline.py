@@ -0,0 +1,273 @@
+#%% About
+'''
+This runs the numbered scripts of a workspace as a pipeline, re-running only
+the scripts whose inputs or code have changed since their last successful run.
+
+Each script is a stage with a list of input and output files. stage() finds
+these by scanning the script for calls that read or write a file given as
+os.path.join(FOLDER ,'name'), e.g.
+   pd.read_pickle(os.path.join(PRODATA_FOLDER ,'fao_chickencombo.pkl.gz'))
+Files built any other way (e.g. with f-strings or loops) must be added to the
+stage with INPUTS or OUTPUTS.
+
+A stage depends on the earlier stages that write its inputs. run_pipeline()
+runs stages in parallel as soon as the stages they depend on are finished.
+A stage is run if any of these changed since its last successful run:
+   - The content of the script, _functions.py, _libraries.py, _constants.py or 0_runme.py
+   - The content of any input file
+   - The content of any output file, or an output file is missing
+Content is compared with a hash, so a stage whose upstream stage re-ran but
+wrote the same data is skipped. Gzipped files are hashed after decompressing,
+since gzip headers include the time of writing.
+
+Stages that download data (e.g. from an API) have no input files, so they are
+only run when their code changes. Use ALWAYS=True or FORCE=True to run them.
+
+Each stage runs in its own Python process, with 0_runme.py executed first as
+when running scripts by hand. Output is written to a log file for each stage.
+The hashes and status of each stage are saved in a JSON state file.
+
+Usage: see 0_run_pipeline.py.
+'''
+#%% Libraries
+
+import os
+import sys
+import re
+import json
+import gzip
+import hashlib
+import subprocess
+import threading
+import datetime as dt
+
+#%% Settings
+
+# Files that every script uses. A change to any of them re-runs all stages.
+COMMON_FILES = ['0_runme.py' ,'_functions.py' ,'_libraries.py' ,'_constants.py']
+
+# Calls that read or write a file whose path is given as os.path.join(...)
+_INPUT_CALLS = r'read_\w+|ExcelFile|load_workbook'
+_OUTPUT_CALLS = r'\.to_\w+|ExcelWriter|savefig'
+_PATH_CALL_RE = re.compile(
+   rf'(?P<call>{_INPUT_CALLS}|{_OUTPUT_CALLS})\s*\(\s*os\.path\.join\((?P<args>[^()]*)\)'
+)
+_STRING_RE = re.compile(r'''^(?:'([^']*)'|"([^"]*)")$''')
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+#%% Functions
+
+# Find input and output files of a script
+# FOLDERS: dictionary {variable name: folder} for the folder variables used in the script, e.g. {'PRODATA_FOLDER':PRODATA_FOLDER}
+# Returns two sorted lists of full paths: inputs, outputs
+def scan_script_io(SCRIPT_FILE ,FOLDERS):
+   with open(SCRIPT_FILE ,encoding='utf-8' ,errors='replace') as f:
+      # Drop commented lines. Commented code often reads or writes files.
+      script_text = '\n'.join(line for line in f if not line.lstrip().startswith('#'))
+   inputs = set()
+   outputs = set()
+   for match in _PATH_CALL_RE.finditer(script_text):
+      args = [arg.strip() for arg in match['args'].split(',')]
+      if not args or args[0] not in FOLDERS:
+         continue
+      parts = [_STRING_RE.match(arg) for arg in args[1:]]
+      if not all(parts):      # Path built from variables. Must be declared by hand.
+         continue
+      filepath = os.path.normpath(os.path.join(FOLDERS[args[0]] ,*(p[1] if p[1] is not None else p[2] for p in parts)))
+      if re.match(_INPUT_CALLS ,match['call']):
+         inputs.add(filepath)
+      else:
+         outputs.add(filepath)
+   # A file written and then read back by the same script is not an input
+   return sorted(inputs - outputs) ,sorted(outputs)
+
+# Define a stage
+# SCRIPT: file name of the script, in the current folder
+# FOLDERS: passed to scan_script_io()
+# INPUTS, OUTPUTS: full paths of files to add to those found by scanning
+# ALWAYS: True to run the stage every time, e.g. for scripts that download data
+def stage(SCRIPT ,FOLDERS ,INPUTS=[] ,OUTPUTS=[] ,ALWAYS=False):
+   scanned_inputs ,scanned_outputs = scan_script_io(SCRIPT ,FOLDERS)
+   return {
+      'script':SCRIPT
+      ,'inputs':sorted(set(scanned_inputs) | set(os.path.normpath(f) for f in INPUTS))
+      ,'outputs':sorted(set(scanned_outputs) | set(os.path.normpath(f) for f in OUTPUTS))
+      ,'always':ALWAYS
+   }
+
+# Hash of a file's content, or None if it does not exist
+# FILE_HASHES: dictionary of earlier hashes, {path: [size, mtime_ns, hash]}. Files whose size and
+# modification time are unchanged are not read again. Updated with the result.
+def file_hash(FILEPATH ,FILE_HASHES):
+   try:
+      file_stat = os.stat(FILEPATH)
+   except OSError:
+      return None
+   saved = FILE_HASHES.get(FILEPATH)
+   if saved and saved[0] == file_stat.st_size and saved[1] == file_stat.st_mtime_ns:
+      return saved[2]
+   hasher = hashlib.sha1()
+   opener = gzip.open if FILEPATH.endswith('.gz') else open
+   try:
+      with opener(FILEPATH ,'rb') as f:
+         for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES) ,b''):
+            hasher.update(chunk)
+   except (OSError ,EOFError):     # e.g. not really gzipped. Hash the raw bytes.
+      hasher = hashlib.sha1()
+      with open(FILEPATH ,'rb') as f:
+         for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES) ,b''):
+            hasher.update(chunk)
+   FILE_HASHES[FILEPATH] = [file_stat.st_size ,file_stat.st_mtime_ns ,hasher.hexdigest()]
+   return hasher.hexdigest()
+
+# Hash of a stage's code and inputs
+def stage_fingerprint(STAGE ,FILE_HASHES):
+   hasher = hashlib.sha1()
+   for filepath in [STAGE['script']] + COMMON_FILES + STAGE['inputs']:
+      hasher.update(f"{filepath}|{file_hash(os.path.abspath(filepath) ,FILE_HASHES)}\n".encode())
+   return hasher.hexdigest()
+
+# Reason to run a stage, or None if it is up to date
+def stage_run_reason(STAGE ,FINGERPRINT ,PREVIOUS ,FILE_HASHES ,FORCE=False):
+   if FORCE:
+      return 'forced'
+   if STAGE['always']:
+      return 'always'
+   if not PREVIOUS:
+      return 'no previous run'
+   if PREVIOUS.get('status') != 'ok':
+      return f"previous run {PREVIOUS.get('status')}"
+   if PREVIOUS.get('fingerprint') != FINGERPRINT:
+      return 'code or inputs changed'
+   for filepath in STAGE['outputs']:
+      output_hash = file_hash(filepath ,FILE_HASHES)
+      if output_hash is None:
+         return f'missing output {os.path.basename(filepath)}'
+      if output_hash != PREVIOUS.get('outputs' ,{}).get(filepath):
+         return f'changed output {os.path.basename(filepath)}'
+   return None
+
+# Run a single stage in a new Python process
+# Returns the return code
+def run_stage(STAGE ,LOG_FOLDER):
+   script = STAGE['script']
+   runner_code = f"exec(open('0_runme.py').read()); exec(compile(open({script!r}).read() ,{script!r} ,'exec'))"
+   env = dict(os.environ ,MPLBACKEND='Agg')     # Do not open plot windows
+   log_file = os.path.join(LOG_FOLDER ,f'{os.path.splitext(script)[0]}.log')
+   with open(log_file ,'w') as log:
+      stage_status = subprocess.run([sys.executable ,'-c' ,runner_code] ,stdout=log ,stderr=subprocess.STDOUT ,env=env)
+   return stage_status.returncode
+
+def _load_state(STATE_FILE):
+   try:
+      with open(STATE_FILE) as f:
+         return json.load(f)
+   except (OSError ,ValueError):
+      return {'stages':{} ,'file_hashes':{}}
+
+def _save_state(STATE ,STATE_FILE):
+   tmp_file = f'{STATE_FILE}.tmp'
+   with open(tmp_file ,'w') as f:
+      json.dump(STATE ,f ,indent=1)
+   os.replace(tmp_file ,STATE_FILE)
+
+# Stages that must finish before each stage: earlier stages that write its inputs or the same outputs
+def stage_dependencies(STAGES):
+   dependencies = []
+   for i ,STAGE in enumerate(STAGES):
+      needs = set(STAGE['inputs']) | set(STAGE['outputs'])
+      dependencies.append([j for j in range(i) if needs & set(STAGES[j]['outputs'])])
+   return dependencies
+
+# Run all stages that are not up to date
+# STAGES: list of stages from stage(), in the order the scripts would be run by hand
+# STATE_FILE: JSON file recording hashes and status of each stage
+# LOG_FOLDER: folder for stage log files. Default: next to STATE_FILE.
+# MAX_WORKERS: maximum number of stages to run at once
+# FORCE: True to run all stages
+# DRY_RUN: True to only print which stages would be run
+# Returns dictionary {script: status}. Status is 'ok', 'up to date', 'failed', 'upstream failed' or 'would run'.
+def run_pipeline(STAGES ,STATE_FILE ,LOG_FOLDER=None ,MAX_WORKERS=None ,FORCE=False ,DRY_RUN=False):
+   funcname = 'run_pipeline'
+   if LOG_FOLDER is None:
+      LOG_FOLDER = os.path.join(os.path.dirname(os.path.abspath(STATE_FILE)) ,'pipeline_logs')
+   os.makedirs(LOG_FOLDER ,exist_ok=True)
+   if MAX_WORKERS is None:
+      MAX_WORKERS = max(1 ,(os.cpu_count() or 2) - 1)
+
+   state = _load_state(STATE_FILE)
+   file_hashes = state.setdefault('file_hashes' ,{})
+   dependencies = stage_dependencies(STAGES)
+   statuses = {}
+   lock = threading.Condition()
+   running = [0]
+
+   def _run(i):
+      STAGE = STAGES[i]
+      script = STAGE['script']
+      with lock:
+         previous = state['stages'].get(script)
+         fingerprint = stage_fingerprint(STAGE ,file_hashes)
+         # An upstream stage that re-ran and changed its outputs changes the fingerprint
+         reason = stage_run_reason(STAGE ,fingerprint ,previous ,file_hashes ,FORCE)
+         if reason is None and DRY_RUN \
+            and any(statuses[STAGES[j]['script']] == 'would run' for j in dependencies[i]):
+            reason = 'upstream stage would run'
+      if reason is None:
+         status = 'up to date'
+         print(f"<{funcname}> {script}: up to date")
+      elif DRY_RUN:
+         status = 'would run'
+         print(f"<{funcname}> {script}: would run ({reason})")
+      else:
+         print(f"<{funcname}> {script}: running ({reason})")
+         started = dt.datetime.now()
+         rc = run_stage(STAGE ,LOG_FOLDER)
+         seconds = (dt.datetime.now() - started).total_seconds()
+         status = 'ok' if rc == 0 else 'failed'
+         print(f"<{funcname}> {script}: {status} in {seconds :.1f} seconds (returncode {rc})")
+         with lock:
+            # Inputs are hashed before the run, so a change made while it ran is caught next time
+            state['stages'][script] = {
+               'status':status
+               ,'returncode':rc
+               ,'fingerprint':fingerprint
+               ,'outputs':{filepath:file_hash(filepath ,file_hashes) for filepath in STAGE['outputs']}
+               ,'started':started.isoformat(timespec='seconds')
+               ,'seconds':round(seconds ,1)
+            }
+            _save_state(state ,STATE_FILE)
+      with lock:
+         statuses[script] = status
+         running[0] -= 1
+         lock.notify_all()
+
+   # Start each stage when the stages it depends on are finished
+   threads = []
+   started_stages = set()
+   with lock:
+      while len(started_stages) < len(STAGES):
+         for i ,STAGE in enumerate(STAGES):
+            if i in started_stages or running[0] >= MAX_WORKERS:
+               continue
+            upstream = [STAGES[j]['script'] for j in dependencies[i]]
+            if not all(script in statuses for script in upstream):
+               continue
+            started_stages.add(i)
+            if any(statuses[script] in ('failed' ,'upstream failed') for script in upstream):
+               statuses[STAGE['script']] = 'upstream failed'
+               print(f"<{funcname}> {STAGE['script']}: skipped, an upstream stage failed")
+               continue
+            running[0] += 1
+            thread = threading.Thread(target=_run ,args=(i ,) ,name=STAGE['script'])
+            thread.start()
+            threads.append(thread)
+         if len(started_stages) < len(STAGES):
+            lock.wait()
+   for thread in threads:
+      thread.join()
+
+   with lock:
+      _save_state(state ,STATE_FILE)
+   return {STAGE['script']:statuses[STAGE['script']] for STAGE in STAGES}
@@ -0,0 +1,222 @@
+#%% About
+'''
+This reads tables from Excel workbooks and PDF files and keeps a cache of the
+results, so a workbook is only parsed again when the file or the read arguments
+change. Parsing Excel (and PDFs with tabula) takes most of the run time of the
+extract scripts.
+
+Each read is saved in CACHE_FOLDER under a key made from a hash of the file's
+content, the reader, the read arguments, and the pandas version. Data frames
+are saved as Feather files (columnar, fast to load) when pyarrow is installed
+and the data frame has no object (text or mixed) columns, otherwise as pickles.
+Feather turns NaN into None in object columns, so a cached read would differ
+from a new one. Each Feather file is read back after saving and replaced by a
+pickle if it does not give the same data frame. A manifest file is written
+last, so a read interrupted part way is not used.
+
+read_excel_ranges() reads several sheets or ranges of one workbook in one call.
+Ranges not in the cache are parsed in parallel processes.
+
+Functions take the same arguments as pd.read_excel() and tabula.read_pdf().
+
+Usage (0_runme.py imports this and sets CACHE_FOLDER):
+   uk_feed = readcache.read_excel(os.path.join(RAWDATA_FOLDER ,'uk_feed.ods') ,sheet_name='Poultry' ,skiprows=5)
+   amu_report = readcache.read_excel_ranges(os.path.join(RAWDATA_FOLDER ,'amu.xlsx') ,{
+      'allspec':{'sheet_name':'Antimicrobial Quantities (AQ)' ,'skiprows':7 ,'nrows':12}
+      ,'ter':{'sheet_name':'AQ-Terrestrial' ,'skiprows':2 ,'nrows':7}
+   })
+   pic_adg_list = readcache.read_pdf(pdf_file ,pages=2 ,lattice=True)
+
+Parallel parsing uses separate processes. On Windows these re-import the main
+script if it was started as a file (python script.py). Scripts run from Spyder,
+0_runme.py or 0_run_pipeline.py are fine.
+'''
+#%% Libraries
+
+import os
+import json
+import pickle
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+#%% Settings
+
+# Folder for cached reads. None: do not cache.
+CACHE_FOLDER = None
+
+# True: ignore cached reads and parse again. New reads are still saved.
+REFRESH = False
+
+# Maximum number of processes parsing at once
+MAX_WORKERS = max(1 ,(os.cpu_count() or 2) - 1)
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+# Content hashes of files already read in this session, {path: (size, mtime_ns, hash)}
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+#%% Functions
+
+# Hash of a file's content. Not read again if its size and modification time are unchanged.
+def _file_hash(FILEPATH):
+   file_stat = os.stat(FILEPATH)
+   with _file_hashes_lock:
+      saved = _file_hashes.get(FILEPATH)
+   if saved and saved[0] == file_stat.st_size and saved[1] == file_stat.st_mtime_ns:
+      return saved[2]
+   hasher = hashlib.sha1()
+   with open(FILEPATH ,'rb') as f:
+      for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES) ,b''):
+         hasher.update(chunk)
+   with _file_hashes_lock:
+      _file_hashes[FILEPATH] = (file_stat.st_size ,file_stat.st_mtime_ns ,hasher.hexdigest())
+   return hasher.hexdigest()
+
+def _cache_key(READER ,FILEPATH ,READ_ARGS):
+   key_json = json.dumps(
+      [READER ,_file_hash(FILEPATH) ,READ_ARGS ,pd.__version__]
+      ,sort_keys=True
+      ,default=repr
+   )
+   return hashlib.sha1(key_json.encode()).hexdigest()[:20]
+
+def _manifest_filepath(CACHE_KEY):
+   return os.path.join(CACHE_FOLDER ,f'{CACHE_KEY}.json')
+
+# Parse a file. Runs in a separate process for parallel reads.
+def _parse(READER ,FILEPATH ,READ_ARGS):
+   if READER == 'excel':
+      return pd.read_excel(FILEPATH ,**READ_ARGS)
+   elif READER == 'pdf':
+      import tabula
+      return tabula.read_pdf(FILEPATH ,**READ_ARGS)
+
+# True if two data frames have the same values, dtypes, index, and columns
+# DataFrame.equals() treats None and NaN as equal, so missing values in object columns are also compared by type
+def _frames_identical(DF1 ,DF2):
+   if not (DF1.equals(DF2) and DF1.dtypes.equals(DF2.dtypes) and DF1.index.equals(DF2.index)):
+      return False
+   for COL in range(DF1.shape[1]):
+      if DF1.dtypes.iloc[COL] == object:
+         col1 ,col2 = DF1.iloc[: ,COL] ,DF2.iloc[: ,COL]
+         if not col1.isnull().equals(col2.isnull()):
+            return False
+         if not (col1[col1.isnull()].map(type).tolist() == col2[col2.isnull()].map(type).tolist()):
+            return False
+   return True
+
+# Save one data frame as Feather if possible, otherwise as pickle. Returns file name.
+def _save_frame(DF ,FILE_STEM):
+   try:
+      import pyarrow as pa
+      import pyarrow.feather as feather
+      use_feather = all(isinstance(COL ,str) for COL in DF.columns) \
+         and not (DF.dtypes == object).any()
+   except ImportError:
+      use_feather = False
+   if use_feather:
+      filename = f'{FILE_STEM}.feather'
+      try:
+         feather.write_feather(pa.Table.from_pandas(DF) ,os.path.join(CACHE_FOLDER ,filename))
+         # Check that the cached read will be the same as this one
+         if _frames_identical(_load_frame(filename) ,DF):
+            return filename
+         os.remove(os.path.join(CACHE_FOLDER ,filename))
+      except (pa.ArrowException ,TypeError ,ValueError):    # e.g. a column with mixed types
+         pass
+   filename = f'{FILE_STEM}.pkl'
+   with open(os.path.join(CACHE_FOLDER ,filename) ,'wb') as f:
+      pickle.dump(DF ,f ,protocol=pickle.HIGHEST_PROTOCOL)
+   return filename
+
+def _load_frame(FILENAME):
+   filepath = os.path.join(CACHE_FOLDER ,FILENAME)
+   if FILENAME.endswith('.feather'):
+      import pyarrow.feather as feather
+      return feather.read_table(filepath).to_pandas()
+   with open(filepath ,'rb') as f:
+      return pickle.load(f)
+
+# Save a result: a data frame, a list of data frames (tabula), or a dictionary of them (sheet_name=None or a list)
+def _save(CACHE_KEY ,RESULT):
+   if isinstance(RESULT ,pd.DataFrame):
+      kind ,names ,frames = 'frame' ,None ,[RESULT]
+   elif isinstance(RESULT ,dict):
+      kind ,names ,frames = 'dict' ,list(RESULT) ,list(RESULT.values())
+   else:
+      kind ,names ,frames = 'list' ,None ,list(RESULT)
+   manifest = {
+      'kind':kind
+      ,'names':names
+      ,'files':[_save_frame(DF ,f'{CACHE_KEY}_{i}') for i ,DF in enumerate(frames)]
+   }
+   # Write to a temporary file and rename so a partial manifest is never read
+   tmp_filepath = f'{_manifest_filepath(CACHE_KEY)}.{os.getpid()}.tmp'
+   with open(tmp_filepath ,'w') as f:
+      json.dump(manifest ,f)
+   os.replace(tmp_filepath ,_manifest_filepath(CACHE_KEY))
+
+# Load a result. Returns None if it is not in the cache.
+def _load(CACHE_KEY):
+   try:
+      with open(_manifest_filepath(CACHE_KEY)) as f:
+         manifest = json.load(f)
+      frames = [_load_frame(FILENAME) for FILENAME in manifest['files']]
+   except (OSError ,ValueError ,pickle.UnpicklingError):
+      return None
+   if manifest['kind'] == 'frame':
+      return frames[0]
+   elif manifest['kind'] == 'dict':
+      return dict(zip(manifest['names'] ,frames))
+   return frames
+
+# Read several (reader, file, arguments) requests. Those not in the cache are parsed in parallel.
+# REQUESTS: dictionary {name: (READER ,FILEPATH ,READ_ARGS)}
+# Returns dictionary {name: result}
+def _read_many(REQUESTS):
+   funcname = '_read_many'
+   results = {}
+   misses = {}
+   for NAME ,(READER ,FILEPATH ,READ_ARGS) in REQUESTS.items():
+      cache_key = _cache_key(READER ,FILEPATH ,READ_ARGS) if CACHE_FOLDER else None
+      result = _load(cache_key) if (cache_key and not REFRESH) else None
+      if result is None:
+         misses[NAME] = cache_key
+      else:
+         results[NAME] = result
+
+   if len(misses) > 1 and MAX_WORKERS > 1:
+      with ProcessPoolExecutor(max_workers=min(MAX_WORKERS ,len(misses))) as executor:
+         futures = {NAME:executor.submit(_parse ,*REQUESTS[NAME]) for NAME in misses}
+         parsed = {NAME:FUTURE.result() for NAME ,FUTURE in futures.items()}
+   else:
+      parsed = {NAME:_parse(*REQUESTS[NAME]) for NAME in misses}
+
+   if CACHE_FOLDER and misses:
+      os.makedirs(CACHE_FOLDER ,exist_ok=True)
+      for NAME ,CACHE_KEY in misses.items():
+         _save(CACHE_KEY ,parsed[NAME])
+   if misses:
+      print(f'<{funcname}> Parsed {len(misses)} of {len(REQUESTS)} reads, loaded {len(REQUESTS) - len(misses)} from cache.')
+   results.update(parsed)
+   return {NAME:results[NAME] for NAME in REQUESTS}
+
+# Read a sheet or range of an Excel or OpenDocument workbook
+# READ_ARGS: arguments for pd.read_excel(), e.g. sheet_name, skiprows, nrows, usecols
+def read_excel(FILEPATH ,**READ_ARGS):
+   return _read_many({'read':('excel' ,FILEPATH ,READ_ARGS)})['read']
+
+# Read several sheets or ranges of a workbook in one call
+# RANGES: dictionary {name: dictionary of arguments for pd.read_excel()}
+# Returns dictionary {name: data frame}
+def read_excel_ranges(FILEPATH ,RANGES):
+   return _read_many({NAME:('excel' ,FILEPATH ,READ_ARGS) for NAME ,READ_ARGS in RANGES.items()})
+
+# Read tables from a PDF with tabula
+# READ_ARGS: arguments for tabula.read_pdf(), e.g. pages, lattice, area, pandas_options
+# Returns list of data frames, as tabula does
+def read_pdf(FILEPATH ,**READ_ARGS):
+   return _read_many({'read':('pdf' ,FILEPATH ,READ_ARGS)})['read']
@@ -16,3 +16,8 @@ PROGRAM_OUTPUT_FOLDER = os.path.join(PARENT_FOLDER ,'Program outputs')
 GLBL_RAWDATA_FOLDER = os.path.join(GRANDPARENT_FOLDER, 'Global Aggregate workspace', 'Data', 'Downloaded')
 GLBL_PRODATA_FOLDER = os.path.join(GRANDPARENT_FOLDER, 'Global Aggregate workspace', 'Data', 'Intermediate')
 DASH_DATA_FOLDER = os.path.join(GRANDPARENT_FOLDER, 'AHLE Dashboard' ,'Dash App' ,'data')
+
+# Reader for Excel and PDF tables that caches the parsed results. See _readcache.py.
+import _readcache as readcache
+imp.reload(readcache)
+readcache.CACHE_FOLDER = os.path.join(PRODATA_FOLDER ,'readcache')
@@ -6,18 +6,29 @@ Importing and exploring the antimicrobial data
 
 input_amu_report_file = os.path.join(RAWDATA_FOLDER ,'AMU_2018_6th report_GBADs.xlsx')
 
+# Read all ranges used below in one call, so they are parsed in parallel
+# skiprows: count of rows to skip at start of sheet. nrows: total number of rows to read.
+amu2018_report = readcache.read_excel_ranges(input_amu_report_file ,{
+   'allspec':{'sheet_name':'Antimicrobial Quantities (AQ)' ,'skiprows':7 ,'nrows':12}
+   ,'ter':{'sheet_name':'AQ-Terrestrial' ,'skiprows':2 ,'nrows':7}
+   ,'agp':{'sheet_name':'AQ-AGPs' ,'skiprows':2 ,'nrows':6}
+   ,'species_dtl':{'sheet_name':'Species covered' ,'skiprows':3 ,'nrows':5}
+   ,'species_grp':{'sheet_name':'Species covered' ,'skiprows':16 ,'nrows':5}
+   ,'biomass_glbl':{'sheet_name':'Animal Biomass' ,'skiprows':3 ,'nrows':3}
+   ,'biomass_rgn_af':{'sheet_name':'Animal Biomass' ,'skiprows':12 ,'nrows':3}
+   ,'biomass_rgn_am':{'sheet_name':'Animal Biomass' ,'skiprows':21 ,'nrows':3}
+   ,'biomass_rgn_as':{'sheet_name':'Animal Biomass' ,'skiprows':31 ,'nrows':3}
+   ,'biomass_rgn_eu':{'sheet_name':'Animal Biomass' ,'skiprows':42 ,'nrows':3}
+   ,'biomass_rgn_me':{'sheet_name':'Animal Biomass' ,'skiprows':53 ,'nrows':3}
+})
+
 # =============================================================================
 #### Antimicrobial usage
 # =============================================================================
 # -----------------------------------------------------------------------------
 # All
 # -----------------------------------------------------------------------------
-amu2018_allspec = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Antimicrobial Quantities (AQ)'
-	,skiprows=7                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=12                    # Total number of rows to read
-)
+amu2018_allspec = amu2018_report['allspec']
 cleancolnames(amu2018_allspec)
 amu2018_allspec.columns = amu2018_allspec.columns.str.strip('_')    # Remove trailing underscores
 
@@ -58,12 +69,7 @@ datainfo(amu2018_allspec)
 # -----------------------------------------------------------------------------
 # Terrestrial
 # -----------------------------------------------------------------------------
-amu2018_ter = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='AQ-Terrestrial'
-	,skiprows=2                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=7                    # Total number of rows to read
-)
+amu2018_ter = amu2018_report['ter']
 cleancolnames(amu2018_ter)
 amu2018_ter.columns = amu2018_ter.columns.str.strip('_')    # Remove trailing underscores
 
@@ -115,12 +121,7 @@ datainfo(amu2018_ter_t_t)
 # -----------------------------------------------------------------------------
 # Growth promotants
 # -----------------------------------------------------------------------------
-amu2018_agp = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='AQ-AGPs'
-	,skiprows=2                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=6                    # Total number of rows to read
-)
+amu2018_agp = amu2018_report['agp']
 cleancolnames(amu2018_agp)
 amu2018_agp.columns = amu2018_agp.columns.str.strip('_')    # Remove trailing underscores
 
@@ -212,12 +213,7 @@ amu2018_m.to_pickle(os.path.join(PRODATA_FOLDER ,'amu2018_tall.pkl.gz'))
 # -----------------------------------------------------------------------------
 # Detailed species
 # -----------------------------------------------------------------------------
-amu2018_species_dtl = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Species covered'
-	,skiprows=3                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=5                    # Total number of rows to read
-)
+amu2018_species_dtl = amu2018_report['species_dtl']
 cleancolnames(amu2018_species_dtl)
 amu2018_species_dtl.columns = amu2018_species_dtl.columns.str.strip('_')    # Remove trailing underscores
 
@@ -237,12 +233,7 @@ amu2018_species_dtl.to_pickle(os.path.join(PRODATA_FOLDER ,'amu2018_species_dtl.
 # -----------------------------------------------------------------------------
 # Species groups
 # -----------------------------------------------------------------------------
-amu2018_species_grp = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Species covered'
-	,skiprows=16                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=5                    # Total number of rows to read
-)
+amu2018_species_grp = amu2018_report['species_grp']
 cleancolnames(amu2018_species_grp)
 amu2018_species_grp.columns = amu2018_species_grp.columns.str.strip('_')    # Remove trailing underscores
 
@@ -268,12 +259,7 @@ amu2018_species_grp.to_pickle(os.path.join(PRODATA_FOLDER ,'amu2018_species_grp.
 # -----------------------------------------------------------------------------
 # Global
 # -----------------------------------------------------------------------------
-amu2018_biomass_glbl = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Animal Biomass'
-	,skiprows=3                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=3                    # Total number of rows to read
-)
+amu2018_biomass_glbl = amu2018_report['biomass_glbl']
 cleancolnames(amu2018_biomass_glbl)
 
 # Rename segment column
@@ -294,12 +280,7 @@ datainfo(amu2018_biomass_glbl)
 # -----------------------------------------------------------------------------
 # AFRICA
 # -----------------------------------------------------------------------------
-amu2018_biomass_rgn_af = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Animal Biomass'
-	,skiprows=12                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=3                    # Total number of rows to read
-)
+amu2018_biomass_rgn_af = amu2018_report['biomass_rgn_af']
 cleancolnames(amu2018_biomass_rgn_af)
 
 # Rename segment column
@@ -320,12 +301,7 @@ datainfo(amu2018_biomass_rgn_af)
 # -----------------------------------------------------------------------------
 # AMERICAS
 # -----------------------------------------------------------------------------
-amu2018_biomass_rgn_am = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Animal Biomass'
-	,skiprows=21                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=3                    # Total number of rows to read
-)
+amu2018_biomass_rgn_am = amu2018_report['biomass_rgn_am']
 cleancolnames(amu2018_biomass_rgn_am)
 
 # Rename segment column
@@ -346,12 +322,7 @@ datainfo(amu2018_biomass_rgn_am)
 # -----------------------------------------------------------------------------
 # ASIA
 # -----------------------------------------------------------------------------
-amu2018_biomass_rgn_as = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Animal Biomass'
-	,skiprows=31                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=3                    # Total number of rows to read
-)
+amu2018_biomass_rgn_as = amu2018_report['biomass_rgn_as']
 cleancolnames(amu2018_biomass_rgn_as)
 
 # Rename segment column
@@ -372,12 +343,7 @@ datainfo(amu2018_biomass_rgn_as)
 # -----------------------------------------------------------------------------
 # EUROPE
 # -----------------------------------------------------------------------------
-amu2018_biomass_rgn_eu = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Animal Biomass'
-	,skiprows=42                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=3                    # Total number of rows to read
-)
+amu2018_biomass_rgn_eu = amu2018_report['biomass_rgn_eu']
 cleancolnames(amu2018_biomass_rgn_eu)
 
 # Rename segment column
@@ -398,12 +364,7 @@ datainfo(amu2018_biomass_rgn_eu)
 # -----------------------------------------------------------------------------
 # MIDDLE EAST
 # -----------------------------------------------------------------------------
-amu2018_biomass_rgn_me = pd.read_excel(
-	input_amu_report_file
-	,sheet_name='Animal Biomass'
-	,skiprows=53                 # List: row numbers to skip. Integer: count of rows to skip at start of file
-    ,nrows=3                    # Total number of rows to read
-)
+amu2018_biomass_rgn_me = amu2018_report['biomass_rgn_me']
 cleancolnames(amu2018_biomass_rgn_me)
 
 # Rename segment column
@@ -484,7 +445,7 @@ amu2018_biomass.to_pickle(os.path.join(PRODATA_FOLDER ,'amu2018_biomass.pkl.gz')
 
 #%% Import antimicrobial importance categories
 
-amu_importance = pd.read_excel(
+amu_importance = readcache.read_excel(
     os.path.join(RAWDATA_FOLDER ,'Classification of AM per priority.xlsx')
 	,skiprows=1
 )
@@ -534,7 +495,7 @@ amu_importance.to_pickle(os.path.join(PRODATA_FOLDER ,'amu_importance.pkl.gz'))
 # =============================================================================
 # See comments in the spreadsheet for sources and calculations
 # Note AMU usage data in the same spreadsheet is recreated separately in combine_and_process.py
-amu_prices = pd.read_excel(
+amu_prices = readcache.read_excel(
     os.path.join(RAWDATA_FOLDER ,'Burden - slider inputs.xlsx')
 	,skiprows=2                 # List: row numbers to skip. Integer: count of rows to skip at start of file
     ,nrows=5                    # Total number of rows to read
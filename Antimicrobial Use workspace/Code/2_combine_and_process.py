@@ -138,6 +138,7 @@ datainfo(amu2018_combined_tall)
 
 amu2018_combined_tall.to_csv(os.path.join(PRODATA_FOLDER ,'amu2018_combined_tall.csv') ,index=False)
 amu2018_combined_tall.to_csv(os.path.join(DASH_DATA_FOLDER ,'amu2018_combined_tall.csv') ,index=False)
+to_feather_fordash(amu2018_combined_tall ,os.path.join(DASH_DATA_FOLDER ,'amu2018_combined_tall.feather'))
 
 #%% Structure: one row per region
 
@@ -477,6 +478,7 @@ datainfo(amu_combined_regional)
 
 amu_combined_regional.to_csv(os.path.join(PRODATA_FOLDER ,'amu_combined_regional.csv') ,index=False)
 amu_combined_regional.to_csv(os.path.join(DASH_DATA_FOLDER ,'amu_combined_regional.csv') ,index=False)
+to_feather_fordash(amu_combined_regional ,os.path.join(DASH_DATA_FOLDER ,'amu_combined_regional.feather'))
 
 #%% Prep Resistance data for plotting at the country-level
 '''
@@ -545,6 +547,7 @@ amr_withsmry = amr_withsmry.query("reporting_year == keep_year")
 datainfo(amr_withsmry)
 amr_withsmry.to_csv(os.path.join(PRODATA_FOLDER ,'amr_withsmry.csv') ,index=False)
 amr_withsmry.to_csv(os.path.join(DASH_DATA_FOLDER ,'amr_withsmry.csv') ,index=False)
+to_feather_fordash(amr_withsmry ,os.path.join(DASH_DATA_FOLDER ,'amr_withsmry.feather'))
 
 #%% Illustrate AM Usage and Price with uncertainty
 
@@ -375,3 +375,44 @@ def lookup_from_dictionary(KEY ,DICT):
         return DICT[KEY]      # If key is found in dictionary, return value
     except:
         return None
+
+# To save a data frame for the dashboard in Feather format, next to the CSV or pickle file
+# Feather is a binary columnar format that the dashboard reads much faster than CSV.
+# Columns in CATEGORICAL_COLS are stored as categories, and the dashboard reads them as categories.
+# Other columns keep their types, including columns that are already categorical.
+# File is uncompressed so the dashboard can memory-map it.
+# Example usage:
+#   df.to_csv(os.path.join(DASH_DATA_FOLDER ,'df.csv') ,index=False)
+#   to_feather_fordash(df ,os.path.join(DASH_DATA_FOLDER ,'df.feather'))
+def to_feather_fordash(
+      INPUT_DF
+      ,FILEPATH          # String: full path to output file, ending in .feather
+      ,CATEGORICAL_COLS=['species' ,'region' ,'production_system' ,'item' ,'agesex_scenario']   # List of strings. Columns not in the data are ignored.
+   ):
+   funcname = inspect.currentframe().f_code.co_name
+   try:
+      import pyarrow as pa
+      import pyarrow.feather as feather
+   except ImportError:
+      print(f"<{funcname}> Package pyarrow not found. Skipping {FILEPATH}.")
+      return None
+
+   dfmod = INPUT_DF.copy()     # pyarrow keeps the index, unlike DataFrame.to_feather()
+   dfmod.columns = dfmod.columns.astype(str)
+   for COL in CATEGORICAL_COLS:
+      if COL in dfmod.columns and not isinstance(dfmod[COL].dtype ,pd.CategoricalDtype):
+         dfmod[COL] = dfmod[COL].astype('category')
+   table = pa.Table.from_pandas(dfmod)
+
+   # Write to a temporary file and rename so the dashboard never reads a partial file
+   tmp_filepath = f"{FILEPATH}.tmp"
+   try:
+      feather.write_feather(table ,tmp_filepath ,compression='uncompressed')
+   except Exception as e:     # e.g. a column with mixed types. Dashboard will read the CSV or pickle.
+      print(f"<{funcname}> Could not save {FILEPATH}: {e!r}")
+      if os.path.exists(tmp_filepath):
+         os.remove(tmp_filepath)
+      return None
+   os.replace(tmp_filepath ,FILEPATH)
+   print(f"<{funcname}> Saved {FILEPATH}")
+   return None
@@ -7,6 +7,10 @@ species.
 This program runs the UoL R code using the subprocess library.
 Required R libraries must be installed first.
 
+Small ruminant scenarios are run with ahle_sr.py, a Python version of the UoL
+small ruminant model, which does not need R. To use the R code instead, set
+USE_R_SMALLRUMINANTS to True.
+
 This code does not need to be run if UoL has already run the simulations.
 
 IMPORTANT: before running this, set Python's working directory to the folder
@@ -18,6 +22,10 @@ import os                        # Operating system functions
 import subprocess                # For running command prompt or other programs
 import inspect                   # For inspecting objects
 import datetime as dt            # Date and time functions
+import threading                 # For running jobs in parallel
+import pandas as pd
+
+import ahle_sr                   # Python version of the small ruminant compartmental model
 
 # Run a command on the command line using subprocess package
 # Example usage: run_cmd(['dir' ,'c:\\users'] ,SHELL=True ,SHOW_MAXLINES=10)
@@ -87,6 +95,141 @@ def timerstop():
       print(f"<{funcname}> Error: no start time defined. Call timerstart() first.")
    return None
 
+# Output files a job will write: ahle_<scenario>.csv for each scenario in its control file
+def job_output_files(JOB):
+   output_folder = JOB['args'][1]
+   scenario_file = JOB['args'][2]
+   try:
+      scenarios = ahle_sr.read_scenarios(scenario_file).columns.tolist()
+   except OSError:     # Missing control file. Job will fail when run.
+      return []
+   # Arg 4, if given: only the first N scenarios are run
+   if len(JOB['args']) > 3 and int(JOB['args'][3]) > 0:
+      scenarios = scenarios[:int(JOB['args'][3])]
+   return [os.path.join(output_folder ,f'ahle_{scenario}.csv') for scenario in scenarios]
+
+# A job is up to date if all of its output files are newer than its scenario control file and its script
+def job_is_uptodate(JOB ,OUTPUT_FILES):
+   if JOB['script'] == 'ahle_sr':
+      script_file = ahle_sr.__file__
+   else:
+      script_file = JOB['script']
+   try:
+      input_mtime = max(os.path.getmtime(f) for f in [JOB['args'][2] ,script_file])
+      output_mtime = min(os.path.getmtime(f) for f in OUTPUT_FILES)
+   except (OSError ,ValueError):     # Missing file or no outputs
+      return False
+   return output_mtime >= input_mtime
+
+# Run one job. Returns status and return code.
+def run_job(JOB):
+   if JOB['script'] == 'ahle_sr':
+      try:
+         ahle_sr.run_scenario_file(*JOB['args'][:3])
+         returncode = 0
+      except Exception as e:
+         print(f"> Job {JOB['name']} failed: {e!r}")
+         returncode = 1
+   else:
+      returncode = run_cmd([r_executable ,JOB['script']] + JOB['args'] ,SHOW_MAXLINES=999)
+   status = 'done' if returncode == 0 else 'failed'
+   return status ,returncode
+
+# Run a list of jobs in parallel
+# JOBS: list of dictionaries with keys 'name', 'script', 'args' and optionally 'cores'
+# MAX_CORES: maximum total cores of jobs running at the same time. A job needing more than this runs alone.
+# MANIFEST_FILE: CSV file to record the status and run time of each job. Rewritten as each job finishes.
+# FORCE: True to run jobs even if their outputs are up to date
+# Jobs whose outputs are newer than their inputs are skipped, unless they failed on the last run.
+# Jobs writing the same output files run one after another, in list order.
+def run_jobs(JOBS ,MAX_CORES ,MANIFEST_FILE ,FORCE=False):
+   funcname = inspect.currentframe().f_code.co_name
+
+   # Status of each job from the last run
+   try:
+      previous_status = pd.read_csv(MANIFEST_FILE).set_index('name')['status'].to_dict()
+   except (OSError ,KeyError ,pd.errors.EmptyDataError):
+      previous_status = {}
+
+   # Later jobs writing the same files must wait for earlier ones
+   job_outputs = [job_output_files(job) for job in JOBS]
+   waits_for = [
+      [j for j in range(i) if set(job_outputs[j]) & set(job_outputs[i])]
+      for i in range(len(JOBS))
+   ]
+
+   manifest_rows = [
+      {
+         'name':job['name']
+         ,'script':os.path.basename(job['script'])
+         ,'scenario_file':os.path.basename(job['args'][2])
+         ,'output_folder':job['args'][1]
+         ,'cores':job.get('cores' ,1)
+         ,'status':'pending'
+         ,'returncode':None
+         ,'started':None
+         ,'seconds':None
+      }
+      for job in JOBS
+   ]
+   def _write_manifest():
+      tmp_file = f'{MANIFEST_FILE}.tmp'
+      pd.DataFrame(manifest_rows).to_csv(tmp_file ,index=False)
+      os.replace(tmp_file ,MANIFEST_FILE)
+
+   lock = threading.Condition()
+   cores_in_use = 0
+
+   def _run(i):
+      nonlocal cores_in_use
+      row = manifest_rows[i]
+      timerstart_job = dt.datetime.now()
+      try:
+         status ,returncode = run_job(JOBS[i])
+      except Exception as e:
+         print(f"<{funcname}> Job {row['name']} failed: {e!r}")
+         status ,returncode = 'failed' ,None
+      with lock:
+         row['status'] = status
+         row['returncode'] = returncode
+         row['seconds'] = round((dt.datetime.now() - timerstart_job).total_seconds() ,1)
+         cores_in_use -= row['cores']
+         _write_manifest()
+         lock.notify_all()
+      print(f"<{funcname}> {row['name']}: {status} in {row['seconds']}s")
+
+   with lock:
+      pending = list(range(len(JOBS)))
+      while pending:
+         for i in pending:
+            row = manifest_rows[i]
+            if any(manifest_rows[j]['status'] in ('pending' ,'running') for j in waits_for[i]):
+               continue
+            # Rerun if an earlier job writing the same files was rerun
+            earlier_rerun = any(manifest_rows[j]['status'] != 'skipped' for j in waits_for[i])
+            if not FORCE and not earlier_rerun \
+               and previous_status.get(row['name']) != 'failed' \
+               and job_is_uptodate(JOBS[i] ,job_outputs[i]):
+               row['status'] = 'skipped'
+               print(f"<{funcname}> {row['name']}: outputs are up to date. Skipping.")
+               pending.remove(i)
+               _write_manifest()
+               break
+            if cores_in_use + row['cores'] <= MAX_CORES or cores_in_use == 0:
+               row['status'] = 'running'
+               row['started'] = f'{dt.datetime.now() :%Y-%m-%d %H:%M:%S}'
+               cores_in_use += row['cores']
+               pending.remove(i)
+               _write_manifest()
+               threading.Thread(target=_run ,args=(i ,) ,name=row['name']).start()
+               break
+         else:     # Nothing can start yet. Wait for a job to finish.
+            lock.wait()
+      while any(row['status'] == 'running' for row in manifest_rows):
+         lock.wait()
+
+   return pd.DataFrame(manifest_rows)
+
 #%% Paths and variables
 
 CURRENT_FOLDER = os.getcwd()
@@ -102,10 +245,37 @@ r_executable = 'C:\\Program Files\\R\\R-4.2.1\\bin\\x64\\Rscript.exe'
 
 N_RUNS = '1000'   # String: number of simulation runs for each scenario
 
+# True: run small ruminant scenarios with the R code. False: use ahle_sr.py.
+USE_R_SMALLRUMINANTS = False
+
+# Maximum number of cores to use for all jobs together
+# Each R control table script uses one core. Set 'cores' on a job if its script starts its own cluster.
+MAX_CORES = max(1 ,os.cpu_count() - 1)
+
+# True: run all jobs even if their outputs are up to date
+FORCE_RERUN = False
+
+# File recording the status and run time of each job
+MANIFEST_FILE = os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_run_manifest.csv')
+
+'''
+Each section below adds jobs to this list. The jobs are run together at the
+end by run_jobs().
+Each job is a dictionary:
+   'name': label for messages and the manifest
+   'script': full path to the R script, or 'ahle_sr' to use ahle_sr.py
+   'args': arguments to the script, as list of strings
+   'cores' (opt): number of cores the job uses. Default 1.
+'''
+ahle_jobs = []
+
 #%% Small ruminants
 
 # Full path to the AHLE function in R
-r_script = os.path.join(PARENT_FOLDER ,'Run AHLE with control table_SMALLRUMINANTS.R')
+if USE_R_SMALLRUMINANTS:
+   r_script = os.path.join(PARENT_FOLDER ,'Run AHLE with control table_SMALLRUMINANTS.R')
+else:
+   r_script = 'ahle_sr'
 
 # =============================================================================
 #### Base scenarios
@@ -128,9 +298,7 @@ r_args = [
     # 9/28: Gemma removed the code that performed this task
     # ,'-1'
 ]
-timerstart()
-returncode_smallrum = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
-timerstop()
+ahle_jobs.append({'name':'Small ruminants base' ,'script':r_script ,'args':r_args})
 
 # =============================================================================
 #### PPR scenario
@@ -138,7 +306,7 @@ timerstop()
 '''
 Note: any scenarios that exist in this file will overwrite results of previous
 run. As of April 2023, this includes ideal and current scenarios in addition to
-PPR.
+PPR. run_jobs() runs jobs that write the same files in the order they are added.
 '''
 # Arguments to R function, as list of strings.
 # ORDER MATTERS! SEE HOW THIS LIST IS PARSED INSIDE R SCRIPT.
@@ -157,9 +325,7 @@ r_args = [
     # 9/28: Gemma removed the code that performed this task
     # ,'-1'
 ]
-timerstart()
-returncode_smallrum_ppr = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
-timerstop()
+ahle_jobs.append({'name':'Small ruminants PPR' ,'script':r_script ,'args':r_args})
 
 # =============================================================================
 #### Brucellosis scenario
@@ -186,9 +352,7 @@ r_args = [
     # 9/28: Gemma removed the code that performed this task
     # ,'-1'
 ]
-timerstart()
-returncode_smallrum_bruc = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
-timerstop()
+ahle_jobs.append({'name':'Small ruminants brucellosis' ,'script':r_script ,'args':r_args})
 
 #%% Small Ruminants using Murdoch's updated function
 
@@ -227,9 +391,7 @@ r_args = [
     # -1: use all scenarios
     ,'-1'
 ]
-timerstart()
-returncode_cattle = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
-timerstop()
+ahle_jobs.append({'name':'Cattle base' ,'script':r_script ,'args':r_args})
 
 # =============================================================================
 #### Brucellosis scenario
@@ -256,22 +418,15 @@ r_args = [
     # -1: use all scenarios
     ,'-1'
 ]
-timerstart()
-returncode_cattle_bruc = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
-timerstop()
+ahle_jobs.append({'name':'Cattle brucellosis' ,'script':r_script ,'args':r_args})
 
 # =============================================================================
 #### Yearly scenarios
 # =============================================================================
 list_years = list(range(2017, 2022))
 
-# Initialize list to save return codes
-returncode_cattle_yearly = []
-
-# Loop through years, calling scenario file for each and saving outputs to a new folder
+# Add a job for each year, calling scenario file for each and saving outputs to a new folder
 for YEAR in list_years:
-    print(f"> Running compartmental model for year {YEAR}...")
-
     # Define input scenario file
     SCENARIO_FILE = os.path.join(
         ETHIOPIA_CODE_FOLDER
@@ -299,12 +454,7 @@ for YEAR in list_years:
         # -1: use all scenarios
         ,'-1'
     ]
-    timerstart()
-    rc = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
-    returncode_cattle_yearly.append(rc)
-    timerstop()
-
-    print(f"> Finished compartmental model for year {YEAR}.")
+    ahle_jobs.append({'name':f'Cattle {YEAR}' ,'script':r_script ,'args':r_args})
 
 # =============================================================================
 #### Subnational/regional scenarios
@@ -322,13 +472,8 @@ list_eth_regions = [
     ,'Tigray'
     ]
 
-# Initialize list to save return codes
-returncode_cattle_regional = []
-
-# Loop through regions, calling scenario file for each and saving outputs to a new folder
+# Add a job for each region, calling scenario file for each and saving outputs to a new folder
 for REGION in list_eth_regions:
-    print(f"> Running compartmental model for region {REGION}...")
-
     # Define input scenario file
     SCENARIO_FILE = os.path.join(
         ETHIOPIA_CODE_FOLDER
@@ -356,12 +501,7 @@ for REGION in list_eth_regions:
         # -1: use all scenarios
         ,'-1'
     ]
-    timerstart()
-    rc = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
-    returncode_cattle_regional.append(rc)
-    timerstop()
-
-    print(f"> Finished compartmental model for region {REGION}.")
+    ahle_jobs.append({'name':f'Cattle {REGION}' ,'script':r_script ,'args':r_args})
 
 #%% Poultry
 
@@ -384,6 +524,15 @@ r_args = [
     # -1: use all scenarios
     ,'-1'
 ]
+ahle_jobs.append({'name':'Poultry' ,'script':r_script ,'args':r_args})
+
+#%% Run all jobs
+
 timerstart()
-returncode_poultry = run_cmd([r_executable ,r_script] + r_args ,SHOW_MAXLINES=999)
+manifest = run_jobs(ahle_jobs ,MAX_CORES=MAX_CORES ,MANIFEST_FILE=MANIFEST_FILE ,FORCE=FORCE_RERUN)
 timerstop()
+
+print(manifest[['name' ,'status' ,'seconds']].to_string())
+failed_jobs = manifest.loc[manifest['status'] == 'failed' ,'name'].tolist()
+if failed_jobs:
+   print(f'> {len(failed_jobs)} jobs failed: {failed_jobs}. Fix and run this program again to rerun only these.')
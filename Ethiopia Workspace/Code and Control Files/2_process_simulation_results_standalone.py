@@ -13,6 +13,7 @@ import os                        # Operating system functions
 import inspect
 import io
 import time
+from concurrent.futures import ThreadPoolExecutor     # For reading files in parallel
 import numpy as np
 import pandas as pd
 import pickle                             # To save objects to disk
@@ -117,6 +118,87 @@ def fill_column_where(
         dfmod.loc[LOC ,COLUMN_TOFILL] = np.nan
     return dfmod
 
+# To save a data frame for the dashboard in Feather format, next to the CSV or pickle file
+# Feather is a binary columnar format that the dashboard reads much faster than CSV.
+# Columns in CATEGORICAL_COLS are stored as categories, and the dashboard reads them as categories.
+# Other columns keep their types, including columns that are already categorical.
+# File is uncompressed so the dashboard can memory-map it.
+# Example usage:
+#   df.to_csv(os.path.join(DASH_DATA_FOLDER ,'df.csv') ,index=False)
+#   to_feather_fordash(df ,os.path.join(DASH_DATA_FOLDER ,'df.feather'))
+def to_feather_fordash(
+        INPUT_DF
+        ,FILEPATH          # String: full path to output file, ending in .feather
+        ,CATEGORICAL_COLS=['species' ,'region' ,'production_system' ,'item' ,'agesex_scenario']   # List of strings. Columns not in the data are ignored.
+    ):
+    funcname = inspect.currentframe().f_code.co_name
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        print(f"<{funcname}> Package pyarrow not found. Skipping {FILEPATH}.")
+        return None
+
+    dfmod = INPUT_DF.copy()     # pyarrow keeps the index, unlike DataFrame.to_feather()
+    dfmod.columns = dfmod.columns.astype(str)
+    for COL in CATEGORICAL_COLS:
+        if COL in dfmod.columns and not isinstance(dfmod[COL].dtype ,pd.CategoricalDtype):
+            dfmod[COL] = dfmod[COL].astype('category')
+    table = pa.Table.from_pandas(dfmod)
+
+    # Write to a temporary file and rename so the dashboard never reads a partial file
+    tmp_filepath = f"{FILEPATH}.tmp"
+    try:
+        feather.write_feather(table ,tmp_filepath ,compression='uncompressed')
+    except Exception as e:     # e.g. a column with mixed types. Dashboard will read the CSV or pickle.
+        print(f"<{funcname}> Could not save {FILEPATH}: {e!r}")
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        return None
+    os.replace(tmp_filepath ,FILEPATH)
+    print(f"<{funcname}> Saved {FILEPATH}")
+    return None
+
+# To sum value columns over several grouping sets in one pass, like GROUPING SETS in SQL
+# Each grouping set replaces some key columns with a label, e.g. {'production_system':'Overall'}, and
+# sums the values over the rows that share the remaining keys. All grouping sets are stacked and summed
+# with a single groupby.
+# As with pivot_table(), rows with missing keys are dropped, as are result rows with all values missing.
+# A sum is missing if all values in the group are missing (sum with min_count=1).
+# Example usage:
+#   df_agg = rollup_sum(df ,['species' ,'production_system' ,'item'] ,['value_mean']
+#       ,[{'labels':{'production_system':'Overall'}}
+#         ,{'labels':{'species':'All Small Ruminants'} ,'rows':lambda x: x['species'].isin(['Sheep' ,'Goat'])}]
+#   )
+def rollup_sum(
+        INPUT_DF
+        ,KEY_COLS          # List of strings: columns identifying each row
+        ,VALUE_COLS        # List of strings: columns to sum
+        ,GROUPING_SETS     # List of dictionaries, one for each set of aggregate rows:
+                           #   'labels': dictionary {key column: label} for the key columns to sum over. Label is a
+                           #      string, or a function that takes the selected rows and returns a Series.
+                           #   'rows' (opt): function that takes INPUT_DF and returns a mask of rows to include.
+    ):
+    KEY_COLS = list(KEY_COLS)
+    VALUE_COLS = list(VALUE_COLS)
+    stack_list = []
+    for i ,GSET in enumerate(GROUPING_SETS):
+        if GSET.get('rows') is None:
+            gset_df = INPUT_DF[KEY_COLS + VALUE_COLS]
+        else:
+            gset_df = INPUT_DF.loc[GSET['rows'](INPUT_DF) ,KEY_COLS + VALUE_COLS]
+        labels = {COL:(LABEL(gset_df) if callable(LABEL) else LABEL) for COL ,LABEL in GSET['labels'].items()}
+        gset_df = gset_df.assign(**labels)
+        gset_df['_grouping_set'] = i
+        stack_list.append(gset_df)
+    stacked = pd.concat(stack_list ,axis=0 ,ignore_index=True)
+
+    # sort=False keeps grouping sets in the order given
+    dfmod = stacked.groupby(['_grouping_set'] + KEY_COLS ,sort=False)[VALUE_COLS].sum(min_count=1)
+    dfmod = dfmod.dropna(how='all').reset_index()
+    del dfmod['_grouping_set']
+    return dfmod
+
 #%% Paths and variables
 
 CURRENT_FOLDER = os.getcwd()
@@ -163,7 +245,18 @@ exchg_data_tomerge.to_pickle(os.path.join(ETHIOPIA_DATA_FOLDER ,'wb_exchg_data_p
 #%% Combine scenario result files
 '''
 This imports CSV files that are output from the compartmental model.
+
+All scenario files for a species, production system, year, and region are read
+in parallel and stacked with a column identifying the scenario. The stacked
+data is then reshaped once to have a set of columns for each scenario.
 '''
+# Read a single scenario file. Returns None if the file does not exist.
+def read_ahle_scenario(filepath):
+    try:
+        return pd.read_csv(filepath)
+    except FileNotFoundError:
+        return None
+
 def combine_ahle_scenarios(
         input_folder
         ,input_file_prefix      # String
@@ -172,29 +265,54 @@ def combine_ahle_scenarios(
         ,label_prodsys          # String: add column 'production_system' with this label
         ,label_year             # Numeric: add column 'year' with this value
         ,label_region           # String: add column 'region' with this value
+        ,wide=True              # True: one set of columns for each scenario, e.g. mean_current. False: one row for each scenario, identified by column 'scenario'.
     ):
-    dfcombined = pd.DataFrame()   # Initialize merged data
-
-    for i ,suffix in enumerate(input_file_suffixes):
-        # Read file if it exists
-        try:
-            df = pd.read_csv(os.path.join(input_folder ,f'{input_file_prefix}_{suffix}.csv'))
-
-            # Add column suffixes
-            if suffix.upper() == 'ALL_MORTALITY_ZERO':      # Recode for consistency
-                suffix = 'MORTALITY_ZERO'
-
-            df = df.add_suffix(f'_{suffix}')
-            df = df.rename(columns={f'Item_{suffix}':'Item' ,f'Group_{suffix}':'Group'})
-
-            # Add to merged data
-            if i == 0:
-                dfcombined = df.copy()
-            else:
-                dfcombined = pd.merge(left=dfcombined ,right=df, on=['Item' ,'Group'] ,how='outer')
-        except FileNotFoundError:
-            print('> File not found: ' ,os.path.join(input_folder ,f'{input_file_prefix}_{suffix}.csv'))
-            print('> Moving to next file.')
+    funcname = inspect.currentframe().f_code.co_name
+    filepaths = [os.path.join(input_folder ,f'{input_file_prefix}_{suffix}.csv') for suffix in input_file_suffixes]
+    with ThreadPoolExecutor(max_workers=min(8 ,len(filepaths) or 1)) as executor:
+        scenario_dfs = list(executor.map(read_ahle_scenario ,filepaths))
+
+    # Stack files that exist, with scenario label
+    stack_list = []
+    scenario_order = []
+    missing_files = []
+    for suffix ,filepath ,df in zip(input_file_suffixes ,filepaths ,scenario_dfs):
+        if df is None:
+            missing_files.append(os.path.basename(filepath))
+            continue
+        if suffix.upper() == 'ALL_MORTALITY_ZERO':      # Recode for consistency
+            suffix = 'MORTALITY_ZERO'
+        stack_list.append(df.assign(scenario=suffix))
+        scenario_order.append(suffix)
+    if missing_files:
+        print(f"<{funcname}> {len(missing_files)} of {len(filepaths)} files not found in {input_folder}:")
+        for FILE in missing_files:
+            print(f"    {FILE}")
+
+    if stack_list:
+        dfcombined = pd.concat(stack_list ,axis=0 ,ignore_index=True)
+    else:
+        dfcombined = pd.DataFrame()   # No files: only the label columns are returned
+
+    if wide and stack_list:
+        _duplicates = dfcombined.duplicated(subset=['Item' ,'Group' ,'scenario'])
+        if _duplicates.any():
+            print(f"<{funcname}> Dropping {_duplicates.sum()} rows with duplicate Item and Group in {input_folder}.")
+            dfcombined = dfcombined.loc[~ _duplicates]
+
+        # Reshape to one column for each statistic and scenario, e.g. Mean_Current
+        stat_cols = [i for i in list(dfcombined) if i not in ['Item' ,'Group' ,'scenario']]
+        wide_cols = [(STAT ,SCENARIO) for SCENARIO in scenario_order for STAT in stat_cols]
+        wide_rows = pd.MultiIndex.from_frame(dfcombined[['Item' ,'Group']].drop_duplicates())
+        dfcombined = dfcombined.set_index(['Item' ,'Group' ,'scenario'])[stat_cols].unstack('scenario')
+        dfcombined = dfcombined.reindex(index=wide_rows ,columns=wide_cols)
+        dfcombined.columns = [f'{STAT}_{SCENARIO}' for STAT ,SCENARIO in wide_cols]
+        dfcombined = dfcombined.reset_index()
+
+    # With more than one file, rows are sorted by Item and Group, as an outer merge
+    # of the files would return them. A single file keeps its own row order.
+    if len(stack_list) > 1:
+        dfcombined = dfcombined.sort_values(by=['Item' ,'Group'] ,kind='mergesort' ,ignore_index=True)
 
     # Add label columns
     dfcombined['species'] = label_species
@@ -875,71 +993,29 @@ for i ,VARCOL in enumerate(var_cols):
    ahle_combo_withagg[VARCOL] = ahle_combo_withagg[SDCOL]**2
 
 # -----------------------------------------------------------------------------
-# Create Overall age/sex group
+# Create Overall age/sex group, Overall sex for each age group, and Overall age
+# group for each sex
 # -----------------------------------------------------------------------------
-# Must be first sum to avoid double-counting!
-ahle_combo_withagg_sumall = ahle_combo_withagg.pivot_table(
-    index=['region' ,'species' ,'production_system' ,'item' ,'year']
-    ,values=mean_cols + var_cols
-    ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-).reset_index()
-ahle_combo_withagg_sumall['group'] = 'Overall'
-ahle_combo_withagg_sumall['age_group'] = 'Overall'
-ahle_combo_withagg_sumall['sex'] = 'Overall'
-
+# All are sums of the individual age/sex groups
+ahle_combo_withagg_sumagesex = rollup_sum(
+    ahle_combo_withagg
+    ,KEY_COLS=['region' ,'species' ,'production_system' ,'item' ,'group' ,'age_group' ,'sex' ,'year']
+    ,VALUE_COLS=mean_cols + var_cols
+    ,GROUPING_SETS=[
+        {'labels':{'group':'Overall' ,'age_group':'Overall' ,'sex':'Overall'}}
+        # Oxen are a special age group which is only male. No "combined" sex.
+        ,{'labels':{'group':lambda x: x['age_group'] + ' Combined' ,'sex':'Overall'}
+          ,'rows':lambda x: x['age_group'].str.upper() != 'OXEN'}
+        ,{'labels':{'group':lambda x: 'Overall ' + x['sex'] ,'age_group':'Overall'}}
+    ]
+)
 ahle_combo_withagg = pd.concat(
-    [ahle_combo_withagg ,ahle_combo_withagg_sumall]
+    [ahle_combo_withagg ,ahle_combo_withagg_sumagesex]
     ,axis=0              # axis=0: concatenate rows (stack), axis=1: concatenate columns (merge)
     ,join='outer'        # 'outer': keep all index values from all data frames
     ,ignore_index=True   # True: do not keep index values on concatenation axis
 )
-del ahle_combo_withagg_sumall
-
-# -----------------------------------------------------------------------------
-# Create Overall sex for each age group
-# -----------------------------------------------------------------------------
-for AGE_GRP in age_group_values:
-    ahle_combo_withagg_sumsexes = ahle_combo_withagg.query(f"age_group == '{AGE_GRP}'").pivot_table(
-        index=['region' ,'species' ,'production_system' ,'item' ,'age_group' ,'year']
-        ,values=mean_cols + var_cols
-        ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-    ).reset_index()
-    ahle_combo_withagg_sumsexes['group'] = f'{AGE_GRP} Combined'
-    ahle_combo_withagg_sumsexes['sex'] = 'Overall'
-
-    # Stack
-    ahle_combo_withagg = pd.concat(
-        [ahle_combo_withagg ,ahle_combo_withagg_sumsexes]
-        ,axis=0              # axis=0: concatenate rows (stack), axis=1: concatenate columns (merge)
-        ,join='outer'        # 'outer': keep all index values from all data frames
-        ,ignore_index=True   # True: do not keep index values on concatenation axis
-    )
-del ahle_combo_withagg_sumsexes
-
-# Oxen are a special age group which is only male. Drop "combined" sex.
-_oxen_combined = (ahle_combo_withagg['group'].str.upper() == 'OXEN COMBINED')
-ahle_combo_withagg = ahle_combo_withagg.drop(ahle_combo_withagg.loc[_oxen_combined].index).reset_index(drop=True)
-
-# -----------------------------------------------------------------------------
-# Create Overall age group for each sex
-# -----------------------------------------------------------------------------
-for SEX_GRP in sex_values:
-    ahle_combo_withagg_sumages = ahle_combo_withagg.query(f"sex == '{SEX_GRP}'").pivot_table(
-        index=['region' ,'species' ,'production_system' ,'item' ,'sex' ,'year']
-        ,values=mean_cols + var_cols
-        ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-    ).reset_index()
-    ahle_combo_withagg_sumages['group'] = f'Overall {SEX_GRP}'
-    ahle_combo_withagg_sumages['age_group'] = 'Overall'
-
-    # Stack
-    ahle_combo_withagg = pd.concat(
-        [ahle_combo_withagg ,ahle_combo_withagg_sumages]
-        ,axis=0              # axis=0: concatenate rows (stack), axis=1: concatenate columns (merge)
-        ,join='outer'        # 'outer': keep all index values from all data frames
-        ,ignore_index=True   # True: do not keep index values on concatenation axis
-    )
-del ahle_combo_withagg_sumages
+del ahle_combo_withagg_sumagesex
 
 # -----------------------------------------------------------------------------
 # Add back original Overall age/sex and de-dup
@@ -959,49 +1035,29 @@ ahle_combo_withagg = ahle_combo_withagg.drop_duplicates(
 )
 
 # -----------------------------------------------------------------------------
-# Create overall production system
+# Create overall production system and combined species
 # -----------------------------------------------------------------------------
-ahle_combo_withagg_sumprod = ahle_combo_withagg.pivot_table(
-   index=['region' ,'species' ,'item' ,'group' ,'age_group' ,'sex' ,'year']
-   ,values=mean_cols + var_cols
-   ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-).reset_index()
-ahle_combo_withagg_sumprod['production_system'] = 'Overall'
-
-ahle_combo_withagg = pd.concat(
-   [ahle_combo_withagg ,ahle_combo_withagg_sumprod]
-   ,axis=0              # axis=0: concatenate rows (stack), axis=1: concatenate columns (merge)
-   ,join='outer'        # 'outer': keep all index values from all data frames
-   ,ignore_index=True   # True: do not keep index values on concatenation axis
+_smallrum_rows = lambda x: x['species'].str.upper().isin(['SHEEP' ,'GOAT'])
+_poultry_rows = lambda x: x['species'].str.contains('poultry' ,case=False ,na=False)
+ahle_combo_withagg_sumprodspec = rollup_sum(
+   ahle_combo_withagg
+   ,KEY_COLS=['region' ,'species' ,'production_system' ,'item' ,'group' ,'age_group' ,'sex' ,'year']
+   ,VALUE_COLS=mean_cols + var_cols
+   ,GROUPING_SETS=[
+      {'labels':{'production_system':'Overall'}}
+      ,{'labels':{'species':'All Small Ruminants'} ,'rows':_smallrum_rows}
+      ,{'labels':{'species':'All Small Ruminants' ,'production_system':'Overall'} ,'rows':_smallrum_rows}
+      ,{'labels':{'species':'All Poultry'} ,'rows':_poultry_rows}
+      ,{'labels':{'species':'All Poultry' ,'production_system':'Overall'} ,'rows':_poultry_rows}
+   ]
 )
-del ahle_combo_withagg_sumprod
-
-# -----------------------------------------------------------------------------
-# Create combined species
-# -----------------------------------------------------------------------------
-# All Small Ruminants
-ahle_combo_withagg_sumspec = ahle_combo_withagg.query("species.str.upper().isin(['SHEEP' ,'GOAT'])").pivot_table(
-   index=['region' ,'production_system' ,'item' ,'group' ,'age_group' ,'sex' ,'year']
-   ,values=mean_cols + var_cols
-   ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-).reset_index()
-ahle_combo_withagg_sumspec['species'] = 'All Small Ruminants'
-
-# All poultry
-ahle_combo_withagg_sumspec2 = ahle_combo_withagg.query("species.str.contains('poultry' ,case=False ,na=False)").pivot_table(
-   index=['region' ,'production_system' ,'item' ,'group' ,'age_group' ,'sex' ,'year']
-   ,values=mean_cols + var_cols
-   ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-).reset_index()
-ahle_combo_withagg_sumspec2['species'] = 'All Poultry'
-
 ahle_combo_withagg = pd.concat(
-   [ahle_combo_withagg ,ahle_combo_withagg_sumspec ,ahle_combo_withagg_sumspec2]
+   [ahle_combo_withagg ,ahle_combo_withagg_sumprodspec]
    ,axis=0              # axis=0: concatenate rows (stack), axis=1: concatenate columns (merge)
    ,join='outer'        # 'outer': keep all index values from all data frames
    ,ignore_index=True   # True: do not keep index values on concatenation axis
 )
-del ahle_combo_withagg_sumspec ,ahle_combo_withagg_sumspec2
+del ahle_combo_withagg_sumprodspec
 
 # -----------------------------------------------------------------------------
 # Calculate standard deviations
@@ -1390,6 +1446,7 @@ ahle_combo_withahle_smry.to_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_all_s
 
 # Output for Dash
 ahle_combo_withahle_smry.to_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_summary2.csv') ,index=False)
+to_feather_fordash(ahle_combo_withahle_smry ,os.path.join(DASH_DATA_FOLDER ,'ahle_all_summary2.feather'))
 
 #%% Checks on calculated AHLE
 
@@ -2006,50 +2063,29 @@ for i ,VARCOL in enumerate(var_cols):
    ahle_combo_scensmry[VARCOL] = ahle_combo_scensmry[SDCOL]**2
 
 # -----------------------------------------------------------------------------
-# Create overall production system
+# Create overall production system and combined species
 # -----------------------------------------------------------------------------
-ahle_combo_scensmry_sumprod = ahle_combo_scensmry.pivot_table(
-   index=['region' ,'species' ,'item' ,'agesex_scenario' ,'year']
-   ,values=mean_cols_scensmry + var_cols
-   ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-).reset_index()
-ahle_combo_scensmry_sumprod['production_system'] = 'Overall'
-
-ahle_combo_scensmry = pd.concat(
-   [ahle_combo_scensmry ,ahle_combo_scensmry_sumprod]
-   ,axis=0              # axis=0: concatenate rows (stack), axis=1: concatenate columns (merge)
-   ,join='outer'        # 'outer': keep all index values from all data frames
-   ,ignore_index=True   # True: do not keep index values on concatenation axis
+_smallrum_rows = lambda x: x['species'].str.upper().isin(['SHEEP' ,'GOAT'])
+_poultry_rows = lambda x: x['species'].str.contains('poultry' ,case=False ,na=False)
+ahle_combo_scensmry_sumprodspec = rollup_sum(
+   ahle_combo_scensmry
+   ,KEY_COLS=['region' ,'species' ,'production_system' ,'item' ,'agesex_scenario' ,'year']
+   ,VALUE_COLS=mean_cols_scensmry + var_cols
+   ,GROUPING_SETS=[
+      {'labels':{'production_system':'Overall'}}
+      ,{'labels':{'species':'All Small Ruminants'} ,'rows':_smallrum_rows}
+      ,{'labels':{'species':'All Small Ruminants' ,'production_system':'Overall'} ,'rows':_smallrum_rows}
+      ,{'labels':{'species':'All Poultry'} ,'rows':_poultry_rows}
+      ,{'labels':{'species':'All Poultry' ,'production_system':'Overall'} ,'rows':_poultry_rows}
+   ]
 )
-del ahle_combo_scensmry_sumprod
-
-# -----------------------------------------------------------------------------
-# Create combined species
-# -----------------------------------------------------------------------------
-# "All Small Ruminants" for Sheep and Goats
-ahle_combo_scensmry_sumspec1 = ahle_combo_scensmry.query("species.str.upper().isin(['SHEEP' ,'GOAT'])").pivot_table(
-   index=['region' ,'production_system' ,'item' ,'agesex_scenario' ,'year']
-   ,values=mean_cols_scensmry + var_cols
-   ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-).reset_index()
-ahle_combo_scensmry_sumspec1['species'] = 'All Small Ruminants'
-
-# "All poultry"
-ahle_combo_scensmry_sumspec2 = ahle_combo_scensmry.query("species.str.contains('poultry' ,case=False ,na=False)").pivot_table(
-   index=['region' ,'production_system' ,'item' ,'agesex_scenario' ,'year']
-   ,values=mean_cols_scensmry + var_cols
-   ,aggfunc=lambda x: x.mean() * x.count()  # Hack: sum is equal to zero if all values are missing. This will cause all missings to produce missing.
-).reset_index()
-ahle_combo_scensmry_sumspec2['species'] = 'All Poultry'
-
-# Concatenate
 ahle_combo_scensmry = pd.concat(
-   [ahle_combo_scensmry ,ahle_combo_scensmry_sumspec1 ,ahle_combo_scensmry_sumspec2]
+   [ahle_combo_scensmry ,ahle_combo_scensmry_sumprodspec]
    ,axis=0              # axis=0: concatenate rows (stack), axis=1: concatenate columns (merge)
    ,join='outer'        # 'outer': keep all index values from all data frames
    ,ignore_index=True   # True: do not keep index values on concatenation axis
 )
-del ahle_combo_scensmry_sumspec1 ,ahle_combo_scensmry_sumspec2
+del ahle_combo_scensmry_sumprodspec
 
 # -----------------------------------------------------------------------------
 # Calculate standard deviations
@@ -2147,6 +2183,7 @@ ahle_combo_scensmry.to_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_all_scensm
 
 # Output for Dash
 ahle_combo_scensmry.to_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_scensmry.csv') ,index=False)
+to_feather_fordash(ahle_combo_scensmry ,os.path.join(DASH_DATA_FOLDER ,'ahle_all_scensmry.feather'))
 
 #%% Calculate AHLE using scenario summaries
 '''
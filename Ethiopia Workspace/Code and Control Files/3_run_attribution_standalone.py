@@ -1,6 +1,6 @@
 #%% About
 '''
-This runs the R program provided by the University of Murdoch to estimate
+This runs the attribution function provided by the University of Murdoch to estimate
 attribution of the AHLE.
 
 The attribution relies on expert opinions which are recorded in CSV files.
@@ -17,6 +17,10 @@ This code separates the AHLE output by species and processes each one individual
 It then calls the attribution function separately, once for each species or group,
 before concatenating the results into a single file for export.
 
+The attribution is run with ahle_attribution.py, a Python version of the R
+attribution function, which does all years and regions in one call. To use the
+R code instead, set USE_R_ATTRIBUTION to True.
+
 IMPORTANT: before running this, set Python's working directory to the folder
 where this code is stored.
 '''
@@ -32,6 +36,8 @@ import numpy as np
 import pandas as pd
 import pickle                    # To save objects to disk
 
+import ahle_attribution          # Python version of the attribution function
+
 # Run a command on the command line using subprocess package
 # Example usage: run_cmd(['dir' ,'c:\\users'] ,SHELL=True ,SHOW_MAXLINES=10)
 # To run an R program:
@@ -206,6 +212,47 @@ def take_first_nonmissing(
 
 	return OUTPUT_SERIES
 
+# To save a data frame for the dashboard in Feather format, next to the CSV or pickle file
+# Feather is a binary columnar format that the dashboard reads much faster than CSV.
+# Columns in CATEGORICAL_COLS are stored as categories, and the dashboard reads them as categories.
+# Other columns keep their types, including columns that are already categorical.
+# File is uncompressed so the dashboard can memory-map it.
+# Example usage:
+#   df.to_csv(os.path.join(DASH_DATA_FOLDER ,'df.csv') ,index=False)
+#   to_feather_fordash(df ,os.path.join(DASH_DATA_FOLDER ,'df.feather'))
+def to_feather_fordash(
+        INPUT_DF
+        ,FILEPATH          # String: full path to output file, ending in .feather
+        ,CATEGORICAL_COLS=['species' ,'region' ,'production_system' ,'item' ,'agesex_scenario']   # List of strings. Columns not in the data are ignored.
+    ):
+    funcname = inspect.currentframe().f_code.co_name
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        print(f"<{funcname}> Package pyarrow not found. Skipping {FILEPATH}.")
+        return None
+
+    dfmod = INPUT_DF.copy()     # pyarrow keeps the index, unlike DataFrame.to_feather()
+    dfmod.columns = dfmod.columns.astype(str)
+    for COL in CATEGORICAL_COLS:
+        if COL in dfmod.columns and not isinstance(dfmod[COL].dtype ,pd.CategoricalDtype):
+            dfmod[COL] = dfmod[COL].astype('category')
+    table = pa.Table.from_pandas(dfmod)
+
+    # Write to a temporary file and rename so the dashboard never reads a partial file
+    tmp_filepath = f"{FILEPATH}.tmp"
+    try:
+        feather.write_feather(table ,tmp_filepath ,compression='uncompressed')
+    except Exception as e:     # e.g. a column with mixed types. Dashboard will read the CSV or pickle.
+        print(f"<{funcname}> Could not save {FILEPATH}: {e!r}")
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        return None
+    os.replace(tmp_filepath ,FILEPATH)
+    print(f"<{funcname}> Saved {FILEPATH}")
+    return None
+
 #%% Paths and variables
 
 CURRENT_FOLDER = os.getcwd()
@@ -222,6 +269,13 @@ DASH_DATA_FOLDER = os.path.join(GRANDPARENT_FOLDER, 'AHLE Dashboard' ,'Dash App'
 # Full path to rscript.exe
 r_executable = 'C:\\Program Files\\R\\R-4.2.1\\bin\\x64\\Rscript.exe'
 
+# True: run attribution with the R code, once for each year and region. False: use ahle_attribution.py.
+USE_R_ATTRIBUTION = False
+
+# Number of samples and random seed for ahle_attribution.py. The R code uses 1000 samples and seed 123.
+ATTRIBUTION_N_SAMPLES = 1000
+ATTRIBUTION_SEED = 123
+
 #%% External data
 
 # =============================================================================
@@ -232,19 +286,30 @@ exchg_data_tomerge = pd.read_pickle(os.path.join(ETHIOPIA_DATA_FOLDER ,'wb_exchg
 
 #%% Run Attribution using example inputs
 
-r_script = os.path.join(ETHIOPIA_CODE_FOLDER ,'Attribution function.R')    # Full path to the R program you want to run
+if USE_R_ATTRIBUTION:
+    r_script = os.path.join(ETHIOPIA_CODE_FOLDER ,'Attribution function.R')    # Full path to the R program you want to run
 
-# Arguments to R function, as list of strings.
-# ORDER MATTERS! SEE HOW THIS LIST IS PARSED INSIDE R SCRIPT.
-r_args = [
-    os.path.join(ETHIOPIA_CODE_FOLDER ,'Attribution function input - example AHLE.csv')                # String: full path to AHLE estimates file (csv)
-    ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_smallruminants.csv')               # String: full path to expert opinion attribution file (csv)
-    ,os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_example.csv')    # String: full path to output file (csv)
-]
+    # Arguments to R function, as list of strings.
+    # ORDER MATTERS! SEE HOW THIS LIST IS PARSED INSIDE R SCRIPT.
+    r_args = [
+        os.path.join(ETHIOPIA_CODE_FOLDER ,'Attribution function input - example AHLE.csv')                # String: full path to AHLE estimates file (csv)
+        ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_smallruminants.csv')               # String: full path to expert opinion attribution file (csv)
+        ,os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_example.csv')    # String: full path to output file (csv)
+    ]
 
-timerstart()
-run_cmd([r_executable ,r_script] + r_args)
-timerstop()
+    timerstart()
+    run_cmd([r_executable ,r_script] + r_args)
+    timerstop()
+else:
+    timerstart()
+    attribution_summary_example = ahle_attribution.attribute(
+        pd.read_csv(os.path.join(ETHIOPIA_CODE_FOLDER ,'Attribution function input - example AHLE.csv'))
+        ,pd.read_csv(os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_smallruminants.csv') ,encoding='utf-8-sig')
+        ,N_SAMPLES=ATTRIBUTION_N_SAMPLES
+        ,SEED=ATTRIBUTION_SEED
+    )
+    attribution_summary_example.to_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_example.csv') ,index=False)
+    timerstop()
 
 #%% Read data and restructure
 '''
@@ -590,165 +655,87 @@ ahle_combo_forattr_poultry['Age class'] = ahle_combo_forattr_poultry['Age class'
 
 r_script = os.path.join(ETHIOPIA_CODE_FOLDER ,'Attribution function.R')    # Full path to the R program you want to run
 
+# Run attribution for all years and regions in AHLE_DF
+# EXPERT_FILE: full path to expert opinion attribution file (csv)
+# LABEL: species label for messages and intermediate file names
+# Returns data frame with the attribution summary and columns year and region
+def run_attribution(AHLE_DF ,EXPERT_FILE ,LABEL):
+   if not USE_R_ATTRIBUTION:
+      print(f'Running attribution for {LABEL}, all years and regions...')
+      expert_df = pd.read_csv(EXPERT_FILE ,encoding='utf-8-sig')    # Some expert files start with a byte order mark
+      timerstart()
+      OUTPUT_DF = ahle_attribution.attribute(
+         AHLE_DF
+         ,expert_df
+         ,BY_COLS=['year' ,'region']
+         ,N_SAMPLES=ATTRIBUTION_N_SAMPLES
+         ,SEED=ATTRIBUTION_SEED
+      )
+      timerstop()
+      return OUTPUT_DF
+
+   # R code: call once for each year and region
+   ahle_file = os.path.join(ETHIOPIA_OUTPUT_FOLDER ,f'ahle_combo_forattr_{LABEL}_oneyear_oneregion.csv')
+   summary_file = os.path.join(ETHIOPIA_OUTPUT_FOLDER ,f'attribution_summary_{LABEL}_oneyear_oneregion.csv')
+   summary_list = []
+   for (YEAR ,REGION) ,ahle_oneyear_oneregion in AHLE_DF.groupby(['year' ,'region'] ,sort=False):
+      print(f'Running attribution for {LABEL}, {YEAR=} and {REGION=}...')
+      ahle_oneyear_oneregion.to_csv(ahle_file ,index=False)
+
+      # Arguments to R function, as list of strings.
+      # ORDER MATTERS! SEE HOW THIS LIST IS PARSED INSIDE R SCRIPT.
+      r_args = [
+         ahle_file        # String: full path to AHLE estimates file (csv)
+         ,EXPERT_FILE     # String: full path to expert opinion attribution file (csv)
+         ,summary_file    # String: full path to output file (csv)
+      ]
+      timerstart()
+      rc = run_cmd([r_executable ,r_script] + r_args)
+      timerstop()
+      if rc != 0:
+         print(f'Attribution for {LABEL}, {YEAR=} and {REGION=} ended with returncode {rc}')
+
+      summary_oneyear_oneregion = pd.read_csv(summary_file)
+      summary_oneyear_oneregion['year'] = YEAR
+      summary_oneyear_oneregion['region'] = REGION
+      summary_list.append(summary_oneyear_oneregion)
+
+   # Delete intermediate CSVs
+   os.remove(ahle_file)
+   os.remove(summary_file)
+
+   return pd.concat(summary_list ,ignore_index=True)
+
 # =============================================================================
 #### Small ruminants
 # =============================================================================
-attribution_summary_smallruminants = pd.DataFrame()     # Initialize to hold all years
-
-# Initialize list to save return codes
-attr_smallrum_returncodes = []
-
-# Loop over years
-for YEAR in ahle_combo_forattr_smallrum['year'].unique():
-    # Loop over regions
-    for REGION in ahle_combo_forattr_smallrum.query(f"year == {YEAR}")['region'].unique():
-        print(f'Running attribution for small ruminants, {YEAR=} and {REGION=}...')
-
-        # Filter to year
-        ahle_combo_forattr_smallrum_oneyear_oneregion = ahle_combo_forattr_smallrum.query(f"year == {YEAR}").query(f"region == '{REGION}'")
-
-        # Write to CSV
-        ahle_combo_forattr_smallrum_oneyear_oneregion.to_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_smallrum_oneyear_oneregion.csv') ,index=False)
-
-        # Run attribution
-        # Arguments to R function, as list of strings.
-        # ORDER MATTERS! SEE HOW THIS LIST IS PARSED INSIDE R SCRIPT.
-        r_args = [
-           os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_smallrum_oneyear_oneregion.csv')  # String: full path to AHLE estimates file (csv)
-           ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_smallruminants.csv')    # String: full path to expert opinion attribution file (csv)
-           ,os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_smallruminants_oneyear_oneregion.csv')    # String: full path to output file (csv)
-        ]
-        timerstart()
-        rc = run_cmd([r_executable ,r_script] + r_args)
-        attr_smallrum_returncodes.append(rc)
-        timerstop()
-
-        # Read CSV with attribution
-        attribution_summary_smallruminants_oneyear_oneregion = pd.read_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_smallruminants_oneyear_oneregion.csv'))
-
-        # Add back filter columns
-        attribution_summary_smallruminants_oneyear_oneregion['year'] = YEAR
-        attribution_summary_smallruminants_oneyear_oneregion['region'] = REGION
-
-        # Append to result dataframe
-        attribution_summary_smallruminants = pd.concat([attribution_summary_smallruminants ,attribution_summary_smallruminants_oneyear_oneregion] ,ignore_index=True)
-
-# Add species label
+attribution_summary_smallruminants = run_attribution(
+   ahle_combo_forattr_smallrum
+   ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_smallruminants.csv')
+   ,'smallruminants'
+)
 attribution_summary_smallruminants['species'] = 'All Small Ruminants'
 
-# Delete intermediate data frames
-del ahle_combo_forattr_smallrum_oneyear_oneregion ,attribution_summary_smallruminants_oneyear_oneregion
-
-# Delete intermediate CSVs
-os.remove(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_smallrum_oneyear_oneregion.csv'))
-os.remove(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_smallruminants_oneyear_oneregion.csv'))
-
 # =============================================================================
 #### Cattle
 # =============================================================================
-attribution_summary_cattle = pd.DataFrame()     # Initialize to hold all years
-
-# Initialize list to save return codes
-attr_cattle_returncodes = []
-
-# Loop over years
-for YEAR in ahle_combo_forattr_cattle['year'].unique():
-    # Loop over regions
-    for REGION in ahle_combo_forattr_cattle.query(f"year == {YEAR}")['region'].unique():
-        print(f'Running attribution for cattle, {YEAR=} and {REGION=}...')
-
-        # Filter to year and region
-        ahle_combo_forattr_cattle_oneyear_oneregion = ahle_combo_forattr_cattle.query(f"year == {YEAR}").query(f"region == '{REGION}'")
-
-        # Write to CSV
-        ahle_combo_forattr_cattle_oneyear_oneregion.to_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_cattle_oneyear_oneregion.csv') ,index=False)
-
-        # Run attribution
-        # Arguments to R function, as list of strings.
-        # ORDER MATTERS! SEE HOW THIS LIST IS PARSED INSIDE R SCRIPT.
-        r_args = [
-           os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_cattle_oneyear_oneregion.csv')  # String: full path to AHLE estimates file (csv)
-           ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_cattle.csv')    # String: full path to expert opinion attribution file (csv)
-           ,os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_cattle_oneyear_oneregion.csv')    # String: full path to output file (csv)
-        ]
-        timerstart()
-        rc = run_cmd([r_executable ,r_script] + r_args)
-        attr_cattle_returncodes.append(rc)
-        timerstop()
-
-        # Read CSV with attribution
-        attribution_summary_cattle_oneyear_oneregion = pd.read_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_cattle_oneyear_oneregion.csv'))
-
-        # Add back filter columns
-        attribution_summary_cattle_oneyear_oneregion['year'] = YEAR
-        attribution_summary_cattle_oneyear_oneregion['region'] = REGION
-
-        # Append to result dataframe
-        attribution_summary_cattle = pd.concat([attribution_summary_cattle ,attribution_summary_cattle_oneyear_oneregion] ,ignore_index=True)
-
-# Add species label
+attribution_summary_cattle = run_attribution(
+   ahle_combo_forattr_cattle
+   ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_cattle.csv')
+   ,'cattle'
+)
 attribution_summary_cattle['species'] = 'Cattle'
 
-# Delete intermediate data frames
-del ahle_combo_forattr_cattle_oneyear_oneregion ,attribution_summary_cattle_oneyear_oneregion
-
-# Delete intermediate CSVs
-os.remove(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_cattle_oneyear_oneregion.csv'))
-os.remove(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_cattle_oneyear_oneregion.csv'))
-
 # =============================================================================
 #### Poultry
 # =============================================================================
-attribution_summary_poultry = pd.DataFrame()     # Initialize to hold all years
-
-# Initialize list to save return codes
-attr_poultry_returncodes = []
-
-# Loop over years
-for YEAR in ahle_combo_forattr_poultry['year'].unique():
-    # Loop over regions
-    for REGION in ahle_combo_forattr_poultry.query(f"year == {YEAR}")['region'].unique():
-        print(f'Running attribution for poultry, {YEAR=} and {REGION=}...')
-
-        # Filter to year
-        ahle_combo_forattr_poultry_oneyear_oneregion = ahle_combo_forattr_poultry.query(f"year == {YEAR}").query(f"region == '{REGION}'")
-
-        # Write to CSV
-        ahle_combo_forattr_poultry_oneyear_oneregion.to_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_poultry_oneyear_oneregion.csv') ,index=False)
-
-        # Run attribution
-        # Arguments to R function, as list of strings.
-        # ORDER MATTERS! SEE HOW THIS LIST IS PARSED INSIDE R SCRIPT.
-        r_args = [
-           os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_poultry_oneyear_oneregion.csv')  # String: full path to AHLE estimates file (csv)
-           ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_chickens.csv')    # String: full path to expert opinion attribution file (csv)
-           ,os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_poultry_oneyear_oneregion.csv')    # String: full path to output file (csv)
-        ]
-        timerstart()
-        rc = run_cmd([r_executable ,r_script] + r_args)
-        attr_poultry_returncodes.append(rc)
-        timerstop()
-
-        # Read CSV with attribution
-        attribution_summary_poultry_oneyear_oneregion = pd.read_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_poultry_oneyear_oneregion.csv'))
-
-        # Add back filter columns
-        attribution_summary_poultry_oneyear_oneregion['year'] = YEAR
-        attribution_summary_poultry_oneyear_oneregion['region'] = REGION
-
-        # Append to result dataframe
-        attribution_summary_poultry = pd.concat([attribution_summary_poultry ,attribution_summary_poultry_oneyear_oneregion] ,ignore_index=True)
-
-# Add species label
+attribution_summary_poultry = run_attribution(
+   ahle_combo_forattr_poultry
+   ,os.path.join(ETHIOPIA_CODE_FOLDER ,'attribution_experts_chickens.csv')
+   ,'poultry'
+)
 attribution_summary_poultry['species'] = 'All Poultry'
 
-# Delete intermediate data frames
-del ahle_combo_forattr_poultry_oneyear_oneregion ,attribution_summary_poultry_oneyear_oneregion
-
-# Delete intermediate CSVs
-os.remove(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_combo_forattr_poultry_oneyear_oneregion.csv'))
-os.remove(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'attribution_summary_poultry_oneyear_oneregion.csv'))
-
 # =============================================================================
 #### Combine attribution results
 # =============================================================================
@@ -1288,3 +1275,4 @@ datainfo(ahle_combo_withattr_toexport)
 # With disease-specific attribution
 ahle_combo_withattr_toexport.to_csv(os.path.join(ETHIOPIA_OUTPUT_FOLDER ,'ahle_all_withattr_disease.csv') ,index=False)
 ahle_combo_withattr_toexport.to_csv(os.path.join(DASH_DATA_FOLDER ,'ahle_all_withattr_disease.csv') ,index=False)
+to_feather_fordash(ahle_combo_withattr_toexport ,os.path.join(DASH_DATA_FOLDER ,'ahle_all_withattr_disease.feather'))
@@ -0,0 +1,137 @@
+#%% About
+'''
+This is a Python version of the attribution function from the University of
+Murdoch ('Attribution function.R').
+
+The attribution function splits each AHLE component (mortality, production loss,
+health cost) for each production system and age class into causes (infectious,
+non-infectious, external), using ranges of expert opinions:
+   - Draw samples of each AHLE estimate from a normal distribution and sum them
+     across species
+   - Average the expert min, avg and max for each cause and draw samples from a
+     PERT distribution
+   - Scale the samples for each cause so that they sum to one across causes
+   - Multiply AHLE samples by the scaled samples and summarize
+
+The R code is called once for each year and region. Here all years and regions
+are done together: samples are arrays with one row per estimate and one column
+per sample, and sums across species or causes are done on these arrays. Expert
+samples are drawn separately for each year and region, as when calling the R
+code for each.
+
+Results match the R code in distribution, not sample for sample, because random
+numbers are generated differently.
+
+Usage:
+   import ahle_attribution
+   attribution_summary = ahle_attribution.attribute(AHLE_DF ,EXPERT_DF ,BY_COLS=['year' ,'region'])
+'''
+#%% Packages
+
+import numpy as np
+import pandas as pd
+
+#%% Settings
+
+# Columns of the AHLE and expert data, as named in the R code
+AHLE_KEY_COLS = ['AHLE' ,'Production system' ,'Age class']
+AHLE_MEAN_COL = 'mean'
+AHLE_SD_COL = 'sd'
+EXPERT_CAUSE_COL = 'Cause'
+
+# 97.5th percentile of the standard normal distribution (R: qnorm(0.975))
+Z_975 = 1.959963984540054
+
+#%% Functions
+
+# PERT samples as in R package mc2d: rpert(n, min, mode, max, shape=4)
+# MIN, MODE, MAX: arrays with one value per row
+# Returns array with one row per value and N_SAMPLES columns. Rows with MODE outside [MIN, MAX] are NaN.
+def rpert_rows(N_SAMPLES ,MIN ,MODE ,MAX ,RNG ,SHAPE=4):
+   MIN ,MODE ,MAX = (np.asarray(x ,dtype='float64') for x in (MIN ,MODE ,MAX))
+   x_range = MAX - MIN
+   degenerate = (x_range == 0)
+   safe_range = np.where(degenerate ,1 ,x_range)
+   a1 = np.where(degenerate ,1 ,1 + SHAPE * (MODE - MIN) / safe_range)
+   a2 = np.where(degenerate ,1 ,1 + SHAPE * (MAX - MODE) / safe_range)
+   invalid = (MODE < MIN) | (MODE > MAX) | np.isnan(a1) | np.isnan(a2)
+   samples = RNG.beta(np.where(invalid ,1 ,a1)[: ,None] ,np.where(invalid ,1 ,a2)[: ,None] ,size=(len(MIN) ,N_SAMPLES))
+   samples = MIN[: ,None] + samples * x_range[: ,None]
+   samples[invalid] = np.nan
+   return samples
+
+# Sum rows of SAMPLES that have the same group code
+# Returns array with one row per group. NaN in any row of a group makes that group's sum NaN, as in R.
+def _sum_by_group(SAMPLES ,GROUP_CODES ,N_GROUPS):
+   sums = np.zeros((N_GROUPS ,SAMPLES.shape[1]))
+   np.add.at(sums ,GROUP_CODES ,SAMPLES)
+   return sums
+
+# Run attribution for all groups in AHLE_DF
+# AHLE_DF: data frame with AHLE estimates. Must have columns AHLE_KEY_COLS, 'mean', 'sd' and BY_COLS.
+#    Rows with the same keys (e.g. different species) are summed.
+# EXPERT_DF: data frame with expert opinions. Must have columns AHLE_KEY_COLS, 'Cause', 'min', 'avg', 'max'.
+#    Values are percentages.
+# BY_COLS: list of columns to run separately, e.g. ['year' ,'region']. Expert opinions apply to all.
+# SEED: integer to get the same results on every call. None uses a new seed each time.
+# Returns data frame with one row per BY group and expert row, with the same columns as the R output
+# plus BY_COLS: AHLE, Production system, Age class, Cause, median, mean, sd, lower95, upper95
+def attribute(AHLE_DF ,EXPERT_DF ,BY_COLS=[] ,N_SAMPLES=1000 ,SEED=123):
+   rng = np.random.default_rng(SEED)
+   BY_COLS = list(BY_COLS)
+   group_cols = BY_COLS + AHLE_KEY_COLS
+
+   # -----------------------------------------------------------------------------
+   # Sample AHLE estimates and sum across species
+   # -----------------------------------------------------------------------------
+   ahle_df = AHLE_DF.reset_index(drop=True)
+   ahle_samples = rng.normal(
+      ahle_df[AHLE_MEAN_COL].to_numpy(dtype='float64')[: ,None]
+      ,ahle_df[AHLE_SD_COL].to_numpy(dtype='float64')[: ,None]
+      ,size=(len(ahle_df) ,N_SAMPLES)
+   )
+   ahle_group_codes = ahle_df.groupby(group_cols ,sort=False ,dropna=False).ngroup().to_numpy()
+   ahle_groups = ahle_df[group_cols].drop_duplicates().reset_index(drop=True)
+   ahle_group_samples = _sum_by_group(ahle_samples ,ahle_group_codes ,len(ahle_groups))
+
+   # -----------------------------------------------------------------------------
+   # Average expert opinions and sample for each BY group
+   # -----------------------------------------------------------------------------
+   expert_avg = EXPERT_DF.groupby(AHLE_KEY_COLS + [EXPERT_CAUSE_COL] ,sort=False)[['min' ,'avg' ,'max']].mean() / 100
+   expert_avg = expert_avg.reset_index()
+
+   if BY_COLS:
+      by_groups = ahle_df[BY_COLS].drop_duplicates().reset_index(drop=True)
+      expert_rows = by_groups.merge(expert_avg ,how='cross')
+   else:
+      expert_rows = expert_avg.copy()
+   attr_samples = rpert_rows(N_SAMPLES ,expert_rows['min'] ,expert_rows['avg'] ,expert_rows['max'] ,rng)
+
+   # Scale so samples sum to one across causes
+   cause_group_codes = expert_rows.groupby(group_cols ,sort=False ,dropna=False).ngroup().to_numpy()
+   cause_sums = _sum_by_group(attr_samples ,cause_group_codes ,cause_group_codes.max() + 1)
+   attr_samples = attr_samples / cause_sums[cause_group_codes]
+
+   # -----------------------------------------------------------------------------
+   # Multiply AHLE samples by attribution samples
+   # -----------------------------------------------------------------------------
+   # Position of the matching AHLE group for each expert row. -1 if there is none.
+   ahle_group_index = pd.MultiIndex.from_frame(ahle_groups)
+   match = ahle_group_index.get_indexer(pd.MultiIndex.from_frame(expert_rows[group_cols]))
+   values = np.full(attr_samples.shape ,np.nan)
+   values[match >= 0] = attr_samples[match >= 0] * ahle_group_samples[match[match >= 0]]
+
+   # -----------------------------------------------------------------------------
+   # Summarize
+   # -----------------------------------------------------------------------------
+   OUTPUT_DF = expert_rows[group_cols + [EXPERT_CAUSE_COL]].copy()
+   OUTPUT_DF['median'] = np.median(values ,axis=1)
+   OUTPUT_DF['mean'] = values.mean(axis=1)
+   OUTPUT_DF['sd'] = values.std(axis=1 ,ddof=1)
+   OUTPUT_DF['lower95'] = OUTPUT_DF['mean'] - (Z_975 * OUTPUT_DF['sd'] / np.sqrt(N_SAMPLES))
+   OUTPUT_DF['upper95'] = OUTPUT_DF['mean'] + (Z_975 * OUTPUT_DF['sd'] / np.sqrt(N_SAMPLES))
+
+   # Same column order as R output, with BY columns at the end
+   OUTPUT_DF = OUTPUT_DF[AHLE_KEY_COLS + [EXPERT_CAUSE_COL ,'median' ,'mean' ,'sd' ,'lower95' ,'upper95'] + BY_COLS]
+   OUTPUT_DF = OUTPUT_DF.sort_values(BY_COLS + AHLE_KEY_COLS + [EXPERT_CAUSE_COL] ,kind='stable' ,ignore_index=True)
+   return OUTPUT_DF
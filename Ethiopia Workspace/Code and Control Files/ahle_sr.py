@@ -0,0 +1,426 @@
+#%% About
+'''
+This is a Python version of the small ruminant compartmental model from UoL,
+as defined in 'Run AHLE with control table_SMALLRUMINANTS.R' (also restructured
+by Murdoch in ahle_sr.R).
+
+It reads the same scenario control files and writes the same output files
+(ahle_<scenario>.csv, one row per item and group) so that
+2_process_simulation_results_standalone.py can read them unchanged.
+
+The R code loops over runs and months, drawing one value per parameter per run.
+Here all runs are calculated together: each population or output is an array
+with one row per run and one column per age-sex group, and only the 12 months
+are looped over. Results match the R code in distribution, not run for run,
+because random numbers are generated differently.
+
+Some details of the R code are kept so that results can be compared:
+   - sample(x ,1) on a single number >= 1 draws a whole number from 1 to x
+   - Dry matter for all groups uses the neonatal female requirement (kg_DM_req_NF)
+   - Parameters that are used without sample() (e.g. ccy, lab_non_health) use the
+     first value if they are distributions, as R does when assigning a vector to
+     a single element
+   - Offtake from neonates and wool are always zero
+
+Usage:
+   import ahle_sr
+   ahle_sr.run_scenario_file(1000 ,OUTPUT_FOLDER ,SCENARIO_FILE)
+'''
+#%% Packages
+
+import os
+import io
+import csv
+import tokenize
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+#%% Settings
+
+# Age-sex groups, in the order of columns in all arrays
+AGESEX_GROUPS = ['NF' ,'NM' ,'JF' ,'JM' ,'AF' ,'AM']
+
+# Groups in the output file and the columns they sum
+# Order matches build_summary_df() in the R code
+OUTPUT_GROUPS = {
+   'Overall':['NF' ,'NM' ,'JF' ,'JM' ,'AF' ,'AM']
+   ,'Neonatal Female':['NF']
+   ,'Neonatal Male':['NM']
+   ,'Neonatal Combined':['NF' ,'NM']
+   ,'Juvenile Female':['JF']
+   ,'Juvenile Male':['JM']
+   ,'Juvenile Combined':['JF' ,'JM']
+   ,'Adult Female':['AF']
+   ,'Adult Male':['AM']
+}
+_all_groups = list(OUTPUT_GROUPS)
+
+# Items in the output file: (label, name of result, groups)
+# Groups are those for which the R code creates a matrix
+OUTPUT_ITEMS = [
+   ('Num Offtake' ,'Num_Offtake' ,_all_groups)
+   ,('Cml Pop Growth' ,'Pop_growth' ,_all_groups)
+   ,('Total Number Increase' ,'Total_number_change' ,_all_groups)
+   ,('Total Mortality' ,'Total_Mortality' ,_all_groups)
+   ,('Value of Total Mortality' ,'Value_of_Total_Mortality' ,_all_groups)
+
+   ,('Population Liveweight (kg)' ,'Quant_Liveweight_kg' ,[g for g in _all_groups if g != 'Neonatal Combined'])
+   ,('Offtake Liveweight (kg)' ,'Offtake_Liveweight_kg' ,['Overall' ,'Juvenile Female' ,'Juvenile Male' ,'Adult Female' ,'Adult Male'])
+   ,('Meat (kg)' ,'Quant_Meat_kg' ,['Overall'])
+   ,('Manure' ,'Quant_Manure' ,_all_groups)
+   ,('Hides' ,'Quant_Hides' ,['Overall' ,'Juvenile Female' ,'Juvenile Male' ,'Juvenile Combined' ,'Adult Female' ,'Adult Male'])
+   ,('Milk' ,'Quant_Milk' ,['Overall'])
+   ,('Wool' ,'Quant_Wool' ,['Overall'])
+   ,('Cml Dry Matter' ,'Cumulative_Dry_Matter' ,_all_groups)
+
+   ,('Value of Offtake' ,'Value_Offtake' ,_all_groups)
+   ,('Value of Herd Increase' ,'Value_Herd_Increase' ,_all_groups)
+   ,('Value of Herd Increase plus Offtake' ,'Total_Value_increase' ,_all_groups)
+   ,('Value of Manure' ,'Value_Manure' ,_all_groups)
+   ,('Value of Hides' ,'Value_Hides' ,['Overall' ,'Juvenile Female' ,'Juvenile Male' ,'Juvenile Combined' ,'Adult Female' ,'Adult Male'])
+   ,('Value of Milk' ,'Value_Milk' ,['Overall'])
+   ,('Total Production Value' ,'Production_value_herd_offteake_hide_man' ,_all_groups)
+
+   ,('Feed Cost' ,'Feed_cost' ,_all_groups)
+   ,('Labour Cost' ,'Labour_cost' ,_all_groups)
+   ,('Health Cost' ,'Health_cost' ,_all_groups)
+   ,('Capital Cost' ,'Capital_cost' ,_all_groups)
+   ,('Infrastructure Cost' ,'Infrastructure_cost' ,_all_groups)
+   ,('Total Expenditure' ,'Total_expenditure' ,_all_groups)
+
+   ,('Gross Margin' ,'Gross_margin' ,_all_groups)
+]
+
+# Column of the scenario control file with parameter names, and columns that are not scenarios
+PARAMETER_COL = 'AHLE Parameter'
+NONSCENARIO_COLS = ['AHLE Parameter' ,'Notes']
+
+#%% Distributions used in scenario control files
+'''
+These match the R functions of the same name, including argument names and
+order, so that parameter values can be copied from the control files as they
+are. R allows named arguments in any position, so arguments are matched with
+_match_args() rather than by Python.
+'''
+# Marks a named argument in a parameter expression. Created by _to_python().
+class _Named:
+   def __init__(self ,NAME ,VALUE):
+      self.name = NAME
+      self.value = VALUE
+
+# Match arguments to FORMALS the way R does: named arguments first, then unnamed arguments in order
+# FORMALS: dictionary {argument name: default value}. Use _REQUIRED for arguments without a default.
+_REQUIRED = object()
+def _match_args(FUNCNAME ,FORMALS ,ARGS):
+   matched = {}
+   unnamed = []
+   for arg in ARGS:
+      if isinstance(arg ,_Named):
+         if arg.name not in FORMALS:
+            raise TypeError(f'{FUNCNAME}() has no argument {arg.name}')
+         matched[arg.name] = arg.value
+      else:
+         unnamed.append(arg)
+   remaining = [name for name in FORMALS if name not in matched]
+   if len(unnamed) > len(remaining):
+      raise TypeError(f'{FUNCNAME}() given too many arguments')
+   matched.update(zip(remaining ,unnamed))
+   for name ,default in FORMALS.items():
+      if name not in matched:
+         if default is _REQUIRED:
+            raise TypeError(f'{FUNCNAME}() missing argument {name}')
+         matched[name] = default
+   return matched
+
+def _make_distributions(RNG):
+   def rpert(*ARGS):
+      args = _match_args('rpert' ,{'n':_REQUIRED ,'x.min':_REQUIRED ,'x.max':_REQUIRED ,'x.mode':_REQUIRED ,'lambda':4} ,ARGS)
+      n ,x_min ,x_max ,x_mode ,lam = args['n'] ,args['x.min'] ,args['x.max'] ,args['x.mode'] ,args['lambda']
+      if x_min > x_max or x_mode > x_max or x_mode < x_min:
+         raise ValueError(f'rpert(): invalid parameters {x_min}, {x_max}, {x_mode}')
+      x_range = x_max - x_min
+      if x_range == 0:
+         return np.full(int(n) ,float(x_min))
+      mu = (x_min + x_max + lam * x_mode) / (lam + 2)
+      if mu == x_mode:
+         v = (lam / 2) + 1
+      else:
+         v = ((mu - x_min) * (2 * x_mode - x_min - x_max)) / ((x_mode - mu) * (x_max - x_min))
+      w = (v * (x_max - mu)) / (mu - x_min)
+      return RNG.beta(v ,w ,size=int(n)) * x_range + x_min
+
+   # Draws again for values outside [a, b] until all are inside
+   def rtruncnorm(*ARGS):
+      args = _match_args('rtruncnorm' ,{'n':_REQUIRED ,'a':-np.inf ,'b':np.inf ,'mean':0 ,'sd':1} ,ARGS)
+      values = RNG.normal(args['mean'] ,args['sd'] ,size=int(args['n']))
+      outside = (values < args['a']) | (values > args['b'])
+      while outside.any():
+         values[outside] = RNG.normal(args['mean'] ,args['sd'] ,size=outside.sum())
+         outside = (values < args['a']) | (values > args['b'])
+      return values
+
+   def rnorm(*ARGS):
+      args = _match_args('rnorm' ,{'n':_REQUIRED ,'mean':0 ,'sd':1} ,ARGS)
+      return RNG.normal(args['mean'] ,args['sd'] ,size=int(args['n']))
+
+   def runif(*ARGS):
+      args = _match_args('runif' ,{'n':_REQUIRED ,'min':0 ,'max':1} ,ARGS)
+      return RNG.uniform(args['min'] ,args['max'] ,size=int(args['n']))
+
+   # R's rgamma takes rate as the third argument. Numpy takes scale = 1/rate.
+   def rgamma(*ARGS):
+      args = _match_args('rgamma' ,{'n':_REQUIRED ,'shape':_REQUIRED ,'rate':1 ,'scale':None} ,ARGS)
+      scale = args['scale'] if args['scale'] is not None else 1 / args['rate']
+      return RNG.gamma(args['shape'] ,scale ,size=int(args['n']))
+
+   return {
+      'rpert':rpert
+      ,'rtruncnorm':rtruncnorm
+      ,'rnorm':rnorm
+      ,'runif':runif
+      ,'rgamma':rgamma
+   }
+
+# Convert a parameter expression from R to Python
+# Named arguments (name = value) become _Named('name' ,value) and ^ becomes **
+def _to_python(EXPRESSION):
+   tokens = list(tokenize.generate_tokens(io.StringIO(EXPRESSION.strip()).readline))
+   output = []
+   depth = 0
+   close_named_at = []     # Depths at which a _Named( needs closing
+   for i ,token in enumerate(tokens):
+      if token.type == tokenize.OP and token.string in (',' ,')') and close_named_at and close_named_at[-1] == depth:
+         output.append(')')
+         close_named_at.pop()
+      if token.type == tokenize.NAME and depth > 0 \
+         and i + 1 < len(tokens) and tokens[i + 1].string == '=' \
+         and output and output[-1] in ('(' ,','):
+         output.append(f'_Named({token.string!r} ,')
+         close_named_at.append(depth)
+         continue
+      if token.type == tokenize.OP and token.string == '=' and output and output[-1].startswith('_Named('):
+         continue
+      if token.type == tokenize.OP and token.string == '(':
+         depth += 1
+      elif token.type == tokenize.OP and token.string == ')':
+         depth -= 1
+      if token.type == tokenize.OP and token.string == '^':
+         output.append('**')
+      elif token.type in (tokenize.NEWLINE ,tokenize.NL ,tokenize.ENDMARKER):
+         continue
+      else:
+         output.append(token.string)
+   return ' '.join(output)
+
+# Evaluate a value from a scenario control file
+# Returns a float or a numpy array of draws
+def eval_parameter(VALUE ,RNG):
+   if not isinstance(VALUE ,str):
+      return float(VALUE)
+   namespace = {'__builtins__':{} ,'_Named':_Named ,**_make_distributions(RNG)}
+   result = eval(_to_python(VALUE) ,namespace)
+   if isinstance(result ,np.ndarray):
+      return result.astype('float64')
+   return float(result)
+
+#%% Model
+
+# Equivalent of sample(X ,1) in R, repeated for each run
+def _sample(X ,NRUNS ,RNG):
+   x = np.atleast_1d(X)
+   if len(x) == 1:
+      if x[0] >= 1:     # R samples from 1:x for a single number >= 1
+         return RNG.integers(1 ,int(np.floor(x[0])) + 1 ,size=NRUNS).astype('float64')
+      return np.full(NRUNS ,x[0])
+   return x[RNG.integers(len(x) ,size=NRUNS)]
+
+# Sample one value per run for each age-sex group
+# PARAMS: list of parameters, one for each age-sex group. None for groups the parameter does not apply to (result is 0).
+def _sample_groups(PARAMS ,NRUNS ,RNG):
+   return np.column_stack([
+      np.zeros(NRUNS) if param is None else _sample(param ,NRUNS ,RNG)
+      for param in PARAMS
+   ])
+
+# First value of a parameter that is used without sample()
+def _first(X):
+   return np.atleast_1d(X)[0]
+
+# Run the compartmental model for one scenario
+# PARAMS: dictionary of parameter values, as returned by eval_parameter()
+# Returns a dictionary {result name: array with one row per run and one column per age-sex group}
+# holding the values at the end of the last month
+def compartmental_model(NRUNS ,PARAMS ,RNG=None):
+   if RNG is None:
+      RNG = np.random.default_rng()
+   p = PARAMS
+   num_months = int(_first(p.get('Num_months' ,12)))
+   zeros = np.zeros((NRUNS ,len(AGESEX_GROUPS)))
+
+   # Initial population
+   n_t0 = np.array([p['N_NF_t0'] ,p['N_NM_t0'] ,p['N_JF_t0'] ,p['N_JM_t0'] ,p['N_AF_t0'] ,p['N_AM_t0']] ,dtype='float64')
+
+   # Reproduction rate
+   mu = _sample(p['part'] ,10000 ,RNG) * _sample(p['prolif'] ,10000 ,RNG) / 12
+
+   # Daily dry matter required and feed expenditure per head
+   kg_dm_req = [p[f'DM_req_prpn_{g}'] * p[f'lw{g}'] for g in AGESEX_GROUPS]
+   expenditure_on_feed = [
+      kg_dm_req_g * p['prpn_lskeepers_purch_feed'] * p['prpn_feed_paid_for'] / p['DM_in_feed'] * p['Feed_cost_kg']
+      for kg_dm_req_g in kg_dm_req
+   ]
+
+   # Parameters for each age-sex group
+   alpha = [p['AlphaN'] ,p['AlphaN'] ,p['AlphaJ'] ,p['AlphaJ'] ,p['AlphaF'] ,p['AlphaM']]
+   gamma = [None ,None ,p['GammaF'] ,p['GammaM'] ,p['GammaF'] ,p['GammaM']]
+   beta = [p['Beta'] ,p['Beta'] ,p['Beta'] ,p['Beta'] ,None ,None]
+   cull = [None ,None ,None ,None ,p['CullF'] ,p['CullM']]
+   lw = [p[f'lw{g}'] for g in AGESEX_GROUPS]
+   fv = [p[f'fv{g}'] for g in AGESEX_GROUPS]
+   manure = [p['Man_N'] ,p['Man_N'] ,p['Man_J'] ,p['Man_J'] ,p['Man_A'] ,p['Man_A']]
+   has_offtake = np.array([g[0] != 'N' for g in AGESEX_GROUPS])
+   is_adult_female = np.array([g == 'AF' for g in AGESEX_GROUPS])
+
+   # Running totals
+   pop = np.tile(n_t0 ,(NRUNS ,1))
+   pop_month1 = None
+   cml_deaths = zeros.copy()
+   cml_offtake = zeros.copy()
+   cml_hides = zeros.copy()
+   cml_milk = zeros.copy()
+   cml_manure = zeros.copy()
+   cml_dm = zeros.copy()
+   cml_feed = zeros.copy()
+   cml_labour = zeros.copy()
+   cml_health = zeros.copy()
+
+   for month in range(num_months):
+      births = _sample(mu ,NRUNS ,RNG) * pop[: ,4]
+      deaths = _sample_groups(alpha ,NRUNS ,RNG) * pop
+      offtake = _sample_groups(gamma ,NRUNS ,RNG) * pop
+      growth = _sample_groups(beta ,NRUNS ,RNG) * pop
+      culls = _sample_groups(cull ,NRUNS ,RNG) * pop
+
+      # Animals coming into each group: births into neonates, growth from the previous age group
+      inflow = np.column_stack([births * 0.5 ,births * 0.5 ,growth[: ,0] ,growth[: ,1] ,growth[: ,2] ,growth[: ,3]])
+      pop = pop + inflow - growth - offtake - deaths - culls
+      if month == 0:
+         pop_month1 = pop.copy()
+
+      cml_deaths += deaths
+      # Culled adult males are counted as offtake
+      cml_offtake += offtake
+      cml_offtake[: ,5] += culls[: ,5]
+      # Only hides from dead juveniles and adults are counted. Offtake hides are in the live animal price.
+      cml_hides[: ,has_offtake] += deaths[: ,has_offtake] * _first(p['hides_rate_mor'])
+      cml_milk[: ,is_adult_female] += (pop[: ,4] * _sample(p['part'] ,NRUNS ,RNG) \
+         * _first(p['prop_F_milked']) * _first(p['lac_duration']) * _first(p['avg_daily_yield_ltr']))[: ,None]
+      cml_manure += pop * _sample_groups(manure ,NRUNS ,RNG) * 30
+      # As in the R code, all groups use the neonatal female dry matter requirement
+      cml_dm += pop * _sample_groups([kg_dm_req[0]] * 6 ,NRUNS ,RNG) * 30
+      cml_feed += pop * _sample_groups(expenditure_on_feed ,NRUNS ,RNG) * 30
+      cml_labour += pop * _sample_groups([p['Lab_SR']] * 6 ,NRUNS ,RNG) * _first(p['lab_non_health'])
+      cml_health += pop * _sample_groups([p['Health_exp']] * 6 ,NRUNS ,RNG)
+
+   # Values at the end of the last month
+   # Items that are not cumulative in the R code only need their last month, so are sampled once here
+   results = {}
+   results['Num_Offtake'] = cml_offtake
+   results['Pop_growth'] = pop - n_t0
+   results['Total_number_change'] = results['Num_Offtake'] + results['Pop_growth']
+   results['Total_Mortality'] = cml_deaths
+   results['Value_of_Total_Mortality'] = cml_deaths * np.array([_first(fv_g) for fv_g in fv])
+
+   results['Quant_Liveweight_kg'] = pop * _sample_groups(lw ,NRUNS ,RNG)
+   results['Offtake_Liveweight_kg'] = cml_offtake * _sample_groups(lw ,NRUNS ,RNG) * has_offtake
+   results['Quant_Meat_kg'] = results['Offtake_Liveweight_kg'] * _first(p['ccy'])
+   results['Quant_Manure'] = cml_manure
+   results['Quant_Hides'] = cml_hides
+   results['Quant_Milk'] = cml_milk
+   results['Quant_Wool'] = zeros.copy()
+   results['Cumulative_Dry_Matter'] = cml_dm
+
+   results['Value_Offtake'] = cml_offtake * _sample_groups(fv ,NRUNS ,RNG) * has_offtake
+   results['Value_Herd_Increase'] = (pop - n_t0) * _sample_groups(fv ,NRUNS ,RNG)
+   results['Total_Value_increase'] = results['Value_Herd_Increase'] + results['Value_Offtake']
+   results['Value_Manure'] = cml_manure * _first(p['Man_value'])
+   results['Value_Hides'] = cml_hides * _first(p['hides_value'])
+   results['Value_Milk'] = cml_milk * _first(p['milk_value_ltr'])
+   results['Production_value_herd_offteake_hide_man'] = results['Total_Value_increase'] \
+      + results['Value_Manure'] + results['Value_Hides'] + results['Value_Milk']
+
+   results['Feed_cost'] = cml_feed
+   results['Labour_cost'] = cml_labour
+   results['Health_cost'] = cml_health
+   results['Capital_cost'] = pop_month1 * _sample_groups(fv ,NRUNS ,RNG) * _first(p['Interest_rate'])
+   results['Infrastructure_cost'] = n_t0 * _sample_groups([p['Infrastructure_per_head']] * 6 ,NRUNS ,RNG)
+   results['Total_expenditure'] = results['Feed_cost'] + results['Labour_cost'] + results['Health_cost'] \
+      + results['Capital_cost'] + results['Infrastructure_cost']
+
+   results['Gross_margin'] = results['Production_value_herd_offteake_hide_man'] - results['Total_expenditure']
+   return results
+
+# Summarize model results in the layout of the R output files
+def build_summary_df(RESULTS):
+   group_cols = {group:[AGESEX_GROUPS.index(g) for g in agesex] for group ,agesex in OUTPUT_GROUPS.items()}
+   rows = []
+   for label ,result_name ,groups in OUTPUT_ITEMS:
+      for group in groups:
+         values = RESULTS[result_name][: ,group_cols[group]].sum(axis=1)
+         q1 ,median ,q3 = np.quantile(values ,[0.25 ,0.5 ,0.75])     # Default method matches R's quantile()
+         rows.append({
+            'Item':label
+            ,'Group':group
+            ,'Mean':values.mean()
+            ,'StDev':values.std(ddof=1)
+            ,'Min':values.min()
+            ,'Q1':q1
+            ,'Median':median
+            ,'Q3':q3
+            ,'Max':values.max()
+         })
+   return pd.DataFrame(rows)
+
+#%% Scenario control files
+
+# Read a scenario control file
+# Returns a data frame with one row per parameter, indexed by parameter name, and one column per scenario
+def read_scenarios(SCENARIO_FILE ,SHEET='Sheet1'):
+   scenarios = pd.read_excel(SCENARIO_FILE ,SHEET)
+   scenarios.columns = scenarios.columns.astype(str).str.strip()
+
+   # Drop rows where parameter name is empty or commented
+   scenarios[PARAMETER_COL] = scenarios[PARAMETER_COL].astype(str).str.strip()
+   _droprows = scenarios[PARAMETER_COL].isin(['' ,'nan']) | scenarios[PARAMETER_COL].str.contains('#' ,regex=False)
+   scenarios = scenarios.loc[~_droprows]
+
+   scenario_cols = [c for c in scenarios.columns if c not in NONSCENARIO_COLS]
+   return scenarios.set_index(PARAMETER_COL)[scenario_cols]
+
+# Run all scenarios in a scenario control file and write a result file for each
+# Output file names match the R code: ahle_<scenario>.csv
+# SEED: integer to get the same results on every call. None (default) uses a new seed each time.
+def run_scenario_file(NRUNS ,OUTPUT_FOLDER ,SCENARIO_FILE ,SEED=None):
+   NRUNS = int(NRUNS)
+   scenarios = read_scenarios(SCENARIO_FILE)
+   rng = np.random.default_rng(SEED)
+   os.makedirs(OUTPUT_FOLDER ,exist_ok=True)
+   output_files = []
+   for scenario in scenarios.columns:
+      print(f'> Running AHLE scenario: {scenario}')
+      timerstart = dt.datetime.now()
+      scenario_params = {
+         name:eval_parameter(value ,rng)
+         for name ,value in scenarios[scenario].items()
+         if not (isinstance(value ,float) and np.isnan(value))
+      }
+      results = compartmental_model(NRUNS ,scenario_params ,rng)
+      summary_df = build_summary_df(results)
+
+      # Quote text like R's write.csv
+      output_file = os.path.join(OUTPUT_FOLDER ,f'ahle_{scenario}.csv')
+      summary_df.to_csv(output_file ,index=False ,quoting=csv.QUOTE_NONNUMERIC)
+      output_files.append(output_file)
+      print(f'> Finished {scenario} in {(dt.datetime.now() - timerstart).total_seconds() :.1f}s')
+   return output_files
@@ -0,0 +1,72 @@
+#%% About
+'''
+This runs the numbered scripts in this folder as a pipeline using _pipeline.py.
+
+Only the scripts whose code or input files have changed since their last
+successful run are run, along with any scripts that use their outputs. Scripts
+that do not depend on each other are run in parallel. Output from each script
+is written to a log file in pipeline_logs, next to the state file.
+
+Input and output files of each script are found by scanning the script. Add any
+that are built another way to its stage with INPUTS or OUTPUTS. See
+_pipeline.py for details.
+
+IMPORTANT: before running this, set Python's working directory to the folder
+where this code is stored.
+'''
+#%% Setup
+
+exec(open('0_runme.py').read())
+import _pipeline
+imp.reload(_pipeline)
+
+# Folder variables used in the scripts, for finding their input and output files
+pipeline_folders = {
+   'RAWDATA_FOLDER':RAWDATA_FOLDER
+   ,'PRODATA_FOLDER':PRODATA_FOLDER
+   ,'FINDATA_FOLDER':FINDATA_FOLDER
+   ,'PROGRAM_OUTPUT_FOLDER':PROGRAM_OUTPUT_FOLDER
+   ,'DASH_DATA_FOLDER':DASH_DATA_FOLDER
+}
+
+# File recording the hashes and status of each stage
+PIPELINE_STATE_FILE = os.path.join(PRODATA_FOLDER ,'pipeline_state.json')
+
+# Maximum number of scripts to run at once
+PIPELINE_MAX_WORKERS = max(1 ,os.cpu_count() - 1)
+
+# True: run all scripts even if they are up to date
+PIPELINE_FORCE = False
+
+#%% Stages
+'''
+In the order the scripts would be run by hand. A script only waits for earlier
+scripts that write its input files.
+'''
+pipeline_stages = [
+   # Extracts. 1a downloads from the GBADs Knowledge Engine API and caches responses.
+   # To refresh, set GBADSKE_REFRESH in 1a and PIPELINE_FORCE here.
+   _pipeline.stage('1a_extract_from_gbadske_api.py' ,pipeline_folders)
+   ,_pipeline.stage('1b_extract_from_fao.py' ,pipeline_folders)
+   ,_pipeline.stage('1c_extract_from_worldbank.py' ,pipeline_folders)
+
+   # Combine and calculate
+   ,_pipeline.stage('2a_combine_data.py' ,pipeline_folders)
+   ,_pipeline.stage('2b_intermediate_calcs_and_imputation.py' ,pipeline_folders)
+   ,_pipeline.stage('2c_ahle_calcs_prep_for_dash.py' ,pipeline_folders)
+]
+
+#%% Run
+
+# To see which scripts would run without running them:
+# _pipeline.run_pipeline(pipeline_stages ,PIPELINE_STATE_FILE ,DRY_RUN=True)
+
+pipeline_status = _pipeline.run_pipeline(
+   pipeline_stages
+   ,PIPELINE_STATE_FILE
+   ,MAX_WORKERS=PIPELINE_MAX_WORKERS
+   ,FORCE=PIPELINE_FORCE
+)
+pipeline_failed = [SCRIPT for SCRIPT ,STATUS in pipeline_status.items() if STATUS in ('failed' ,'upstream failed')]
+if pipeline_failed:
+   print(f"Scripts not completed: {pipeline_failed}")
@@ -2,15 +2,20 @@
 '''
 We will prefer to get data from the Informatics team API.
 For documentation see http://gbadske.org:9000/dataportal/
+
+Requests go through the client in _gbadske_api.py, which requests years in
+parallel, retries failed requests, and saves responses in a cache folder. Set
+GBADSKE_REFRESH to True to request everything again.
 '''
 
 #%% Packages and functions
 
-import requests as req         # For sending HTTP requests
 import inspect
 import io
 import pandas as pd
 
+import _gbadske_api as gbadske   # Client for the GBADs Knowledge Engine API
+
 # To clean up column names in a dataframe
 def cleancolnames(INPUT_DF):
    # Comments inside the statement create errors. Putting all comments at the top.
@@ -70,52 +75,32 @@ def datainfo(
 
 #%% View tables and field names
 
+# True: ignore saved API responses and request everything again
+GBADSKE_REFRESH = False
+
+gbadske_client = gbadske.make_client(
+    CACHE_FOLDER=os.path.join(RAWDATA_FOLDER ,'gbadske_cache')
+    ,REFRESH=GBADSKE_REFRESH
+)
+
 # =============================================================================
 #### Get list of all available tables
 # =============================================================================
-gbadske_tablelist_uri = 'http://gbadske.org:9000/GBADsTables/public?format=text'
-gbadske_tablelist = req.get(gbadske_tablelist_uri).text.split(',')   # Get table list and convert to list
+gbadske_tablelist = gbadske.get_table_list(gbadske_client)
 
 # ----------------------------------------------------------------------------
 # Lookup the column names in a specific table
 # ----------------------------------------------------------------------------
-gbadske_fieldnames_uri = 'http://gbadske.org:9000/GBADsTable/public'
-
 # Return the column names for a table
 # Usage: table_columns = gbadske_get_column_names(table)
 def gbadske_get_column_names(
         TABLE_NAME          # String: name of table
         ,RESP_TYPE='list'   # String: 'list' returns a list, 'string' returns a string
     ):
-    fieldnames_params = {
-       'table_name':TABLE_NAME
-       ,'format':'text'
-       }
-    fieldnames_str = req.get(gbadske_fieldnames_uri , params=fieldnames_params).text
-    fieldnames_list = req.get(gbadske_fieldnames_uri , params=fieldnames_params).text.split(',')
-    if RESP_TYPE == 'list':
-        return fieldnames_list
-    elif RESP_TYPE == 'string':
-        return fieldnames_str
+    return gbadske.get_column_names(gbadske_client ,TABLE_NAME ,RESP_TYPE)
 
 #%% Retrieve a table
 
-gbadske_query_uri = 'http://gbadske.org:9000/GBADsPublicQuery/'
-
-# -----------------------------------------------------------------------------
-# Pieces
-# -----------------------------------------------------------------------------
-# gbadske_query_table_name = 'livestock_countries_biomass'
-# gbadske_query_params = {
-#     'fields':gbadske_get_column_names(gbadske_query_table_name ,'string')   # All columns in table
-#     ,'query':"year=2017 AND member_country='Australia'"     # Note character column value must be in SINGLE QUOTES (double quotes don't work)
-#     ,'format':'file'
-#     }
-# gbadske_query_resp = req.get(gbadske_query_uri + gbadske_query_table_name , params=gbadske_query_params)
-
-# # Read table into pandas dataframe
-# gbadske_query_df = pd.read_csv(io.StringIO(gbadske_query_resp.text))
-
 # -----------------------------------------------------------------------------
 # Function
 # -----------------------------------------------------------------------------
@@ -125,21 +110,7 @@ def gbadske_import_to_pandas(
         TABLE_NAME      # String: name of table
         ,QUERY=""       # String (optional): data query in DOUBLE QUOTES. Values for character columns value must be in SINGLE QUOTES e.g. QUERY="year=2017 AND member_country='Australia'".
     ):
-    funcname = inspect.currentframe().f_code.co_name
-    query_params = {
-        'fields':gbadske_get_column_names(TABLE_NAME ,'string')
-        ,'query':QUERY
-        ,'format':'file'
-        }
-    query_resp = req.get(gbadske_query_uri + TABLE_NAME , params=query_params)
-
-    if query_resp.status_code == 200:
-        query_df = pd.read_csv(io.StringIO(query_resp.text))    # Read table into pandas dataframe
-    else:
-        print(f'<{funcname}> HTTP query error.')
-        query_df = pd.DataFrame()
-
-    return query_df
+    return gbadske.import_to_pandas(gbadske_client ,TABLE_NAME ,QUERY)
 
 #%% Get tables needed for AHLE
 
@@ -151,10 +122,7 @@ get_years = range(2000 ,2022)
 # =============================================================================
 # Get data for range of years
 livestock_countries_biomass_cols = gbadske_get_column_names('livestock_countries_biomass')
-livestock_countries_biomass = pd.DataFrame()    # Initialize
-for i in get_years:
-    single_year = gbadske_import_to_pandas('livestock_countries_biomass' ,QUERY=f"year={i}")
-    livestock_countries_biomass = pd.concat([livestock_countries_biomass ,single_year] ,ignore_index=True)
+livestock_countries_biomass = gbadske.import_years(gbadske_client ,'livestock_countries_biomass' ,get_years)
 
 # -----------------------------------------------------------------------------
 # Cleanup
@@ -199,10 +167,7 @@ livestock_countries_biomass.to_pickle(os.path.join(PRODATA_FOLDER ,'livestock_co
 # =============================================================================
 # Get data for range of years
 livestock_countries_biomass_oie_cols = gbadske_get_column_names('livestock_countries_biomass_oie')
-livestock_countries_biomass_oie = pd.DataFrame()    # Initialize
-for i in get_years:
-    single_year = gbadske_import_to_pandas('livestock_countries_biomass_oie' ,QUERY=f"year={i}")
-    livestock_countries_biomass_oie = pd.concat([livestock_countries_biomass_oie ,single_year] ,ignore_index=True)
+livestock_countries_biomass_oie = gbadske.import_years(gbadske_client ,'livestock_countries_biomass_oie' ,get_years)
 
 lcbo_years = livestock_countries_biomass_oie['year'].value_counts()
 
@@ -212,10 +177,7 @@ lcbo_years = livestock_countries_biomass_oie['year'].value_counts()
 # =============================================================================
 # Get data for range of years
 biomass_oie_cols = gbadske_get_column_names('biomass_oie')
-biomass_oie = pd.DataFrame()    # Initialize
-for i in get_years:
-    single_year = gbadske_import_to_pandas('biomass_oie' ,QUERY=f"year={i}")
-    biomass_oie = pd.concat([biomass_oie ,single_year] ,ignore_index=True)
+biomass_oie = gbadske.import_years(gbadske_client ,'biomass_oie' ,get_years)
 
 bo_years = biomass_oie['year'].value_counts()
 
@@ -280,10 +242,7 @@ biomass_live_weight_fao.to_pickle(os.path.join(PRODATA_FOLDER ,'biomass_live_wei
 # =============================================================================
 #### World Bank
 # =============================================================================
-wb_income = pd.DataFrame()    # Initialize
-for i in get_years:
-    single_year = gbadske_import_to_pandas('countries_incomegroups_worldbank' ,QUERY=f"year={i}")
-    wb_income = pd.concat([wb_income ,single_year] ,ignore_index=True)
+wb_income = gbadske.import_years(gbadske_client ,'countries_incomegroups_worldbank' ,get_years)
 
 datainfo(wb_income)
 
@@ -310,15 +269,7 @@ un_geo_codes.to_pickle(os.path.join(PRODATA_FOLDER ,'un_geo_codes.pkl.gz'))
 # =============================================================================
 #### countries_adminunits_iso
 # =============================================================================
-# check_admin = gbadske_import_to_pandas('countries_adminunits_iso')
-
-gbadske_query_table_name = 'countries_adminunits_iso'
-gbadske_query_params = {
-    'fields':gbadske_get_column_names(gbadske_query_table_name ,'string')   # All columns in table
-    ,'query':""     # Note character column value must be in SINGLE QUOTES (double quotes don't work)
-    ,'format':'file'
-    }
-gbadske_query_resp = req.get(gbadske_query_uri + gbadske_query_table_name , params=gbadske_query_params)
+check_admin = gbadske_import_to_pandas('countries_adminunits_iso')
 
 # =============================================================================
 #### Check others
@@ -328,6 +279,9 @@ gbadske_query_resp = req.get(gbadske_query_uri + gbadske_query_table_name , para
 # check_idtable = gbadske_import_to_pandas('idtable')
 # check_country_info = gbadske_import_to_pandas('country_info')
 
+# Requests, retries, and cache hits
+print(gbadske.stats(gbadske_client))
+
 #%% Create summaries
 
 # =============================================================================
@@ -249,8 +249,24 @@ median1_meat = world_ahle_imp.pivot_table(
    ,aggfunc='median'
 )
 
+# -----------------------------------------------------------------------------
+# Where production per kg biomass is missing, fill with median at different aggregation levels
+# -----------------------------------------------------------------------------
 # Find average for each species, year, region, and income group, weighted by biomass
 # UPDATE: Using median price instead of average as it is robust to outliers.
+# Medians for all production columns are calculated together. Each value's source is recorded in
+# {col}_impsource.
+world_ahle_imp = impute_hierarchical_median(
+    world_ahle_imp
+    ,IMPUTE_COLS=[f"{PRODCOL_BASE}_kgperkgbm" for PRODCOL_BASE in prod_animals_lookup]
+    ,GROUP_LEVELS={
+        'median1':['species' ,'year' ,'region' ,'incomegroup']
+        ,'median2a':['species' ,'year' ,'incomegroup']
+        ,'median2b':['species' ,'year' ,'region']
+        ,'median3':['species' ,'year']
+    }
+)
+
 for PRODCOL_BASE ,ANIMAL_BASE in prod_animals_lookup.items():
 # for PRODCOL_BASE in production_cols_base:
     # # -----------------------------------------------------------------------------
@@ -305,77 +321,6 @@ for PRODCOL_BASE ,ANIMAL_BASE in prod_animals_lookup.items():
     #     ,how='left'
     # )
 
-    # -----------------------------------------------------------------------------
-    # Alternative: get median at different aggregation levels
-    # -----------------------------------------------------------------------------
-    # Get median by group at least aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year' ,'region' ,'incomegroup']
-       ,values=f"{PRODCOL_BASE}_kgperkgbm"
-       ,aggfunc='median'
-    ).add_suffix('_median1')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year' ,'region' ,'incomegroup']
-        ,how='left'
-    )
-
-    # Get median by group at mid aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year' ,'incomegroup']
-       ,values=f"{PRODCOL_BASE}_kgperkgbm"
-       ,aggfunc='median'
-    ).add_suffix('_median2a')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year' ,'incomegroup']
-        ,how='left'
-    )
-
-    # Get median by group at mid aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year' ,'region']
-       ,values=f"{PRODCOL_BASE}_kgperkgbm"
-       ,aggfunc='median'
-    ).add_suffix('_median2b')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year' ,'region']
-        ,how='left'
-    )
-
-    # Get median by group at most aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year']
-       ,values=f"{PRODCOL_BASE}_kgperkgbm"
-       ,aggfunc='median'
-    ).add_suffix('_median3')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year']
-        ,how='left'
-    )
-
-    # -----------------------------------------------------------------------------
-    # Where production per kg biomass is missing, fill with average
-    # -----------------------------------------------------------------------------
-    _null_rows = (world_ahle_imp[f"{PRODCOL_BASE}_kgperkgbm"].isnull())
-    print(f"> Filling {_null_rows.sum() :,} rows where {PRODCOL_BASE}_kgperkgbm is missing.")
-
-    world_ahle_imp[f"{PRODCOL_BASE}_kgperkgbm_raw"] = world_ahle_imp[f"{PRODCOL_BASE}_kgperkgbm"]      # Create copy of original column
-    candidate_cols_inorder = [
-        f"{PRODCOL_BASE}_kgperkgbm_raw"
-        # ,f'{PRODCOL_BASE}_kgperkgbm_wtavg1'
-        # ,f'{PRODCOL_BASE}_kgperkgbm_wtavg2a'
-        # ,f'{PRODCOL_BASE}_kgperkgbm_wtavg2b'
-        # ,f'{PRODCOL_BASE}_kgperkgbm_wtavg3'
-        ,f'{PRODCOL_BASE}_kgperkgbm_median1'
-        ,f'{PRODCOL_BASE}_kgperkgbm_median2a'
-        ,f'{PRODCOL_BASE}_kgperkgbm_median2b'
-        ,f'{PRODCOL_BASE}_kgperkgbm_median3'
-        ]
-    world_ahle_imp[f"{PRODCOL_BASE}_kgperkgbm"] = take_first_nonmissing(world_ahle_imp ,candidate_cols_inorder)
-
     # -----------------------------------------------------------------------------
     # Recalculate production from production per kg biomass
     # -----------------------------------------------------------------------------
@@ -385,6 +330,7 @@ for PRODCOL_BASE ,ANIMAL_BASE in prod_animals_lookup.items():
     world_ahle_imp[f"{PRODCOL_BASE}_tonnes_raw"] = world_ahle_imp[f"{PRODCOL_BASE}_tonnes"]      # Create copy of original column
     world_ahle_imp[f"{PRODCOL_BASE}_tonnes"] = \
         round((world_ahle_imp[f"{PRODCOL_BASE}_kgperkgbm"] / 1000) * world_ahle_imp[f"{ANIMAL_BASE}_kgbm"] ,0)   # Round to integer
+    world_ahle_imp[f"{PRODCOL_BASE}_tonnes_impsource"] = world_ahle_imp[f"{PRODCOL_BASE}_kgperkgbm_impsource"]
 
 datainfo(world_ahle_imp)
 
@@ -405,43 +351,9 @@ imputed_cols_withspec = {
    ,'production_wool_kgperkgbm':['Sheep']
 }
 
-for COL ,SPECIES_LIST in imputed_cols_withspec.items():
-    # Get raw and imputed version and difference between them
-    check_imputation = world_ahle_imp[['country' ,'species' ,'year' ,COL ,f"{COL}_raw"]].copy()
-    check_imputation['impdiff'] = check_imputation[COL] - check_imputation[f"{COL}_raw"]
-    check_imputation['impdiff_abs'] = abs(check_imputation['impdiff'])
-    check_imputation['impdiff_pct'] = check_imputation['impdiff'] / check_imputation[f"{COL}_raw"]
-
-    # Row counts
-    spec_list_upper = [i.upper() for i in SPECIES_LIST]
-    if 'ALL' in spec_list_upper:
-        _rows_correctspecies = (check_imputation['species'].notnull())
-    else:
-        _rows_correctspecies = (check_imputation['species'].str.upper().isin(spec_list_upper))
-
-    print(f"<check_imputation> {COL}:")
-    print(f"    {_rows_correctspecies.sum(): ,} rows with applicable species {SPECIES_LIST}.")
-
-    _rows_rawmissing = _rows_correctspecies & (check_imputation[f"{COL}_raw"].isnull())
-    # _rows_rawmissing = (check_imputation[f"{COL}_raw"].isnull())
-    print(f"    {_rows_rawmissing.sum(): ,} rows where original value is missing.")
-
-    _rows_impmissing = _rows_correctspecies & (check_imputation[COL].isnull())
-    print(f"    {_rows_impmissing.sum(): ,} rows where imputed value is missing.")
-
-    _rows_impdiff = _rows_correctspecies & (check_imputation['impdiff_abs'] > 0)
-    print(f"    {_rows_impdiff.sum(): ,} rows where imputed value is different from original.")
-
-    # Boxplots of differences by Species
-    # snplt = sns.catplot(
-    #     data=check_imputation
-    #     ,x='species'
-    #     ,y='impdiff'
-    #     # ,hue='colorvar'
-    #     ,kind='box'
-    #     ,orient='v'
-    #     )
-    # plt.title(COL)
+# Count of rows by imputation source for each column
+imputation_summary = imputation_report(world_ahle_imp ,imputed_cols_withspec)
+print(f"<imputation_report>\n{imputation_summary}")
 
 #%% Producer Prices
 
@@ -686,78 +598,23 @@ datainfo(world_ahle_imp)
     #     ,how='left'
     # )
 
-for PRICE_BASE in price_cols_base:
-    # -----------------------------------------------------------------------------
-    # Alternative: get median price in USD at different aggregation levels
-    # -----------------------------------------------------------------------------
-    # Get median by group at least aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year' ,'region' ,'incomegroup']
-       ,values=f"{PRICE_BASE}_usdpertonne_cnst2010" ,aggfunc='median'
-    )
-    median = median.add_suffix('_median1')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year' ,'region' ,'incomegroup']
-        ,how='left'
-    )
-
-    # Get median by group at mid aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year' ,'incomegroup']
-       ,values=f"{PRICE_BASE}_usdpertonne_cnst2010" ,aggfunc='median'
-    )
-    median = median.add_suffix('_median2a')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year' ,'incomegroup']
-        ,how='left'
-    )
-
-    # Get median by group at mid aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year' ,'region']
-       ,values=f"{PRICE_BASE}_usdpertonne_cnst2010" ,aggfunc='median'
-    )
-    median = median.add_suffix('_median2b')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year' ,'region']
-        ,how='left'
-    )
-
-    # Get median by group at most aggregate level
-    median = world_ahle_imp.pivot_table(
-       index=['species' ,'year']
-       ,values=f"{PRICE_BASE}_usdpertonne_cnst2010" ,aggfunc='median'
-    )
-    median = median.add_suffix('_median3')
-    # Merge with data
-    world_ahle_imp = pd.merge(left=world_ahle_imp ,right=median
-        ,on=['species' ,'year']
-        ,how='left'
-    )
-
-    # -----------------------------------------------------------------------------
-    # Where price in USD is missing, fill with average
-    # -----------------------------------------------------------------------------
-    _null_rows = (world_ahle_imp[f"{PRICE_BASE}_usdpertonne_cnst2010"].isnull())
-    print(f"> Filling {_null_rows.sum() :,} rows where {PRICE_BASE}_usdpertonne_cnst2010 is missing.")
-
-    world_ahle_imp[f"{PRICE_BASE}_usdpertonne_cnst2010_raw"] = world_ahle_imp[f"{PRICE_BASE}_usdpertonne_cnst2010"]      # Create copy of original column
-    candidate_cols_inorder = [
-        f"{PRICE_BASE}_usdpertonne_cnst2010_raw"
-        # ,f'{PRICE}_wtavg1'
-        # ,f'{PRICE}_wtavg2a'
-        # ,f'{PRICE}_wtavg2b'
-        # ,f'{PRICE}_wtavg3'
-        ,f'{PRICE_BASE}_usdpertonne_cnst2010_median2a'   # Some extreme resuls with median 1, so putting 2a first
-        ,f'{PRICE_BASE}_usdpertonne_cnst2010_median2b'
-        ,f'{PRICE_BASE}_usdpertonne_cnst2010_median1'
-        ,f'{PRICE_BASE}_usdpertonne_cnst2010_median3'
-        ]
-    world_ahle_imp[f"{PRICE_BASE}_usdpertonne_cnst2010"] = take_first_nonmissing(world_ahle_imp ,candidate_cols_inorder)
+# -----------------------------------------------------------------------------
+# Where price in USD is missing, fill with median at different aggregation levels
+# -----------------------------------------------------------------------------
+# Medians for all price columns are calculated together. Each value's source is recorded in
+# {col}_impsource.
+world_ahle_imp = impute_hierarchical_median(
+    world_ahle_imp
+    ,IMPUTE_COLS=[f"{PRICE_BASE}_usdpertonne_cnst2010" for PRICE_BASE in price_cols_base]
+    ,GROUP_LEVELS={
+        'median2a':['species' ,'year' ,'incomegroup']   # Some extreme resuls with median 1, so putting 2a first
+        ,'median2b':['species' ,'year' ,'region']
+        ,'median1':['species' ,'year' ,'region' ,'incomegroup']
+        ,'median3':['species' ,'year']
+    }
+)
 
+for PRICE_BASE in price_cols_base:
     # -----------------------------------------------------------------------------
     # Replace coded values (supposed to be missing) with np.nan
     # -----------------------------------------------------------------------------
@@ -808,43 +665,9 @@ imputed_cols_withspec = {
     ,'producer_price_wool_usdpertonne_cnst2010':['Sheep']
 }
 
-for COL ,SPECIES_LIST in imputed_cols_withspec.items():
-    # Get raw and imputed version and difference between them
-    check_imputation = world_ahle_imp[['country' ,'species' ,'year' ,COL ,f"{COL}_raw"]].copy()
-    check_imputation['impdiff'] = check_imputation[COL] - check_imputation[f"{COL}_raw"]
-    check_imputation['impdiff_abs'] = abs(check_imputation['impdiff'])
-    check_imputation['impdiff_pct'] = check_imputation['impdiff'] / check_imputation[f"{COL}_raw"]
-
-    # Row counts
-    spec_list_upper = [i.upper() for i in SPECIES_LIST]
-    if 'ALL' in spec_list_upper:
-        _rows_correctspecies = (check_imputation['species'].notnull())
-    else:
-        _rows_correctspecies = (check_imputation['species'].str.upper().isin(spec_list_upper))
-
-    print(f"<check_imputation> {COL}:")
-    print(f"    {_rows_correctspecies.sum(): ,} rows with applicable species {SPECIES_LIST}.")
-
-    _rows_rawmissing = _rows_correctspecies & (check_imputation[f"{COL}_raw"].isnull())
-    # _rows_rawmissing = (check_imputation[f"{COL}_raw"].isnull())
-    print(f"    {_rows_rawmissing.sum(): ,} rows where original value is missing.")
-
-    _rows_impmissing = _rows_correctspecies & (check_imputation[COL].isnull())
-    print(f"    {_rows_impmissing.sum(): ,} rows where imputed value is missing.")
-
-    _rows_impdiff = _rows_correctspecies & (check_imputation['impdiff_abs'] > 0)
-    print(f"    {_rows_impdiff.sum(): ,} rows where imputed value is different from original.")
-
-    # Boxplots of differences by Species
-    # snplt = sns.catplot(
-    #     data=check_imputation
-    #     ,x='species'
-    #     ,y='impdiff'
-    #     # ,hue='colorvar'
-    #     ,kind='box'
-    #     ,orient='v'
-    #     )
-    # plt.title(COL)
+# Count of rows by imputation source for each column
+imputation_summary = imputation_report(world_ahle_imp ,imputed_cols_withspec)
+print(f"<imputation_report>\n{imputation_summary}")
 
 #%% Data checks
 
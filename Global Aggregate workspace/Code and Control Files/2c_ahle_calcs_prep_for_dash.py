@@ -158,6 +158,7 @@ world_ahle_abt_fordash.to_pickle(os.path.join(FINDATA_FOLDER ,'world_ahle_abt_fo
 
 # Output to Dash data folder
 world_ahle_abt_fordash.to_pickle(os.path.join(DASH_DATA_FOLDER ,'world_ahle_abt_fordash.pkl.gz'))
+to_feather_fordash(world_ahle_abt_fordash ,os.path.join(DASH_DATA_FOLDER ,'world_ahle_abt_fordash.feather'))
 
 #%% Add mortality and expenditure rates
 '''
@@ -367,6 +367,82 @@ def take_first_nonmissing(
 
    return OUTPUT_SERIES
 
+# To fill missing values with the median of groups, trying each grouping level in order
+# For each column in IMPUTE_COLS:
+#   {col}_raw: copy of the original column
+#   {col}: original value where non-missing, otherwise the median of the first level whose group has one
+#   {col}_impsource: where the value came from: 'raw', a level label, or missing if no level had a median
+# Medians are calculated from the original values, once per level for all columns together.
+# Rows with a missing key at a level get no median from that level, as with pivot_table.
+# Example usage:
+#   df = impute_hierarchical_median(
+#      df
+#      ,IMPUTE_COLS=['col1' ,'col2']
+#      ,GROUP_LEVELS={'median1':['species' ,'year' ,'region'] ,'median2':['species' ,'year']}
+#   )
+def impute_hierarchical_median(
+      INPUT_DF
+      ,IMPUTE_COLS          # List of strings: columns to impute
+      ,GROUP_LEVELS         # Dictionary: label for each level and list of columns to group by, in the order to try them
+      ,RAW_SUFFIX='_raw'
+      ,SOURCE_SUFFIX='_impsource'
+   ):
+   funcname = inspect.currentframe().f_code.co_name
+   OUTPUT_DF = INPUT_DF.copy()
+   raw_values = OUTPUT_DF[IMPUTE_COLS].astype('float64')
+
+   imputed_values = raw_values.to_numpy(copy=True)
+   source = np.where(raw_values.notnull() ,'raw' ,None).astype(object)
+   for LABEL ,BY_VARS in GROUP_LEVELS.items():
+      # Median of each group, lined up with the rows of the data
+      group_medians = raw_values.groupby([OUTPUT_DF[VAR] for VAR in BY_VARS] ,observed=True).median()
+      if len(BY_VARS) > 1:
+         row_keys = pd.MultiIndex.from_frame(OUTPUT_DF[BY_VARS])
+      else:
+         row_keys = pd.Index(OUTPUT_DF[BY_VARS[0]])
+      row_medians = group_medians.reindex(row_keys).to_numpy()
+
+      _fill = np.isnan(imputed_values) & ~np.isnan(row_medians)
+      imputed_values[_fill] = row_medians[_fill]
+      source[_fill] = LABEL
+
+   for i ,COL in enumerate(IMPUTE_COLS):
+      OUTPUT_DF[f"{COL}{RAW_SUFFIX}"] = raw_values[COL]
+      OUTPUT_DF[COL] = imputed_values[: ,i]
+      OUTPUT_DF[f"{COL}{SOURCE_SUFFIX}"] = pd.Categorical(source[: ,i] ,categories=['raw'] + list(GROUP_LEVELS))
+      _rows_filled = OUTPUT_DF[f"{COL}{SOURCE_SUFFIX}"].isin(list(GROUP_LEVELS)).sum()
+      print(f"<{funcname}> Filled {_rows_filled :,} of {raw_values[COL].isnull().sum() :,} rows where {COL} is missing.")
+
+   return OUTPUT_DF
+
+# To count where the values of imputed columns came from, in one table
+# Returns a data frame with one row per column: number of applicable rows, and number of rows for
+# each imputation source. Rows where the value is missing (originally or after later changes) are counted as 'missing'.
+# COLS_WITHSPEC: dictionary of columns and list of species each one applies to. ['All'] for all species.
+# Example usage:
+#   imputation_report(df ,{'col1':['All'] ,'col2':['Cattle' ,'Sheep']})
+def imputation_report(
+      INPUT_DF
+      ,COLS_WITHSPEC
+      ,SOURCE_SUFFIX='_impsource'
+      ,SPECIES_COL='species'
+   ):
+   species_upper = INPUT_DF[SPECIES_COL].astype(str).str.upper()
+   report_list = []
+   for COL ,SPECIES_LIST in COLS_WITHSPEC.items():
+      spec_list_upper = [i.upper() for i in SPECIES_LIST]
+      if 'ALL' in spec_list_upper:
+         _rows_correctspecies = INPUT_DF[SPECIES_COL].notnull()
+      else:
+         _rows_correctspecies = species_upper.isin(spec_list_upper)
+      source = INPUT_DF.loc[_rows_correctspecies ,f"{COL}{SOURCE_SUFFIX}"].cat.add_categories('missing')
+      source = source.where(INPUT_DF.loc[_rows_correctspecies ,COL].notnull() ,'missing')
+      counts = source.value_counts(sort=False)
+      report_list.append(pd.concat([pd.Series({'applicable_rows':_rows_correctspecies.sum()}) ,counts]).rename(COL))
+
+   OUTPUT_DF = pd.DataFrame(report_list).fillna(0).astype(int)
+   return OUTPUT_DF
+
 # To add a column to a data frame by lookup on keys
 # Usage: df['new_col'] = df['col_with_lookup'].apply(lookup_from_dictionary ,DICT=my_dictionary)
 def lookup_from_dictionary(KEY ,DICT):
@@ -374,3 +450,44 @@ def lookup_from_dictionary(KEY ,DICT):
         return DICT[KEY]      # If key is found in dictionary, return value
     except:
         return None
+
+# To save a data frame for the dashboard in Feather format, next to the CSV or pickle file
+# Feather is a binary columnar format that the dashboard reads much faster than CSV.
+# Columns in CATEGORICAL_COLS are stored as categories, and the dashboard reads them as categories.
+# Other columns keep their types, including columns that are already categorical.
+# File is uncompressed so the dashboard can memory-map it.
+# Example usage:
+#   df.to_csv(os.path.join(DASH_DATA_FOLDER ,'df.csv') ,index=False)
+#   to_feather_fordash(df ,os.path.join(DASH_DATA_FOLDER ,'df.feather'))
+def to_feather_fordash(
+      INPUT_DF
+      ,FILEPATH          # String: full path to output file, ending in .feather
+      ,CATEGORICAL_COLS=['species' ,'region' ,'production_system' ,'item' ,'agesex_scenario']   # List of strings. Columns not in the data are ignored.
+   ):
+   funcname = inspect.currentframe().f_code.co_name
+   try:
+      import pyarrow as pa
+      import pyarrow.feather as feather
+   except ImportError:
+      print(f"<{funcname}> Package pyarrow not found. Skipping {FILEPATH}.")
+      return None
+
+   dfmod = INPUT_DF.copy()     # pyarrow keeps the index, unlike DataFrame.to_feather()
+   dfmod.columns = dfmod.columns.astype(str)
+   for COL in CATEGORICAL_COLS:
+      if COL in dfmod.columns and not isinstance(dfmod[COL].dtype ,pd.CategoricalDtype):
+         dfmod[COL] = dfmod[COL].astype('category')
+   table = pa.Table.from_pandas(dfmod)
+
+   # Write to a temporary file and rename so the dashboard never reads a partial file
+   tmp_filepath = f"{FILEPATH}.tmp"
+   try:
+      feather.write_feather(table ,tmp_filepath ,compression='uncompressed')
+   except Exception as e:     # e.g. a column with mixed types. Dashboard will read the CSV or pickle.
+      print(f"<{funcname}> Could not save {FILEPATH}: {e!r}")
+      if os.path.exists(tmp_filepath):
+         os.remove(tmp_filepath)
+      return None
+   os.replace(tmp_filepath ,FILEPATH)
+   print(f"<{funcname}> Saved {FILEPATH}")
+   return None
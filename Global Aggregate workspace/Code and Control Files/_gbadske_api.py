@@ -0,0 +1,189 @@
+#%% About
+'''
+This is a client for the GBADs Knowledge Engine (GBADsKE) API.
+For documentation see http://gbadske.org:9000/dataportal/
+
+The API returns large tables slowly, so tables are requested in parts, e.g. one
+year at a time. import_years() requests the parts in parallel, with a limit on
+the number of requests at once, and stacks them once at the end.
+
+All requests share one connection pool. Failed requests (connection errors,
+timeouts, and server errors) are retried with increasing waits.
+
+Responses are saved in a cache folder, keyed by the table and query, and reused
+on later calls with the same table and query. Set 'refresh' to True when making
+the client to request everything again (the cache is then updated).
+
+The base URL can be changed, e.g. to test against a local server.
+
+Usage:
+   import _gbadske_api as gbadske
+   gbadske_client = gbadske.make_client(CACHE_FOLDER=os.path.join(RAWDATA_FOLDER ,'gbadske_cache'))
+   biomass = gbadske.import_years(gbadske_client ,'livestock_countries_biomass' ,range(2000 ,2022))
+'''
+#%% Libraries
+
+import os
+import io
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests as req
+import pandas as pd
+
+#%% Settings
+
+BASE_URL = 'http://gbadske.org:9000'
+
+# Maximum number of requests at once. The API is slow with many parallel requests.
+MAX_WORKERS = 4
+
+# Retries for failed requests. Waits are BACKOFF_SECONDS, then doubled for each retry.
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 2
+RETRY_STATUS_CODES = [429 ,500 ,502 ,503 ,504]
+
+# Seconds to wait for a connection and for the response. Queries without a year can take many minutes.
+TIMEOUT_SECONDS = (10 ,900)
+
+#%% Functions
+
+# Make a client. Returns a dictionary to pass to the other functions.
+# CACHE_FOLDER: folder to save responses in. None: do not cache.
+# REFRESH: True to ignore saved responses. New responses are still saved.
+def make_client(BASE_URL=BASE_URL ,CACHE_FOLDER=None ,REFRESH=False ,MAX_WORKERS=MAX_WORKERS):
+   session = req.Session()
+   adapter = req.adapters.HTTPAdapter(pool_connections=1 ,pool_maxsize=MAX_WORKERS)
+   session.mount('http://' ,adapter)
+   session.mount('https://' ,adapter)
+   if CACHE_FOLDER:
+      os.makedirs(CACHE_FOLDER ,exist_ok=True)
+   return {
+      'base_url':BASE_URL.rstrip('/')
+      ,'session':session
+      ,'cache_folder':CACHE_FOLDER
+      ,'refresh':REFRESH
+      ,'max_workers':MAX_WORKERS
+      ,'column_names':{}
+      ,'lock':threading.Lock()
+      ,'stats':{'requests':0 ,'retries':0 ,'cache_hits':0}
+   }
+
+def _count(CLIENT ,STAT):
+   with CLIENT['lock']:
+      CLIENT['stats'][STAT] += 1
+
+def _cache_filepath(CLIENT ,PATH ,PARAMS):
+   key_json = json.dumps([PATH ,PARAMS] ,sort_keys=True)
+   key_hash = hashlib.sha1(key_json.encode()).hexdigest()[:16]
+   table_name = PARAMS.get('table_name') or PATH.rstrip('/').split('/')[-1]
+   return os.path.join(CLIENT['cache_folder'] ,f'{table_name}_{key_hash}.txt')
+
+# GET a path on the API and return the response text
+# Returns None if the request fails after all retries or gets a status other than 200
+def get_text(CLIENT ,PATH ,PARAMS={}):
+   cache_filepath = None
+   if CLIENT['cache_folder']:
+      cache_filepath = _cache_filepath(CLIENT ,PATH ,PARAMS)
+      if not CLIENT['refresh'] and os.path.exists(cache_filepath):
+         _count(CLIENT ,'cache_hits')
+         with open(cache_filepath ,encoding='utf-8') as f:
+            return f.read()
+
+   url = CLIENT['base_url'] + PATH
+   for attempt in range(MAX_RETRIES + 1):
+      if attempt > 0:
+         _count(CLIENT ,'retries')
+         time.sleep(BACKOFF_SECONDS * 2**(attempt - 1))
+      _count(CLIENT ,'requests')
+      try:
+         resp = CLIENT['session'].get(url ,params=PARAMS ,timeout=TIMEOUT_SECONDS)
+      except (req.ConnectionError ,req.Timeout) as e:
+         error = repr(e)
+         continue
+      if resp.status_code in RETRY_STATUS_CODES:
+         error = f'HTTP status {resp.status_code}'
+         continue
+      if resp.status_code != 200:
+         print(f'<get_text> HTTP status {resp.status_code} for {PATH} {PARAMS.get("query" ,"")}')
+         return None
+      if cache_filepath:
+         # Write to a temporary file and rename so a partial file is never read
+         tmp_filepath = f'{cache_filepath}.{threading.get_ident()}.tmp'
+         with open(tmp_filepath ,'w' ,encoding='utf-8') as f:
+            f.write(resp.text)
+         os.replace(tmp_filepath ,cache_filepath)
+      return resp.text
+   print(f'<get_text> Failed after {MAX_RETRIES + 1} attempts for {PATH} {PARAMS.get("query" ,"")}: {error}')
+   return None
+
+# List of all available tables
+def get_table_list(CLIENT):
+   tablelist_str = get_text(CLIENT ,'/GBADsTables/public' ,{'format':'text'})
+   if tablelist_str is None:
+      return []
+   return tablelist_str.split(',')
+
+# Return the column names for a table
+# RESP_TYPE: 'list' returns a list, 'string' returns a comma-separated string
+# Returns None if the request fails
+def get_column_names(CLIENT ,TABLE_NAME ,RESP_TYPE='list'):
+   with CLIENT['lock']:
+      fieldnames_str = CLIENT['column_names'].get(TABLE_NAME)
+   if fieldnames_str is None:
+      fieldnames_str = get_text(CLIENT ,'/GBADsTable/public' ,{'table_name':TABLE_NAME ,'format':'text'})
+      if fieldnames_str is None:      # Request failed
+         return None
+      with CLIENT['lock']:
+         CLIENT['column_names'][TABLE_NAME] = fieldnames_str
+   if RESP_TYPE == 'list':
+      return fieldnames_str.split(',')
+   elif RESP_TYPE == 'string':
+      return fieldnames_str
+
+def _query_text(CLIENT ,TABLE_NAME ,QUERY):
+   fieldnames_str = get_column_names(CLIENT ,TABLE_NAME ,'string')
+   if fieldnames_str is None:
+      return None
+   query_params = {
+      'fields':fieldnames_str
+      ,'query':QUERY
+      ,'format':'file'
+   }
+   return get_text(CLIENT ,f'/GBADsPublicQuery/{TABLE_NAME}' ,query_params)
+
+# Return a table as a pandas dataframe
+# QUERY (optional): data query in DOUBLE QUOTES. Values for character columns must be in SINGLE QUOTES
+#    e.g. QUERY="year=2017 AND member_country='Australia'".
+# Returns an empty data frame if the request fails
+def import_to_pandas(CLIENT ,TABLE_NAME ,QUERY=''):
+   query_text = _query_text(CLIENT ,TABLE_NAME ,QUERY)
+   if query_text is None:
+      return pd.DataFrame()
+   return pd.read_csv(io.StringIO(query_text))
+
+# Return a table for a list of years as a single pandas dataframe
+# Each year is a separate request. Requests are run in parallel.
+# QUERY_TEMPLATE: query for each year, with {year} where the year goes
+def import_years(CLIENT ,TABLE_NAME ,YEARS ,QUERY_TEMPLATE='year={year}'):
+   funcname = 'import_years'
+   YEARS = list(YEARS)
+   get_column_names(CLIENT ,TABLE_NAME)     # Request once before starting parallel requests
+   queries = [QUERY_TEMPLATE.format(year=YEAR) for YEAR in YEARS]
+   with ThreadPoolExecutor(max_workers=CLIENT['max_workers']) as executor:
+      query_texts = list(executor.map(lambda QUERY: _query_text(CLIENT ,TABLE_NAME ,QUERY) ,queries))
+
+   failed_years = [YEAR for YEAR ,query_text in zip(YEARS ,query_texts) if query_text is None]
+   if failed_years:
+      print(f'<{funcname}> {TABLE_NAME}: no data for {len(failed_years)} of {len(YEARS)} years: {failed_years}')
+   year_dfs = [pd.read_csv(io.StringIO(query_text)) for query_text in query_texts if query_text is not None]
+   if not year_dfs:
+      return pd.DataFrame()
+   return pd.concat(year_dfs ,ignore_index=True)
+
+# Data frame of request, retry, and cache hit counts for a client
+def stats(CLIENT):
+   with CLIENT['lock']:
+      return pd.DataFrame([CLIENT['stats']])